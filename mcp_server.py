@@ -7,7 +7,6 @@ between DShield Elasticsearch queries and DShield threat intelligence.
 # type: ignore[operator,assignment,union-attr,arg-type,index]
 
 import asyncio
-import json
 import sys
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -18,6 +17,7 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool  # Fixed import for Tool
+from src import json_codec
 from src.campaign_analyzer import CampaignAnalyzer
 from src.campaign_mcp_tools import CampaignMCPTools
 from src.context_injector import ContextInjector
@@ -119,6 +119,15 @@ class DShieldMCPServer:
             logger.error("Failed to load user config", error=str(e))
             self.user_config = None
 
+        # Compact or indented JSON in tool output
+        if self.user_config:
+            try:
+                json_codec.set_compact_output(
+                    self.user_config.get_setting("performance", "compact_json_output") is True
+                )
+            except (ValueError, KeyError):
+                pass
+
         # Initialize error handler with configuration
         try:
             error_config = ErrorHandlingConfig()
@@ -238,19 +247,19 @@ class DShieldMCPServer:
             try:
                 if uri == "dshield://events":
                     events = await self._get_recent_dshield_events()
-                    return json.dumps(events, default=str)
+                    return json_codec.dumps(events)
                 elif uri == "dshield://attacks":
                     attacks = await self._get_recent_dshield_attacks()
-                    return json.dumps(attacks, default=str)
+                    return json_codec.dumps(attacks)
                 elif uri == "dshield://top-attackers":
                     attackers = await self._get_dshield_top_attackers()
-                    return json.dumps(attackers, default=str)
+                    return json_codec.dumps(attackers)
                 elif uri == "dshield://statistics":
                     stats = await self._get_dshield_stats()
-                    return json.dumps(stats, default=str)
+                    return json_codec.dumps(stats)
                 elif uri == "dshield://threat-intelligence":
                     # Return cached threat intelligence
-                    return json.dumps(
+                    return json_codec.dumps(
                         {"message": "Use enrich_ip_with_dshield tool for specific IPs"}
                     )
                 elif uri == "dshield://data-dictionary":
@@ -261,13 +270,13 @@ class DShieldMCPServer:
                     error_response = self.error_handler.create_resource_error(
                         uri, "not_found", f"Resource '{uri}' not found"
                     )
-                    return json.dumps(error_response)
+                    return json_codec.dumps(error_response)
             except Exception as e:
                 logger.error("Resource reading failed", uri=uri, error=str(e))
                 error_response = self.error_handler.create_resource_error(
                     uri, "unavailable", f"Failed to read resource '{uri}': {e!s}"
                 )
-                return json.dumps(error_response)
+                return json_codec.dumps(error_response)
 
     def _register_tool_handlers(self) -> None:
         """Register tool handlers with the dispatcher.
@@ -600,6 +609,8 @@ class DShieldMCPServer:
                 - sort_by: Field to sort by (default: '@timestamp')
                 - sort_order: Sort order 'asc' or 'desc' (default: 'desc')
                 - cursor: Cursor token for cursor-based pagination
+                - use_pit: Page through a point-in-time snapshot (opaque cursor)
+                - projection: 'lean' (default) or 'full' (adds raw_data and indices)
                 - optimization: Smart query optimization mode
                 - fallback_strategy: Fallback strategy when optimization fails
                 - max_result_size_mb: Maximum result size in MB
@@ -630,6 +641,8 @@ class DShieldMCPServer:
         sort_by = arguments.get("sort_by", "@timestamp")
         sort_order = arguments.get("sort_order", "desc")
         cursor = arguments.get("cursor")
+        use_pit = arguments.get("use_pit", False)
+        projection = arguments.get("projection", "lean")
         include_summary = arguments.get("include_summary", True)
         optimization = arguments.get(
             "optimization",
@@ -723,6 +736,8 @@ class DShieldMCPServer:
                 fallback_strategy=fallback_strategy,
                 max_result_size_mb=max_result_size_mb,
                 query_timeout_seconds=query_timeout_seconds,
+                use_pit=use_pit,
+                projection=projection,
             )
 
             if not events:
@@ -763,10 +778,10 @@ class DShieldMCPServer:
                 response_text += "\n"
 
             # Add pagination metadata for programmatic access
-            response_text += f"Pagination Metadata:\n{json.dumps(pagination_info, indent=2)}\n\n"
+            response_text += f"Pagination Metadata:\n{json_codec.dumps_text(pagination_info)}\n\n"
 
             # Add events
-            response_text += "Events:\n" + json.dumps(events, indent=2, default=str)
+            response_text += "Events:\n" + json_codec.dumps_text(events)
 
             return [{"type": "text", "text": response_text}]
         except Exception as e:
@@ -899,9 +914,8 @@ class DShieldMCPServer:
             response_text += f"- Total Bytes Sent: {summary['total_bytes_sent']}\n"
             response_text += f"- Average Duration: {summary['avg_duration']}\n\n"
 
-            response_text += "Detailed Aggregations:\n" + json.dumps(
-                processed_aggregations, indent=2, default=str
-            )
+            response_text += "Detailed Aggregations:\n"
+            response_text += json_codec.dumps_text(processed_aggregations)
 
             return [{"type": "text", "text": response_text}]
         except Exception as e:
@@ -1051,7 +1065,7 @@ class DShieldMCPServer:
                 response_text += "- Stream IDs: "
                 f"{[chunk['stream_id'] for chunk in all_chunks if chunk['stream_id']]}\n\n"
 
-            response_text += "Chunk Details:\n" + json.dumps(all_chunks, indent=2, default=str)
+            response_text += "Chunk Details:\n" + json_codec.dumps_text(all_chunks)
 
             return [{"type": "text", "text": response_text}]
 
@@ -1119,7 +1133,7 @@ class DShieldMCPServer:
                 "session_context": session_context,
             }
 
-            return [{"type": "text", "text": json.dumps(response, default=str, indent=2)}]
+            return [{"type": "text", "text": json_codec.dumps_text(response)}]
 
         except Exception as e:
             logger.error("Session context streaming failed", error=str(e))
@@ -1172,11 +1186,11 @@ class DShieldMCPServer:
                     f"- Attack patterns: {list(summary.get('attack_patterns', {}).keys())}\n\n"
                 )
 
-            response_text += "Attack Details:\n" + json.dumps(attacks, indent=2, default=str)
+            response_text += "Attack Details:\n" + json_codec.dumps_text(attacks)
 
             # Add pagination info to response
             if pagination_info['has_next'] or pagination_info['has_previous']:
-                response_text += "\n\nPagination Info:\n" + json.dumps(pagination_info, indent=2)
+                response_text += "\n\nPagination Info:\n" + json_codec.dumps_text(pagination_info)
 
             return [{"type": "text", "text": response_text}]
         except Exception as e:
@@ -1205,7 +1219,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"Found {len(reputation_data)} DShield reputation records:\n\n"
-                + json.dumps(reputation_data, indent=2, default=str),
+                + json_codec.dumps_text(reputation_data),
             }
         ]
 
@@ -1222,7 +1236,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"Found {len(attackers)} top DShield attackers in the last "
-                f"{hours} hours:\n\n" + json.dumps(attackers, indent=2, default=str),
+                f"{hours} hours:\n\n" + json_codec.dumps_text(attackers),
             }
         ]
 
@@ -1243,7 +1257,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"Found {len(geo_data)} DShield geographic records:\n\n"
-                + json.dumps(geo_data, indent=2, default=str),
+                + json_codec.dumps_text(geo_data),
             }
         ]
 
@@ -1260,7 +1274,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"Found {len(port_data)} DShield port records:\n\n"
-                + json.dumps(port_data, indent=2, default=str),
+                + json_codec.dumps_text(port_data),
             }
         ]
 
@@ -1276,7 +1290,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"DShield Statistics (Last {time_range_hours} hours):\n\n"
-                + json.dumps(stats, indent=2, default=str),
+                + json_codec.dumps_text(stats),
             }
         ]
 
@@ -1306,7 +1320,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Data Availability Diagnosis Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1322,7 +1336,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"DShield threat intelligence for {ip_address}:\n\n"
-                + json.dumps(threat_data, indent=2, default=str),
+                + json_codec.dumps_text(threat_data),
             }
         ]
 
@@ -1338,7 +1352,7 @@ class DShieldMCPServer:
         return [
             {
                 "type": "text",
-                "text": "Attack Report:\n\n" + json.dumps(report, indent=2, default=str),
+                "text": "Attack Report:\n\n" + json_codec.dumps_text(report),
             }
         ]
 
@@ -1361,7 +1375,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"Events for IPs {ip_addresses} in the last {time_range_hours} hours:\n\n"
-                + json.dumps(processed_events, indent=2, default=str),
+                + json_codec.dumps_text(processed_events),
             }
         ]
 
@@ -1394,7 +1408,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Security Summary (Last 24 Hours):\n\n"
-                + json.dumps(summary, indent=2, default=str),
+                + json_codec.dumps_text(summary),
             }
         ]
 
@@ -1447,7 +1461,7 @@ class DShieldMCPServer:
                 {
                     "type": "text",
                     "text": "✅ Elasticsearch connection successful!\n\n"
-                    + json.dumps(result, indent=2, default=str),
+                    + json_codec.dumps_text(result),
                 }
             ]
 
@@ -1492,7 +1506,7 @@ class DShieldMCPServer:
             if "guidelines" in sections:
                 data["analysis_guidelines"] = DataDictionary.get_analysis_guidelines()
 
-            return [{"type": "text", "text": json.dumps(data, indent=2, default=str)}]
+            return [{"type": "text", "text": json_codec.dumps_text(data)}]
 
     async def _get_health_status(self, arguments: dict[str, Any]) -> list[dict[str, Any]]:
         """Get health status of the MCP server and its dependencies."""
@@ -1514,6 +1528,26 @@ class DShieldMCPServer:
                     "timestamp": datetime.now(UTC).isoformat(),
                     "health_checks": health_results,
                     "features": feature_summary,
+                    "query_cache": (
+                        self.elastic_client.get_query_cache_stats()
+                        if self.elastic_client
+                        else None
+                    ),
+                    "query_size_estimator": (
+                        self.elastic_client.get_query_size_estimator_stats()
+                        if self.elastic_client
+                        else None
+                    ),
+                    "request_coalescing": (
+                        self.elastic_client.get_request_coalescing_stats()
+                        if self.elastic_client
+                        else None
+                    ),
+                    "field_resolver": (
+                        self.elastic_client.get_field_resolver_stats()
+                        if self.elastic_client
+                        else None
+                    ),
                     "server_info": {
                         "tools_loaded": len(self.tool_loader.get_all_tool_definitions()),
                         "tools_available": len(self.tool_loader.get_available_tools(
@@ -1532,8 +1566,14 @@ class DShieldMCPServer:
                     "available_features": len(self.feature_manager.get_available_features()),
                     "total_tools": len(self.tool_loader.get_all_tool_definitions()),
                 }
+                if self.elastic_client and self.elastic_client.events_cache is not None:
+                    stats = self.elastic_client.get_query_cache_stats()
+                    response_data["query_cache"] = {
+                        name: {"hits": stats[name]["hits"], "misses": stats[name]["misses"]}
+                        for name in ("events", "aggregations")
+                    }
 
-            return [{"type": "text", "text": json.dumps(response_data, indent=2, default=str)}]
+            return [{"type": "text", "text": json_codec.dumps_text(response_data)}]
 
         except Exception as e:
             logger.error("Failed to get health status", error=str(e))
@@ -1639,13 +1679,13 @@ class DShieldMCPServer:
                         for method, data in results.items()
                     }
                 }
-                return [{"type": "text", "text": json.dumps(summary, indent=2, default=str)}]
+                return [{"type": "text", "text": json_codec.dumps_text(summary)}]
             else:
                 response_text = f"Statistical Anomaly Detection Results\n"
                 response_text += f"Time Range: {time_range_hours} hours\n"
                 response_text += f"Methods: {', '.join(anomaly_methods)}\n"
                 response_text += f"Sensitivity: {sensitivity}\n\n"
-                response_text += json.dumps(results, indent=2, default=str)
+                response_text += json_codec.dumps_text(results)
                 return [{"type": "text", "text": response_text}]
 
         except Exception as e:
@@ -1708,7 +1748,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Campaign Analysis Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1739,7 +1779,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Campaign Indicator Expansion Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1767,7 +1807,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Campaign Timeline Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1791,7 +1831,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Campaign Comparison Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1820,7 +1860,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Ongoing Campaign Detection Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1848,7 +1888,7 @@ class DShieldMCPServer:
         return [
             {
                 "type": "text",
-                "text": "Campaign Search Results:\n\n" + json.dumps(result, indent=2, default=str),
+                "text": "Campaign Search Results:\n\n" + json_codec.dumps_text(result),
             }
         ]
 
@@ -1875,7 +1915,7 @@ class DShieldMCPServer:
         return [
             {
                 "type": "text",
-                "text": "Campaign Details:\n\n" + json.dumps(result, indent=2, default=str),
+                "text": "Campaign Details:\n\n" + json_codec.dumps_text(result),
             }
         ]
 
@@ -1906,7 +1946,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "LaTeX Document Generation Results:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1920,7 +1960,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": "Available LaTeX Templates:\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1936,7 +1976,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"LaTeX Template Schema for '{template_name}':\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1955,7 +1995,7 @@ class DShieldMCPServer:
             {
                 "type": "text",
                 "text": f"LaTeX Document Data Validation for '{template_name}':\n\n"
-                + json.dumps(result, indent=2, default=str),
+                + json_codec.dumps_text(result),
             }
         ]
 
@@ -1999,7 +2039,7 @@ class DShieldMCPServer:
                 {
                     "type": "text",
                     "text": f"Comprehensive IP Enrichment Results for {ip_address}:\n\n"
-                    + json.dumps(response_data, indent=2, default=str),
+                    + json_codec.dumps_text(response_data),
                 }
             ]
 
@@ -2047,7 +2087,7 @@ class DShieldMCPServer:
                 {
                     "type": "text",
                     "text": f"Comprehensive Domain Enrichment Results for {domain}:\n\n"
-                    + json.dumps(response_data, indent=2, default=str),
+                    + json_codec.dumps_text(response_data),
                 }
             ]
 
@@ -2073,7 +2113,7 @@ class DShieldMCPServer:
                 {
                     "type": "text",
                     "text": "Threat Indicator Correlation Results:\n\n"
-                    + json.dumps(result, indent=2, default=str),
+                    + json_codec.dumps_text(result),
                 }
             ]
 
@@ -2125,7 +2165,7 @@ class DShieldMCPServer:
                 {
                     "type": "text",
                     "text": "Threat Intelligence Summary:\n\n"
-                    + json.dumps(summary, indent=2, default=str),
+                    + json_codec.dumps_text(summary),
                 }
             ]
 
@@ -2200,7 +2240,7 @@ class DShieldMCPServer:
                     {
                         "type": "text",
                         "text": "Statistical Anomaly Detection Results:\n\n"
-                        + json.dumps(result, indent=2, default=str),
+                        + json_codec.dumps_text(result),
                     }
                 ]
             else:
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark attack-pattern classification against the keyword count.
+
+Compares the per-keyword ``any(keyword in text)`` loop with the compiled
+AttackPatternMatcher while the DShield keyword table is padded with extra
+synthetic keywords. The automaton's per-event cost should stay flat as the
+keyword count grows. The matcher's result cache is disabled so every event
+is actually scanned.
+
+Usage:
+    python scripts/benchmark_attack_patterns.py --events 20000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_processor import DataProcessor
+from src.pattern_matcher import AttackPatternMatcher
+
+DESCRIPTIONS = [
+    "failed login attempt for user root from scanner",
+    "port scan detected using nmap against ssh service",
+    "http get request with status 404 for /wp-login.php",
+    "possible sql injection in login form parameter id",
+    "connection event from unknown host on tcp port 8080",
+]
+
+
+def padded_patterns(base: dict[str, list[str]], extra: int, rng: random.Random) -> dict:
+    """Add ``extra`` random keywords spread over the base patterns.
+
+    Args:
+        base: DShield attack pattern table
+        extra: Number of synthetic keywords to add
+        rng: Random generator
+
+    Returns:
+        New pattern table
+
+    """
+    patterns = {name: list(keywords) for name, keywords in base.items()}
+    names = list(patterns)
+    for i in range(extra):
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+        patterns[names[i % len(names)]].append(word)
+    return patterns
+
+
+def naive(patterns: dict[str, list[str]], description: str, event_type: str) -> list[str]:
+    """Classify with one substring test per keyword (the previous approach).
+
+    Args:
+        patterns: Pattern table
+        description: Lower-cased description
+        event_type: Lower-cased event type
+
+    Returns:
+        Matched pattern names
+
+    """
+    return [
+        pattern
+        for pattern, keywords in patterns.items()
+        if any(keyword in description or keyword in event_type for keyword in keywords)
+    ]
+
+
+def per_event_us(func, texts: list[tuple[str, str]], rounds: int) -> float:
+    """Median microseconds per event over several rounds.
+
+    Args:
+        func: Classifier taking (description, event_type)
+        texts: Events to classify
+        rounds: Timed rounds
+
+    Returns:
+        Median microseconds per event
+
+    """
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for description, event_type in texts:
+            func(description, event_type)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) / len(texts) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a table of per-event costs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000, help="Events per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [
+        (f"{rng.choice(DESCRIPTIONS)} #{i}", rng.choice(["attack", "connection", "block"]))
+        for i in range(args.events)
+    ]
+    base = DataProcessor().dshield_attack_patterns
+
+    print(f"{'keywords':>9} {'states':>7} {'naive us/event':>15} {'automaton us/event':>19}")
+    for extra in (0, 100, 1000, 5000):
+        patterns = padded_patterns(base, extra, rng)
+        keyword_count = sum(len(keywords) for keywords in patterns.values())
+        matcher = AttackPatternMatcher(patterns, max_cached_texts=0)
+        naive_us = per_event_us(
+            lambda d, t, p=patterns: naive(p, d, t), texts, args.rounds
+        )
+        automaton_us = per_event_us(matcher.classify, texts, args.rounds)
+        print(f"{keyword_count:>9} {matcher.state_count:>7} {naive_us:>15.2f} {automaton_us:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark similar-campaign search with MinHash and LSH.
+
+Indexes synthetic campaign token sets and compares finding the campaigns
+similar to one campaign through LSH buckets with an exact Jaccard scan over
+every campaign. Each probe campaign has a planted near duplicate, so the
+recall column shows how often LSH finds it. No Elasticsearch cluster or
+configuration file is required.
+
+Usage:
+    python scripts/benchmark_campaign_similarity.py --campaigns 1000 10000 --tokens 40
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.campaign_similarity import CampaignSimilarityIndex
+
+TTPS = [f"ttp:T{1000 + i}" for i in range(200)]
+
+
+def make_tokens(tokens: int, rng: random.Random) -> set[str]:
+    """Build the token set of a synthetic campaign."""
+    ips = {f"ind:10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"}
+    while len(ips) < tokens:
+        ips.add(f"ind:10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}")
+    return ips | set(rng.sample(TTPS, 3))
+
+
+def near_duplicate(tokens: set[str], rng: random.Random) -> set[str]:
+    """Replace a tenth of a token set with new tokens."""
+    kept = set(rng.sample(sorted(tokens), len(tokens) - len(tokens) // 10))
+    return kept | {f"ind:192.0.2.{i}" for i in range(len(tokens) // 10)}
+
+
+def jaccard(first: set[str], second: set[str]) -> float:
+    """Return the exact Jaccard similarity of two sets."""
+    return len(first & second) / len(first | second)
+
+
+def main() -> None:
+    """Run the benchmark and print the latency table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--tokens", type=int, default=40, help="Indicators per campaign")
+    parser.add_argument("--probes", type=int, default=100, help="Queries per measurement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{args.tokens} indicators per campaign, mean of {args.probes} queries")
+    print(
+        f"  {'campaigns':>9} {'index (s)':>10} {'lsh (ms)':>9} {'scan (ms)':>10} "
+        f"{'candidates':>11} {'recall':>7}"
+    )
+    for size in args.campaigns:
+        campaigns = {f"campaign-{i}": make_tokens(args.tokens, rng) for i in range(size)}
+        probes = rng.sample(sorted(campaigns), min(args.probes, size))
+        for probe in probes:
+            campaigns[f"{probe}-copy"] = near_duplicate(campaigns[probe], rng)
+
+        index = CampaignSimilarityIndex()
+        start = time.perf_counter()
+        for campaign_id, tokens in campaigns.items():
+            index.add(campaign_id, tokens)
+        index_seconds = time.perf_counter() - start
+
+        found = candidates = 0
+        start = time.perf_counter()
+        for probe in probes:
+            results = index.similar_to(probe, limit=5)
+            found += any(campaign_id == f"{probe}-copy" for campaign_id, _ in results)
+        lsh_ms = (time.perf_counter() - start) / len(probes) * 1000
+        for probe in probes:
+            candidates += len(index.candidates(index.signature(probe)))
+
+        start = time.perf_counter()
+        for probe in probes:
+            tokens = campaigns[probe]
+            sorted(
+                ((jaccard(tokens, other), campaign_id) for campaign_id, other in campaigns.items()),
+                reverse=True,
+            )[:5]
+        scan_ms = (time.perf_counter() - start) / len(probes) * 1000
+
+        print(
+            f"  {len(campaigns):>9,} {index_seconds:>10.2f} {lsh_ms:>9.3f} {scan_ms:>10.3f} "
+            f"{candidates / len(probes):>11.1f} {found / len(probes):>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
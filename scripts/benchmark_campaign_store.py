@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Benchmark campaign store lookups and searches.
+
+Fills an in-memory campaign store with synthetic campaigns and times
+lookups by campaign ID and searches by indicator, TTP, time range and
+confidence score. No Elasticsearch cluster or configuration file is
+required.
+
+Usage:
+    python scripts/benchmark_campaign_store.py --campaigns 1000 10000 --events 50
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.campaign_analyzer import Campaign, CampaignEvent
+from src.campaign_store import CampaignStore
+
+TTPS = [f"T{1000 + i}" for i in range(200)]
+
+
+def make_campaign(number: int, events: int, rng: random.Random) -> Campaign:
+    """Build a synthetic campaign.
+
+    Args:
+        number: Campaign number, used for its ID
+        events: Number of member events
+        rng: Random generator
+
+    Returns:
+        Campaign with events from a handful of source IPs
+
+    """
+    start = datetime(2024, 1, 1, tzinfo=UTC) + timedelta(hours=rng.randint(0, 24 * 365))
+    ips = [f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in "12345"]
+    ttps = rng.sample(TTPS, 3)
+    members = [
+        CampaignEvent(
+            event_id=f"c{number}-e{i}",
+            timestamp=start + timedelta(minutes=i),
+            source_ip=rng.choice(ips),
+            destination_ip="192.0.2.1",
+            ttp_technique=rng.choice(ttps),
+        )
+        for i in range(events)
+    ]
+    return Campaign(
+        campaign_id=f"campaign-{number}",
+        confidence_score=rng.random(),
+        start_time=members[0].timestamp,
+        end_time=members[-1].timestamp,
+        related_indicators=ips,
+        ttp_techniques=ttps,
+        total_events=events,
+        events=members,
+    )
+
+
+def timed(function, repeats: int) -> float:
+    """Return the mean duration of a call in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print the latency table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events", type=int, default=50, help="Events per campaign")
+    parser.add_argument("--repeats", type=int, default=200, help="Calls per measurement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    rng = random.Random(args.seed)
+
+    print(f"{args.events} events per campaign, mean of {args.repeats} calls")
+    print(
+        f"  {'campaigns':>9} {'load (s)':>9} {'by id (ms)':>11} {'indicator':>10} "
+        f"{'ttp+score':>10} {'time range':>11}"
+    )
+    for size in args.campaigns:
+        store = CampaignStore()
+        campaigns = [make_campaign(i, args.events, rng) for i in range(size)]
+        start = time.perf_counter()
+        for campaign in campaigns:
+            store.save_campaign(campaign)
+        load_seconds = time.perf_counter() - start
+
+        probe = campaigns[size // 2]
+        window = probe.start_time - timedelta(days=1)
+        by_id = timed(
+            lambda store=store, probe=probe: store.get_campaign(probe.campaign_id), args.repeats
+        )
+        by_indicator = timed(
+            lambda store=store, probe=probe: store.search(indicators=[probe.related_indicators[0]]),
+            args.repeats,
+        )
+        by_ttp = timed(
+            lambda store=store, probe=probe: store.search(
+                ttps=[probe.ttp_techniques[0]], min_confidence=0.9
+            ),
+            args.repeats,
+        )
+        by_time = timed(
+            lambda store=store, window=window: store.search(
+                start_time=window, end_time=window + timedelta(days=1)
+            ),
+            args.repeats,
+        )
+        print(
+            f"  {size:>9,} {load_seconds:>9.2f} {by_id:>11.3f} {by_indicator:>10.3f} "
+            f"{by_ttp:>10.3f} {by_time:>11.3f}"
+        )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
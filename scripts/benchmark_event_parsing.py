@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Microbenchmark for ElasticsearchClient._parse_dshield_event.
+
+Compares the compiled field-extraction plans against the per-call
+``_extract_field_mapped`` resolution on synthetic Cowrie and DShield
+documents. No Elasticsearch cluster or configuration file is required.
+
+Usage:
+    python scripts/benchmark_event_parsing.py --hits 10000 --rounds 5
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.elasticsearch_client import ElasticsearchClient
+
+BENCH_CONFIG = {
+    "elasticsearch": {
+        "url": "http://localhost:9200",
+        "index_patterns": {"cowrie": ["cowrie-*"], "dshield": ["dshield-*"]},
+    }
+}
+
+
+def make_cowrie_hit(i: int, rng: random.Random) -> dict[str, Any]:
+    """Build a synthetic Cowrie SSH honeypot hit (ECS nested layout).
+
+    Args:
+        i: Document sequence number
+        rng: Random generator
+
+    Returns:
+        Elasticsearch hit dictionary
+
+    """
+    return {
+        "_id": f"cowrie-{i}",
+        "_index": "cowrie.dshield-2024.01.01",
+        "_source": {
+            "@timestamp": f"2024-01-01T{i % 24:02d}:{i % 60:02d}:00Z",
+            "source": {
+                "ip": f"203.0.113.{rng.randint(1, 254)}",
+                "port": rng.randint(1024, 65535),
+                "geo": {"country_name": rng.choice(["CN", "US", "RU", "BR"])},
+            },
+            "destination": {"ip": "10.0.0.5", "port": 22},
+            "event": {
+                "kind": "event",
+                "category": "authentication",
+                "type": "cowrie.login.failed",
+                "dataset": "cowrie",
+            },
+            "network": {"protocol": "ssh", "transport": "tcp"},
+            "user": {"name": rng.choice(["root", "admin", "pi"])},
+            "session": {"id": f"s{i // 5}"},
+            "message": "login attempt [root/123456] failed",
+            "tags": ["cowrie", "ssh"],
+        },
+    }
+
+
+def make_dshield_hit(i: int, rng: random.Random) -> dict[str, Any]:
+    """Build a synthetic DShield firewall hit (flat dotted layout).
+
+    Args:
+        i: Document sequence number
+        rng: Random generator
+
+    Returns:
+        Elasticsearch hit dictionary
+
+    """
+    return {
+        "_id": f"dshield-{i}",
+        "_index": "dshield-2024.01.01",
+        "_source": {
+            "@timestamp": f"2024-01-01T{i % 24:02d}:{i % 60:02d}:00Z",
+            "source.ip": f"198.51.100.{rng.randint(1, 254)}",
+            "destination.ip": "10.0.0.7",
+            "source.port": rng.randint(1024, 65535),
+            "destination.port": rng.choice([23, 80, 443, 445, 3389]),
+            "event.category": "network",
+            "event.type": "connection",
+            "asn": rng.randint(1000, 65000),
+            "country": rng.choice(["CN", "US", "RU", "BR"]),
+            "reputation": rng.randint(0, 100),
+            "region": "eu-west",
+        },
+    }
+
+
+def build_client() -> ElasticsearchClient:
+    """Construct an ElasticsearchClient without touching real configuration.
+
+    Returns:
+        ElasticsearchClient instance
+
+    """
+    with (
+        patch("src.elasticsearch_client.get_config", return_value=BENCH_CONFIG),
+        patch("src.elasticsearch_client.get_user_config"),
+    ):
+        return ElasticsearchClient()
+
+
+def time_parse(
+    client: ElasticsearchClient, hits: list[dict[str, Any]], rounds: int
+) -> list[float]:
+    """Time parsing a page of hits several times.
+
+    Args:
+        client: Client whose parser is measured
+        hits: Page of hits to parse
+        rounds: Number of timed repetitions
+
+    Returns:
+        Wall-clock seconds per round
+
+    """
+    indices = ["cowrie-*", "dshield-*"]
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client._parse_dshield_hits(hits, indices)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=10000, help="Hits per page")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per mode")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    # Keep per-document debug logging out of the measurement
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    rng = random.Random(args.seed)
+    hits = [
+        make_cowrie_hit(i, rng) if i % 2 else make_dshield_hit(i, rng) for i in range(args.hits)
+    ]
+    client = build_client()
+
+    results = {}
+    for label, compiled in (("per-call mapping", False), ("compiled plans", True)):
+        client.use_compiled_field_plans = compiled
+        client._parse_dshield_hits(hits[:100], ["warmup"])
+        results[label] = statistics.median(time_parse(client, hits, args.rounds))
+
+    print(f"Parsed {args.hits} hits (median of {args.rounds} rounds)")
+    for label, seconds in results.items():
+        per_hit_us = seconds / args.hits * 1e6
+        print(f"  {label:<18} {seconds * 1000:9.1f} ms  {per_hit_us:7.2f} us/hit")
+    speedup = results["per-call mapping"] / results["compiled plans"]
+    print(f"  speedup            {speedup:9.2f}x")
+    print(f"  plan cache         {client._get_field_plan_cache().get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark DataProcessor summaries over columnar event batches.
+
+Builds synthetic parsed DShield events, encodes them into an EventBatch and
+times generate_security_summary and generate_dshield_summary over it, then
+times the chunked single-pass security summary straight from the event list,
+optionally across worker processes. No Elasticsearch cluster or
+configuration file is required.
+
+Usage:
+    python scripts/benchmark_event_summary.py --events 1000000 --workers 4
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_processor import DataProcessor
+from src.event_batch import EventBatch
+
+DESCRIPTIONS = [
+    "Failed login attempt for root",
+    "Port scan detected using nmap",
+    "HTTP GET request with status 404",
+    "SQL injection attempt on login form",
+    "connection event from scanner",
+]
+
+
+def make_events(count: int, rng: random.Random) -> list[dict[str, Any]]:
+    """Build synthetic parsed DShield events.
+
+    Args:
+        count: Number of events
+        rng: Random generator
+
+    Returns:
+        List of event dictionaries shaped like ElasticsearchClient output
+
+    """
+    indices = ["cowrie.dshield-2024.01.01", "zeek.dshield-2024.01.01"]
+    events = []
+    for i in range(count):
+        events.append(
+            {
+                "id": str(i),
+                "timestamp": f"2024-01-01T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                f"{rng.randint(0, 59):02d}+00:00",
+                "source_ip": f"203.0.{rng.randint(0, 40)}.{rng.randint(1, 254)}",
+                "destination_ip": f"10.0.0.{rng.randint(1, 20)}",
+                "source_port": rng.randint(1024, 65535),
+                "destination_port": rng.choice([22, 23, 80, 443, 445, 3389]),
+                "protocol": rng.choice(["tcp", "udp", "http"]),
+                "event_type": rng.choice(["attack", "block", "connection", "reputation"]),
+                "severity": rng.choice(["low", "medium", "high", "critical"]),
+                "category": rng.choice(["network", "authentication", "intrusion"]),
+                "description": rng.choice(DESCRIPTIONS),
+                "country": rng.choice(["CN", "US", "RU", "BR", "NL", "DE"]),
+                "asn": rng.randint(1000, 1200),
+                "organization": rng.choice(["Hosting A", "ISP B", "Cloud C"]),
+                "reputation_score": rng.randint(0, 100),
+                "attack_count": rng.randint(1, 20),
+                "tags": [],
+                "attack_types": [],
+                "indices": indices,
+            }
+        )
+    return events
+
+
+def main() -> None:
+    """Run the benchmark and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000, help="Number of events")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Events per chunk")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0: none)")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    events = make_events(args.events, random.Random(args.seed))
+    processor = DataProcessor()
+
+    start = time.perf_counter()
+    batch = EventBatch.from_events(events)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processor.generate_security_summary(batch)
+    security_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processor.generate_dshield_summary(batch)
+    dshield_seconds = time.perf_counter() - start
+
+    print(f"Summarised {args.events:,} events")
+    start = time.perf_counter()
+    if args.workers:
+        with ProcessPoolExecutor(args.workers) as executor:
+            processor.generate_security_summary(events, args.chunk_size, executor)
+    else:
+        processor.generate_security_summary(events, args.chunk_size)
+    chunked_seconds = time.perf_counter() - start
+
+    rows = (
+        ("encode EventBatch", encode_seconds),
+        ("generate_security_summary", security_seconds),
+        ("generate_dshield_summary", dshield_seconds),
+        (f"chunked summary ({args.workers or 'no'} workers)", chunked_seconds),
+    )
+    for label, seconds in rows:
+        print(f"  {label:<30} {seconds:7.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark JSON encoding of tool responses and TCP frames.
+
+Builds synthetic DShield event pages shaped like query_dshield_events
+results and encodes them the way the tool formatters and TCP transports do:
+with the standard library (the previous behaviour) and with src.json_codec,
+both indented and compact. Prints bytes per response and CPU time per
+response, and the time to decode a frame. No Elasticsearch cluster or
+configuration file is required.
+
+Usage:
+    python scripts/benchmark_json_codec.py --events 500 --responses 200
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import json_codec
+
+DESCRIPTIONS = [
+    "Failed login attempt for root",
+    "Port scan detected using nmap",
+    "HTTP GET request with status 404",
+    "SQL injection attempt on login form",
+    "connection event from scanner",
+]
+
+
+def make_response(count: int, rng: random.Random) -> dict[str, Any]:
+    """Build a synthetic query_dshield_events response.
+
+    Args:
+        count: Number of events in the page
+        rng: Random generator
+
+    Returns:
+        Response dictionary with events and pagination metadata
+
+    """
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    events = []
+    for i in range(count):
+        source_ip = f"203.0.{rng.randint(0, 40)}.{rng.randint(1, 254)}"
+        events.append(
+            {
+                "id": f"evt-{i}",
+                "timestamp": start + timedelta(seconds=rng.randint(0, 86400)),
+                "source_ip": source_ip,
+                "destination_ip": f"10.0.0.{rng.randint(1, 20)}",
+                "source_port": rng.randint(1024, 65535),
+                "destination_port": rng.choice([22, 23, 80, 443, 445, 3389]),
+                "protocol": rng.choice(["tcp", "udp", "http"]),
+                "event_type": rng.choice(["attack", "block", "connection", "reputation"]),
+                "severity": rng.choice(["low", "medium", "high", "critical"]),
+                "description": rng.choice(DESCRIPTIONS),
+                "country": rng.choice(["CN", "US", "RU", "BR", "NL", "DE"]),
+                "reputation_score": round(rng.random() * 100, 2),
+                "tags": ["scanner", "dshield"][: rng.randint(0, 2)],
+                "index": "cowrie.dshield-2024.01.01",
+                "raw_data": {"source": {"ip": source_ip}, "message": rng.choice(DESCRIPTIONS)},
+            }
+        )
+    return {
+        "events": events,
+        "pagination": {"page_size": count, "total_available": count * 10, "has_more": True},
+    }
+
+
+def measure(encode: Callable[[Any], bytes], response: Any, repeat: int) -> tuple[int, float]:
+    """Encode a response repeatedly.
+
+    Args:
+        encode: Encoder returning UTF-8 bytes
+        response: Response to encode
+        repeat: Number of encodings
+
+    Returns:
+        (bytes per response, CPU microseconds per response)
+
+    """
+    size = len(encode(response))
+    start = time.process_time()
+    for _ in range(repeat):
+        encode(response)
+    return size, (time.process_time() - start) / repeat * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print sizes and timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500, help="Events per response")
+    parser.add_argument("--responses", type=int, default=200, help="Encodings per variant")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    response = make_response(args.events, random.Random(args.seed))
+    variants = (
+        ("stdlib indent", lambda v: json.dumps(v, indent=2, default=str).encode("utf-8")),
+        (
+            "stdlib compact",
+            lambda v: json.dumps(v, separators=(",", ":"), default=str).encode("utf-8"),
+        ),
+        ("json_codec indent", lambda v: json_codec.dumps_bytes(v, indent=True)),
+        ("json_codec compact", json_codec.dumps_bytes),
+    )
+
+    backend = "orjson" if json_codec.HAS_ORJSON else "stdlib (orjson not installed)"
+    print(f"{args.events} events per response, {args.responses} responses, codec: {backend}")
+    print(f"  {'variant':<20} {'bytes/resp':>12} {'CPU us/resp':>12}")
+    for label, encode in variants:
+        size, cpu_us = measure(encode, response, args.responses)
+        print(f"  {label:<20} {size:>12,} {cpu_us:>12.1f}")
+
+    frame = json_codec.dumps_bytes(response)
+    rows = (("stdlib decode", json.loads), ("json_codec decode", json_codec.loads))
+    for label, decode in rows:
+        start = time.process_time()
+        for _ in range(args.responses):
+            decode(frame)
+        cpu_us = (time.process_time() - start) / args.responses * 1e6
+        print(f"  {label:<20} {len(frame):>12,} {cpu_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark temporal proximity scoring for campaign confidence.
+
+Builds synthetic campaign events spread over a time span and times the
+per-event pairwise score (_calculate_time_proximity_score for every event,
+O(n^2)) against the sorted-timestamp window count
+(_calculate_time_proximity_scores, O(n log n)) for growing event counts.
+The pairwise variant is skipped above --max-pairwise events. No
+Elasticsearch cluster or configuration file is required.
+
+Usage:
+    python scripts/benchmark_time_proximity.py --sizes 1000 5000 20000 100000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.campaign_analyzer import CampaignAnalyzer, CampaignEvent
+
+
+def make_events(count: int, span_hours: float, rng: random.Random) -> list[CampaignEvent]:
+    """Build synthetic campaign events.
+
+    Args:
+        count: Number of events
+        span_hours: Time span the events are spread over
+        rng: Random generator
+
+    Returns:
+        Campaign events with unique IDs
+
+    """
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    span = int(span_hours * 3600)
+    return [
+        CampaignEvent(
+            event_id=f"evt-{i}", timestamp=start + timedelta(seconds=rng.randint(0, span))
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark and print the scaling table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[500, 1000, 2000, 5000, 20000, 100000]
+    )
+    parser.add_argument("--span-hours", type=float, default=72.0, help="Time span of events")
+    parser.add_argument("--window-seconds", type=float, default=3600.0, help="Proximity window")
+    parser.add_argument("--max-pairwise", type=int, default=5000, help="Largest pairwise run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    with patch("src.campaign_analyzer.get_user_config"):
+        analyzer = CampaignAnalyzer(Mock())
+    analyzer.time_proximity_window_seconds = args.window_seconds
+    rng = random.Random(args.seed)
+
+    print(f"window {args.window_seconds:.0f} s, events spread over {args.span_hours:.0f} h")
+    print(f"  {'events':>8} {'pairwise (s)':>13} {'sweep (s)':>10} {'speedup':>9}")
+    for size in args.sizes:
+        events = make_events(size, args.span_hours, rng)
+
+        start = time.perf_counter()
+        sweep = analyzer._calculate_time_proximity_scores(events)
+        sweep_seconds = time.perf_counter() - start
+
+        if size <= args.max_pairwise:
+            start = time.perf_counter()
+            pairwise = [analyzer._calculate_time_proximity_score(e, events) for e in events]
+            pairwise_seconds = time.perf_counter() - start
+            assert pairwise == sweep, "scores differ"
+            print(
+                f"  {size:>8,} {pairwise_seconds:>13.3f} {sweep_seconds:>10.4f} "
+                f"{pairwise_seconds / sweep_seconds:>8.0f}x"
+            )
+        else:
+            print(f"  {size:>8,} {'-':>13} {sweep_seconds:>10.4f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
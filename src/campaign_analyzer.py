@@ -4,8 +4,12 @@
 Core campaign correlation and analysis engine for identifying coordinated attack campaigns.
 """
 
+import asyncio
 import ipaddress
-from collections import Counter, defaultdict
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -14,6 +18,8 @@ from typing import Any
 import structlog
 
 from .elasticsearch_client import ElasticsearchClient
+from .subnet_index import SubnetIndex, subnet_of
+from .temporal_proximity import neighbour_counts, to_epoch_microseconds
 from .user_config import get_user_config
 
 logger = structlog.get_logger(__name__)
@@ -97,6 +103,61 @@ class Campaign:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class QueryBudget:
+    """Limits on the Elasticsearch work done to correlate one campaign.
+
+    A query is refused once the query or document budget is spent or the
+    deadline has passed; the first limit reached is kept in
+    ``exhausted_reason``.
+    """
+
+    max_queries: int
+    max_documents: int
+    deadline_seconds: float
+    queries_used: int = 0
+    documents_used: int = 0
+    exhausted_reason: str | None = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    def remaining_seconds(self) -> float:
+        """Return the time left before the deadline."""
+        return self.deadline_seconds - (time.monotonic() - self.started_at)
+
+    def acquire(self, queries: int = 1) -> bool:
+        """Reserve budget for queries about to be sent.
+
+        Args:
+            queries: Number of searches in the request.
+
+        Returns:
+            True if the queries may run, False if the budget is exhausted.
+
+        """
+        if self.exhausted_reason is None:
+            if self.remaining_seconds() <= 0:
+                self.exhausted_reason = "deadline"
+            elif self.documents_used >= self.max_documents:
+                self.exhausted_reason = "max_documents"
+            elif self.queries_used + queries > self.max_queries:
+                self.exhausted_reason = "max_queries"
+        if self.exhausted_reason is not None:
+            return False
+        self.queries_used += queries
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return budget usage for campaign metadata."""
+        return {
+            "max_queries": self.max_queries,
+            "max_documents": self.max_documents,
+            "deadline_seconds": self.deadline_seconds,
+            "queries_used": self.queries_used,
+            "documents_used": self.documents_used,
+            "exhausted_reason": self.exhausted_reason,
+        }
+
+
 class CampaignAnalyzer:
     """Core campaign analysis and correlation engine.
 
@@ -125,6 +186,15 @@ class CampaignAnalyzer:
         self.enable_geospatial_correlation = self.user_config.get_setting(
             "campaign", "enable_geospatial_correlation"
         )
+        self.subnet_prefix_v4 = self.user_config.get_setting("campaign", "subnet_prefix_v4")
+        self.subnet_prefix_v6 = self.user_config.get_setting("campaign", "subnet_prefix_v6")
+        self.time_proximity_window_seconds = self.user_config.get_setting(
+            "campaign", "time_proximity_window_seconds"
+        )
+        self.temporal_max_windows = self.user_config.get_setting("campaign", "temporal_max_windows")
+        self.temporal_events_per_window = self.user_config.get_setting(
+            "campaign", "temporal_events_per_window"
+        )
 
         # Performance tracking
         self.enable_performance_logging = self.user_config.get_setting(
@@ -136,6 +206,27 @@ class CampaignAnalyzer:
         self.behavioral_pattern_threshold = 0.6
         self.temporal_clustering_threshold = 0.7
 
+        # Batched indicator queries (stages 1, 5 and 6)
+        self.indicator_batch_size = self.user_config.get_setting("campaign", "indicator_batch_size")
+        self.searches_per_msearch = self.user_config.get_setting("campaign", "searches_per_msearch")
+        self.events_per_indicator = self.user_config.get_setting("campaign", "events_per_indicator")
+
+        # Query planning: concurrency shared by all campaigns of this analyzer
+        # and per-campaign budget
+        self.max_concurrent_queries = self.user_config.get_setting(
+            "campaign", "max_concurrent_queries"
+        )
+        self.max_queries_per_campaign = self.user_config.get_setting(
+            "campaign", "max_queries_per_campaign"
+        )
+        self.max_documents_per_campaign = self.user_config.get_setting(
+            "campaign", "max_documents_per_campaign"
+        )
+        self.campaign_deadline_seconds = self.user_config.get_setting(
+            "campaign", "campaign_deadline_seconds"
+        )
+        self._query_semaphore: asyncio.Semaphore | None = None
+
     async def correlate_events(
         self,
         seed_events: list[dict[str, Any]],
@@ -145,6 +236,14 @@ class CampaignAnalyzer:
     ) -> Campaign:
         """Correlate events based on specified criteria to identify campaigns.
 
+        Queries within a stage run concurrently, limited by the analyzer-wide
+        ``max_concurrent_queries`` and by a per-campaign QueryBudget (maximum
+        queries, maximum documents and a deadline). Expansion stops early
+        once ``max_campaign_events`` events are found or the budget is spent.
+        Per-stage timings, budget usage and the stage skipped by an early stop
+        are reported under ``stage_timings``, ``query_budget`` and
+        ``short_circuited_at`` in the campaign metadata.
+
         Args:
             seed_events: List of seed event dictionaries to start correlation from.
             correlation_criteria: List of CorrelationMethod enums to use for correlation.
@@ -167,44 +266,67 @@ class CampaignAnalyzer:
             min_confidence=min_confidence,
         )
 
-        try:
-            # Stage 1: Direct IOC matches
-            correlated_events = await self._stage1_direct_ioc_matches(
-                seed_events, time_window_hours
-            )
-
-            # Stage 2: Infrastructure correlation
-            if CorrelationMethod.INFRASTRUCTURE_CORRELATION in correlation_criteria:
-                correlated_events = await self._stage2_infrastructure_correlation(
-                    correlated_events, time_window_hours
-                )
-
-            # Stage 3: Behavioral correlation
-            if CorrelationMethod.BEHAVIORAL_CORRELATION in correlation_criteria:
-                correlated_events = await self._stage3_behavioral_correlation(
-                    correlated_events, time_window_hours
-                )
-
-            # Stage 4: Temporal correlation
-            if CorrelationMethod.TEMPORAL_CORRELATION in correlation_criteria:
-                correlated_events = await self._stage4_temporal_correlation(
-                    correlated_events, time_window_hours
-                )
-
-            # Stage 5: IP correlation
-            if CorrelationMethod.IP_CORRELATION in correlation_criteria:
-                correlated_events = await self._stage5_ip_correlation(
-                    correlated_events, time_window_hours
-                )
+        budget = QueryBudget(
+            max_queries=self.max_queries_per_campaign,
+            max_documents=self.max_documents_per_campaign,
+            deadline_seconds=self.campaign_deadline_seconds,
+        )
+        stages = [
+            ("direct_ioc_matches", None, self._stage1_direct_ioc_matches),
+            (
+                "infrastructure_correlation",
+                CorrelationMethod.INFRASTRUCTURE_CORRELATION,
+                self._stage2_infrastructure_correlation,
+            ),
+            (
+                "behavioral_correlation",
+                CorrelationMethod.BEHAVIORAL_CORRELATION,
+                self._stage3_behavioral_correlation,
+            ),
+            (
+                "temporal_correlation",
+                CorrelationMethod.TEMPORAL_CORRELATION,
+                self._stage4_temporal_correlation,
+            ),
+            ("ip_correlation", CorrelationMethod.IP_CORRELATION, self._stage5_ip_correlation),
+            (
+                "network_correlation",
+                CorrelationMethod.NETWORK_CORRELATION,
+                self._stage6_network_correlation,
+            ),
+        ]
+        stage_timings: dict[str, float] = {}
+        short_circuited_at = None
 
-            # Stage 6: Network correlation (NEW)
-            if CorrelationMethod.NETWORK_CORRELATION in correlation_criteria:
-                correlated_events = await self._stage6_network_correlation(
-                    correlated_events, time_window_hours
-                )
+        try:
+            # Stages 1-6 each expand the events found so far; stage 1 starts
+            # from the seed events
+            correlated_events = seed_events
+            for name, method, stage in stages:
+                if method is not None and method not in correlation_criteria:
+                    continue
+                # Stop expanding once the campaign is full or out of budget
+                if name != "direct_ioc_matches" and (
+                    len(correlated_events) >= self.max_campaign_events
+                    or budget.exhausted_reason is not None
+                ):
+                    short_circuited_at = name
+                    break
+                stage_start = time.perf_counter()
+                correlated_events = await stage(correlated_events, time_window_hours, budget)
+                stage_timings[name] = round(time.perf_counter() - stage_start, 4)
+
+            if len(correlated_events) > self.max_campaign_events:
+                correlated_events = correlated_events[: self.max_campaign_events]
 
             # Stage 7: Confidence scoring and filtering
+            stage_start = time.perf_counter()
             campaign = await self._stage7_confidence_scoring(correlated_events, min_confidence)
+            stage_timings["confidence_scoring"] = round(time.perf_counter() - stage_start, 4)
+
+            campaign.metadata["stage_timings"] = stage_timings
+            campaign.metadata["query_budget"] = budget.to_dict()
+            campaign.metadata["short_circuited_at"] = short_circuited_at
 
             # Calculate performance metrics
             end_time = datetime.now()
@@ -217,6 +339,8 @@ class CampaignAnalyzer:
                     total_events=campaign.total_events,
                     processing_time_seconds=processing_time,
                     confidence_score=campaign.confidence_score,
+                    stage_timings=stage_timings,
+                    queries_used=budget.queries_used,
                 )
 
             return campaign
@@ -421,27 +545,26 @@ class CampaignAnalyzer:
         self,
         seed_events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 1: Direct IOC matches from seed events.
 
         Args:
             seed_events: List of seed event dictionaries.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
 
         """
-        correlated_events = []
-
+        iocs = []
         for seed_event in seed_events:
-            # Extract IOCs from seed event
-            iocs = self._extract_iocs_from_event(seed_event)
+            iocs.extend(self._extract_iocs_from_event(seed_event))
 
-            for ioc in iocs:
-                # Query for events containing this IOC
-                events = await self._query_events_by_ioc(ioc, time_window_hours)
-                correlated_events.extend(events)
+        # Query events for every IOC in batched multi-search requests
+        matches = await self._query_events_by_indicators(iocs, time_window_hours, budget=budget)
+        correlated_events = [event for events in matches.values() for event in events]
 
         # Remove duplicates
         unique_events = self._deduplicate_events(correlated_events)
@@ -456,12 +579,14 @@ class CampaignAnalyzer:
         self,
         events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 2: Infrastructure correlation (domains, certificates, hosting).
 
         Args:
             events: List of event dictionaries to correlate.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
@@ -472,11 +597,11 @@ class CampaignAnalyzer:
         # Extract infrastructure indicators
         infrastructure_indicators = self._extract_infrastructure_indicators(events)
 
-        for indicator in infrastructure_indicators:
-            # Query for events with similar infrastructure
-            related_events = await self._query_events_by_infrastructure(
-                indicator, time_window_hours
-            )
+        # Query for events with the same infrastructure in batched requests
+        matches = await self._query_events_by_indicators(
+            infrastructure_indicators, time_window_hours, budget=budget
+        )
+        for related_events in matches.values():
             correlated_events.extend(related_events)
 
         # Remove duplicates
@@ -495,12 +620,14 @@ class CampaignAnalyzer:
         self,
         events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 3: Behavioral correlation (similar attack patterns, timing, TTPs).
 
         Args:
             events: List of event dictionaries to correlate.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
@@ -514,23 +641,27 @@ class CampaignAnalyzer:
             # Extract behavioral patterns
             behavioral_patterns = self._extract_behavioral_patterns(events)
 
+            queries: list[Callable[[], Awaitable[list[dict[str, Any]]]]] = []
+
             for pattern in behavioral_patterns:
                 if pattern.get("confidence", 0) >= self.behavioral_pattern_threshold:
                     # Query for events with similar behavioral patterns
-                    related_events = await self._query_events_by_behavioral_pattern(
-                        pattern, time_window_hours
+                    queries.append(
+                        lambda pattern=pattern: self._query_events_by_behavioral_pattern(
+                            pattern, time_window_hours
+                        )
                     )
-                    correlated_events.extend(related_events)
 
             # Enhanced: Analyze attack sequences and TTP patterns
             attack_sequences = self._analyze_attack_sequences(events)
             for sequence in attack_sequences:
                 if sequence.get("sophistication_score", 0) >= 0.7:
                     # Find events that follow similar attack sequences
-                    sequence_events = await self._query_events_by_sequence(
-                        sequence, time_window_hours
+                    queries.append(
+                        lambda sequence=sequence: self._query_events_by_sequence(
+                            sequence, time_window_hours
+                        )
                     )
-                    correlated_events.extend(sequence_events)
 
             # Enhanced: User agent and payload analysis
             ua_patterns = self._extract_user_agent_patterns(events)
@@ -538,10 +669,14 @@ class CampaignAnalyzer:
 
             for pattern in ua_patterns + payload_patterns:
                 if pattern.get("confidence", 0) >= 0.6:
-                    pattern_events = await self._query_events_by_signature(
-                        pattern, time_window_hours
+                    queries.append(
+                        lambda pattern=pattern: self._query_events_by_signature(
+                            pattern, time_window_hours
+                        )
                     )
-                    correlated_events.extend(pattern_events)
+
+            # The queries are independent: run them concurrently
+            correlated_events.extend(await self._run_event_queries(queries, budget))
 
             # Remove duplicates
             unique_events = self._deduplicate_events(correlated_events)
@@ -564,12 +699,19 @@ class CampaignAnalyzer:
         self,
         events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 4: Temporal correlation (time-based clustering and proximity).
 
+        The span of the events is split into ``correlation_window_minutes``
+        windows. One histogram request ranks the windows by event density and
+        a second one returns the events of the ``temporal_max_windows``
+        densest ones.
+
         Args:
             events: List of event dictionaries to correlate.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
@@ -580,10 +722,31 @@ class CampaignAnalyzer:
         # Group events by time windows
         time_windows = self._create_time_windows(events, self.correlation_window_minutes)
 
-        for window_start, window_end in time_windows:
-            # Query for events in this time window
-            window_events = await self._query_events_by_time_window(window_start, window_end)
-            correlated_events.extend(window_events)
+        windows: list[dict[str, Any]] = []
+        if time_windows:
+            try:
+                windows = (
+                    await self._run_query(
+                        lambda: self.es_client.query_events_by_time_windows(
+                            time_windows[0][0],
+                            time_windows[-1][1],
+                            self.correlation_window_minutes,
+                            max_windows=self.temporal_max_windows,
+                            events_per_window=self.temporal_events_per_window,
+                        ),
+                        budget,
+                        # The histogram, then the events of the densest windows
+                        searches=2,
+                        count_documents=lambda result: sum(len(w["events"]) for w in result),
+                    )
+                    or []
+                )
+            except Exception as e:
+                logger.error("Failed to query events by time window", error=str(e))
+
+        # Densest windows first
+        for window in windows:
+            correlated_events.extend(window["events"])
 
         # Remove duplicates
         unique_events = self._deduplicate_events(correlated_events)
@@ -592,6 +755,7 @@ class CampaignAnalyzer:
             "Stage 4 completed",
             input_events=len(events),
             time_windows=len(time_windows),
+            expanded_windows=len(windows),
             correlated_events=len(unique_events),
         )
 
@@ -601,12 +765,14 @@ class CampaignAnalyzer:
         self,
         events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 5: IP correlation (same source IPs, IP ranges, ASNs).
 
         Args:
             events: List of event dictionaries to correlate.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
@@ -617,9 +783,11 @@ class CampaignAnalyzer:
         # Extract IP addresses
         ip_addresses = self._extract_ip_addresses(events)
 
-        for ip in ip_addresses:
-            # Query for events from the same IP
-            related_events = await self._query_events_by_ip(ip, time_window_hours)
+        # Query for events from the same IPs in batched multi-search requests
+        matches = await self._query_events_by_indicators(
+            ip_addresses, time_window_hours, ip_fields=("source.ip",), budget=budget
+        )
+        for related_events in matches.values():
             correlated_events.extend(related_events)
 
         # Remove duplicates
@@ -638,12 +806,14 @@ class CampaignAnalyzer:
         self,
         events: list[dict[str, Any]],
         time_window_hours: int,
+        budget: QueryBudget | None = None,
     ) -> list[dict[str, Any]]:
         """Stage 6: Network-based correlation using subnet analysis and routing patterns.
 
         Args:
             events: List of event dictionaries to correlate.
             time_window_hours: Time window for correlation.
+            budget: Optional per-campaign query budget.
 
         Returns:
             List of correlated event dictionaries.
@@ -659,17 +829,23 @@ class CampaignAnalyzer:
             source_ips = self._extract_ip_addresses(events)
 
             # Group IPs by subnet
-            subnet_groups = self._group_ips_by_subnet(source_ips)
+            subnet_groups = self._group_ips_by_subnet(
+                source_ips, self.subnet_prefix_v4, self.subnet_prefix_v6
+            )
 
             # Find related events from same subnets
             correlated_events = events.copy()
 
-            for _subnet, ips in subnet_groups.items():
-                if len(ips) >= 2:  # Only process subnets with multiple IPs
-                    # Query events from related IPs in the same subnet
-                    for ip in ips:
-                        related_events = await self._query_events_by_ip(ip, time_window_hours)
-                        correlated_events.extend(related_events)
+            # Only process subnets with multiple IPs
+            subnets = [cidr for cidr, ips in subnet_groups.items() if len(ips) >= 2]
+
+            # Query events from anywhere in those subnets: each subnet is one
+            # CIDR value of a batched terms query
+            matches = await self._query_events_by_indicators(
+                subnets, time_window_hours, ip_fields=("source.ip",), budget=budget
+            )
+            for related_events in matches.values():
+                correlated_events.extend(related_events)
 
             # Remove duplicates
             correlated_events = self._deduplicate_events(correlated_events)
@@ -677,6 +853,7 @@ class CampaignAnalyzer:
             logger.info(
                 "Network correlation completed",
                 original_events=len(events),
+                subnets=len(subnets),
                 correlated_events=len(correlated_events),
             )
 
@@ -708,8 +885,11 @@ class CampaignAnalyzer:
             campaign_events.append(campaign_event)
 
         # Calculate confidence scores
-        for event in campaign_events:
-            event.confidence_score = self._calculate_event_confidence(event, campaign_events)
+        proximity_scores = self._calculate_time_proximity_scores(campaign_events)
+        for event, proximity_score in zip(campaign_events, proximity_scores, strict=True):
+            event.confidence_score = self._calculate_event_confidence(
+                event, campaign_events, proximity_score
+            )
 
         # Filter by minimum confidence
         filtered_events = [e for e in campaign_events if e.confidence_score >= min_confidence]
@@ -770,51 +950,296 @@ class CampaignAnalyzer:
 
         """
         try:
-            import re
-
             domain_pattern = r"https?://([^/]+)"
             match = re.search(domain_pattern, url)
             return match.group(1) if match else None
         except Exception:
             return None
 
-    async def _query_events_by_ioc(self, ioc: str, time_window_hours: int) -> list[dict[str, Any]]:
-        """Query events containing a specific IOC.
+    def _get_query_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore limiting queries in flight across all campaigns.
+
+        Returns:
+            Semaphore sized by ``max_concurrent_queries``
+
+        """
+        if self._query_semaphore is None:
+            self._query_semaphore = asyncio.Semaphore(max(1, self.max_concurrent_queries))
+        return self._query_semaphore
+
+    async def _run_query(
+        self,
+        query: Callable[[], Awaitable[Any]],
+        budget: QueryBudget | None,
+        searches: int = 1,
+        count_documents: Callable[[Any], int] = len,
+    ) -> Any | None:
+        """Run one Elasticsearch request under the concurrency limit and budget.
 
         Args:
-            ioc: Indicator of compromise to search for.
-            time_window_hours: Time window for the query.
+            query: Function starting the request.
+            budget: Optional per-campaign query budget.
+            searches: Number of searches in the request.
+            count_documents: Function counting the documents in the result.
 
         Returns:
-            List of event dictionaries containing the IOC.
+            The request result, or None if the budget refused the request or
+            the deadline passed while it was running.
 
         """
-        try:
-            # Build query filter for IOC
-            filters = {
-                "query": {
+        if budget is not None and not budget.acquire(searches):
+            return None
+
+        async with self._get_query_semaphore():
+            if budget is None:
+                return await query()
+            try:
+                result = await asyncio.wait_for(query(), timeout=budget.remaining_seconds())
+            except TimeoutError:
+                budget.exhausted_reason = budget.exhausted_reason or "deadline"
+                return None
+
+        budget.documents_used += count_documents(result)
+        return result
+
+    async def _run_event_queries(
+        self,
+        queries: list[Callable[[], Awaitable[list[dict[str, Any]]]]],
+        budget: QueryBudget | None,
+    ) -> list[dict[str, Any]]:
+        """Run independent event queries concurrently.
+
+        Args:
+            queries: Functions starting one event query each.
+            budget: Optional per-campaign query budget.
+
+        Returns:
+            Events returned by all queries that ran, in query order.
+
+        """
+        results = await asyncio.gather(*(self._run_query(query, budget) for query in queries))
+        return [event for events in results if events for event in events]
+
+    async def _query_events_by_indicators(
+        self,
+        indicators: list[str],
+        time_window_hours: int,
+        ip_fields: tuple[str, ...] = ("source.ip", "destination.ip"),
+        budget: QueryBudget | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Query events for many indicators with batched multi-search requests.
+
+        IP and CIDR network indicators are grouped into ``terms`` queries on
+        ``ip_fields``; other indicators (domains, user agents) into ``should`` queries of
+        named wildcard clauses on the URL and user agent. Each batch is one
+        search, searches are sent ``searches_per_msearch`` at a time through
+        ``msearch`` and at most ``max_concurrent_queries`` requests are in
+        flight. Within a search every indicator gets its own bucket of at most
+        ``events_per_indicator`` events, so a noisy indicator cannot starve
+        the rest of its batch. Matching events are then attributed back to the
+        indicators they matched and listed under ``matched_indicators``.
+
+        Args:
+            indicators: Indicators to search for (duplicates are ignored).
+            time_window_hours: Time window for the queries.
+            ip_fields: ECS fields IP indicators are matched against.
+            budget: Optional per-campaign query budget; each search of a
+                request counts as one query.
+
+        Returns:
+            Dictionary mapping each indicator to the events it matched.
+
+        """
+        unique_indicators = list(dict.fromkeys(i for i in indicators if i))
+        if not unique_indicators:
+            return {}
+
+        ip_indicators = []
+        other_indicators = []
+        for indicator in unique_indicators:
+            try:
+                if "/" in indicator:
+                    ipaddress.ip_network(indicator, strict=False)
+                else:
+                    ipaddress.ip_address(indicator)
+                ip_indicators.append(indicator)
+            except ValueError:
+                other_indicators.append(indicator)
+
+        batch_size = max(1, self.indicator_batch_size)
+        # (indicators, batch query, one named clause per indicator)
+        searches: list[tuple[list[str], dict[str, Any], dict[str, Any]]] = []
+        for start in range(0, len(ip_indicators), batch_size):
+            batch = ip_indicators[start : start + batch_size]
+            searches.append(
+                (
+                    batch,
+                    self._build_ip_batch_query(batch, ip_fields),
+                    self._build_ip_groups(batch, ip_fields),
+                )
+            )
+        for start in range(0, len(other_indicators), batch_size):
+            batch = other_indicators[start : start + batch_size]
+            query = self._build_ioc_batch_query(batch)
+            groups = {clause["bool"]["_name"]: clause for clause in query["bool"]["should"]}
+            searches.append((batch, query, groups))
+
+        per_request = max(1, self.searches_per_msearch)
+        requests = [searches[i : i + per_request] for i in range(0, len(searches), per_request)]
+
+        async def run(
+            request: list[tuple[list[str], dict[str, Any], dict[str, Any]]],
+        ) -> list[list[dict]]:
+            try:
+                results = await self._run_query(
+                    lambda: self.es_client.msearch_dshield_events(
+                        [query for _, query, _ in request],
+                        time_range_hours=time_window_hours,
+                        size=self.events_per_indicator,
+                        groups=[groups for _, _, groups in request],
+                    ),
+                    budget,
+                    searches=len(request),
+                    count_documents=lambda results: sum(map(len, results)),
+                )
+            except Exception as e:
+                logger.error(
+                    "Failed to query events by indicator batch",
+                    indicators=sum(len(batch) for batch, _, _ in request),
+                    error=str(e),
+                )
+                results = None
+            return results if results is not None else [[] for _ in request]
+
+        responses = await asyncio.gather(*(run(request) for request in requests))
+
+        # Attribute events to indicators; an event found by several searches
+        # is kept once with all of its indicators
+        matches: dict[str, list[dict[str, Any]]] = {i: [] for i in unique_indicators}
+        events_by_id: dict[Any, dict[str, Any]] = {}
+        for request, results in zip(requests, responses, strict=True):
+            for (batch, _, _), events in zip(request, results, strict=False):
+                for event in events:
+                    event_id = event.get("_id") or event.get("event_id") or event.get("id")
+                    event = events_by_id.setdefault(event_id, event) if event_id else event
+                    matched = event.setdefault("matched_indicators", [])
+                    for indicator in self._attribute_event(event, batch, ip_fields):
+                        if indicator not in matched:
+                            matched.append(indicator)
+                            matches[indicator].append(event)
+
+        logger.info(
+            "Batched indicator queries completed",
+            indicators=len(unique_indicators),
+            searches=len(searches),
+            requests=len(requests),
+            matched_events=len(events_by_id),
+        )
+
+        return matches
+
+    def _build_ip_batch_query(self, ips: list[str], ip_fields: tuple[str, ...]) -> dict[str, Any]:
+        """Build one query matching any of a batch of IP addresses.
+
+        Args:
+            ips: IP addresses in the batch.
+            ip_fields: ECS fields to match the addresses against.
+
+        Returns:
+            Elasticsearch query clause.
+
+        """
+        return {
+            "bool": {
+                "should": [{"terms": {field: ips}} for field in ip_fields],
+                "minimum_should_match": 1,
+            },
+        }
+
+    def _build_ip_groups(
+        self, ips: list[str], ip_fields: tuple[str, ...]
+    ) -> dict[str, dict[str, Any]]:
+        """Build one clause per IP address or network of a batch.
+
+        Args:
+            ips: IP addresses and CIDR networks in the batch.
+            ip_fields: ECS fields to match the addresses against.
+
+        Returns:
+            Clause matching each indicator's events, keyed by indicator.
+
+        """
+        return {
+            ip: {
+                "bool": {
+                    # term queries on ip fields also accept CIDR networks
+                    "should": [{"term": {ip_field: ip}} for ip_field in ip_fields],
+                    "minimum_should_match": 1,
+                },
+            }
+            for ip in ips
+        }
+
+    def _build_ioc_batch_query(self, iocs: list[str]) -> dict[str, Any]:
+        """Build one query matching any of a batch of non-IP indicators.
+
+        Each indicator is a named clause so that hits report which indicator
+        they matched in ``matched_queries``.
+
+        Args:
+            iocs: Domains, user agents or other string indicators.
+
+        Returns:
+            Elasticsearch query clause.
+
+        """
+        should = []
+        for ioc in iocs:
+            pattern = "*" + re.sub(r"([\\*?])", r"\\\1", ioc) + "*"
+            should.append(
+                {
                     "bool": {
                         "should": [
-                            {"term": {"source.ip": ioc}},
-                            {"term": {"destination.ip": ioc}},
-                            {"wildcard": {"url.original": f"*{ioc}*"}},
-                            {"wildcard": {"user_agent.original": f"*{ioc}*"}},
+                            {"wildcard": {"url.original": pattern}},
+                            {"wildcard": {"user_agent.original": pattern}},
                         ],
+                        "_name": ioc,
                     },
-                },
-            }
-
-            events, _ = await self.es_client.query_dshield_events(
-                time_range_hours=time_window_hours,
-                filters=filters,
-                page_size=100,
+                }
             )
+        return {"bool": {"should": should, "minimum_should_match": 1}}
 
-            return events
+    def _attribute_event(
+        self,
+        event: dict[str, Any],
+        batch: list[str],
+        ip_fields: tuple[str, ...],
+    ) -> list[str]:
+        """Find the indicators of a batch that an event matched.
 
-        except Exception as e:
-            logger.error("Failed to query events by IOC", ioc=ioc, error=str(e))
-            return []
+        CIDR indicators match the events whose IP lies in the network.
+
+        Args:
+            event: Event returned by a batched query.
+            batch: Indicators the query searched for.
+            ip_fields: ECS fields IP indicators were matched against.
+
+        Returns:
+            Matching indicators from the batch.
+
+        """
+        candidates = list(event.get("matched_queries", []))
+        ips = []
+        for ip_field in ip_fields:
+            # Parsed events use underscore names, raw documents ECS names
+            ips.append(event.get(ip_field.replace(".", "_")))
+            ips.append(event.get(ip_field))
+        candidates.extend(ips)
+        batch_set = set(batch)
+        prefixes = {indicator.rsplit("/", 1)[1] for indicator in batch if "/" in indicator}
+        for prefix in prefixes:
+            candidates.extend(subnet_of(ip, int(prefix)) for ip in ips if isinstance(ip, str))
+        return [c for c in dict.fromkeys(candidates) if c in batch_set]
 
     def _deduplicate_events(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Remove duplicate events based on event ID.
@@ -830,7 +1255,7 @@ class CampaignAnalyzer:
         unique_events = []
 
         for event in events:
-            event_id = event.get("_id") or event.get("event_id")
+            event_id = event.get("_id") or event.get("event_id") or event.get("id")
             if event_id and event_id not in seen_ids:
                 seen_ids.add(event_id)
                 unique_events.append(event)
@@ -1066,35 +1491,6 @@ class CampaignAnalyzer:
 
         return windows
 
-    async def _query_events_by_time_window(
-        self, start_time: datetime, end_time: datetime
-    ) -> list[dict[str, Any]]:
-        """Query events within a specific time window."""
-        try:
-            filters = {
-                "@timestamp": {
-                    "gte": start_time.isoformat(),
-                    "lte": end_time.isoformat(),
-                },
-            }
-
-            events, _ = await self.es_client.query_dshield_events(
-                time_range_hours=24,  # Use a reasonable default
-                filters=filters,
-                page_size=100,
-            )
-
-            return events
-
-        except Exception as e:
-            logger.error(
-                "Failed to query events by time window",
-                start_time=start_time,
-                end_time=end_time,
-                error=str(e),
-            )
-            return []
-
     def _extract_ip_addresses(self, events: list[dict[str, Any]]) -> list[str]:
         """Extract IP addresses from events."""
         ips = []
@@ -1107,25 +1503,6 @@ class CampaignAnalyzer:
 
         return list(set(ips))
 
-    async def _query_events_by_ip(self, ip: str, time_window_hours: int) -> list[dict[str, Any]]:
-        """Query events from a specific IP address."""
-        try:
-            filters = {
-                "source.ip": ip,
-            }
-
-            events, _ = await self.es_client.query_dshield_events(
-                time_range_hours=time_window_hours,
-                filters=filters,
-                page_size=100,
-            )
-
-            return events
-
-        except Exception as e:
-            logger.error("Failed to query events by IP", ip=ip, error=str(e))
-            return []
-
     async def _query_events_by_behavioral_pattern(
         self, pattern: dict[str, Any], time_window_hours: int
     ) -> list[dict[str, Any]]:
@@ -1220,9 +1597,24 @@ class CampaignAnalyzer:
         )
 
     def _calculate_event_confidence(
-        self, event: CampaignEvent, all_events: list[CampaignEvent]
+        self,
+        event: CampaignEvent,
+        all_events: list[CampaignEvent],
+        time_proximity_score: float | None = None,
     ) -> float:
-        """Calculate confidence score for an event."""
+        """Calculate confidence score for an event.
+
+        Args:
+            event: Event to score.
+            all_events: All events of the campaign.
+            time_proximity_score: Precomputed temporal proximity score of the
+                event (see ``_calculate_time_proximity_scores``); computed
+                from ``all_events`` when omitted.
+
+        Returns:
+            Confidence score between 0 and 1.
+
+        """
         confidence = 0.0
 
         # Factor 1: Event completeness (0-30 points)
@@ -1254,7 +1646,8 @@ class CampaignAnalyzer:
 
         # Factor 3: Temporal proximity to other events (0-30 points)
         if len(all_events) > 1:
-            time_proximity_score = self._calculate_time_proximity_score(event, all_events)
+            if time_proximity_score is None:
+                time_proximity_score = self._calculate_time_proximity_score(event, all_events)
             confidence += time_proximity_score
 
         # Normalize to 0-1 scale
@@ -1267,18 +1660,42 @@ class CampaignAnalyzer:
         if len(all_events) <= 1:
             return 0.0
 
-        # Find events within 1 hour
+        # Find events within the proximity window (1 hour by default)
         nearby_events = 0
 
         for other_event in all_events:
             if other_event.event_id != event.event_id:
                 time_diff = abs((event.timestamp - other_event.timestamp).total_seconds())
-                if time_diff <= 3600:  # 1 hour in seconds
+                if time_diff <= self.time_proximity_window_seconds:
                     nearby_events += 1
 
         # Score based on number of nearby events
         return min(nearby_events * 5, 30)
 
+    def _calculate_time_proximity_scores(self, events: list[CampaignEvent]) -> list[float]:
+        """Calculate the time proximity score of every event at once.
+
+        Gives the same scores as ``_calculate_time_proximity_score`` for each
+        event, with a sorted-timestamp window count in O(n log n) instead of
+        comparing every pair of events.
+
+        Args:
+            events: All events of the campaign.
+
+        Returns:
+            Time proximity score of each event, in input order.
+
+        """
+        if len(events) <= 1:
+            return [0.0] * len(events)
+
+        counts = neighbour_counts(
+            to_epoch_microseconds([event.timestamp for event in events]),
+            round(self.time_proximity_window_seconds * 1_000_000),
+            keys=[event.event_id for event in events],
+        )
+        return [min(int(count) * 5, 30) for count in counts]
+
     def _create_campaign_from_events(self, events: list[CampaignEvent]) -> Campaign:
         """Create a campaign from a list of events."""
         if not events:
@@ -1386,22 +1803,23 @@ class CampaignAnalyzer:
 
         return unique_relationships
 
-    def _group_ips_by_subnet(self, ips: list[str], subnet_mask: int = 24) -> dict[str, list[str]]:
-        """Group IP addresses by subnet."""
-        subnet_groups = defaultdict(list)
+    def _group_ips_by_subnet(
+        self, ips: list[str], subnet_mask: int = 24, ipv6_prefix: int = 64
+    ) -> dict[str, list[str]]:
+        """Group IP addresses by subnet.
 
-        for ip in ips:
-            try:
-                # Parse IP and get network
-                ip_obj = ipaddress.IPv4Address(ip)
-                network = ipaddress.IPv4Network(f"{ip_obj}/{subnet_mask}", strict=False)
-                subnet_key = str(network.network_address)
-                subnet_groups[subnet_key].append(ip)
-            except Exception as e:
-                logger.debug(f"Failed to parse IP {ip}: {e}")
-                continue
+        Args:
+            ips: IPv4 or IPv6 addresses; other values are skipped.
+            subnet_mask: Prefix length of IPv4 subnets.
+            ipv6_prefix: Prefix length of IPv6 subnets.
 
-        return dict(subnet_groups)
+        Returns:
+            Subnet CIDR (e.g. ``203.0.113.0/24``) to member addresses.
+
+        """
+        index = SubnetIndex(ipv4_prefix=subnet_mask, ipv6_prefix=ipv6_prefix)
+        index.add_all(ips)
+        return index.groups()
 
     async def _expand_ioc_network(self, ioc: str, depth: int) -> list[IndicatorRelationship]:
         """Network-based IOC expansion using subnet analysis."""
@@ -0,0 +1,406 @@
+"""Online clustering of events into ongoing campaigns.
+
+Ongoing campaign detection used to group one page of recent events in
+memory, so on a busy sensor fleet it saw a small, arbitrary sample.
+:class:`OnlineCampaignClusterer` instead consumes every new event once, from
+an Elasticsearch tail, and keeps its clusters between calls.
+
+Events are linked through the features they share: source IP, source subnet,
+user agent and payload signature (a hash of the request URL or original
+event). Each feature value is a node of a union-find structure; an event
+unions the nodes of its features, so two events end up in the same cluster
+whenever a chain of shared features connects them. Adding an event costs a
+few near-constant-time ``find`` calls, and a cluster only keeps counters and
+a bounded sample of its events, never the events themselves.
+
+Feature kinds carry a link strength and only kinds at least as strong as the
+correlation threshold link events. A user agent or payload seen from very
+many source IPs (a stock browser string, ``GET /``) would chain unrelated
+actors together, so such values stop linking once they exceed
+``max_key_sources`` sources.
+"""
+
+import hashlib
+from collections import Counter
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+
+from .subnet_index import subnet_of
+
+logger = structlog.get_logger(__name__)
+
+# Strength of the evidence that two events sharing a feature are related
+LINK_STRENGTHS = {
+    "ip": 1.0,
+    "payload": 0.9,
+    "subnet": 0.8,
+    "user_agent": 0.6,
+}
+
+_SAMPLE_SIZE = 20
+_TOP_VALUES = 5
+
+
+def _lookup(source: Any, path: str) -> Any:
+    """Read a dotted field from a document with flat or nested keys."""
+    if not isinstance(source, dict):
+        return None
+    if path in source:
+        return source[path]
+    head, _, rest = path.partition(".")
+    return _lookup(source.get(head), rest) if rest else None
+
+
+def _timestamp(event: dict[str, Any]) -> float:
+    """Return the epoch seconds of a parsed event, naive times taken as UTC."""
+    value = event.get("timestamp")
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        return datetime.now(UTC).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+class ClusterStats:
+    """Running summary of one cluster."""
+
+    def __init__(self, cluster_id: int) -> None:
+        """Initialize an empty cluster.
+
+        Args:
+            cluster_id: Creation sequence number; merged clusters keep the
+                smaller one, so a campaign keeps its ID as it grows
+
+        """
+        self.cluster_id = cluster_id
+        self.event_count = 0
+        self.first_seen: float | None = None
+        self.last_seen: float | None = None
+        self.source_ips: set[str] = set()
+        self.event_types: Counter[str] = Counter()
+        self.features: Counter[str] = Counter()
+        self.sample_event_ids: list[str] = []
+
+    def add(self, event: dict[str, Any], timestamp: float, keys: list[str]) -> None:
+        """Count an event and the features that linked it."""
+        self.event_count += 1
+        self.first_seen = timestamp if self.first_seen is None else min(self.first_seen, timestamp)
+        self.last_seen = timestamp if self.last_seen is None else max(self.last_seen, timestamp)
+        if event.get("source_ip"):
+            self.source_ips.add(str(event["source_ip"]))
+        if event.get("event_type"):
+            self.event_types[str(event["event_type"])] += 1
+        self.features.update(key for key in keys if not key.startswith("ip:"))
+        if len(self.sample_event_ids) < _SAMPLE_SIZE and event.get("id"):
+            self.sample_event_ids.append(str(event["id"]))
+
+    def merge(self, other: "ClusterStats") -> None:
+        """Absorb the summary of another cluster."""
+        self.cluster_id = min(self.cluster_id, other.cluster_id)
+        self.event_count += other.event_count
+        firsts = [t for t in (self.first_seen, other.first_seen) if t is not None]
+        lasts = [t for t in (self.last_seen, other.last_seen) if t is not None]
+        self.first_seen = min(firsts) if firsts else None
+        self.last_seen = max(lasts) if lasts else None
+        self.source_ips |= other.source_ips
+        self.event_types.update(other.event_types)
+        self.features.update(other.features)
+        room = _SAMPLE_SIZE - len(self.sample_event_ids)
+        self.sample_event_ids.extend(other.sample_event_ids[:room])
+
+    def to_state(self) -> dict[str, Any]:
+        """Return a JSON-compatible copy of the summary."""
+        return {
+            "cluster_id": self.cluster_id,
+            "event_count": self.event_count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "source_ips": sorted(self.source_ips),
+            "event_types": dict(self.event_types),
+            "features": dict(self.features),
+            "sample_event_ids": self.sample_event_ids,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "ClusterStats":
+        """Rebuild a summary saved with :meth:`to_state`."""
+        stats = cls(state["cluster_id"])
+        stats.event_count = state["event_count"]
+        stats.first_seen = state["first_seen"]
+        stats.last_seen = state["last_seen"]
+        stats.source_ips = set(state["source_ips"])
+        stats.event_types = Counter(state["event_types"])
+        stats.features = Counter(state["features"])
+        stats.sample_event_ids = list(state["sample_event_ids"])
+        return stats
+
+
+class OnlineCampaignClusterer:
+    """Incremental union-find clustering of events by shared features."""
+
+    def __init__(
+        self,
+        correlation_threshold: float = 0.8,
+        subnet_prefix_v4: int = 24,
+        subnet_prefix_v6: int = 64,
+        max_key_sources: int = 1000,
+    ) -> None:
+        """Initialize an empty clusterer.
+
+        Args:
+            correlation_threshold: Smallest link strength (see
+                ``LINK_STRENGTHS``) of the feature kinds that link events
+            subnet_prefix_v4: Prefix length of IPv4 source subnets
+            subnet_prefix_v6: Prefix length of IPv6 source subnets
+            max_key_sources: Number of source IPs after which a user agent or
+                payload signature stops linking events
+
+        """
+        self.correlation_threshold = correlation_threshold
+        self.subnet_prefixes = {4: subnet_prefix_v4, 6: subnet_prefix_v6}
+        self.max_key_sources = max_key_sources
+        self.kinds = {
+            kind for kind, strength in LINK_STRENGTHS.items() if strength >= correlation_threshold
+        }
+        self.checkpoint: dict[str, Any] | None = None
+        self.events_processed = 0
+        self._parent: dict[str, str] = {}
+        self._size: dict[str, int] = {}
+        self._clusters: dict[str, ClusterStats] = {}
+        self._key_sources: dict[str, set[str]] = {}
+        self._hubs: set[str] = set()
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        """Return the number of clusters."""
+        return len(self._clusters)
+
+    def _find(self, key: str) -> str:
+        """Return the root of a node, halving the path on the way."""
+        parent = self._parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def _node(self, key: str) -> str:
+        """Return the root of a node, creating a singleton cluster if new."""
+        if key not in self._parent:
+            self._parent[key] = key
+            self._size[key] = 1
+            self._clusters[key] = ClusterStats(self._next_id)
+            self._next_id += 1
+            return key
+        return self._find(key)
+
+    def _union(self, first: str, second: str) -> str:
+        """Join the clusters of two roots, returning the new root."""
+        if first == second:
+            return first
+        if self._size[first] < self._size[second]:
+            first, second = second, first
+        self._parent[second] = first
+        self._size[first] += self._size.pop(second)
+        self._clusters[first].merge(self._clusters.pop(second))
+        return first
+
+    def _event_keys(self, event: dict[str, Any]) -> list[str]:
+        """Return the feature nodes an event links, skipping overused values."""
+        raw = event.get("raw_data") or {}
+        source_ip = event.get("source_ip")
+        candidates: list[tuple[str, str]] = []
+        if source_ip:
+            candidates.append(("ip", str(source_ip)))
+            version = 6 if ":" in str(source_ip) else 4
+            subnet = subnet_of(str(source_ip), self.subnet_prefixes[version])
+            if subnet:
+                candidates.append(("subnet", subnet))
+        user_agent = event.get("user_agent") or _lookup(raw, "user_agent.original")
+        if user_agent:
+            candidates.append(("user_agent", str(user_agent)))
+        payload = (
+            event.get("url")
+            or _lookup(raw, "url.original")
+            or _lookup(raw, "event.original")
+            or _lookup(raw, "input")
+        )
+        if payload:
+            digest = hashlib.sha1(str(payload).encode("utf-8"), usedforsecurity=False)
+            candidates.append(("payload", digest.hexdigest()[:16]))
+
+        keys = []
+        for kind, value in candidates:
+            if kind not in self.kinds:
+                continue
+            key = f"{kind}:{value}"
+            if kind in ("user_agent", "payload"):
+                if key in self._hubs:
+                    continue
+                sources = self._key_sources.setdefault(key, set())
+                if source_ip:
+                    sources.add(str(source_ip))
+                if len(sources) > self.max_key_sources:
+                    self._hubs.add(key)
+                    del self._key_sources[key]
+                    logger.debug("Feature stopped linking events", feature=kind)
+                    continue
+            keys.append(key)
+        return keys
+
+    def add_event(self, event: dict[str, Any]) -> bool:
+        """Add one parsed event to its cluster.
+
+        Args:
+            event: Parsed DShield event
+
+        Returns:
+            False if the event has no linking feature and was skipped
+
+        """
+        keys = self._event_keys(event)
+        if not keys:
+            return False
+        root = self._node(keys[0])
+        for key in keys[1:]:
+            root = self._union(root, self._node(key))
+        self._clusters[root].add(event, _timestamp(event), keys)
+        self.events_processed += 1
+        return True
+
+    def add_events(self, events: list[dict[str, Any]]) -> int:
+        """Add parsed events, returning how many had a linking feature."""
+        return sum(self.add_event(event) for event in events)
+
+    def prune(self, before: datetime) -> int:
+        """Drop the clusters whose last event is older than a time.
+
+        Args:
+            before: Clusters last seen before this time are dropped
+
+        Returns:
+            Number of clusters dropped
+
+        """
+        cutoff = before.timestamp() if before.tzinfo else before.replace(tzinfo=UTC).timestamp()
+        stale = {
+            root
+            for root, stats in self._clusters.items()
+            if stats.last_seen is None or stats.last_seen < cutoff
+        }
+        if not stale:
+            return 0
+        for key in [key for key in self._parent if self._find(key) in stale]:
+            del self._parent[key]
+            self._key_sources.pop(key, None)
+        for root in stale:
+            del self._clusters[root]
+            del self._size[root]
+        logger.debug("Pruned idle clusters", dropped=len(stale), remaining=len(self._clusters))
+        return len(stale)
+
+    def active_campaigns(
+        self, since: datetime, min_events: int, include_alert_data: bool = True
+    ) -> list[dict[str, Any]]:
+        """Describe the clusters that look like ongoing campaigns.
+
+        Args:
+            since: Only clusters with an event at or after this time
+            min_events: Smallest number of events of a campaign
+            include_alert_data: Whether to add top features and sample events
+
+        Returns:
+            Campaigns ordered by decreasing threat level score
+
+        """
+        cutoff = since.timestamp() if since.tzinfo else since.replace(tzinfo=UTC).timestamp()
+        campaigns = []
+        for stats in self._clusters.values():
+            if stats.event_count < min_events or (stats.last_seen or 0) < cutoff:
+                continue
+            # Grows with volume relative to the threshold and with the number of sources
+            volume = min(stats.event_count / (10 * max(min_events, 1)), 1.0)
+            spread = min(len(stats.source_ips) / 50, 1.0)
+            campaign: dict[str, Any] = {
+                "campaign_id": f"ongoing_{stats.cluster_id}",
+                "threat_level_score": round(0.5 + 0.3 * volume + 0.2 * spread, 3),
+                "event_count": stats.event_count,
+                "unique_source_ips": len(stats.source_ips),
+                "first_seen": datetime.fromtimestamp(stats.first_seen or 0, UTC).isoformat(),
+                "last_seen": datetime.fromtimestamp(stats.last_seen or 0, UTC).isoformat(),
+            }
+            if include_alert_data:
+                campaign["alert_data"] = {
+                    "source_ips": sorted(stats.source_ips)[:_SAMPLE_SIZE],
+                    "top_event_types": dict(stats.event_types.most_common(_TOP_VALUES)),
+                    "linking_features": dict(stats.features.most_common(_TOP_VALUES)),
+                    "sample_event_ids": stats.sample_event_ids,
+                }
+            campaigns.append(campaign)
+        campaigns.sort(key=lambda c: (c["threat_level_score"], c["event_count"]), reverse=True)
+        return campaigns
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the number of clusters, feature nodes and processed events."""
+        return {
+            "clusters": len(self._clusters),
+            "feature_nodes": len(self._parent),
+            "overused_features": len(self._hubs),
+            "events_processed": self.events_processed,
+            "checkpoint": self.checkpoint,
+        }
+
+    def to_state(self) -> dict[str, Any]:
+        """Return a JSON-compatible snapshot of the clusters and checkpoint."""
+        return {
+            "correlation_threshold": self.correlation_threshold,
+            "subnet_prefixes": [self.subnet_prefixes[4], self.subnet_prefixes[6]],
+            "max_key_sources": self.max_key_sources,
+            "checkpoint": self.checkpoint,
+            "events_processed": self.events_processed,
+            "next_id": self._next_id,
+            "parent": self._parent,
+            "size": self._size,
+            "clusters": {root: stats.to_state() for root, stats in self._clusters.items()},
+            "key_sources": {key: sorted(ips) for key, ips in self._key_sources.items()},
+            "hubs": sorted(self._hubs),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "OnlineCampaignClusterer":
+        """Rebuild a clusterer saved with :meth:`to_state`.
+
+        Args:
+            state: Snapshot from :meth:`to_state`
+
+        Returns:
+            Clusterer continuing from the snapshot's checkpoint
+
+        Raises:
+            KeyError: If the snapshot is missing a field
+
+        """
+        prefix_v4, prefix_v6 = state["subnet_prefixes"]
+        clusterer = cls(
+            correlation_threshold=state["correlation_threshold"],
+            subnet_prefix_v4=prefix_v4,
+            subnet_prefix_v6=prefix_v6,
+            max_key_sources=state["max_key_sources"],
+        )
+        clusterer.checkpoint = state["checkpoint"]
+        clusterer.events_processed = state["events_processed"]
+        clusterer._next_id = state["next_id"]
+        clusterer._parent = dict(state["parent"])
+        clusterer._size = dict(state["size"])
+        clusterer._clusters = {
+            root: ClusterStats.from_state(stats) for root, stats in state["clusters"].items()
+        }
+        clusterer._key_sources = {key: set(ips) for key, ips in state["key_sources"].items()}
+        clusterer._hubs = set(state["hubs"])
+        return clusterer
@@ -4,31 +4,68 @@
 MCP tools for campaign analysis and correlation.
 """
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import structlog
 
-from .campaign_analyzer import CampaignAnalyzer, CampaignEvent, CorrelationMethod
+from .campaign_analyzer import Campaign, CampaignAnalyzer, CampaignEvent, CorrelationMethod
+from .campaign_clustering import OnlineCampaignClusterer
+from .campaign_similarity import (
+    CampaignSimilarityIndex,
+    campaign_tokens,
+    estimate_similarity_matrix,
+)
+from .campaign_store import CampaignStore, campaign_summary
 from .elasticsearch_client import ElasticsearchClient
 from .user_config import get_user_config
 
 logger = structlog.get_logger(__name__)
 
+# Campaign store snapshot holding the ongoing campaign clusters and checkpoint
+CLUSTER_STATE_NAME = "ongoing_campaign_clusters"
+
 
 class CampaignMCPTools:
     """MCP tools for campaign analysis and correlation."""
 
-    def __init__(self, es_client: ElasticsearchClient | None = None):
+    def __init__(
+        self,
+        es_client: ElasticsearchClient | None = None,
+        campaign_store: CampaignStore | None = None,
+    ):
         """Initialize CampaignMCPTools.
 
         Args:
             es_client: Optional ElasticsearchClient instance. If not provided, a new one is created.
+            campaign_store: Optional campaign store. If not provided, the configured
+                SQLite database is opened.
 
         """
         self.es_client = es_client or ElasticsearchClient()
         self.campaign_analyzer = CampaignAnalyzer(self.es_client)
         self.user_config = get_user_config()
+        self.campaign_store = campaign_store or self._open_campaign_store()
+        self.campaign_clusterer: OnlineCampaignClusterer | None = None
+        # MinHash/LSH index of the stored campaigns, built on first use
+        self.campaign_similarity: CampaignSimilarityIndex | None = None
+        self.related_campaigns_limit = 5
+        # Events read per tail request and per detection call; a call that
+        # reaches the limit leaves the rest to the next call
+        self.tail_page_size = 1000
+        self.tail_max_events = 50000
+        # Idle clusters are dropped once older than this (or the detection window)
+        self.cluster_retention_hours = 168
+        # Stored campaigns extended with tailed events per detection call
+        self.extend_campaigns_limit = 100
+
+    def _open_campaign_store(self) -> CampaignStore:
+        """Open the configured campaign store, keeping campaigns in memory on failure."""
+        try:
+            return CampaignStore(self.user_config.get_campaign_database_path())
+        except Exception as e:
+            logger.warning("Failed to open campaign store, using memory", error=str(e))
+            return CampaignStore()
 
     async def analyze_campaign(
         self,
@@ -97,6 +134,7 @@ class CampaignMCPTools:
                 time_window_hours=time_range_hours,
                 min_confidence=min_confidence,
             )
+            self._store_campaign(campaign)
 
             # Build response
             result = {
@@ -423,6 +461,7 @@ class CampaignMCPTools:
                 "comparison_metrics": comparison_metrics,
                 "similarity_matrix": similarity_matrix,
                 "detailed_comparisons": comparison_results,
+                "related_campaigns": self._find_related_campaigns(campaigns),
             }
 
             # Add visualization data if requested
@@ -457,10 +496,17 @@ class CampaignMCPTools:
     ) -> dict[str, Any]:
         """Real-time detection of active campaigns.
 
+        Each call clusters only the events indexed since the checkpoint of the
+        previous call (the last ``time_window_hours`` on the first call) into
+        clusters kept between calls and checkpointed in the campaign store.
+        The new events are also merged into the stored campaigns active in the
+        window that involve their source IPs.
+
         Args:
             time_window_hours: Time window for detection (default: 24 hours)
             min_event_threshold: Minimum events for campaign detection
-            correlation_threshold: Minimum correlation threshold
+            correlation_threshold: Smallest link strength of the features that
+                link events (see ``campaign_clustering.LINK_STRENGTHS``)
             include_alert_data: Whether to include alert data
 
         Returns:
@@ -475,50 +521,45 @@ class CampaignMCPTools:
         )
 
         try:
-            # Query recent events
-            recent_events, _, _ = await self.es_client.query_dshield_events(
-                time_range_hours=time_window_hours,
-                page_size=1000,
+            clusterer = self._get_campaign_clusterer(correlation_threshold)
+            new_events, checkpoint = await self.es_client.tail_dshield_events(
+                checkpoint=clusterer.checkpoint,
+                since_hours=time_window_hours,
+                page_size=self.tail_page_size,
+                max_events=self.tail_max_events,
             )
+            clusterer.add_events(new_events)
+            clusterer.checkpoint = checkpoint
 
-            if len(recent_events) < min_event_threshold:
-                return {
-                    "success": True,
-                    "ongoing_campaigns": [],
-                    "total_events_analyzed": len(recent_events),
-                    "message": "Insufficient events for campaign detection",
-                }
-
-            # Group events by potential campaigns
-            campaign_groups = self._group_events_by_campaigns(recent_events, correlation_threshold)
-
-            # Analyze each group
-            ongoing_campaigns = []
-            for group_id, events in campaign_groups.items():
-                if len(events) >= min_event_threshold:
-                    campaign_analysis = await self._analyze_campaign_group(
-                        group_id,
-                        events,
-                        include_alert_data,
-                    )
-                    if campaign_analysis:
-                        ongoing_campaigns.append(campaign_analysis)
-
-            # Sort by threat level
-            ongoing_campaigns.sort(key=lambda x: x.get("threat_level_score", 0), reverse=True)
+            now = datetime.now(UTC)
+            extended = self._extend_stored_campaigns(
+                new_events, since=now - timedelta(hours=time_window_hours)
+            )
+            retention_hours = max(self.cluster_retention_hours, time_window_hours)
+            clusterer.prune(now - timedelta(hours=retention_hours))
+            ongoing_campaigns = clusterer.active_campaigns(
+                since=now - timedelta(hours=time_window_hours),
+                min_events=min_event_threshold,
+                include_alert_data=include_alert_data,
+            )
+            self._save_campaign_clusterer(clusterer)
 
             logger.info(
                 "Ongoing campaign detection completed",
-                total_events=len(recent_events),
-                campaign_groups=len(campaign_groups),
+                new_events=len(new_events),
+                clusters=len(clusterer),
                 ongoing_campaigns=len(ongoing_campaigns),
+                extended_campaigns=len(extended),
             )
 
             return {
                 "success": True,
                 "ongoing_campaigns": ongoing_campaigns,
-                "total_events_analyzed": len(recent_events),
-                "detection_time": datetime.now().isoformat(),
+                "total_events_analyzed": clusterer.events_processed,
+                "new_events_analyzed": len(new_events),
+                "extended_campaigns": extended,
+                "caught_up": len(new_events) < self.tail_max_events,
+                "detection_time": now.isoformat(),
                 "time_window_hours": time_window_hours,
             }
 
@@ -836,26 +877,120 @@ class CampaignMCPTools:
         except Exception:
             return None
 
+    def _store_campaign(self, campaign: Campaign) -> None:
+        """Save an analysed campaign so later lookups need no correlation."""
+        try:
+            self.campaign_store.save_campaign(campaign)
+            if self.campaign_similarity is not None:
+                self.campaign_similarity.add_campaign(campaign_summary(campaign))
+        except Exception as e:
+            logger.warning(
+                "Failed to store campaign", campaign_id=campaign.campaign_id, error=str(e)
+            )
+
+    def _extend_stored_campaigns(
+        self, events: list[dict[str, Any]], since: datetime
+    ) -> dict[str, int]:
+        """Merge tailed events into the stored campaigns involving their source IPs.
+
+        Only campaigns active since ``since`` are extended. The similarity
+        index entry of each extended campaign is refreshed if the index is built.
+
+        Args:
+            events: Parsed events from the event tail
+            since: Oldest end time of the campaigns to extend
+
+        Returns:
+            Number of events added to each extended campaign
+
+        """
+        by_ip: dict[str, list[CampaignEvent]] = {}
+        for event in events:
+            if event.get("source_ip"):
+                by_ip.setdefault(str(event["source_ip"]), []).append(
+                    self._tailed_campaign_event(event)
+                )
+        if not by_ip:
+            return {}
+
+        extended: dict[str, int] = {}
+        try:
+            campaigns = self.campaign_store.search(
+                indicators=list(by_ip), start_time=since, limit=self.extend_campaigns_limit
+            )
+            for campaign in campaigns:
+                campaign_id = campaign["campaign_id"]
+                matched = [
+                    event
+                    for indicator in campaign.get("related_indicators", [])
+                    for event in by_ip.get(indicator, [])
+                ]
+                added = self.campaign_store.add_events(campaign_id, matched)
+                if not added:
+                    continue
+                extended[campaign_id] = added
+                summary = self.campaign_store.get_campaign(campaign_id)
+                if self.campaign_similarity is not None and summary is not None:
+                    self.campaign_similarity.add_campaign(summary)
+        except Exception as e:
+            logger.warning("Failed to extend stored campaigns", error=str(e))
+        return extended
+
+    @staticmethod
+    def _tailed_campaign_event(event: dict[str, Any]) -> CampaignEvent:
+        """Convert a parsed event from the event tail to a CampaignEvent."""
+        timestamp = event.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return CampaignEvent(
+            event_id=str(event.get("id", "")),
+            timestamp=timestamp or datetime.now(UTC),
+            source_ip=event.get("source_ip"),
+            destination_ip=event.get("destination_ip"),
+            event_type=event.get("event_type"),
+            event_category=event.get("category"),
+        )
+
+    def _get_similarity_index(self) -> CampaignSimilarityIndex:
+        """Return the campaign similarity index, indexing the stored campaigns once."""
+        if self.campaign_similarity is None:
+            index = CampaignSimilarityIndex()
+            for campaign in self.campaign_store.iter_campaigns():
+                index.add_campaign(campaign)
+            logger.debug("Built campaign similarity index", **index.get_stats())
+            self.campaign_similarity = index
+        return self.campaign_similarity
+
+    def _find_related_campaigns(
+        self, campaigns: list[dict[str, Any]]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Find the stored campaigns most similar to each compared campaign."""
+        index = self._get_similarity_index()
+        compared = [campaign["campaign_id"] for campaign in campaigns]
+        return {
+            campaign["campaign_id"]: [
+                {"campaign_id": campaign_id, "similarity": round(similarity, 3)}
+                for campaign_id, similarity in index.query(
+                    index.hasher.signature(campaign_tokens(campaign)),
+                    limit=self.related_campaigns_limit,
+                    exclude=compared,
+                )
+            ]
+            for campaign in campaigns
+        }
+
     async def _get_campaign_events(self, campaign_id: str) -> list[CampaignEvent]:
-        """Get campaign events by campaign ID."""
-        # This is a simplified implementation
-        # In a real system, you'd query a campaign database
+        """Get campaign events by campaign ID from the campaign store."""
         try:
-            # For now, simulate getting events
-            # In practice, you'd query your campaign storage
-            return []
+            return self.campaign_store.get_events(campaign_id)
         except Exception as e:
             logger.error(f"Failed to get campaign events for {campaign_id}: {e}")
             return []
 
     async def _get_campaign_data(self, campaign_id: str) -> dict[str, Any] | None:
-        """Get campaign data by campaign ID."""
-        # This is a simplified implementation
-        # In a real system, you'd query a campaign database
+        """Get campaign data by campaign ID from the campaign store."""
         try:
-            # For now, simulate getting campaign data
-            # In practice, you'd query your campaign storage
-            return None
+            return self.campaign_store.get_campaign(campaign_id)
         except Exception as e:
             logger.error(f"Failed to get campaign data for {campaign_id}: {e}")
             return None
@@ -918,9 +1053,15 @@ class CampaignMCPTools:
     def _calculate_similarity_matrix(
         self, campaigns: list[dict[str, Any]], comparison_results: dict[str, Any]
     ) -> list[list[float]]:
-        """Calculate similarity matrix for campaigns."""
-        # Simplified implementation
-        return [[1.0, 0.5], [0.5, 1.0]]
+        """Estimate the indicator and TTP similarity of every pair of campaigns.
+
+        Uses MinHash signatures, so each pair costs a comparison of two
+        fixed-size arrays rather than of the full indicator sets.
+        """
+        hasher = self._get_similarity_index().hasher
+        return estimate_similarity_matrix(
+            [hasher.signature(campaign_tokens(c)) for c in campaigns]
+        )
 
     def _generate_comparison_visualization_data(
         self, campaigns: list[dict[str, Any]], comparison_results: dict[str, Any]
@@ -929,37 +1070,99 @@ class CampaignMCPTools:
         # Simplified implementation
         return {"visualization_type": "similarity_matrix"}
 
-    def _group_events_by_campaigns(
-        self, events: list[dict[str, Any]], correlation_threshold: float
-    ) -> dict[str, list[dict[str, Any]]]:
-        """Group events by potential campaigns."""
-        # Simplified implementation
-        return {"group_1": events[: len(events) // 2], "group_2": events[len(events) // 2 :]}
+    def _get_campaign_clusterer(self, correlation_threshold: float) -> OnlineCampaignClusterer:
+        """Return the ongoing campaign clusterer, restoring its last checkpoint.
 
-    async def _analyze_campaign_group(
-        self, group_id: str, events: list[dict[str, Any]], include_alert_data: bool
-    ) -> dict[str, Any] | None:
-        """Analyze a group of events as a potential campaign."""
-        # Simplified implementation
-        return {
-            "campaign_id": group_id,
-            "threat_level_score": 0.7,
-            "event_count": len(events),
-        }
+        Clusters built with another correlation threshold linked events through
+        other features, so a threshold change starts over from a new clusterer.
+        """
+        clusterer = self.campaign_clusterer
+        if clusterer is None:
+            try:
+                state = self.campaign_store.load_state(CLUSTER_STATE_NAME)
+                if state:
+                    clusterer = OnlineCampaignClusterer.from_state(state)
+            except Exception as e:
+                logger.warning("Failed to restore campaign clusters", error=str(e))
+        if clusterer is None or clusterer.correlation_threshold != correlation_threshold:
+            if clusterer is not None:
+                logger.info(
+                    "Correlation threshold changed, restarting campaign clustering",
+                    previous=clusterer.correlation_threshold,
+                    threshold=correlation_threshold,
+                )
+            clusterer = OnlineCampaignClusterer(
+                correlation_threshold=correlation_threshold,
+                subnet_prefix_v4=self.campaign_analyzer.subnet_prefix_v4,
+                subnet_prefix_v6=self.campaign_analyzer.subnet_prefix_v6,
+            )
+        self.campaign_clusterer = clusterer
+        return clusterer
+
+    def _save_campaign_clusterer(self, clusterer: OnlineCampaignClusterer) -> None:
+        """Checkpoint the ongoing campaign clusters in the campaign store."""
+        try:
+            self.campaign_store.save_state(CLUSTER_STATE_NAME, clusterer.to_state())
+        except Exception as e:
+            logger.warning("Failed to checkpoint campaign clusters", error=str(e))
 
     def _build_campaign_search_query(
         self, search_criteria: dict[str, Any], time_range_hours: int
     ) -> dict[str, Any]:
-        """Build search query for campaigns."""
-        # Simplified implementation
-        return {"query": "search"}
+        """Build campaign store search filters from search criteria.
+
+        Args:
+            search_criteria: ``indicators`` (IPs or domains), ``ttps`` (ATT&CK
+                techniques or tactics) and ``min_confidence``; a single string is
+                accepted for the list criteria. ``similar_to`` (a campaign ID)
+                restricts the results to campaigns with similar indicators and
+                TTPs, at least ``min_similarity`` similar if given
+            time_range_hours: Campaigns active within this many hours are matched
+
+        Returns:
+            Keyword arguments for :meth:`CampaignStore.search`, plus the
+            ``similar_to`` and ``min_similarity`` criteria
+
+        """
+
+        def as_list(value: Any) -> list[str] | None:
+            if not value:
+                return None
+            return [value] if isinstance(value, str) else [str(v) for v in value]
+
+        min_confidence = search_criteria.get("min_confidence")
+        return {
+            "indicators": as_list(search_criteria.get("indicators")),
+            "ttps": as_list(search_criteria.get("ttps")),
+            "start_time": datetime.now(UTC) - timedelta(hours=time_range_hours),
+            "min_confidence": float(min_confidence) if min_confidence is not None else None,
+            "similar_to": search_criteria.get("similar_to"),
+            "min_similarity": float(search_criteria.get("min_similarity", 0.0)),
+        }
 
     async def _search_campaign_database(
         self, search_query: dict[str, Any], max_results: int
     ) -> list[dict[str, Any]]:
-        """Search campaign database."""
-        # Simplified implementation
-        return []
+        """Search the campaign store, ranking by similarity for ``similar_to``."""
+        filters = dict(search_query)
+        similar_to = filters.pop("similar_to", None)
+        min_similarity = filters.pop("min_similarity", 0.0)
+        if not similar_to:
+            return self.campaign_store.search(**filters, limit=max_results)
+
+        # LSH candidates only; the store then applies the other criteria
+        ranked = dict(
+            self._get_similarity_index().similar_to(
+                similar_to, limit=None, min_similarity=min_similarity
+            )
+        )
+        matches = self.campaign_store.search(
+            **filters, campaign_ids=list(ranked), limit=len(ranked)
+        )
+        for campaign in matches:
+            campaign["similarity"] = round(ranked[campaign["campaign_id"]], 3)
+        matches.sort(key=lambda campaign: -campaign["similarity"])
+        return matches[:max_results]
 
     def _generate_campaign_summary(self, campaign: dict[str, Any]) -> str:
         """Generate campaign summary."""
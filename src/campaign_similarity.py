@@ -0,0 +1,295 @@
+"""MinHash signatures and LSH buckets for campaign similarity.
+
+Comparing campaigns on their indicator and TTP sets pairwise costs a set
+intersection per pair, so finding the campaigns related to one campaign
+grows linearly, and a full similarity matrix quadratically, with the number
+of campaigns retained. Instead every campaign gets a MinHash signature: for
+each of ``num_perm`` random hash functions, the smallest hash of any of its
+tokens. Two signatures agree at a position with probability equal to the
+Jaccard similarity of the token sets, so the fraction of equal positions
+estimates it from fixed-size arrays.
+
+:class:`CampaignSimilarityIndex` also splits every signature into ``bands``
+bands of ``rows`` values and files the campaign under each band. Campaigns
+sharing at least one band are the candidates of a query; only those are
+compared in full. The chance of becoming a candidate rises steeply around a
+similarity of roughly ``(1 / bands) ** (1 / rows)`` (about 0.42 with the
+defaults), so related campaigns are found without scanning the others.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def campaign_tokens(campaign: dict[str, Any]) -> set[str]:
+    """Return the indicator and TTP tokens of a campaign summary.
+
+    Args:
+        campaign: Campaign summary with ``related_indicators``,
+            ``infrastructure_domains``, ``ttp_techniques`` and ``ttp_tactics``
+
+    Returns:
+        Tokens prefixed by kind, so an indicator never matches a TTP
+
+    """
+    tokens = {
+        f"ind:{value}"
+        for key in ("related_indicators", "infrastructure_domains")
+        for value in campaign.get(key) or []
+        if value
+    }
+    tokens.update(
+        f"ttp:{value}"
+        for key in ("ttp_techniques", "ttp_tactics")
+        for value in campaign.get(key) or []
+        if value
+    )
+    return tokens
+
+
+def _token_hash(token: str) -> int:
+    """Hash a token to 32 bits."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    """Fixed family of hash functions computing MinHash signatures."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        """Draw the hash functions.
+
+        Signatures are only comparable between hashers built with the same
+        ``num_perm`` and ``seed``.
+
+        Args:
+            num_perm: Number of hash functions (signature length)
+            seed: Seed of the random hash function parameters
+
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # 32-bit multipliers and 32-bit token hashes keep a*x + b below 2**64
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray | None:
+        """Compute the signature of a token set.
+
+        Args:
+            tokens: Set of tokens
+
+        Returns:
+            uint32 array of ``num_perm`` minimum hashes, or None for an empty
+            set, which is similar to nothing
+
+        """
+        hashes = np.fromiter((_token_hash(t) for t in set(tokens)), dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(first: np.ndarray | None, second: np.ndarray | None) -> float:
+    """Estimate the Jaccard similarity of two token sets from their signatures.
+
+    Args:
+        first: Signature of the first set (None if empty)
+        second: Signature of the second set (None if empty)
+
+    Returns:
+        Fraction of equal signature positions, 0.0 if a set is empty
+
+    """
+    if first is None or second is None:
+        return 0.0
+    return float(np.count_nonzero(first == second)) / first.size
+
+
+def estimate_similarity_matrix(signatures: list[np.ndarray | None]) -> list[list[float]]:
+    """Estimate the pairwise similarities of several signatures at once.
+
+    Args:
+        signatures: Signatures, None for empty sets
+
+    Returns:
+        Symmetric matrix with 1.0 on the diagonal, rounded to 3 decimals
+
+    """
+    count = len(signatures)
+    present = [i for i, signature in enumerate(signatures) if signature is not None]
+    present_signatures = [signature for signature in signatures if signature is not None]
+    matrix = np.zeros((count, count))
+    if present:
+        stacked = np.stack(present_signatures)
+        equal = (stacked[:, None, :] == stacked[None, :, :]).mean(axis=2)
+        matrix[np.ix_(present, present)] = equal
+    np.fill_diagonal(matrix, 1.0)
+    return np.round(matrix, 3).tolist()
+
+
+class CampaignSimilarityIndex:
+    """MinHash signatures of campaigns with LSH band buckets."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1) -> None:
+        """Initialize an empty index.
+
+        Args:
+            num_perm: Signature length
+            bands: Number of LSH bands; more bands find less similar
+                campaigns at the cost of more candidates
+            seed: Seed of the hash functions
+
+        Raises:
+            ValueError: If ``num_perm`` is not a multiple of ``bands``
+
+        """
+        if bands <= 0 or num_perm % bands:
+            raise ValueError("num_perm must be a positive multiple of bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._signatures: dict[str, np.ndarray] = {}
+        self._buckets: list[dict[bytes, set[str]]] = [{} for _ in range(bands)]
+
+    @property
+    def threshold(self) -> float:
+        """Similarity at which a campaign becomes a candidate about half the time."""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def __len__(self) -> int:
+        """Return the number of indexed campaigns."""
+        return len(self._signatures)
+
+    def __contains__(self, campaign_id: object) -> bool:
+        """Check whether a campaign is indexed."""
+        return campaign_id in self._signatures
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        """Split a signature into the bucket keys of its bands."""
+        rows = self.rows
+        return [signature[i * rows : (i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def signature(self, campaign_id: str) -> np.ndarray | None:
+        """Return the signature of an indexed campaign, or None."""
+        return self._signatures.get(campaign_id)
+
+    def add(self, campaign_id: str, tokens: Iterable[str]) -> bool:
+        """Index a campaign, replacing its previous signature.
+
+        Args:
+            campaign_id: Campaign ID
+            tokens: Indicator and TTP tokens (see :func:`campaign_tokens`)
+
+        Returns:
+            False if the campaign has no tokens and was not indexed
+
+        """
+        self.remove(campaign_id)
+        signature = self.hasher.signature(tokens)
+        if signature is None:
+            return False
+        self._signatures[campaign_id] = signature
+        for buckets, key in zip(self._buckets, self._band_keys(signature), strict=True):
+            buckets.setdefault(key, set()).add(campaign_id)
+        return True
+
+    def add_campaign(self, campaign: dict[str, Any]) -> bool:
+        """Index a campaign summary by its indicator and TTP tokens."""
+        return self.add(campaign["campaign_id"], campaign_tokens(campaign))
+
+    def remove(self, campaign_id: str) -> bool:
+        """Remove a campaign from the index.
+
+        Args:
+            campaign_id: Campaign ID
+
+        Returns:
+            True if the campaign was indexed
+
+        """
+        signature = self._signatures.pop(campaign_id, None)
+        if signature is None:
+            return False
+        for buckets, key in zip(self._buckets, self._band_keys(signature), strict=True):
+            members = buckets.get(key)
+            if members is not None:
+                members.discard(campaign_id)
+                if not members:
+                    del buckets[key]
+        return True
+
+    def candidates(self, signature: np.ndarray) -> set[str]:
+        """Return the campaigns sharing at least one band with a signature."""
+        found: set[str] = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature), strict=True):
+            found.update(buckets.get(key, ()))
+        return found
+
+    def query(
+        self,
+        signature: np.ndarray | None,
+        limit: int | None = 10,
+        min_similarity: float = 0.0,
+        exclude: Iterable[str] = (),
+    ) -> list[tuple[str, float]]:
+        """Find the indexed campaigns most similar to a signature.
+
+        Args:
+            signature: Signature to compare with
+            limit: Maximum number of campaigns, or None for all candidates
+            min_similarity: Smallest estimated similarity returned
+            exclude: Campaign IDs left out of the results
+
+        Returns:
+            (campaign ID, estimated similarity) pairs, most similar first
+
+        """
+        if signature is None:
+            return []
+        excluded = set(exclude)
+        scored = [
+            (campaign_id, estimate_similarity(signature, self._signatures[campaign_id]))
+            for campaign_id in self.candidates(signature) - excluded
+        ]
+        scored = [pair for pair in scored if pair[1] >= min_similarity]
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored if limit is None else scored[:limit]
+
+    def similar_to(
+        self, campaign_id: str, limit: int | None = 10, min_similarity: float = 0.0
+    ) -> list[tuple[str, float]]:
+        """Find the campaigns most similar to an indexed campaign.
+
+        Args:
+            campaign_id: Indexed campaign
+            limit: Maximum number of campaigns, or None for all candidates
+            min_similarity: Smallest estimated similarity returned
+
+        Returns:
+            (campaign ID, estimated similarity) pairs, most similar first;
+            empty if the campaign is not indexed
+
+        """
+        return self.query(
+            self._signatures.get(campaign_id), limit, min_similarity, exclude=[campaign_id]
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the index size and LSH parameters."""
+        return {
+            "campaigns": len(self._signatures),
+            "num_perm": self.hasher.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "threshold": round(self.threshold, 3),
+        }
@@ -0,0 +1,506 @@
+"""Persistent, indexed store of correlated campaigns.
+
+Campaign tools used to find nothing once ``analyze_campaign`` had returned:
+details, timelines, comparisons and searches all had to correlate the
+events again. :class:`CampaignStore` keeps every analysed campaign in a
+local SQLite database instead:
+
+* ``campaigns`` holds one row per campaign with its summary, and secondary
+  indexes on start time, end time and confidence score;
+* ``campaign_events`` holds the member events, keyed by campaign and event
+  ID, so events arriving later are merged without duplicates;
+* ``campaign_indicators`` and ``campaign_ttps`` are inverted indexes from an
+  indicator (IP, domain) or ATT&CK technique/tactic to its campaigns;
+* ``campaign_state`` holds named JSON snapshots, such as the checkpointed
+  state of ongoing campaign detection.
+
+Lookups by campaign ID and searches by indicator, TTP, time range and score
+are therefore index reads instead of Elasticsearch correlations. A time range
+overlap test on two open-ended columns would read every campaign on one side
+of the range; bounding ``start_time`` below by the range start minus the
+longest campaign duration (read from an index on the duration expression)
+makes it a bounded range scan instead. Times are stored as epoch seconds;
+naive datetimes are taken to be UTC.
+"""
+
+import re
+import sqlite3
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import fields
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+
+from . import json_codec
+from .campaign_analyzer import Campaign, CampaignEvent
+
+logger = structlog.get_logger(__name__)
+
+_DOMAIN_PATTERN = re.compile(r"https?://([^/:]+)")
+_EVENT_FIELDS = tuple(f.name for f in fields(CampaignEvent))
+# Values of a list bound as one JSON array parameter
+_JSON_VALUES = "(SELECT value FROM json_each(?))"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign_id TEXT PRIMARY KEY,
+    confidence_score REAL NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    total_events INTEGER NOT NULL DEFAULT 0,
+    summary_json TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_start_time ON campaigns(start_time);
+CREATE INDEX IF NOT EXISTS idx_campaigns_end_time ON campaigns(end_time);
+CREATE INDEX IF NOT EXISTS idx_campaigns_confidence ON campaigns(confidence_score);
+CREATE INDEX IF NOT EXISTS idx_campaigns_duration ON campaigns(end_time - start_time);
+
+CREATE TABLE IF NOT EXISTS campaign_events (
+    campaign_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    source_ip TEXT,
+    destination_ip TEXT,
+    event_json TEXT NOT NULL,
+    PRIMARY KEY (campaign_id, event_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_campaign_events_time ON campaign_events(campaign_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS campaign_indicators (
+    indicator TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    PRIMARY KEY (indicator, campaign_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_campaign_indicators_campaign ON campaign_indicators(campaign_id);
+
+CREATE TABLE IF NOT EXISTS campaign_ttps (
+    ttp TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    PRIMARY KEY (ttp, campaign_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_campaign_ttps_campaign ON campaign_ttps(campaign_id);
+
+CREATE TABLE IF NOT EXISTS campaign_state (
+    name TEXT PRIMARY KEY,
+    state_json TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Return epoch seconds, taking naive datetimes to be UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp.timestamp()
+
+
+def _url_domain(url: str | None) -> str | None:
+    """Return the host of an http(s) URL, or None."""
+    match = _DOMAIN_PATTERN.match(url) if url else None
+    return match.group(1) if match else None
+
+
+def _merge(existing: list[Any], new: Iterable[Any]) -> list[Any]:
+    """Append the new values that are not already listed, keeping order."""
+    return list(dict.fromkeys([*existing, *(value for value in new if value)]))
+
+
+def _event_row(campaign_id: str, event: CampaignEvent) -> tuple[Any, ...]:
+    """Build the ``campaign_events`` row of an event."""
+    # A shallow read; dataclasses.asdict deep-copies every value
+    data = {name: getattr(event, name) for name in _EVENT_FIELDS}
+    data["timestamp"] = event.timestamp.isoformat()
+    return (
+        campaign_id,
+        event.event_id,
+        _epoch(event.timestamp),
+        event.source_ip,
+        event.destination_ip,
+        json_codec.dumps(data),
+    )
+
+
+def _event_indicators(events: Iterable[CampaignEvent]) -> tuple[list[str], list[str], list[str]]:
+    """Collect the IPs, domains and TTPs of events, in first-seen order."""
+    ips: dict[str, None] = {}
+    domains: dict[str, None] = {}
+    ttps: dict[str, None] = {}
+    for event in events:
+        for ip in (event.source_ip, event.destination_ip):
+            if ip:
+                ips[ip] = None
+        domain = _url_domain(event.url)
+        if domain:
+            domains[domain] = None
+        for ttp in (event.ttp_technique, event.ttp_tactic):
+            if ttp:
+                ttps[ttp] = None
+    return list(ips), list(domains), list(ttps)
+
+
+def campaign_summary(campaign: Campaign) -> dict[str, Any]:
+    """Describe a campaign without its events and relationships.
+
+    Args:
+        campaign: Correlated campaign
+
+    Returns:
+        JSON-compatible summary, with ISO 8601 start and end times
+
+    """
+    return {
+        "campaign_id": campaign.campaign_id,
+        "confidence_score": campaign.confidence_score,
+        "start_time": campaign.start_time.isoformat(),
+        "end_time": campaign.end_time.isoformat(),
+        "total_events": campaign.total_events,
+        "unique_ips": campaign.unique_ips,
+        "unique_targets": campaign.unique_targets,
+        "attack_vectors": list(campaign.attack_vectors),
+        "ttp_techniques": list(campaign.ttp_techniques),
+        "ttp_tactics": list(campaign.ttp_tactics),
+        "infrastructure_domains": list(campaign.infrastructure_domains),
+        "geographic_regions": list(campaign.geographic_regions),
+        "suspected_actor": campaign.suspected_actor,
+        "campaign_name": campaign.campaign_name,
+        "description": campaign.description,
+        "related_indicators": list(campaign.related_indicators),
+        "metadata": campaign.metadata,
+    }
+
+
+class CampaignStore:
+    """SQLite store of campaigns, their events, indicators and TTPs."""
+
+    def __init__(self, db_path: str = ":memory:") -> None:
+        """Open (and create if needed) a campaign store.
+
+        Args:
+            db_path: SQLite database file, or ``:memory:`` for a store that
+                lives as long as this object
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or initialized
+
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        logger.debug("Campaign store opened", db_path=db_path)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _index_terms(
+        self, campaign_id: str, indicators: Iterable[str], ttps: Iterable[str]
+    ) -> None:
+        """Add indicators and TTPs of a campaign to the inverted indexes."""
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO campaign_indicators (indicator, campaign_id) VALUES (?, ?)",
+            [(indicator, campaign_id) for indicator in indicators if indicator],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO campaign_ttps (ttp, campaign_id) VALUES (?, ?)",
+            [(ttp, campaign_id) for ttp in ttps if ttp],
+        )
+
+    def save_campaign(self, campaign: Campaign) -> None:
+        """Insert a campaign, replacing any stored campaign with the same ID.
+
+        Args:
+            campaign: Correlated campaign, including its events
+
+        """
+        summary = campaign_summary(campaign)
+        ips, domains, ttps = _event_indicators(campaign.events)
+        with self._conn:
+            self._delete(campaign.campaign_id)
+            self._conn.execute(
+                "INSERT INTO campaigns (campaign_id, confidence_score, start_time, end_time, "
+                "total_events, summary_json, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    campaign.campaign_id,
+                    campaign.confidence_score,
+                    _epoch(campaign.start_time),
+                    _epoch(campaign.end_time),
+                    campaign.total_events,
+                    json_codec.dumps(summary),
+                    datetime.now(UTC).timestamp(),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO campaign_events (campaign_id, event_id, timestamp, "
+                "source_ip, destination_ip, event_json) VALUES (?, ?, ?, ?, ?, ?)",
+                [_event_row(campaign.campaign_id, event) for event in campaign.events],
+            )
+            self._index_terms(
+                campaign.campaign_id,
+                [*campaign.related_indicators, *campaign.infrastructure_domains, *ips, *domains],
+                [*campaign.ttp_techniques, *campaign.ttp_tactics, *ttps],
+            )
+        logger.debug(
+            "Campaign saved", campaign_id=campaign.campaign_id, events=len(campaign.events)
+        )
+
+    def add_events(
+        self,
+        campaign_id: str,
+        events: Sequence[CampaignEvent],
+        confidence_score: float | None = None,
+    ) -> int:
+        """Merge newly arrived events into a stored campaign.
+
+        Events already stored under the campaign are ignored. The time range,
+        event count, indicator and TTP lists and indexes are updated from the
+        new events; the distinct IP counts from the stored event rows.
+
+        Args:
+            campaign_id: Stored campaign to extend
+            events: Events to add
+            confidence_score: New confidence score, if it was recomputed
+
+        Returns:
+            Number of events that were not stored yet
+
+        Raises:
+            KeyError: If the campaign is not stored
+
+        """
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT summary_json FROM campaigns WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(campaign_id)
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO campaign_events (campaign_id, event_id, timestamp, "
+                "source_ip, destination_ip, event_json) VALUES (?, ?, ?, ?, ?, ?)",
+                [_event_row(campaign_id, event) for event in events],
+            )
+            added = self._conn.total_changes - before
+            if not added and confidence_score is None:
+                return 0
+
+            summary = json_codec.loads(row["summary_json"])
+            ips, domains, ttps = _event_indicators(events)
+            unique_ips, unique_targets = self._conn.execute(
+                "SELECT COUNT(DISTINCT source_ip), COUNT(DISTINCT destination_ip) "
+                "FROM campaign_events WHERE campaign_id = ?",
+                (campaign_id,),
+            ).fetchone()
+            times = [_epoch(event.timestamp) for event in events]
+            start = min([_epoch(datetime.fromisoformat(summary["start_time"])), *times])
+            end = max([_epoch(datetime.fromisoformat(summary["end_time"])), *times])
+            summary.update(
+                start_time=datetime.fromtimestamp(start, UTC).isoformat(),
+                end_time=datetime.fromtimestamp(end, UTC).isoformat(),
+                total_events=summary.get("total_events", 0) + added,
+                unique_ips=max(summary.get("unique_ips", 0), unique_ips),
+                unique_targets=max(summary.get("unique_targets", 0), unique_targets),
+                related_indicators=_merge(summary.get("related_indicators", []), ips),
+                infrastructure_domains=_merge(summary.get("infrastructure_domains", []), domains),
+                ttp_techniques=_merge(
+                    summary.get("ttp_techniques", []), (e.ttp_technique for e in events)
+                ),
+                ttp_tactics=_merge(summary.get("ttp_tactics", []), (e.ttp_tactic for e in events)),
+            )
+            if confidence_score is not None:
+                summary["confidence_score"] = confidence_score
+            self._conn.execute(
+                "UPDATE campaigns SET confidence_score = ?, start_time = ?, end_time = ?, "
+                "total_events = ?, summary_json = ?, updated_at = ? WHERE campaign_id = ?",
+                (
+                    summary["confidence_score"],
+                    start,
+                    end,
+                    summary["total_events"],
+                    json_codec.dumps(summary),
+                    datetime.now(UTC).timestamp(),
+                    campaign_id,
+                ),
+            )
+            self._index_terms(campaign_id, [*ips, *domains], ttps)
+        logger.debug("Events added to campaign", campaign_id=campaign_id, added=added)
+        return added
+
+    def _delete(self, campaign_id: str) -> int:
+        """Delete a campaign's rows from every table (inside a transaction)."""
+        for table in ("campaign_events", "campaign_indicators", "campaign_ttps"):
+            self._conn.execute(f"DELETE FROM {table} WHERE campaign_id = ?", (campaign_id,))
+        return self._conn.execute(
+            "DELETE FROM campaigns WHERE campaign_id = ?", (campaign_id,)
+        ).rowcount
+
+    def delete_campaign(self, campaign_id: str) -> bool:
+        """Delete a campaign with its events and index entries.
+
+        Args:
+            campaign_id: Campaign to delete
+
+        Returns:
+            True if the campaign was stored
+
+        """
+        with self._conn:
+            return self._delete(campaign_id) > 0
+
+    def get_campaign(self, campaign_id: str) -> dict[str, Any] | None:
+        """Return the summary of a stored campaign.
+
+        Args:
+            campaign_id: Campaign ID
+
+        Returns:
+            Campaign summary (see :func:`campaign_summary`), or None
+
+        """
+        row = self._conn.execute(
+            "SELECT summary_json FROM campaigns WHERE campaign_id = ?", (campaign_id,)
+        ).fetchone()
+        return json_codec.loads(row["summary_json"]) if row else None
+
+    def iter_campaigns(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the summaries of all stored campaigns."""
+        for row in self._conn.execute("SELECT summary_json FROM campaigns"):
+            yield json_codec.loads(row["summary_json"])
+
+    def get_events(self, campaign_id: str, limit: int | None = None) -> list[CampaignEvent]:
+        """Return the stored events of a campaign, oldest first.
+
+        Args:
+            campaign_id: Campaign ID
+            limit: Maximum number of events, or None for all of them
+
+        Returns:
+            Campaign events (empty if the campaign is not stored)
+
+        """
+        rows = self._conn.execute(
+            "SELECT event_json FROM campaign_events WHERE campaign_id = ? "
+            "ORDER BY timestamp LIMIT ?",
+            (campaign_id, -1 if limit is None else limit),
+        ).fetchall()
+        events = []
+        for row in rows:
+            data = json_codec.loads(row["event_json"])
+            data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+            events.append(CampaignEvent(**{k: v for k, v in data.items() if k in _EVENT_FIELDS}))
+        return events
+
+    def search(
+        self,
+        indicators: Sequence[str] | None = None,
+        ttps: Sequence[str] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        min_confidence: float | None = None,
+        campaign_ids: Sequence[str] | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Find campaigns matching every given criterion.
+
+        Args:
+            indicators: Campaigns involving any of these IPs or domains
+            ttps: Campaigns using any of these ATT&CK techniques or tactics
+            start_time: Campaigns still active at or after this time
+            end_time: Campaigns that started at or before this time
+            min_confidence: Smallest confidence score
+            campaign_ids: Only these campaigns (an empty list matches none)
+            limit: Maximum number of campaigns
+
+        Returns:
+            Campaign summaries, most confident and then most recent first
+
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        # Lists are bound as one JSON array parameter, so their length is not
+        # limited by SQLITE_MAX_VARIABLE_NUMBER
+        if indicators:
+            clauses.append(
+                "campaign_id IN (SELECT campaign_id FROM campaign_indicators "
+                f"WHERE indicator IN {_JSON_VALUES})"
+            )
+            params.append(json_codec.dumps(list(indicators)))
+        if ttps:
+            clauses.append(
+                "campaign_id IN (SELECT campaign_id FROM campaign_ttps "
+                f"WHERE ttp IN {_JSON_VALUES})"
+            )
+            params.append(json_codec.dumps(list(ttps)))
+        if start_time is not None:
+            # No campaign that started before this bound can still be active
+            longest = self._conn.execute(
+                "SELECT MAX(end_time - start_time) FROM campaigns"
+            ).fetchone()[0]
+            clauses.append("end_time >= ? AND start_time >= ?")
+            params.extend([_epoch(start_time), _epoch(start_time) - (longest or 0.0)])
+        if end_time is not None:
+            clauses.append("start_time <= ?")
+            params.append(_epoch(end_time))
+        if min_confidence is not None:
+            clauses.append("confidence_score >= ?")
+            params.append(min_confidence)
+        if campaign_ids is not None:
+            clauses.append(f"campaign_id IN {_JSON_VALUES}")
+            params.append(json_codec.dumps(list(campaign_ids)))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT summary_json FROM campaigns {where}"
+            "ORDER BY confidence_score DESC, end_time DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [json_codec.loads(row["summary_json"]) for row in rows]
+
+    def save_state(self, name: str, state: dict[str, Any]) -> None:
+        """Save a named JSON snapshot, replacing the previous one.
+
+        Args:
+            name: Snapshot name
+            state: JSON-compatible state
+
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO campaign_state (name, state_json, updated_at) "
+                "VALUES (?, ?, ?)",
+                (name, json_codec.dumps(state), datetime.now(UTC).timestamp()),
+            )
+
+    def load_state(self, name: str) -> dict[str, Any] | None:
+        """Load a named JSON snapshot.
+
+        Args:
+            name: Snapshot name
+
+        Returns:
+            Saved state, or None if there is none
+
+        """
+        row = self._conn.execute(
+            "SELECT state_json FROM campaign_state WHERE name = ?", (name,)
+        ).fetchone()
+        return json_codec.loads(row["state_json"]) if row else None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the number of stored campaigns, events and index entries."""
+        counts = {
+            name: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for name, table in (
+                ("campaigns", "campaigns"),
+                ("events", "campaign_events"),
+                ("indicators", "campaign_indicators"),
+                ("ttps", "campaign_ttps"),
+            )
+        }
+        return {**counts, "db_path": self.db_path}
@@ -789,6 +789,8 @@ class ContextInjector:
                             sources.add(str(index))
                 else:
                     sources.add(str(indices))
+            elif event.get("index"):
+                sources.add(str(event["index"]))
 
         return list(sources)
 
@@ -11,6 +11,7 @@ Features:
 - DShield-specific data mapping
 - Summary and report generation
 - Utility methods for extracting and analyzing event data
+- Vectorised summaries over columnar event batches (see ``src.event_batch``)
 
 Example:
     >>> from src.data_processor import DataProcessor
@@ -24,11 +25,14 @@ import os
 import traceback
 import uuid
 from collections import Counter
+from concurrent.futures import Executor
 from datetime import UTC, datetime
 from typing import Any
 
+import numpy as np
 import structlog
 
+from .event_batch import EventBatch
 from .models import (
     DShieldAttack,
     DShieldReputation,
@@ -37,6 +41,18 @@ from .models import (
     EventCategory,
     EventSeverity,
 )
+from .pattern_matcher import AttackPatternMatcher
+from .summary_engine import (
+    BatchCounts,
+    DistinctCount,
+    IndexNames,
+    MatchCount,
+    RowCount,
+    SummaryEngine,
+    TopValues,
+    ValueCounts,
+    summarize,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -148,6 +164,9 @@ class DataProcessor:
             "other": EventCategory.OTHER,
         }
 
+        # Keyword automaton over dshield_attack_patterns, compiled on first use
+        self._attack_pattern_matcher: AttackPatternMatcher | None = None
+
     def process_security_events(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Process and normalize security events from DShield SIEM.
 
@@ -162,6 +181,7 @@ class DataProcessor:
 
         """
         processed_events = []
+        classify = self._get_attack_pattern_matcher().classify
 
         for event in events:
             try:
@@ -172,10 +192,12 @@ class DataProcessor:
                 # Normalize event data
                 normalized_event = self._normalize_event(event)
 
-                # Detect attack patterns
-                normalized_event["attack_patterns"] = self._detect_attack_patterns(
-                    [normalized_event]
+                # Detect attack patterns (one scan of the event's text)
+                patterns = classify(
+                    self._pattern_text(normalized_event.get("description", "")),
+                    self._pattern_text(normalized_event.get("event_type", "")),
                 )
+                normalized_event["attack_patterns"] = dict.fromkeys(patterns, 1)
 
                 # Add DShield-specific enrichments
                 normalized_event = self._enrich_dshield_data(normalized_event)
@@ -375,215 +397,135 @@ class DataProcessor:
 
         return processed_attackers
 
-    def generate_dshield_summary(self, events: list[dict[str, Any]]) -> DShieldStatistics:
-        """Generate DShield-specific security summary."""
-        if not events:
+    def generate_dshield_summary(
+        self, events: list[dict[str, Any]] | EventBatch
+    ) -> DShieldStatistics:
+        """Generate DShield-specific security summary.
+
+        Args:
+            events: Parsed events, or an EventBatch already holding them
+
+        Returns:
+            DShield statistics computed over the events
+
+        """
+        batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+        if not len(batch):
             return self._create_empty_dshield_statistics()
 
-        # Extract DShield-specific data
-        dshield_attacks = [e for e in events if e.get("event_type") == "attack"]
+        # Attack events only count towards attackers and targets
+        attacks = batch.event_type.mask("attack")
+        reputation_scores = batch.reputation_score.values
 
         # Compile statistics
         stats = DShieldStatistics(
             time_range_hours=24,  # Default, should be configurable
-            total_attacks=len(dshield_attacks),
-            unique_attackers=len(
-                set(
-                    str(e.get("source_ip"))
-                    if isinstance(e.get("source_ip"), list | dict)
-                    else e.get("source_ip")
-                    for e in dshield_attacks
-                    if e.get("source_ip")
-                )
-            ),
-            total_targets=len(
-                set(
-                    str(e.get("destination_ip"))
-                    if isinstance(e.get("destination_ip"), list | dict)
-                    else e.get("destination_ip")
-                    for e in dshield_attacks
-                    if e.get("destination_ip")
-                )
-            ),
-            countries_attacking=len(
-                set(
-                    str(e.get("country"))
-                    if isinstance(e.get("country"), list | dict)
-                    else e.get("country")
-                    for e in events
-                    if e.get("country")
-                )
-            ),
-            ports_targeted=len(
-                set(
-                    str(e.get("destination_port"))
-                    if isinstance(e.get("destination_port"), list | dict)
-                    else e.get("destination_port")
-                    for e in events
-                    if e.get("destination_port")
-                )
-            ),
-            protocols_used=len(
-                set(
-                    str(e.get("protocol"))
-                    if isinstance(e.get("protocol"), list | dict)
-                    else e.get("protocol")
-                    for e in events
-                    if e.get("protocol")
-                )
-            ),
-            asns_attacking=len(
-                set(
-                    str(e.get("asn")) if isinstance(e.get("asn"), list | dict) else e.get("asn")
-                    for e in events
-                    if e.get("asn")
-                )
-            ),
-            organizations_attacking=len(
-                set(
-                    str(e.get("organization"))
-                    if isinstance(e.get("organization"), list | dict)
-                    else e.get("organization")
-                    for e in events
-                    if e.get("organization")
-                )
-            ),
-            high_reputation_ips=len([e for e in events if e.get("reputation_score", 0) > 80]),
-            top_countries=self._get_top_countries(events),
-            top_ports=self._get_top_ports(events),
-            top_protocols=self._get_top_protocols(events),
-            top_asns=self._get_top_asns(events),
-            top_organizations=self._get_top_organizations(events),
-            average_reputation_score=self._calculate_average_reputation(events),
-            indices_queried=list(set(str(index) for e in events for index in e.get("indices", []))),
+            total_attacks=int(np.count_nonzero(attacks)),
+            unique_attackers=batch.source_ip.nunique(attacks),
+            total_targets=batch.destination_ip.nunique(attacks),
+            countries_attacking=batch.country.nunique(),
+            ports_targeted=batch.destination_port.nunique(),
+            protocols_used=batch.protocol.nunique(),
+            asns_attacking=batch.asn.nunique(),
+            organizations_attacking=batch.organization.nunique(),
+            high_reputation_ips=int(np.count_nonzero(reputation_scores > 80)),
+            top_countries=self._get_top_countries(batch),
+            top_ports=self._get_top_ports(batch),
+            top_protocols=self._get_top_protocols(batch),
+            top_asns=self._get_top_asns(batch),
+            top_organizations=self._get_top_organizations(batch),
+            average_reputation_score=self._calculate_average_reputation(batch),
+            indices_queried=list(batch.indices),
             query_duration_ms=None,  # TODO: Calculate actual query duration
         )
 
         return stats
 
-    def generate_security_summary(self, events: list[dict[str, Any]]) -> dict[str, Any]:
-        """Generate security summary statistics with DShield enrichment."""
-        if not events:
-            return self._create_empty_summary()
-
-        summary: dict[str, Any] = {
-            "timestamp": datetime.now(UTC).isoformat(),
-            "time_range_hours": 24,  # Default, should be configurable
-            "total_events": len(events),
-            "events_by_severity": {},
-            "events_by_category": {},
-            "unique_source_ips": 0,
-            "unique_destination_ips": 0,
-            "top_source_ips": [],
-            "top_destination_ips": [],
-            "high_risk_events": 0,
-            "threat_intelligence_hits": 0,
-            "attack_patterns": {},
-            "timeline": {},
-            "indices_queried": [],
-            # DShield-specific statistics
-            "dshield_attacks": 0,
-            "dshield_blocks": 0,
-            "dshield_reputation_hits": 0,
-            "top_attackers": [],
-            "geographic_distribution": {},
-            "port_distribution": {},
-            "asn_distribution": {},
-            "organization_distribution": {},
-            "reputation_distribution": {},
-        }
+    def create_security_summary_engine(self) -> SummaryEngine:
+        """Create an empty engine computing the security summary statistics.
 
-        # Extract unique IPs
-        source_ips = set()
-        destination_ips = set()
-        ip_event_counts: Counter[str] = Counter()
+        Every statistic of ``generate_security_summary`` is registered as a
+        mergeable accumulator, so engines built over separate chunks of events
+        can be combined with ``SummaryEngine.merge``.
 
-        # Process events
-        for event in events:
-            # Count by severity
-            severity = event.get("severity", "medium")
-            # Ensure severity is hashable
-            if isinstance(severity, list | dict):
-                severity = str(severity)
-            summary["events_by_severity"][severity] = (
-                summary["events_by_severity"].get(severity, 0) + 1
-            )
+        Returns:
+            SummaryEngine with the security summary statistics registered
 
-            # Count by category
-            category = event.get("category", "other")
-            # Ensure category is hashable
-            if isinstance(category, list | dict):
-                category = str(category)
-            summary["events_by_category"][category] = (
-                summary["events_by_category"].get(category, 0) + 1
-            )
+        """
+        return SummaryEngine(
+            {
+                "total_events": RowCount(),
+                "events_by_severity": ValueCounts("severity"),
+                "events_by_category": ValueCounts("category"),
+                "event_types": ValueCounts("event_type"),
+                "unique_source_ips": DistinctCount("source_ip"),
+                "unique_destination_ips": DistinctCount("destination_ip"),
+                "top_source_ips": TopValues("source_ip", 10),
+                "high_risk_events": MatchCount("severity", ("high", "critical")),
+                "attack_patterns": BatchCounts(self._detect_attack_patterns),
+                "timeline": ValueCounts("hour"),
+                "indices_queried": IndexNames(),
+                "geographic_distribution": ValueCounts("country"),
+                "port_distribution": ValueCounts("destination_port"),
+                "asn_distribution": ValueCounts("asn"),
+                "organization_distribution": ValueCounts("organization"),
+                "reputation_distribution": BatchCounts(self._get_reputation_distribution),
+            }
+        )
 
-            # Track IPs - ensure they are hashable
-            source_ip = event.get("source_ip")
-            if source_ip:
-                if isinstance(source_ip, list | dict):
-                    source_ip_str = str(source_ip)
-                else:
-                    source_ip_str = str(source_ip)
-                source_ips.add(source_ip_str)
-                ip_event_counts[source_ip_str] += 1
-
-            destination_ip = event.get("destination_ip")
-            if destination_ip:
-                if isinstance(destination_ip, list | dict):
-                    destination_ip_str = str(destination_ip)
-                else:
-                    destination_ip_str = str(destination_ip)
-                destination_ips.add(destination_ip_str)
-
-            # Count high-risk events
-            if severity in ["high", "critical"]:
-                summary["high_risk_events"] += 1
-
-            # DShield-specific counting
-            if event.get("event_type") == "attack":
-                summary["dshield_attacks"] += 1
-            elif event.get("event_type") == "block":
-                summary["dshield_blocks"] += 1
-            elif event.get("event_type") == "reputation":
-                summary["dshield_reputation_hits"] += 1
-
-            # Track indices
-            if "indices" in event:
-                indices = event["indices"]
-                if isinstance(indices, list):
-                    for index in indices:
-                        if isinstance(index, list | dict):
-                            summary["indices_queried"].append(str(index))
-                        else:
-                            summary["indices_queried"].append(str(index))
-                else:
-                    summary["indices_queried"].append(str(indices))
+    def generate_security_summary(
+        self,
+        events: list[dict[str, Any]] | EventBatch | SummaryEngine,
+        chunk_size: int = 100_000,
+        executor: Executor | None = None,
+    ) -> dict[str, Any]:
+        """Generate security summary statistics with DShield enrichment.
 
-        # Update summary with IP statistics
-        summary["unique_source_ips"] = len(source_ips)
-        summary["unique_destination_ips"] = len(destination_ips)
+        All statistics are accumulated together in a single pass over the
+        events, chunk by chunk. With an ``executor`` the chunks are
+        summarized in parallel and the partial results merged.
 
-        # Get top source IPs
-        summary["top_source_ips"] = [
-            {"ip": ip, "count": count} for ip, count in ip_event_counts.most_common(10)
-        ]
+        Args:
+            events: Parsed events, an EventBatch holding them, or an engine
+                from ``create_security_summary_engine`` that was already
+                updated (e.g. by merging per-chunk engines)
+            chunk_size: Number of events encoded per chunk
+            executor: Optional executor used to summarize chunks in parallel
 
-        # Generate DShield-specific distributions
-        summary["geographic_distribution"] = self._get_geographic_distribution(events)
-        summary["port_distribution"] = self._get_port_distribution(events)
-        summary["asn_distribution"] = self._get_asn_distribution(events)
-        summary["organization_distribution"] = self._get_organization_distribution(events)
-        summary["reputation_distribution"] = self._get_reputation_distribution(events)
+        Returns:
+            Security summary dictionary
 
-        # Generate timeline
-        summary["timeline"] = self._generate_timeline(events)
+        """
+        if isinstance(events, SummaryEngine):
+            engine = events
+        elif isinstance(events, EventBatch):
+            engine = self.create_security_summary_engine()
+            engine.update(events)
+        else:
+            engine = summarize(
+                events, self.create_security_summary_engine, chunk_size, executor
+            )
 
-        # Detect attack patterns
-        summary["attack_patterns"] = self._detect_attack_patterns(events)
+        stats = engine.results()
+        if not stats["total_events"]:
+            return self._create_empty_summary()
 
-        # Remove duplicates from indices
-        summary["indices_queried"] = list(set(summary["indices_queried"]))
+        event_types = stats.pop("event_types")
+        summary: dict[str, Any] = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "time_range_hours": 24,  # Default, should be configurable
+            **stats,
+            "top_source_ips": [
+                {"ip": ip, "count": count} for ip, count in stats["top_source_ips"]
+            ],
+            "top_destination_ips": [],
+            "threat_intelligence_hits": 0,
+            # DShield-specific statistics
+            "dshield_attacks": event_types.get("attack", 0),
+            "dshield_blocks": event_types.get("block", 0),
+            "dshield_reputation_hits": event_types.get("reputation", 0),
+            "top_attackers": [],
+        }
 
         return summary
 
@@ -601,8 +543,11 @@ class DataProcessor:
         # Generate report ID
         report_id = str(uuid.uuid4())
 
+        # Columnar view of the events for the aggregate statistics
+        batch = EventBatch.from_events(events)
+
         # Analyze events
-        self._analyze_events(events)
+        self._analyze_events(batch)
 
         # Extract threat indicators
         threat_indicators = self._extract_threat_indicators(events, threat_intelligence)
@@ -611,14 +556,14 @@ class DataProcessor:
         attack_vectors = self._identify_attack_vectors(events)
 
         # Determine affected systems
-        affected_systems = self._identify_affected_systems(events)
+        affected_systems = self._identify_affected_systems(batch)
 
         # Assess impact
-        impact_assessment = self._assess_impact(events, threat_indicators)
+        impact_assessment = self._assess_impact(batch, threat_indicators)
 
         # Generate recommendations
         recommendations = self._generate_recommendations(
-            events, threat_indicators, impact_assessment
+            batch, threat_indicators, impact_assessment
         )
 
         # Process DShield-specific data
@@ -637,20 +582,12 @@ class DataProcessor:
             "report_id": report_id,
             "timestamp": datetime.now(UTC).isoformat(),
             "title": f"Security Incident Report - {report_id[:8]}",
-            "summary": self._generate_executive_summary(events, threat_indicators),
+            "summary": self._generate_executive_summary(batch, threat_indicators),
             "total_events": len(events),
-            "unique_ips": len(
-                set(
-                    str(e.get("source_ip"))
-                    if isinstance(e.get("source_ip"), list | dict)
-                    else e.get("source_ip")
-                    for e in events
-                    if e.get("source_ip")
-                )
-            ),
+            "unique_ips": batch.source_ip.nunique(),
             "time_range": self._calculate_time_range(events),
             "threat_indicators": threat_indicators,
-            "high_risk_ips": self._identify_high_risk_ips(events, threat_intelligence),
+            "high_risk_ips": self._identify_high_risk_ips(batch, threat_intelligence),
             "attack_vectors": attack_vectors,
             "affected_systems": affected_systems,
             "impact_assessment": impact_assessment,
@@ -763,225 +700,155 @@ class DataProcessor:
 
         return event
 
-    def _detect_attack_patterns(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Detect attack patterns in events."""
-        pattern_counts: Counter[str] = Counter()
+    def _detect_attack_patterns(
+        self, events: list[dict[str, Any]] | EventBatch
+    ) -> dict[str, int]:
+        """Detect attack patterns in events.
 
-        for event in events:
-            # Robustly handle both strings and lists for description and event_type
-            description_raw = event.get("description", "")
-            if isinstance(description_raw, list):
-                description = " ".join(map(str, description_raw)).lower()
-            else:
-                description = str(description_raw).lower()
+        For an EventBatch, each distinct (description, event type) pair is
+        classified once and weighted by how many events share it.
 
-            event_type_raw = event.get("event_type", "")
-            if isinstance(event_type_raw, list):
-                event_type = " ".join(map(str, event_type_raw)).lower()
-            else:
-                event_type = str(event_type_raw).lower()
+        Args:
+            events: Events, or an EventBatch holding them
 
-            for pattern, keywords in self.dshield_attack_patterns.items():
-                if any(keyword in description or keyword in event_type for keyword in keywords):
-                    pattern_counts[pattern] += 1
+        Returns:
+            Dictionary of pattern name to number of matching events
+
+        """
+        pattern_counts: Counter[str] = Counter()
+
+        if isinstance(events, EventBatch):
+            classify = self._get_attack_pattern_matcher().classify
+            for (description, event_type), count in events.pattern_text.value_counts().items():
+                for pattern in classify(str(description).lower(), str(event_type).lower()):
+                    pattern_counts[pattern] += count
+            return dict(pattern_counts)
+
+        for patterns in self.classify_attack_patterns(events):
+            pattern_counts.update(patterns)
 
         return dict(pattern_counts)
 
-    def _get_top_countries(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Get top countries by attack count."""
-        country_counts: Counter[str] = Counter()
-        for event in events:
-            if event.get("country"):
-                country_counts[
-                    str(event["country"])
-                    if isinstance(event["country"], list | dict)
-                    else event["country"]
-                ] += 1
+    def classify_attack_patterns(self, events: list[dict[str, Any]]) -> list[tuple[str, ...]]:
+        """Classify a page of events into attack patterns.
+
+        Each event's description and event type are scanned once by the
+        precompiled keyword automaton.
+
+        Args:
+            events: Event dictionaries
+
+        Returns:
+            Matched pattern names for each event, in input order
+
+        """
+        return self._get_attack_pattern_matcher().classify_many(
+            (
+                self._pattern_text(event.get("description", "")),
+                self._pattern_text(event.get("event_type", "")),
+            )
+            for event in events
+        )
+
+    @staticmethod
+    def _pattern_text(value: Any) -> str:
+        """Lower-case a description or event type, joining list values.
+
+        Args:
+            value: Raw field value
+
+        Returns:
+            Lower-cased text
+
+        """
+        if isinstance(value, list):
+            return " ".join(map(str, value)).lower()
+        return str(value).lower()
+
+    def _get_attack_pattern_matcher(self) -> AttackPatternMatcher:
+        """Return the compiled matcher for ``dshield_attack_patterns``.
+
+        The matcher is rebuilt when ``dshield_attack_patterns`` is replaced.
+
+        Returns:
+            AttackPatternMatcher for the current pattern table
+
+        """
+        matcher = self._attack_pattern_matcher
+        if matcher is None or matcher.patterns is not self.dshield_attack_patterns:
+            matcher = AttackPatternMatcher(self.dshield_attack_patterns)
+            self._attack_pattern_matcher = matcher
+        return matcher
 
+    def _get_top_countries(self, batch: EventBatch) -> list[dict[str, Any]]:
+        """Get top countries by attack count."""
         return [
             {"country": country, "count": count}
-            for country, count in country_counts.most_common(10)
+            for country, count in batch.country.most_common(10)
         ]
 
-    def _get_top_ports(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _get_top_ports(self, batch: EventBatch) -> list[dict[str, Any]]:
         """Get top ports by attack count."""
-        port_counts: Counter[str] = Counter()
-        for event in events:
-            if event.get("destination_port"):
-                port_counts[
-                    str(event["destination_port"])
-                    if isinstance(event["destination_port"], list | dict)
-                    else event["destination_port"]
-                ] += 1
-
-        return [{"port": port, "count": count} for port, count in port_counts.most_common(10)]
+        return [
+            {"port": port, "count": count} for port, count in batch.destination_port.most_common(10)
+        ]
 
-    def _get_top_protocols(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _get_top_protocols(self, batch: EventBatch) -> list[dict[str, Any]]:
         """Get top protocols by attack count."""
-        protocol_counts: Counter[str] = Counter()
-        for event in events:
-            if event.get("protocol"):
-                protocol_counts[
-                    str(event["protocol"])
-                    if isinstance(event["protocol"], list | dict)
-                    else event["protocol"]
-                ] += 1
-
         return [
             {"protocol": protocol, "count": count}
-            for protocol, count in protocol_counts.most_common(10)
+            for protocol, count in batch.protocol.most_common(10)
         ]
 
-    def _get_top_asns(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _get_top_asns(self, batch: EventBatch) -> list[dict[str, Any]]:
         """Get top ASNs by attack count."""
-        asn_counts: Counter[str] = Counter()
-        for event in events:
-            if event.get("asn"):
-                asn_counts[
-                    str(event["asn"]) if isinstance(event["asn"], list | dict) else event["asn"]
-                ] += 1
+        return [{"asn": asn, "count": count} for asn, count in batch.asn.most_common(10)]
 
-        return [{"asn": asn, "count": count} for asn, count in asn_counts.most_common(10)]
-
-    def _get_top_organizations(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _get_top_organizations(self, batch: EventBatch) -> list[dict[str, Any]]:
         """Get top organizations by attack count."""
-        org_counts: Counter[str] = Counter()
-        for event in events:
-            if event.get("organization"):
-                org_counts[
-                    str(event["organization"])
-                    if isinstance(event["organization"], list | dict)
-                    else event["organization"]
-                ] += 1
-
-        return [{"organization": org, "count": count} for org, count in org_counts.most_common(10)]
+        return [
+            {"organization": org, "count": count}
+            for org, count in batch.organization.most_common(10)
+        ]
 
-    def _calculate_average_reputation(self, events: list[dict[str, Any]]) -> float | None:
+    def _calculate_average_reputation(self, batch: EventBatch) -> float | None:
         """Calculate average reputation score."""
-        scores = [
-            float(e.get("reputation_score", 0))
-            for e in events
-            if e.get("reputation_score") is not None
-        ]
-        return sum(scores) / len(scores) if scores else None
+        scores = batch.reputation_score.values
+        scores = scores[~np.isnan(scores)]
+        return float(scores.mean()) if scores.size else None
 
-    def _get_geographic_distribution(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Get geographic distribution of attacks."""
-        distribution: Counter[str] = Counter()
-        for event in events:
-            if event.get("country"):
-                distribution[
-                    str(event["country"])
-                    if isinstance(event["country"], list | dict)
-                    else event["country"]
-                ] += 1
-        return dict(distribution)
-
-    def _get_port_distribution(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Get port distribution of attacks."""
-        distribution: Counter[str] = Counter()
-        for event in events:
-            if event.get("destination_port"):
-                distribution[
-                    str(event["destination_port"])
-                    if isinstance(event["destination_port"], list | dict)
-                    else event["destination_port"]
-                ] += 1
-        return dict(distribution)
-
-    def _get_asn_distribution(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Get ASN distribution of attacks."""
-        distribution: Counter[str] = Counter()
-        for event in events:
-            if event.get("asn"):
-                distribution[
-                    str(event["asn"]) if isinstance(event["asn"], list | dict) else event["asn"]
-                ] += 1
-        return dict(distribution)
-
-    def _get_organization_distribution(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Get organization distribution of attacks."""
-        distribution: Counter[str] = Counter()
-        for event in events:
-            if event.get("organization"):
-                distribution[
-                    str(event["organization"])
-                    if isinstance(event["organization"], list | dict)
-                    else event["organization"]
-                ] += 1
-        return dict(distribution)
-
-    def _get_reputation_distribution(self, events: list[dict[str, Any]]) -> dict[str, int]:
+    def _get_reputation_distribution(self, batch: EventBatch) -> dict[str, int]:
         """Get reputation score distribution."""
-        distribution: Counter[str] = Counter()
-        for event in events:
-            score = event.get("reputation_score")
-            if score is not None:
-                if score >= 80:
-                    distribution["high"] += 1
-                elif score >= 50:
-                    distribution["medium"] += 1
-                else:
-                    distribution["low"] += 1
-        return dict(distribution)
-
-    def _generate_timeline(self, events: list[dict[str, Any]]) -> dict[str, int]:
-        """Generate timeline of events."""
-        timeline: Counter[str] = Counter()
-        for event in events:
-            timestamp = event.get("timestamp")
-            if timestamp:
-                try:
-                    if isinstance(timestamp, str):
-                        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                    else:
-                        dt = timestamp
-                    hour = dt.strftime("%Y-%m-%d %H:00")
-                    timeline[hour] += 1
-                except Exception:
-                    continue
-        return dict(timeline)
+        scores = batch.reputation_score.values
+        scores = scores[~np.isnan(scores)]
+        buckets = {
+            "high": int(np.count_nonzero(scores >= 80)),
+            "medium": int(np.count_nonzero((scores >= 50) & (scores < 80))),
+            "low": int(np.count_nonzero(scores < 50)),
+        }
+        return {bucket: count for bucket, count in buckets.items() if count}
 
-    def _analyze_events(self, events: list[dict[str, Any]]) -> dict[str, Any]:
+    def _analyze_events(self, batch: EventBatch) -> dict[str, Any]:
         """Analyze events for patterns and insights."""
-        # Filter out unhashable values for Counter
-        severity_values = []
-        category_values = []
-
-        for event in events:
-            severity = event.get("severity")
-            category = event.get("category")
-
-            # Convert to string if it's not hashable
-            if severity is not None:
-                if isinstance(severity, list | dict):
-                    severity_values.append(str(severity))
-                else:
-                    severity_values.append(severity)
+        engine = SummaryEngine(
+            {
+                "total_events": RowCount(),
+                "unique_ips": DistinctCount("source_ip"),
+                "attack_patterns": BatchCounts(self._detect_attack_patterns),
+                "severity_distribution": ValueCounts("severity"),
+                "category_distribution": ValueCounts("category"),
+            }
+        )
+        engine.update(batch)
+        analysis = engine.results()
 
-            if category is not None:
-                if isinstance(category, list | dict):
-                    category_values.append(str(category))
-                else:
-                    category_values.append(category)
+        # Events without a severity or category are not distributed
+        for key in ("severity_distribution", "category_distribution"):
+            distribution = analysis[key]
+            distribution.pop(None, None)
+            analysis[key] = Counter(distribution)
 
-        # Extract unique IPs safely
-        unique_ips = set()
-        for event in events:
-            source_ip = event.get("source_ip")
-            if source_ip:
-                if isinstance(source_ip, list | dict):
-                    unique_ips.add(str(source_ip))
-                else:
-                    unique_ips.add(str(source_ip))
-
-        return {
-            "total_events": len(events),
-            "unique_ips": len(unique_ips),
-            "attack_patterns": self._detect_attack_patterns(events),
-            "severity_distribution": Counter(severity_values),
-            "category_distribution": Counter(category_values),
-        }
+        return analysis
 
     def _extract_threat_indicators(
         self, events: list[dict[str, Any]], threat_intelligence: dict[str, Any]
@@ -1053,25 +920,15 @@ class DataProcessor:
 
         return list(vectors)
 
-    def _identify_affected_systems(self, events: list[dict[str, Any]]) -> list[str]:
+    def _identify_affected_systems(self, batch: EventBatch) -> list[str]:
         """Identify affected systems from events."""
-        systems = set()
-
-        for event in events:
-            if event.get("destination_ip"):
-                systems.add(
-                    str(event["destination_ip"])
-                    if isinstance(event["destination_ip"], list | dict)
-                    else event["destination_ip"]
-                )
-
-        return list(systems)
+        return batch.destination_ip.unique()
 
     def _assess_impact(
-        self, events: list[dict[str, Any]], threat_indicators: list[dict[str, Any]]
+        self, batch: EventBatch, threat_indicators: list[dict[str, Any]]
     ) -> str:
         """Assess the impact of the security incident."""
-        high_severity_count = len([e for e in events if e.get("severity") in ["high", "critical"]])
+        high_severity_count = int(np.count_nonzero(batch.severity.mask("high", "critical")))
         high_reputation_count = len(
             [i for i in threat_indicators if i.get("type") == "high_reputation_score"]
         )
@@ -1083,7 +940,7 @@ class DataProcessor:
         return "Low - Limited high-severity events detected"
 
     def _generate_recommendations(
-        self, events: list[dict[str, Any]], threat_indicators: list[dict[str, Any]], impact: str
+        self, batch: EventBatch, threat_indicators: list[dict[str, Any]], impact: str
     ) -> list[str]:
         """Generate security recommendations."""
         recommendations = []
@@ -1094,10 +951,10 @@ class DataProcessor:
         recommendations.append("Enable logging and monitoring for all critical systems")
 
         # DShield-specific recommendations
-        if any(e.get("reputation_score", 0) > 80 for e in events):
+        if np.any(batch.reputation_score.values > 80):
             recommendations.append("Block IP addresses with high DShield reputation scores")
 
-        if any(e.get("attack_count", 0) > 10 for e in events):
+        if np.any(batch.attack_count.values > 10):
             recommendations.append(
                 "Implement additional monitoring for IPs with high attack counts"
             )
@@ -1155,22 +1012,12 @@ class DataProcessor:
         return list(tags)
 
     def _generate_executive_summary(
-        self, events: list[dict[str, Any]], threat_indicators: list[dict[str, Any]]
+        self, batch: EventBatch, threat_indicators: list[dict[str, Any]]
     ) -> str:
         """Generate executive summary of the security incident."""
-        total_events = len(events)
-
-        # Extract unique IPs safely
-        unique_ips = set()
-        for event in events:
-            source_ip = event.get("source_ip")
-            if source_ip:
-                if isinstance(source_ip, list | dict):
-                    unique_ips.add(str(source_ip))
-                else:
-                    unique_ips.add(str(source_ip))
-
-        high_severity = len([e for e in events if e.get("severity") in ["high", "critical"]])
+        total_events = len(batch)
+        unique_ips = batch.source_ip.unique()
+        high_severity = int(np.count_nonzero(batch.severity.mask("high", "critical")))
 
         summary = (
             f"Security incident involving {total_events} events from "
@@ -1187,23 +1034,11 @@ class DataProcessor:
         return summary
 
     def _identify_high_risk_ips(
-        self, events: list[dict[str, Any]], threat_intelligence: dict[str, Any]
+        self, batch: EventBatch, threat_intelligence: dict[str, Any]
     ) -> list[str]:
         """Identify high-risk IP addresses."""
-        high_risk_ips = set()
-
-        for event in events:
-            source_ip = event.get("source_ip")
-            if source_ip:
-                if isinstance(source_ip, list | dict):
-                    source_ip_str = str(source_ip)
-                else:
-                    source_ip_str = str(source_ip)
-
-                if event.get("reputation_score", 0) > 80 or event.get("attack_count", 0) > 10:
-                    high_risk_ips.add(source_ip_str)
-
-        return list(high_risk_ips)
+        high_risk = (batch.reputation_score.values > 80) | (batch.attack_count.values > 10)
+        return batch.source_ip.unique(high_risk)
 
     def _create_empty_summary(self) -> dict[str, Any]:
         """Create empty security summary."""
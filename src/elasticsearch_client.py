@@ -3,7 +3,13 @@
 Optimized for DShield SIEM integration patterns.
 """
 
+import asyncio
+import base64
+import heapq
 import inspect
+import json
+import time
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from urllib.parse import urlparse
@@ -14,16 +20,160 @@ from elasticsearch import AsyncElasticsearch
 from elasticsearch.exceptions import RequestError, TransportError
 from packaging import version
 
+from . import json_codec
 from .config_loader import get_config
+from .event_batch import EventBatch
+from .field_extraction import FieldPlanCache
+from .field_resolver import FieldResolver
+from .index_catalog import IndexCatalog
 from .mcp_error_handler import CircuitBreaker, MCPErrorHandler
+from .query_cache import (
+    QueryResultCache,
+    canonical_query_key,
+    drop_absolute_time_bounds,
+    has_relative_range,
+    normalize_filters,
+    snap_time_bounds,
+    time_bucket,
+)
+from .query_size_estimator import QuerySizeEstimator, SizeEstimate
+from .request_coalescing import RequestCoalescer
+from .sessionization import (
+    NO_SESSION_KEY,
+    Session,
+    Sessionizer,
+    decode_session_cursor,
+    encode_session_cursor,
+    session_key,
+)
 from .user_config import get_user_config
 
 logger = structlog.get_logger(__name__)
 
+try:
+    from elasticsearch.serializer import OrjsonSerializer
+except ImportError:  # elasticsearch < 8.12
+    OrjsonSerializer = None
+
+# Supported shapes for parsed events (see _parse_dshield_event)
+EVENT_PROJECTIONS = ("full", "lean")
+
+# Number of events serialized per page when measuring projection sizes
+PROJECTION_METRICS_SAMPLE = 50
+
+# Pages are measured one in this many times unless a caller asks for metrics
+PROJECTION_METRICS_INTERVAL = 10
+
+# Per-attacker metrics computed under source IP buckets
+ATTACKER_SUB_AGGREGATIONS = {
+    "first_seen": {"min": {"field": "@timestamp"}},
+    "last_seen": {"max": {"field": "@timestamp"}},
+    "unique_ports": {"cardinality": {"field": "destination.port"}},
+}
+
+# Indices per get_mapping request when loading the field resolver
+MAPPING_BATCH_SIZE = 50
+
+# User-friendly query field names and the ECS fields they stand for
+QUERY_FIELD_ALIASES = {
+    # IP address fields
+    "source_ip": "source.ip",
+    "src_ip": "source.ip",
+    "sourceip": "source.ip",
+    "destination_ip": "destination.ip",
+    "dest_ip": "destination.ip",
+    "destinationip": "destination.ip",
+    "target_ip": "destination.ip",
+    # Port fields
+    "source_port": "source.port",
+    "src_port": "source.port",
+    "destination_port": "destination.port",
+    "dest_port": "destination.port",
+    "target_port": "destination.port",
+    # Event fields
+    "event_type": "event.type",
+    "eventtype": "event.type",
+    "event_category": "event.category",
+    "eventcategory": "event.category",
+    "event_kind": "event.kind",
+    "eventkind": "event.kind",
+    "event_outcome": "event.outcome",
+    "eventoutcome": "event.outcome",
+    # Network fields
+    "protocol": "network.protocol",
+    "network_protocol": "network.protocol",
+    "network_type": "network.type",
+    "networktype": "network.type",
+    "network_direction": "network.direction",
+    "networkdirection": "network.direction",
+    # HTTP fields
+    "http_method": "http.request.method",
+    "httpmethod": "http.request.method",
+    "http_status": "http.response.status_code",
+    "httpstatus": "http.response.status_code",
+    "http_version": "http.version",
+    "httpversion": "http.version",
+    # URL fields
+    "url": "url.original",
+    "url_original": "url.original",
+    "url_path": "url.path",
+    "urlpath": "url.path",
+    "url_query": "url.query",
+    "urlquery": "url.query",
+    # User agent fields
+    "user_agent": "user_agent.original",
+    "useragent": "user_agent.original",
+    "ua": "user_agent.original",
+    # Geographic fields
+    "source_country": "source.geo.country_name",
+    "sourcecountry": "source.geo.country_name",
+    "dest_country": "destination.geo.country_name",
+    "destcountry": "destination.geo.country_name",
+    "country": "source.geo.country_name",  # Default to source
+    # Timestamp fields
+    "timestamp": "@timestamp",
+    "time": "@timestamp",
+    "date": "@timestamp",
+    # Severity and description (common user expectations)
+    "severity": "event.severity",
+    "description": "event.description",
+    "message": "log.message",
+    "log_message": "log.message",
+}
+
 
 class ElasticsearchClient:
     """Client for interacting with DShield SIEM Elasticsearch."""
 
+    # Circuit breaker protecting Elasticsearch, set up by __init__
+    circuit_breaker: CircuitBreaker | None = None
+
+    # Query result caches, created by __init__ when caching is enabled
+    events_cache: QueryResultCache | None = None
+    aggregation_cache: QueryResultCache | None = None
+    query_cache_time_bucket_seconds = 60
+
+    # Default of include_performance_metrics, from the pagination settings
+    include_performance_metrics = True
+
+    # Index catalog used by get_available_indices, created by __init__
+    index_catalog: IndexCatalog | None = None
+    _catalog_refresh_task: asyncio.Task | None = None
+
+    # Field tables compiled from index mappings, filled by catalog refreshes
+    field_resolver: FieldResolver | None = None
+    _field_plan_cache: FieldPlanCache | None = None
+    _resolved_plan_cache: FieldPlanCache | None = None
+
+    # Result size statistics used by _estimate_query_size, created on first use
+    size_estimator: QuerySizeEstimator | None = None
+
+    # Shares identical concurrent searches, created by __init__
+    request_coalescer: RequestCoalescer | None = None
+
+    # Pages served since creation, used to sample projection metrics
+    _projection_pages = 0
+
     def __init__(self, error_handler: MCPErrorHandler | None = None):
         """Initialize the Elasticsearch client.
 
@@ -101,10 +251,19 @@ class ElasticsearchClient:
         )
         self.fallback_strategy = user_config.get_setting("query", "fallback_strategy")
         self.max_query_complexity = user_config.get_setting("query", "max_query_complexity")
+        self.cursor_timeout_seconds = user_config.get_setting(
+            "pagination", "cursor_timeout_seconds"
+        )
+        self.include_performance_metrics = bool(
+            user_config.get_setting("pagination", "include_performance_metrics")
+        )
         self.enable_performance_logging = user_config.get_setting(
             "logging", "enable_performance_logging"
         )
 
+        # Normalized result caches for event pages and aggregations
+        self._init_query_caches(user_config)
+
         # Index patterns
         patterns = es_config.get("index_patterns", {})
         self.dshield_indices = []
@@ -256,6 +415,98 @@ class ElasticsearchClient:
             "http_version": ["http.version", "http_version", "version"],
         }
 
+        # Compiled per-shape extraction plans for _parse_dshield_event. Rebuilt
+        # lazily whenever dshield_field_mappings is replaced.
+        self.use_compiled_field_plans = True
+        self._field_plan_cache = None
+        self._resolved_plan_cache = None
+
+        # Upper bound on concurrent slices for iter_dshield_events_sliced
+        self.max_slices = 8
+
+        # Discovered indices and their time ranges, refreshed in the background
+        # once older than the refresh interval
+        self.index_catalog = IndexCatalog(refresh_interval_seconds=300.0)
+
+        # Logical-to-physical field tables, compiled from the mappings of the
+        # catalogued indices
+        self.field_resolver = FieldResolver()
+
+        # Rolling result size statistics for smart query optimization
+        self.size_estimator = QuerySizeEstimator()
+
+        # Identical searches issued concurrently share one request
+        self.request_coalescer = RequestCoalescer()
+
+    def _init_query_caches(self, user_config: Any) -> None:
+        """Create the query result caches from the performance settings.
+
+        Caching stays disabled when ``enable_caching`` is off or the cache
+        settings cannot be read.
+
+        Args:
+            user_config: User configuration providing the performance settings
+
+        """
+        try:
+            enabled = user_config.get_setting("performance", "enable_caching")
+            ttl_seconds = float(user_config.get_setting("performance", "cache_ttl_seconds"))
+            max_bytes = int(user_config.get_setting("performance", "query_cache_max_mb")) << 20
+            bucket_seconds = int(
+                user_config.get_setting("performance", "query_cache_time_bucket_seconds")
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Query result cache disabled: invalid settings", error=str(e))
+            return
+
+        if enabled is not True:
+            return
+        self.query_cache_time_bucket_seconds = bucket_seconds
+        self.events_cache = QueryResultCache("events", max_bytes, ttl_seconds)
+        self.aggregation_cache = QueryResultCache("aggregations", max_bytes, ttl_seconds)
+
+    async def _coalesced_search(self, **kwargs: Any) -> Any:
+        """Run a search, sharing it with identical searches already in flight.
+
+        Args:
+            **kwargs: Arguments for ``AsyncElasticsearch.search``
+
+        Returns:
+            The search response, shared read-only between coalesced callers
+
+        """
+        if self.request_coalescer is None:
+            return await self.client.search(**kwargs)
+        key = canonical_query_key("search", kwargs)
+        return await self.request_coalescer.run(key, lambda: self.client.search(**kwargs))
+
+    def get_request_coalescing_stats(self) -> dict[str, Any]:
+        """Get the number of searches sent and of callers that shared one.
+
+        Returns:
+            Coalescing counters, including ``coalesced_waiters``
+
+        """
+        if self.request_coalescer is None:
+            return {"requests": 0, "coalesced_waiters": 0, "in_flight": 0}
+        return self.request_coalescer.get_stats()
+
+    def get_query_cache_stats(self) -> dict[str, Any]:
+        """Get hit/miss counters and sizes of the query result caches.
+
+        Returns:
+            Statistics per cache, None for a disabled cache
+
+        """
+        return {
+            "enabled": self.events_cache is not None,
+            "time_bucket_seconds": self.query_cache_time_bucket_seconds,
+            "events": self.events_cache.get_stats() if self.events_cache else None,
+            "aggregations": (
+                self.aggregation_cache.get_stats() if self.aggregation_cache else None
+            ),
+        }
+
     def _check_circuit_breaker(self, operation: str) -> bool:
         """Check if circuit breaker allows the operation.
 
@@ -380,6 +631,10 @@ class ElasticsearchClient:
                 **ssl_options,
             )
 
+            # Use the orjson fast path for request and response bodies when available
+            if json_codec.HAS_ORJSON and OrjsonSerializer is not None:
+                es_kwargs["serializers"] = {"application/json": OrjsonSerializer()}
+
             # Only add compatibility_mode if the client supports it (>=8.7.0)
             # and the argument exists
             try:
@@ -447,6 +702,9 @@ class ElasticsearchClient:
                 logger.error("Failed to get Elasticsearch info", error=str(e))
                 raise
 
+            # Load the index catalog and field mappings off the query path
+            self._schedule_index_catalog_refresh()
+
         except Exception as e:
             logger.error(
                 "Failed to connect to Elasticsearch", error=str(e), error_type=type(e).__name__
@@ -460,12 +718,138 @@ class ElasticsearchClient:
 
     async def close(self):
         """Close Elasticsearch connection."""
+        if self._catalog_refresh_task and not self._catalog_refresh_task.done():
+            self._catalog_refresh_task.cancel()
         if self.client:
             await self.client.close()
             logger.info("Elasticsearch connection closed")
 
     async def get_available_indices(self) -> list[str]:
-        """Get available DShield indices."""
+        """Get available DShield indices.
+
+        Served from the index catalog. The catalog is filled on first use;
+        once stale, the cached names are returned while a refresh runs in
+        the background.
+        """
+        catalog = self.index_catalog
+        if catalog is None:
+            return await self._discover_indices()
+        if not catalog.indices:
+            return await self.refresh_index_catalog()
+        if catalog.is_stale():
+            self._schedule_index_catalog_refresh()
+        return list(catalog.indices)
+
+    async def refresh_index_catalog(self) -> list[str]:
+        """Rediscover DShield indices and the time range each one covers.
+
+        The time ranges come from index names and from one min/max
+        ``@timestamp`` aggregation over all discovered indices. The catalog
+        is left unchanged if no index is found. Mappings of new indices are
+        loaded into the field resolver.
+
+        Returns:
+            Discovered index names
+
+        """
+        names = await self._discover_indices()
+        if names and self.index_catalog is not None:
+            bounds = await self._get_index_timestamp_bounds(names)
+            self.index_catalog.update(names, bounds)
+            logger.debug("Index catalog refreshed", indices=len(names), with_bounds=len(bounds))
+            await self._seed_size_estimator(names)
+            await self.refresh_field_resolver(names)
+        return names
+
+    async def refresh_field_resolver(self, indices: list[str]) -> int:
+        """Load the mappings of new indices and recompile the field tables.
+
+        Mappings are read once per index; indices that disappeared are
+        dropped. Failures leave the previous tables in place.
+
+        Args:
+            indices: Current DShield index names
+
+        Returns:
+            Number of index mappings loaded
+
+        """
+        resolver = self.field_resolver
+        if resolver is None or not indices:
+            return 0
+        current = set(indices)
+        resolver.forget([index for index in resolver.indices if index not in current])
+        new = [index for index in indices if not resolver.covers(index)]
+        loaded = 0
+        for start in range(0, len(new), MAPPING_BATCH_SIZE):
+            batch = new[start : start + MAPPING_BATCH_SIZE]
+            try:
+                mapping = await self.get_index_mapping(",".join(batch))
+            except Exception as e:
+                logger.warning("Could not load index mappings", indices=len(batch), error=str(e))
+                break
+            loaded += resolver.update(getattr(mapping, "body", mapping))
+        self._compiled_field_resolver()
+        return loaded
+
+    def _compiled_field_resolver(self) -> FieldResolver | None:
+        """Get the field resolver, compiled for the current field mappings.
+
+        Returns:
+            The resolver, or None until an index mapping has been loaded
+
+        """
+        resolver = self.field_resolver
+        if resolver is None or not resolver.indices:
+            return None
+        if resolver.compiled_for is not self.dshield_field_mappings:
+            resolver.compile(self.dshield_field_mappings, QUERY_FIELD_ALIASES)
+        return resolver
+
+    def get_field_resolver_stats(self) -> dict[str, Any]:
+        """Get the number of index mappings and fields the resolver knows.
+
+        Returns:
+            Field resolver statistics
+
+        """
+        if self.field_resolver is None:
+            return {"indices": 0, "mapped_fields": 0, "compilations": 0, "ready": False}
+        return self.field_resolver.get_stats()
+
+    async def _seed_size_estimator(self, indices: list[str]) -> None:
+        """Load stored bytes per document from index ``_stats`` into the estimator.
+
+        Runs with catalog refreshes, off the query path. Failures only leave
+        the estimator without a prior for the indices.
+
+        Args:
+            indices: Index names to read statistics for
+
+        """
+        try:
+            stats = await self.client.indices.stats(index=",".join(indices), metric="docs,store")
+            seeded = self._get_size_estimator().seed_from_index_stats(
+                getattr(stats, "body", stats)
+            )
+            logger.debug("Seeded query size estimator from index stats", indices=seeded)
+        except Exception as e:
+            logger.warning("Could not read index stats for size estimation", error=str(e))
+
+    def _schedule_index_catalog_refresh(self) -> None:
+        """Start a background catalog refresh unless one is running."""
+        if self._catalog_refresh_task and not self._catalog_refresh_task.done():
+            return
+
+        def log_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Index catalog refresh failed", error=str(task.exception()))
+
+        self._catalog_refresh_task = asyncio.create_task(self.refresh_index_catalog())
+        self._catalog_refresh_task.add_done_callback(log_failure)
+
+    async def _discover_indices(self) -> list[str]:
+        """List the DShield indices present in the cluster."""
         if not self.client:
             await self.connect()
 
@@ -494,6 +878,80 @@ class ElasticsearchClient:
             # Fallback to raising exception if no error handler
             raise
 
+    async def _get_index_timestamp_bounds(
+        self, indices: list[str]
+    ) -> dict[str, tuple[datetime | None, datetime | None]]:
+        """Get the oldest and newest ``@timestamp`` of each index.
+
+        Args:
+            indices: Index names
+
+        Returns:
+            (min, max) timestamps per index; empty if the request fails
+
+        """
+        body = {
+            "size": 0,
+            "aggs": {
+                "indices": {
+                    "terms": {"field": "_index", "size": len(indices)},
+                    "aggs": {
+                        "min_timestamp": {"min": {"field": "@timestamp"}},
+                        "max_timestamp": {"max": {"field": "@timestamp"}},
+                    },
+                },
+            },
+        }
+        try:
+            response = await self.client.search(index=",".join(indices), body=body)
+        except Exception as e:
+            logger.warning("Failed to get index time ranges", error=str(e))
+            return {}
+
+        def to_datetime(aggregation: dict[str, Any]) -> datetime | None:
+            value = aggregation.get("value")
+            return datetime.fromtimestamp(value / 1000, UTC) if value is not None else None
+
+        buckets = response.get("aggregations", {}).get("indices", {}).get("buckets", [])
+        return {
+            bucket["key"]: (
+                to_datetime(bucket.get("min_timestamp", {})),
+                to_datetime(bucket.get("max_timestamp", {})),
+            )
+            for bucket in buckets
+        }
+
+    async def _get_indices_for_time_range(self, time_range_hours: int) -> list[str]:
+        """Get the DShield indices that may hold events from the last N hours.
+
+        Args:
+            time_range_hours: Time range in hours ending now
+
+        Returns:
+            Overlapping indices; all indices if none overlap, and the fallback
+            indices if none were discovered
+
+        """
+        indices = self._prune_indices(await self.get_available_indices(), time_range_hours)
+        return indices or self.fallback_indices
+
+    def _prune_indices(self, indices: list[str], time_range_hours: int) -> list[str]:
+        """Drop the indices that hold no events from the last N hours.
+
+        Args:
+            indices: Candidate index names
+            time_range_hours: Time range in hours ending now
+
+        Returns:
+            Overlapping indices, or all candidates if none overlap
+
+        """
+        if not indices or self.index_catalog is None:
+            return indices
+        now = datetime.now(UTC)
+        pruned = self.index_catalog.prune(indices, now - timedelta(hours=time_range_hours), now)
+        return pruned or indices
+
     async def query_dshield_events(
         self,
         time_range_hours: int = 24,
@@ -510,12 +968,75 @@ class ElasticsearchClient:
         fallback_strategy: str = "aggregate",
         max_result_size_mb: float = 10.0,
         query_timeout_seconds: int = 30,
+        use_pit: bool = False,
+        projection: str = "full",
+        include_performance_metrics: bool | None = None,
     ) -> tuple[list[dict[str, Any]], int, dict[str, Any]]:
         """Query DShield events from Elasticsearch with enhanced pagination support.
 
         Supports both traditional page-based pagination and cursor-based pagination
         for better performance with massive datasets.
+
+        With ``use_pit=True`` (or when ``cursor`` is a token returned by a previous
+        point-in-time query) pages are read from an Elasticsearch point-in-time
+        with ``search_after`` on ``sort_by`` plus a ``_shard_doc`` tiebreaker.
+        Cost per page stays constant at any depth, results are not bounded by
+        ``index.max_result_window`` and stay consistent while new events are
+        indexed. The returned ``next_page_token`` is opaque and must be passed
+        back unchanged as ``cursor``.
+
+        With ``projection="lean"`` events carry the hit's own ``index`` instead
+        of ``raw_data`` and the full ``indices`` list, and ``_source`` is
+        filtered server-side to the fields the parser can map. Serialized bytes
+        per event are reported under ``performance_metrics`` in the
+        pagination information when ``include_performance_metrics`` is set
+        (by default the ``pagination.include_performance_metrics`` setting).
+        Otherwise pages are still measured on one page in
+        ``PROJECTION_METRICS_INTERVAL`` to keep the result size estimator
+        calibrated, without reporting the measurement.
         """
+        if projection not in EVENT_PROJECTIONS:
+            raise ValueError(
+                f"Invalid projection '{projection}'. Must be one of {list(EVENT_PROJECTIONS)}"
+            )
+
+        pit_state = self._decode_pit_cursor(cursor) if cursor else None
+        if include_performance_metrics is None:
+            include_performance_metrics = self.include_performance_metrics
+
+        # Serve repeated views from the normalized result cache (point-in-time
+        # pages are tied to a short-lived search context and are not cached)
+        cache_key = None
+        if self.events_cache is not None and not use_pit and pit_state is None:
+            cache_key = canonical_query_key(
+                "events",
+                {
+                    "time_range_hours": time_range_hours,
+                    "time_bucket": time_bucket(self.query_cache_time_bucket_seconds),
+                    "indices": sorted(indices) if indices is not None else None,
+                    "filters": normalize_filters(
+                        snap_time_bounds(
+                            self._map_query_fields(filters or {}),
+                            self.query_cache_time_bucket_seconds,
+                        )
+                    ),
+                    "fields": sorted(fields) if fields else None,
+                    "page": page,
+                    "page_size": page_size,
+                    "sort": [sort_by, sort_order],
+                    "cursor": cursor,
+                    "include_summary": include_summary,
+                    "optimization": [optimization, fallback_strategy, max_result_size_mb],
+                    "projection": projection,
+                    "include_performance_metrics": include_performance_metrics,
+                },
+            )
+            cached = self.events_cache.get(cache_key)
+            if cached is not None:
+                events, total_count, pagination_info = cached
+                logger.debug("Query result cache hit", events=len(events))
+                return events, total_count, pagination_info
+
         # Check circuit breaker before proceeding
         circuit_breaker_result = self._check_circuit_breaker("query_dshield_events")
         if isinstance(circuit_breaker_result, dict):  # Error response
@@ -524,13 +1045,23 @@ class ElasticsearchClient:
         if not self.client:
             await self.connect()
 
+        if use_pit or pit_state is not None:
+            return await self._query_dshield_events_pit(
+                time_range_hours=time_range_hours,
+                indices=indices,
+                filters=filters,
+                page_size=page_size,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                pit_state=pit_state,
+                query_timeout_seconds=query_timeout_seconds,
+                projection=projection,
+                include_performance_metrics=include_performance_metrics,
+            )
+
         # Use DShield indices if available, otherwise fallback
         if indices is None:
-            available_indices = await self.get_available_indices()
-            if available_indices:
-                indices = available_indices
-            else:
-                indices = self.fallback_indices
+            indices = await self._get_indices_for_time_range(time_range_hours)
 
         # Smart Query Optimization
         optimization_applied = None
@@ -605,55 +1136,22 @@ class ElasticsearchClient:
                         optimization_applied,
                     )
 
+        # Prediction for the page actually requested, checked against the response
+        size_shape_key = self._query_shape_key(time_range_hours, indices, filters)
+        predicted_size = (
+            self._get_size_estimator().estimate(indices, fields, page_size, size_shape_key)
+            if optimization == "auto"
+            else None
+        )
+
         # Build search query with timeout
         search_body = {
             "timeout": f"{query_timeout_seconds}s",
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "range": {
-                                "@timestamp": {
-                                    "gte": f"now-{time_range_hours}h",
-                                    "lte": "now",
-                                },
-                            },
-                        },
-                    ],
-                },
-            },
+            "query": self._build_events_query(time_range_hours, filters),
             "size": page_size,
         }
-
-        # Apply intelligent field mapping for user-friendly field names
-        mapped_filters = self._map_query_fields(filters) if filters else None
-
-        # Add additional filters
-        if mapped_filters:
-            for key, value in mapped_filters.items():
-                if key == "@timestamp":
-                    # Handle custom timestamp filtering
-                    search_body["query"]["bool"]["must"].append({"range": {"@timestamp": value}})
-                elif isinstance(value, dict):
-                    # Handle nested filters (e.g., "source_ip": {"eq": "1.2.3.4"})
-                    for sub_key, sub_value in value.items():
-                        if sub_key == "eq":
-                            search_body["query"]["bool"]["must"].append({"term": {key: sub_value}})
-                        elif sub_key == "in":
-                            search_body["query"]["bool"]["must"].append({"terms": {key: sub_value}})
-                        elif sub_key == "gte":
-                            search_body["query"]["bool"]["must"].append(
-                                {"range": {key: {"gte": sub_value}}}
-                            )
-                        elif sub_key == "lte":
-                            search_body["query"]["bool"]["must"].append(
-                                {"range": {key: {"lte": sub_value}}}
-                            )
-                # Handle arrays with terms, single values with term
-                elif isinstance(value, list | tuple):
-                    search_body["query"]["bool"]["must"].append({"terms": {key: value}})
-                else:
-                    search_body["query"]["bool"]["must"].append({"term": {key: value}})
+        if projection == "lean":
+            search_body["_source"] = self._projection_source_fields()
 
         # Build search body with enhanced pagination
         search_body["sort"] = [{sort_by: {"order": sort_order}}]
@@ -673,7 +1171,7 @@ class ElasticsearchClient:
 
         try:
             # Execute search
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=",".join(indices),
                 body=search_body,
             )
@@ -684,14 +1182,9 @@ class ElasticsearchClient:
             documents = hits.get("hits", [])
 
             # Parse events
-            events = []
+            events = self._parse_dshield_hits(documents, indices, projection)
             next_cursor = None
 
-            for doc in documents:
-                event = self._parse_dshield_event(doc, indices)
-                if event:
-                    events.append(event)
-
             # Generate next cursor for cursor-based pagination
             if documents and cursor:
                 last_hit = documents[-1]
@@ -716,6 +1209,21 @@ class ElasticsearchClient:
                 sort_by=sort_by,
                 sort_order=sort_order,
             )
+            full_bytes_per_event = 0.0
+            if self._measure_projection(include_performance_metrics):
+                metrics = self._projection_metrics(documents, events, indices, projection)
+                if include_performance_metrics:
+                    pagination_info["performance_metrics"] = metrics
+                full_bytes_per_event = metrics["full_bytes_per_event"]
+            self._record_query_size(
+                indices,
+                fields,
+                len(events),
+                full_bytes_per_event,
+                total_count,
+                size_shape_key,
+                predicted_size,
+            )
 
             logger.info(
                 f"Retrieved {len(events)} events from {len(indices)} indices",
@@ -728,6 +1236,9 @@ class ElasticsearchClient:
             # Record successful operation with circuit breaker
             self._record_circuit_breaker_success()
 
+            if cache_key is not None:
+                self.events_cache.put(cache_key, [events, total_count, pagination_info])
+
             return events, total_count, pagination_info
 
         except Exception as e:
@@ -737,143 +1248,422 @@ class ElasticsearchClient:
             self._record_circuit_breaker_failure(e)
 
             if self.error_handler:
-                # Create appropriate error response based on exception type
-                if isinstance(e, RequestError):
-                    return (
-                        [],
-                        0,
-                        {
-                            "error": self.error_handler.create_external_service_error(
-                                "Elasticsearch", str(e)
-                            )
-                        },
-                    )
-                if isinstance(e, TransportError):
-                    return (
-                        [],
-                        0,
-                        {
-                            "error": self.error_handler.create_external_service_error(
-                                "Elasticsearch", f"Connection error: {e!s}"
-                            )
-                        },
-                    )
-                if isinstance(e, ValueError):
-                    return [], 0, {"error": self.error_handler.create_invalid_params_error(str(e))}
-                return (
-                    [],
-                    0,
-                    {
-                        "error": self.error_handler.create_internal_error(
-                            f"Query execution failed: {e!s}"
-                        )
-                    },
-                )
+                return [], 0, {"error": self._create_query_error(e)}
             # Fallback to raising exception if no error handler
             raise
 
-    async def _estimate_query_size(
+    def _create_query_error(self, e: Exception) -> dict[str, Any]:
+        """Create a structured error response for a failed event query.
+
+        Args:
+            e: Exception raised while querying Elasticsearch
+
+        Returns:
+            Error response created by the configured MCPErrorHandler
+
+        """
+        if isinstance(e, RequestError):
+            return self.error_handler.create_external_service_error("Elasticsearch", str(e))
+        if isinstance(e, TransportError):
+            return self.error_handler.create_external_service_error(
+                "Elasticsearch", f"Connection error: {e!s}"
+            )
+        if isinstance(e, ValueError):
+            return self.error_handler.create_invalid_params_error(str(e))
+        return self.error_handler.create_internal_error(f"Query execution failed: {e!s}")
+
+    def _build_events_query(
         self,
         time_range_hours: int,
-        indices: list[str],
         filters: dict[str, Any] | None,
-        fields: list[str] | None,
-        page_size: int,
-    ) -> float:
-        """Estimate the size of a query result in MB.
+        time_bounds: dict[str, str] | None = None,
+        filters_mapped: bool = False,
+    ) -> dict[str, Any]:
+        """Build the bool query used by query_dshield_events.
 
-        Performs a lightweight query to estimate the size of the full
-        result set. This is used for smart query optimization to
-        determine if optimization is needed.
+        Applies the relative time range and user filters after mapping
+        user-friendly field names to ECS notation.
 
         Args:
             time_range_hours: Time range in hours to query
-            indices: List of indices to query
             filters: Query filters to apply
-            fields: Fields to include in the result
-            page_size: Number of results per page
+            time_bounds: Absolute ``gte``/``lte`` bounds used instead of the
+                relative time range
+            filters_mapped: Whether ``filters`` already use ECS field names
 
         Returns:
-            Estimated result size in megabytes
-
-        Raises:
-            RequestError: If the estimation query fails
+            Elasticsearch query clause
 
         """
-        try:
-            # Build a count query to get total documents
-            count_body = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "range": {
-                                    "@timestamp": {
-                                        "gte": f"now-{time_range_hours}h",
-                                        "lte": "now",
-                                    },
-                                },
-                            },
-                        ],
+        must: list[dict[str, Any]] = [
+            {
+                "range": {
+                    "@timestamp": time_bounds
+                    or {
+                        "gte": f"now-{time_range_hours}h",
+                        "lte": "now",
                     },
                 },
-            }
+            },
+        ]
 
-            # Apply intelligent field mapping for user-friendly field names
+        # Apply intelligent field mapping for user-friendly field names
+        if filters_mapped:
+            mapped_filters = filters
+        else:
             mapped_filters = self._map_query_fields(filters) if filters else None
 
-            # Add filters if provided
-            if mapped_filters:
-                for key, value in mapped_filters.items():
-                    if key == "@timestamp":
-                        count_body["query"]["bool"]["must"].append({"range": {"@timestamp": value}})
-                    elif isinstance(value, dict):
-                        for sub_key, sub_value in value.items():
-                            if sub_key == "eq":
-                                count_body["query"]["bool"]["must"].append(
-                                    {"term": {key: sub_value}}
-                                )
-                            elif sub_key == "in":
-                                count_body["query"]["bool"]["must"].append(
-                                    {"terms": {key: sub_value}}
-                                )
-                            elif sub_key == "gte":
-                                count_body["query"]["bool"]["must"].append(
-                                    {"range": {key: {"gte": sub_value}}}
-                                )
-                            elif sub_key == "lte":
-                                count_body["query"]["bool"]["must"].append(
-                                    {"range": {key: {"lte": sub_value}}}
-                                )
-                    else:
-                        count_body["query"]["bool"]["must"].append({"term": {key: value}})
+        if mapped_filters:
+            for key, value in mapped_filters.items():
+                if key == "@timestamp":
+                    # Handle custom timestamp filtering
+                    must.append({"range": {"@timestamp": value}})
+                elif isinstance(value, dict):
+                    # Handle nested filters (e.g., "source_ip": {"eq": "1.2.3.4"})
+                    for sub_key, sub_value in value.items():
+                        if sub_key == "eq":
+                            must.append({"term": {key: sub_value}})
+                        elif sub_key == "in":
+                            must.append({"terms": {key: sub_value}})
+                        elif sub_key == "gte":
+                            must.append({"range": {key: {"gte": sub_value}}})
+                        elif sub_key == "lte":
+                            must.append({"range": {key: {"lte": sub_value}}})
+                # Handle arrays with terms, single values with term
+                elif isinstance(value, list | tuple):
+                    must.append({"terms": {key: value}})
+                else:
+                    must.append({"term": {key: value}})
 
-            # Get total count
-            count_response = await self.client.count(
-                index=",".join(indices),
-                body=count_body,
-            )
+        return {"bool": {"must": must}}
 
-            total_docs = count_response["count"]
+    @staticmethod
+    def _encode_pit_cursor(state: dict[str, Any]) -> str:
+        """Encode point-in-time pagination state as an opaque cursor token.
 
-            # Estimate size per document based on fields
-            if fields:
-                # Conservative estimate: 1KB per field per document
-                bytes_per_doc = len(fields) * 1024
+        Args:
+            state: Pagination state (PIT id, search_after values, page, total)
+
+        Returns:
+            URL-safe cursor token
+
+        """
+        payload = json.dumps(state, separators=(",", ":"), default=str).encode()
+        return "pit." + base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_pit_cursor(cursor: str) -> dict[str, Any] | None:
+        """Decode a cursor produced by _encode_pit_cursor.
+
+        Args:
+            cursor: Cursor token supplied by the caller
+
+        Returns:
+            Pagination state, or None if the cursor is not a PIT cursor
+
+        """
+        if not isinstance(cursor, str) or not cursor.startswith("pit."):
+            return None
+        encoded = cursor[4:]
+        try:
+            payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            state = json.loads(payload)
+        except (ValueError, TypeError):
+            logger.warning("Invalid point-in-time cursor, starting a new one")
+            return None
+        if not isinstance(state, dict) or "pit_id" not in state:
+            return None
+        return state
+
+    async def _query_dshield_events_pit(
+        self,
+        time_range_hours: int,
+        indices: list[str] | None,
+        filters: dict[str, Any] | None,
+        page_size: int,
+        sort_by: str,
+        sort_order: str,
+        pit_state: dict[str, Any] | None,
+        query_timeout_seconds: int,
+        projection: str = "full",
+        include_performance_metrics: bool = False,
+    ) -> tuple[list[dict[str, Any]], int, dict[str, Any]]:
+        """Fetch one page of DShield events from a point-in-time.
+
+        Opens a new point-in-time when ``pit_state`` is None, otherwise
+        continues after the ``search_after`` values stored in the state. The
+        total hit count is tracked on the first page only and carried in the
+        cursor. The point-in-time is closed once the last page is returned.
+
+        The first page resolves the time range to absolute timestamps and
+        stores them with the mapped filters in the cursor, so every page of a
+        snapshot runs the same query whatever the caller passes later.
+
+        Args:
+            time_range_hours: Time range in hours to query
+            indices: Indices to open the point-in-time on (first page only)
+            filters: Query filters to apply (first page only)
+            page_size: Number of results per page
+            sort_by: Primary sort field
+            sort_order: Sort order ('asc' or 'desc')
+            pit_state: Decoded cursor state, or None for the first page
+            query_timeout_seconds: Query timeout in seconds
+            projection: Event projection mode ('full' or 'lean')
+            include_performance_metrics: Whether to report the page size
+
+        Returns:
+            Tuple of events, total count and pagination information
+
+        """
+        keep_alive = f"{self.cursor_timeout_seconds}s"
+        opened_pit_id = None
+
+        try:
+            if pit_state is None:
+                if indices is None:
+                    indices = await self._get_indices_for_time_range(time_range_hours)
+                pit_response = await self.client.open_point_in_time(
+                    index=",".join(indices), keep_alive=keep_alive
+                )
+                opened_pit_id = pit_response["id"]
+                now = datetime.now(UTC)
+                pit_state = {
+                    "pit_id": opened_pit_id,
+                    "page": 0,
+                    "total": None,
+                    "time_bounds": {
+                        "gte": (now - timedelta(hours=time_range_hours)).isoformat(),
+                        "lte": now.isoformat(),
+                    },
+                    "filters": self._map_query_fields(filters) if filters else None,
+                }
+            else:
+                sort_by = pit_state.get("sort_by", sort_by)
+                sort_order = pit_state.get("sort_order", sort_order)
+                page_size = pit_state.get("page_size", page_size)
+
+            first_page = pit_state.get("total") is None
+            search_body: dict[str, Any] = {
+                "timeout": f"{query_timeout_seconds}s",
+                "query": self._build_events_query(
+                    time_range_hours,
+                    pit_state.get("filters", filters),
+                    time_bounds=pit_state.get("time_bounds"),
+                    filters_mapped="filters" in pit_state,
+                ),
+                "size": page_size,
+                "pit": {"id": pit_state["pit_id"], "keep_alive": keep_alive},
+                "sort": [
+                    {sort_by: {"order": sort_order}},
+                    {"_shard_doc": {"order": sort_order}},
+                ],
+                "track_total_hits": first_page,
+            }
+            if pit_state.get("search_after"):
+                search_body["search_after"] = pit_state["search_after"]
+            if projection == "lean":
+                search_body["_source"] = self._projection_source_fields()
+
+            # Point-in-time searches must not name an index
+            response = await self.client.search(body=search_body)
+
+            hits = response.get("hits", {})
+            documents = hits.get("hits", [])
+            if first_page:
+                total_count = hits.get("total", {}).get("value", 0)
+            else:
+                total_count = pit_state["total"]
+
+            events = self._parse_dshield_hits(documents, indices or [], projection)
+            page = pit_state.get("page", 0) + 1
+
+            # Elasticsearch may hand back a new PIT id; always continue with the latest
+            pit_id = response.get("pit_id", pit_state["pit_id"])
+            next_cursor = None
+            if documents and len(documents) >= page_size:
+                next_cursor = self._encode_pit_cursor(
+                    {
+                        "pit_id": pit_id,
+                        "search_after": documents[-1].get("sort"),
+                        "page": page,
+                        "total": total_count,
+                        "sort_by": sort_by,
+                        "sort_order": sort_order,
+                        "page_size": page_size,
+                        "time_bounds": pit_state.get("time_bounds"),
+                        "filters": pit_state.get("filters"),
+                    }
+                )
             else:
-                # Conservative estimate: 5KB per document for all fields
-                bytes_per_doc = 5 * 1024
+                await self._close_point_in_time(pit_id)
+
+            pagination_info = self._generate_enhanced_pagination_info(
+                page=page,
+                page_size=page_size,
+                total_count=total_count,
+                cursor=None,
+                next_cursor=next_cursor,
+                sort_by=sort_by,
+                sort_order=sort_order,
+            )
+            pagination_info["pagination_method"] = "pit"
+            pagination_info["has_next"] = pagination_info["has_more"] = next_cursor is not None
+            pagination_info.pop("next_page", None)
+            pagination_info.pop("previous_page", None)
+            if include_performance_metrics:
+                pagination_info["performance_metrics"] = self._projection_metrics(
+                    documents, events, indices or [], projection
+                )
+
+            logger.info(
+                f"Retrieved {len(events)} events from point-in-time",
+                total_count=total_count,
+                page=page,
+                page_size=page_size,
+                pagination_method="pit",
+            )
+
+            self._record_circuit_breaker_success()
+            return events, total_count, pagination_info
+
+        except Exception as e:
+            logger.error(f"Error querying DShield events from point-in-time: {e!s}")
+            self._record_circuit_breaker_failure(e)
+            if opened_pit_id:
+                await self._close_point_in_time(opened_pit_id)
+            if self.error_handler:
+                return [], 0, {"error": self._create_query_error(e)}
+            raise
 
-            # Calculate total size for requested page
-            total_bytes = min(total_docs, page_size) * bytes_per_doc
-            total_mb = total_bytes / (1024 * 1024)
+    async def _close_point_in_time(self, pit_id: str) -> None:
+        """Close a point-in-time, logging rather than raising on failure.
 
-            return total_mb
+        Args:
+            pit_id: Point-in-time id to close
 
+        """
+        try:
+            await self.client.close_point_in_time(id=pit_id)
         except Exception as e:
-            logger.warning(f"Could not estimate query size: {e}")
-            # Return conservative estimate
-            return page_size * 0.005  # 5KB per document estimate
+            logger.warning("Failed to close point-in-time", error=str(e))
+
+    async def _estimate_query_size(
+        self,
+        time_range_hours: int,
+        indices: list[str],
+        filters: dict[str, Any] | None,
+        fields: list[str] | None,
+        page_size: int,
+    ) -> float:
+        """Estimate the size of a query result in MB.
+
+        Used by smart query optimization to decide whether fields or the page
+        size need to be reduced. The estimate comes from the rolling
+        statistics of :class:`QuerySizeEstimator` (bytes per document learned
+        from previous responses and index ``_stats``, total hits seen for the
+        same query shape), so no request is sent to Elasticsearch.
+
+        Args:
+            time_range_hours: Time range in hours to query
+            indices: List of indices to query
+            filters: Query filters to apply
+            fields: Fields to include in the result
+            page_size: Number of results per page
+
+        Returns:
+            Estimated result size in megabytes
+
+        """
+        shape_key = self._query_shape_key(time_range_hours, indices, filters)
+        estimate = self._get_size_estimator().estimate(indices, fields, page_size, shape_key)
+        logger.debug(
+            "Estimated query size",
+            size_mb=round(estimate.total_mb, 4),
+            bytes_per_doc=round(estimate.bytes_per_doc),
+            expected_docs=estimate.expected_docs,
+            source=estimate.source,
+        )
+        return float(estimate.total_mb)
+
+    def _get_size_estimator(self) -> QuerySizeEstimator:
+        """Return the result size estimator, creating it on first use."""
+        if self.size_estimator is None:
+            self.size_estimator = QuerySizeEstimator()
+        return self.size_estimator
+
+    def _query_shape_key(
+        self, time_range_hours: int, indices: list[str], filters: dict[str, Any] | None
+    ) -> str:
+        """Build the key under which total hits of a query are tracked.
+
+        Args:
+            time_range_hours: Time range in hours to query
+            indices: List of indices to query
+            filters: Query filters to apply
+
+        Returns:
+            Key identifying the query independently of paging, fields and
+            absolute ``@timestamp`` bounds
+
+        """
+        return canonical_query_key(
+            "shape",
+            {
+                "time_range_hours": time_range_hours,
+                "indices": sorted(indices),
+                "filters": normalize_filters(
+                    drop_absolute_time_bounds(self._map_query_fields(filters or {}))
+                ),
+            },
+        )
+
+    def _record_query_size(
+        self,
+        indices: list[str],
+        fields: list[str] | None,
+        returned_docs: int,
+        bytes_per_doc: float,
+        total_hits: int,
+        shape_key: str,
+        predicted: SizeEstimate | None,
+    ) -> None:
+        """Feed a response's measured size back into the size estimator.
+
+        Args:
+            indices: Queried indices
+            fields: Requested fields
+            returned_docs: Number of events returned
+            bytes_per_doc: Measured serialized bytes per event
+            total_hits: Total hits reported by Elasticsearch
+            shape_key: Key from :meth:`_query_shape_key`
+            predicted: Estimate made before the query, if any
+
+        """
+        estimator = self._get_size_estimator()
+        estimator.observe(
+            indices,
+            fields,
+            returned_docs,
+            bytes_per_doc,
+            total_hits=total_hits,
+            shape_key=shape_key,
+            predicted=predicted,
+        )
+        if predicted is not None:
+            logger.debug(
+                "Query size prediction error",
+                predicted_mb=round(predicted.total_mb, 4),
+                relative_error=estimator.last_error,
+            )
+
+    def get_query_size_estimator_stats(self) -> dict[str, Any]:
+        """Get the prediction error and coverage of the result size estimator.
+
+        Returns:
+            Estimator statistics including the relative prediction error
+
+        """
+        return self._get_size_estimator().get_stats()
 
     def _optimize_fields(self, fields: list[str]) -> list[str]:
         """Optimize field selection for better performance.
@@ -956,120 +1746,62 @@ class ElasticsearchClient:
             # Return aggregation results instead of individual events
             logger.info("Applying aggregation fallback strategy")
 
-            # Create aggregation query
-            agg_body = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "range": {
-                                    "@timestamp": {
-                                        "gte": f"now-{time_range_hours}h",
-                                        "lte": "now",
-                                    },
-                                },
-                            },
-                        ],
-                    },
-                },
-                "size": 0,  # No individual documents
-                "aggs": {
-                    "top_sources": {
-                        "terms": {
-                            "field": "source_ip",
-                            "size": 50,
-                        },
-                    },
-                    "top_destinations": {
-                        "terms": {
-                            "field": "destination_port",
-                            "size": 50,
-                        },
-                    },
-                    "event_types": {
-                        "terms": {
-                            "field": "event.category",
-                            "size": 20,
-                        },
-                    },
-                    "timeline": {
-                        "date_histogram": {
-                            "field": "@timestamp",
-                            "calendar_interval": "1h",
-                        },
-                    },
-                },
-            }
-
-            # Add filters if provided
-            if filters:
-                for key, value in filters.items():
-                    if key == "@timestamp":
-                        agg_body["query"]["bool"]["must"].append({"range": {"@timestamp": value}})
-                    elif isinstance(value, dict):
-                        for sub_key, sub_value in value.items():
-                            if sub_key == "eq":
-                                agg_body["query"]["bool"]["must"].append({"term": {key: sub_value}})
-                            elif sub_key == "in":
-                                agg_body["query"]["bool"]["must"].append(
-                                    {"terms": {key: sub_value}}
-                                )
-                            elif sub_key == "gte":
-                                agg_body["query"]["bool"]["must"].append(
-                                    {"range": {key: {"gte": sub_value}}}
-                                )
-                            elif sub_key == "lte":
-                                agg_body["query"]["bool"]["must"].append(
-                                    {"range": {key: {"lte": sub_value}}}
-                                )
-                    else:
-                        agg_body["query"]["bool"]["must"].append({"term": {key: value}})
-
-            response = await self.client.search(
-                index=",".join(indices),
-                body=agg_body,
+            # Exact top sources and destinations, ranked by paging through
+            # every bucket rather than capping a terms aggregation
+            top_sources, top_destinations = await asyncio.gather(
+                self.top_composite_buckets(
+                    "source.ip",
+                    limit=50,
+                    time_range_hours=time_range_hours,
+                    indices=indices,
+                    filters=filters,
+                ),
+                self.top_composite_buckets(
+                    "destination.port",
+                    limit=50,
+                    time_range_hours=time_range_hours,
+                    indices=indices,
+                    filters=filters,
+                ),
             )
 
             # Convert aggregation results to event-like format
             events = []
-            aggs = response.get("aggregations", {})
 
             # Add summary events for each aggregation
-            if "top_sources" in aggs:
-                for bucket in aggs["top_sources"]["buckets"]:
-                    events.append(
-                        {
-                            "id": f"agg_source_{bucket['key']}",
-                            "timestamp": datetime.now(UTC).isoformat(),
-                            "source_ip": bucket["key"],
-                            "event_type": "aggregation",
-                            "category": ["summary", "source_analysis"],
-                            "description": f"Top source IP: {bucket['key']} with "
-                            f"{bucket['doc_count']} events",
-                            "raw_data": {
-                                "aggregation_type": "top_sources",
-                                "doc_count": bucket["doc_count"],
-                            },
-                        }
-                    )
+            for bucket in top_sources:
+                events.append(
+                    {
+                        "id": f"agg_source_{bucket['key']}",
+                        "timestamp": datetime.now(UTC).isoformat(),
+                        "source_ip": bucket["key"],
+                        "event_type": "aggregation",
+                        "category": ["summary", "source_analysis"],
+                        "description": f"Top source IP: {bucket['key']} with "
+                        f"{bucket['doc_count']} events",
+                        "raw_data": {
+                            "aggregation_type": "top_sources",
+                            "doc_count": bucket["doc_count"],
+                        },
+                    }
+                )
 
-            if "top_destinations" in aggs:
-                for bucket in aggs["top_destinations"]["buckets"]:
-                    events.append(
-                        {
-                            "id": f"agg_dest_{bucket['key']}",
-                            "timestamp": datetime.now(UTC).isoformat(),
-                            "destination_port": bucket["key"],
-                            "event_type": "aggregation",
-                            "category": ["summary", "destination_analysis"],
-                            "description": f"Top destination port: {bucket['key']} with "
-                            f"{bucket['doc_count']} events",
-                            "raw_data": {
-                                "aggregation_type": "top_destinations",
-                                "doc_count": bucket["doc_count"],
-                            },
-                        }
-                    )
+            for bucket in top_destinations:
+                events.append(
+                    {
+                        "id": f"agg_dest_{bucket['key']}",
+                        "timestamp": datetime.now(UTC).isoformat(),
+                        "destination_port": bucket["key"],
+                        "event_type": "aggregation",
+                        "category": ["summary", "destination_analysis"],
+                        "description": f"Top destination port: {bucket['key']} with "
+                        f"{bucket['doc_count']} events",
+                        "raw_data": {
+                            "aggregation_type": "top_destinations",
+                            "doc_count": bucket["doc_count"],
+                        },
+                    }
+                )
 
             # Create pagination info for aggregation results
             pagination_info = {
@@ -1141,7 +1873,7 @@ class ElasticsearchClient:
                     else:
                         sample_body["query"]["bool"]["must"].append({"term": {key: value}})
 
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=",".join(indices),
                 body=sample_body,
             )
@@ -1151,11 +1883,7 @@ class ElasticsearchClient:
             total_count = hits.get("total", {}).get("value", 0)
             documents = hits.get("hits", [])
 
-            events = []
-            for doc in documents:
-                event = self._parse_dshield_event(doc, indices)
-                if event:
-                    events.append(event)
+            events = self._parse_dshield_hits(documents, indices)
 
             pagination_info = {
                 "page_size": 10,
@@ -1210,6 +1938,10 @@ class ElasticsearchClient:
         data summarization. This is useful for generating reports
         and understanding data patterns without retrieving full records.
 
+        Responses are cached separately from event pages. Queries using
+        relative times (``now``) or absolute ``@timestamp`` bounds share a cache
+        entry within one time bucket.
+
         Args:
             index: List of indices to query
             query: Base query to filter documents
@@ -1223,24 +1955,46 @@ class ElasticsearchClient:
             RequestError: If the aggregation query fails
 
         """
+        # Build the complete search body
+        search_body = {
+            "query": query,
+            **aggregation_query,
+        }
+
+        cache_key = None
+        if self.aggregation_cache is not None:
+            bucket_seconds = self.query_cache_time_bucket_seconds
+            cache_key = canonical_query_key(
+                "aggregations",
+                {
+                    "index": sorted(index),
+                    "body": snap_time_bounds(search_body, bucket_seconds),
+                    "time_bucket": (
+                        time_bucket(bucket_seconds) if has_relative_range(search_body) else None
+                    ),
+                },
+            )
+            cached = self.aggregation_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Aggregation cache hit")
+                return cached
+
         if not self.client:
             await self.connect()
 
         try:
-            # Build the complete search body
-            search_body = {
-                "query": query,
-                **aggregation_query,
-            }
 
             # Execute search with aggregations
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=",".join(index),
                 body=search_body,
             )
 
             logger.info(f"Executed aggregation query on {len(index)} indices")
 
+            if cache_key is not None:
+                self.aggregation_cache.put(cache_key, getattr(response, "body", response))
+
             return response
 
         except Exception as e:
@@ -1312,11 +2066,7 @@ class ElasticsearchClient:
 
         # Use DShield indices if available, otherwise fallback
         if indices is None:
-            available_indices = await self.get_available_indices()
-            if available_indices:
-                indices = available_indices
-            else:
-                indices = self.fallback_indices
+            indices = await self._get_indices_for_time_range(time_range_hours)
 
         # Build query with time range
         query = {
@@ -1381,7 +2131,7 @@ class ElasticsearchClient:
 
         try:
             # Execute search
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=",".join(indices),
                 body=search_body,
             )
@@ -1392,14 +2142,9 @@ class ElasticsearchClient:
             documents = hits.get("hits", [])
 
             # Parse events
-            events = []
+            events = self._parse_dshield_hits(documents, indices)
             last_event_id = None
 
-            for doc in documents:
-                event = self._parse_dshield_event(doc, indices)
-                if event:
-                    events.append(event)
-
             # Generate next stream_id for cursor-based pagination
             if documents:
                 last_hit = documents[-1]
@@ -1458,6 +2203,665 @@ class ElasticsearchClient:
             # Fallback to raising exception if no error handler
             raise
 
+    async def iter_dshield_events(
+        self,
+        time_range_hours: int = 24,
+        indices: list[str] | None = None,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+        chunk_size: int = 500,
+        prefetch_pages: int = 1,
+        max_events: int | None = None,
+        stream_id: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over every matching DShield event across all stream pages.
+
+        Wraps ``stream_dshield_events`` in an async generator so callers can
+        write ``async for event in client.iter_dshield_events(...)`` instead of
+        driving the ``stream_id`` loop themselves. A background task fetches
+        the next ``search_after`` page while the consumer works on the current
+        one. At most ``prefetch_pages`` fetched pages are buffered; when the
+        buffer is full the fetcher waits for the consumer, so memory stays
+        bounded regardless of how many events match.
+
+        Args:
+            time_range_hours: Time range in hours to query (default: 24)
+            indices: Specific indices to query (default: all DShield indices)
+            filters: Additional query filters to apply
+            fields: Specific fields to return (reduces payload size)
+            chunk_size: Number of events per page (default: 500, max: 1000)
+            prefetch_pages: Number of pages buffered ahead of the consumer
+                (default: 1)
+            max_events: Stop after yielding this many events (default: no limit)
+            stream_id: Optional stream ID to resume from
+
+        Yields:
+            Parsed DShield event dictionaries in stream order
+
+        Raises:
+            ValueError: If prefetch_pages is less than 1
+            RuntimeError: If a page request fails
+
+        """
+        if prefetch_pages < 1:
+            raise ValueError("prefetch_pages must be at least 1")
+
+        if not self.client:
+            await self.connect()
+
+        # Resolve indices once rather than on every page
+        if indices is None:
+            indices = await self._get_indices_for_time_range(time_range_hours)
+
+        end_of_stream = object()
+        pages: asyncio.Queue[Any] = asyncio.Queue(maxsize=prefetch_pages)
+
+        async def fetch_pages() -> None:
+            current_stream_id = stream_id
+            try:
+                while True:
+                    events, _, next_stream_id = await self.stream_dshield_events(
+                        time_range_hours=time_range_hours,
+                        indices=indices,
+                        filters=filters,
+                        fields=fields,
+                        chunk_size=chunk_size,
+                        stream_id=current_stream_id,
+                    )
+                    if isinstance(next_stream_id, dict):
+                        raise RuntimeError(
+                            f"Streaming page request failed: {next_stream_id.get('error')}"
+                        )
+                    if events:
+                        await pages.put(events)
+                    if not next_stream_id:
+                        break
+                    current_stream_id = next_stream_id
+            except Exception as e:
+                await pages.put(e)
+            await pages.put(end_of_stream)
+
+        fetcher = asyncio.create_task(fetch_pages())
+        yielded = 0
+        try:
+            while True:
+                page = await pages.get()
+                if page is end_of_stream:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                for event in page:
+                    yield event
+                    yielded += 1
+                    if max_events is not None and yielded >= max_events:
+                        return
+        finally:
+            if not fetcher.done():
+                fetcher.cancel()
+                try:
+                    await fetcher
+                except asyncio.CancelledError:
+                    pass
+            logger.debug("Event iteration finished", events_yielded=yielded)
+
+    async def iter_dshield_events_sliced(
+        self,
+        time_range_hours: int = 24,
+        indices: list[str] | None = None,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+        chunk_size: int = 1000,
+        max_slices: int | None = None,
+        metrics: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Bulk-export DShield events with concurrent sliced point-in-time reads.
+
+        Opens one point-in-time over the target indices and splits it into N
+        slices, each paged independently with ``search_after`` on
+        ``_shard_doc``. The slices run concurrently and their pages are merged
+        into a single stream, so whole-day exports are no longer limited by a
+        single shard-request pipeline. N is ``max_slices`` capped by the number
+        of shards reported for the point-in-time.
+
+        Events are yielded in arrival order, not in timestamp order. Use
+        ``iter_dshield_events`` when ordering matters.
+
+        Args:
+            time_range_hours: Time range in hours to query (default: 24)
+            indices: Specific indices to query (default: all DShield indices)
+            filters: Additional query filters to apply
+            fields: Specific fields to return (reduces payload size)
+            chunk_size: Documents per slice page (default: 1000)
+            max_slices: Maximum concurrent slices (default: ``self.max_slices``)
+            metrics: Optional dictionary populated with per-slice throughput
+                metrics (documents, pages, elapsed seconds, documents/second)
+
+        Yields:
+            Parsed DShield event dictionaries
+
+        Raises:
+            RuntimeError: If the circuit breaker is open
+            Exception: If a slice request fails
+
+        """
+        circuit_breaker_result = self._check_circuit_breaker("iter_dshield_events_sliced")
+        if isinstance(circuit_breaker_result, dict):
+            raise RuntimeError("Elasticsearch circuit breaker is open")
+
+        if not self.client:
+            await self.connect()
+
+        if indices is None:
+            indices = await self._get_indices_for_time_range(time_range_hours)
+
+        keep_alive = f"{self.cursor_timeout_seconds}s"
+        pit_response = await self.client.open_point_in_time(
+            index=",".join(indices), keep_alive=keep_alive
+        )
+        pit_id = pit_response["id"]
+        shard_count = pit_response.get("_shards", {}).get("total") or 0
+        slice_count = max_slices or self.max_slices
+        if shard_count:
+            slice_count = min(slice_count, shard_count)
+        slice_count = max(1, slice_count)
+
+        query = self._build_events_query(time_range_hours, filters)
+        slice_metrics = [
+            {"slice_id": i, "documents": 0, "pages": 0, "elapsed_seconds": 0.0}
+            for i in range(slice_count)
+        ]
+        if metrics is not None:
+            metrics.update({"slice_count": slice_count, "slices": slice_metrics})
+
+        end_of_slice = object()
+        pages: asyncio.Queue[Any] = asyncio.Queue(maxsize=slice_count * 2)
+
+        async def read_slice(slice_id: int) -> None:
+            slice_stats = slice_metrics[slice_id]
+            started = time.perf_counter()
+            search_after = None
+            try:
+                while True:
+                    search_body: dict[str, Any] = {
+                        "query": query,
+                        "size": chunk_size,
+                        "pit": {"id": pit_id, "keep_alive": keep_alive},
+                        "sort": [{"_shard_doc": {"order": "asc"}}],
+                        "track_total_hits": False,
+                    }
+                    if slice_count > 1:
+                        search_body["slice"] = {"id": slice_id, "max": slice_count}
+                    if fields:
+                        search_body["_source"] = fields
+                    if search_after:
+                        search_body["search_after"] = search_after
+
+                    response = await self.client.search(body=search_body)
+                    documents = response.get("hits", {}).get("hits", [])
+                    slice_stats["pages"] += 1
+                    slice_stats["documents"] += len(documents)
+                    if documents:
+                        await pages.put(documents)
+                    if len(documents) < chunk_size:
+                        break
+                    search_after = documents[-1].get("sort")
+            except Exception as e:
+                await pages.put(e)
+            finally:
+                elapsed = time.perf_counter() - started
+                slice_stats["elapsed_seconds"] = round(elapsed, 3)
+                slice_stats["documents_per_second"] = (
+                    round(slice_stats["documents"] / elapsed, 1) if elapsed > 0 else 0.0
+                )
+            await pages.put(end_of_slice)
+
+        started = time.perf_counter()
+        readers = [asyncio.create_task(read_slice(i)) for i in range(slice_count)]
+        finished = 0
+        try:
+            while finished < slice_count:
+                page = await pages.get()
+                if page is end_of_slice:
+                    finished += 1
+                    continue
+                if isinstance(page, Exception):
+                    self._record_circuit_breaker_failure(page)
+                    raise page
+                for event in self._parse_dshield_hits(page, indices):
+                    yield event
+            self._record_circuit_breaker_success()
+        finally:
+            for reader in readers:
+                if not reader.done():
+                    reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+            await self._close_point_in_time(pit_id)
+
+            elapsed = time.perf_counter() - started
+            total_documents = sum(stats["documents"] for stats in slice_metrics)
+            if metrics is not None:
+                metrics["total_documents"] = total_documents
+                metrics["elapsed_seconds"] = round(elapsed, 3)
+                metrics["documents_per_second"] = (
+                    round(total_documents / elapsed, 1) if elapsed > 0 else 0.0
+                )
+            logger.info(
+                "Sliced export finished",
+                slice_count=slice_count,
+                total_documents=total_documents,
+                elapsed_seconds=round(elapsed, 3),
+                slices=slice_metrics,
+            )
+
+    async def msearch_dshield_events(
+        self,
+        queries: list[dict[str, Any]],
+        time_range_hours: int = 24,
+        indices: list[str] | None = None,
+        size: int = 100,
+        projection: str = "full",
+        max_concurrent_searches: int | None = None,
+        groups: list[dict[str, dict[str, Any]]] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Run several DShield event searches in one ``_msearch`` round trip.
+
+        Each query clause is applied as a filter on top of the relative time
+        range, newest events first. Names given to clauses with ``_name`` are
+        reported back on the parsed events as ``matched_queries``, so callers
+        batching several indicators into one search can tell which indicator
+        each event matched.
+
+        With ``groups``, a search returns up to ``size`` events for each named
+        clause of its group instead of ``size`` events overall: the clauses
+        become the buckets of a ``filters`` aggregation with a ``top_hits``
+        sub-aggregation, so one busy clause cannot crowd out the others. The
+        bucket names are reported as ``matched_queries``. ``size`` is then
+        bounded by ``index.max_inner_result_window`` (100 by default).
+
+        Args:
+            queries: Elasticsearch query clauses, one per search
+            time_range_hours: Time range in hours to query (default: 24)
+            indices: Specific indices to query (default: all DShield indices)
+            size: Maximum events returned per search, or per named clause
+                with ``groups`` (default: 100)
+            projection: Event projection mode ('full' or 'lean')
+            max_concurrent_searches: Optional limit on the searches
+                Elasticsearch runs concurrently for this request
+            groups: Optional named clauses for each query, in query order
+
+        Returns:
+            Parsed events for each query, in query order. A search that fails
+            on its own yields an empty list.
+
+        Raises:
+            RuntimeError: If the circuit breaker is open
+            ValueError: If projection is not supported
+            Exception: If the multi-search request fails
+
+        """
+        if projection not in EVENT_PROJECTIONS:
+            raise ValueError(
+                f"Invalid projection '{projection}'. Must be one of {list(EVENT_PROJECTIONS)}"
+            )
+        if not queries:
+            return []
+
+        circuit_breaker_result = self._check_circuit_breaker("msearch_dshield_events")
+        if isinstance(circuit_breaker_result, dict):
+            raise RuntimeError("Elasticsearch circuit breaker is open")
+
+        if not self.client:
+            await self.connect()
+
+        if indices is None:
+            indices = await self._get_indices_for_time_range(time_range_hours)
+
+        searches: list[dict[str, Any]] = []
+        for position, query in enumerate(queries):
+            search_query = self._build_events_query(time_range_hours, None)
+            search_query["bool"]["filter"] = [query]
+            body: dict[str, Any] = {
+                "query": search_query,
+                "size": size,
+                "sort": [{"@timestamp": {"order": "desc"}}],
+                "track_total_hits": False,
+            }
+            if projection == "lean":
+                body["_source"] = self._projection_source_fields()
+            if groups is not None:
+                hits_keys = ("size", "sort", "_source")
+                top_hits = {key: body.pop(key) for key in hits_keys if key in body}
+                body["size"] = 0
+                body["aggs"] = {
+                    "groups": {
+                        "filters": {"filters": groups[position]},
+                        "aggs": {"events": {"top_hits": top_hits}},
+                    }
+                }
+            searches.extend(({}, body))
+
+        params: dict[str, Any] = {}
+        if max_concurrent_searches:
+            params["max_concurrent_searches"] = max_concurrent_searches
+
+        try:
+            response = await self.client.msearch(
+                index=",".join(indices), searches=searches, **params
+            )
+        except Exception as e:
+            logger.error(f"Error running DShield multi-search: {e!s}", searches=len(queries))
+            self._record_circuit_breaker_failure(e)
+            raise
+
+        self._record_circuit_breaker_success()
+
+        results: list[list[dict[str, Any]]] = []
+        for position, item in enumerate(response.get("responses", [])):
+            if "error" in item:
+                logger.warning(
+                    "DShield multi-search item failed", position=position, error=item["error"]
+                )
+                results.append([])
+                continue
+
+            if groups is not None:
+                results.append(self._parse_grouped_hits(item, indices, projection))
+                continue
+
+            events = []
+            for hit in item.get("hits", {}).get("hits", []):
+                event = self._parse_dshield_event(hit, indices, projection)
+                if event:
+                    if hit.get("matched_queries"):
+                        event["matched_queries"] = hit["matched_queries"]
+                    events.append(event)
+            results.append(events)
+
+        # Keep one result per query even if the response is short
+        results.extend([] for _ in range(len(queries) - len(results)))
+        return results
+
+    def _parse_grouped_hits(
+        self, item: dict[str, Any], indices: list[str], projection: str
+    ) -> list[dict[str, Any]]:
+        """Parse the per-clause top hits of a grouped multi-search item.
+
+        Args:
+            item: One response of a grouped ``_msearch`` request
+            indices: Indices the search ran on
+            projection: Event projection mode
+
+        Returns:
+            Events of all buckets, each listed once with the names of every
+            bucket it appeared in under ``matched_queries``
+
+        """
+        buckets = item.get("aggregations", {}).get("groups", {}).get("buckets", {})
+        events_by_id: dict[str, dict[str, Any]] = {}
+        for name, bucket in buckets.items():
+            for hit in bucket.get("events", {}).get("hits", {}).get("hits", []):
+                key = f"{hit.get('_index')}/{hit.get('_id')}"
+                event = events_by_id.get(key)
+                if event is None:
+                    event = self._parse_dshield_event(hit, indices, projection)
+                    if not event:
+                        continue
+                    event["matched_queries"] = []
+                    events_by_id[key] = event
+                event["matched_queries"].append(name)
+        return list(events_by_id.values())
+
+    async def query_events_by_time_windows(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        window_minutes: int,
+        max_windows: int = 50,
+        events_per_window: int = 100,
+        indices: list[str] | None = None,
+        projection: str = "full",
+    ) -> list[dict[str, Any]]:
+        """Get the densest time windows of a range and their events.
+
+        A ``date_histogram`` splits the range into windows of
+        ``window_minutes`` aligned on ``start_time`` and a ``bucket_sort``
+        keeps the ``max_windows`` windows with the most events. This first
+        request only counts documents. A second request then fetches the
+        newest events of the chosen windows with one ``filters`` bucket per
+        window and ``top_hits``, so no hits are gathered for windows that
+        are dropped.
+
+        Args:
+            start_time: Start of the range (naive times are taken as UTC)
+            end_time: End of the range
+            window_minutes: Length of each window in minutes
+            max_windows: Maximum number of windows returned, densest first
+            events_per_window: Events returned per window (at most 100)
+            indices: Specific indices to query (default: DShield indices
+                overlapping the range)
+            projection: Event projection mode ('full' or 'lean')
+
+        Returns:
+            Windows ordered by decreasing event count, each with ``start``,
+            ``end``, ``doc_count`` and parsed ``events``
+
+        Raises:
+            ValueError: If projection or the window length is invalid
+            RuntimeError: If the circuit breaker is open or the request fails
+
+        """
+        if projection not in EVENT_PROJECTIONS:
+            raise ValueError(
+                f"Invalid projection '{projection}'. Must be one of {list(EVENT_PROJECTIONS)}"
+            )
+        if window_minutes <= 0:
+            raise ValueError("window_minutes must be positive")
+
+        circuit_breaker_result = self._check_circuit_breaker("query_events_by_time_windows")
+        if isinstance(circuit_breaker_result, dict):
+            raise RuntimeError("Elasticsearch circuit breaker is open")
+
+        if not self.client:
+            await self.connect()
+
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=UTC)
+        if end_time.tzinfo is None:
+            end_time = end_time.replace(tzinfo=UTC)
+        if indices is None:
+            age_hours = (datetime.now(UTC) - start_time).total_seconds() / 3600
+            indices = await self._get_indices_for_time_range(max(1, int(age_hours) + 1))
+
+        interval_ms = window_minutes * 60000
+        start_ms = int(start_time.timestamp() * 1000)
+        time_query = {
+            "range": {"@timestamp": {"gte": start_time.isoformat(), "lte": end_time.isoformat()}}
+        }
+        histogram_body = {
+            "size": 0,
+            "track_total_hits": False,
+            "query": time_query,
+            "aggs": {
+                "windows": {
+                    "date_histogram": {
+                        "field": "@timestamp",
+                        "fixed_interval": f"{window_minutes}m",
+                        # Align windows on the start of the range
+                        "offset": f"{start_ms % interval_ms}ms",
+                        "min_doc_count": 1,
+                    },
+                    "aggs": {
+                        "densest": {
+                            "bucket_sort": {
+                                "sort": [{"_count": {"order": "desc"}}],
+                                "size": max_windows,
+                            }
+                        }
+                    },
+                }
+            },
+        }
+
+        try:
+            response = await self._coalesced_search(index=",".join(indices), body=histogram_body)
+            buckets = response.get("aggregations", {}).get("windows", {}).get("buckets", [])
+            hits_by_window: dict[str, list[dict[str, Any]]] = {}
+            if buckets:
+                top_hits: dict[str, Any] = {
+                    "size": min(max(events_per_window, 1), 100),
+                    "sort": [{"@timestamp": {"order": "desc"}}],
+                }
+                if projection == "lean":
+                    top_hits["_source"] = self._projection_source_fields()
+                events_body = {
+                    "size": 0,
+                    "track_total_hits": False,
+                    "query": time_query,
+                    "aggs": {
+                        "windows": {
+                            "filters": {
+                                "filters": {
+                                    str(bucket["key"]): {
+                                        "range": {
+                                            "@timestamp": {
+                                                "gte": bucket["key"],
+                                                "lt": bucket["key"] + interval_ms,
+                                                "format": "epoch_millis",
+                                            }
+                                        }
+                                    }
+                                    for bucket in buckets
+                                }
+                            },
+                            "aggs": {"events": {"top_hits": top_hits}},
+                        }
+                    },
+                }
+                response = await self._coalesced_search(index=",".join(indices), body=events_body)
+                window_buckets = (
+                    response.get("aggregations", {}).get("windows", {}).get("buckets", {})
+                )
+                hits_by_window = {
+                    key: bucket.get("events", {}).get("hits", {}).get("hits", [])
+                    for key, bucket in window_buckets.items()
+                }
+        except Exception as e:
+            logger.error("Time window query failed", window_minutes=window_minutes, error=str(e))
+            self._record_circuit_breaker_failure(e)
+            raise RuntimeError(f"Time window query failed: {e!s}") from e
+        self._record_circuit_breaker_success()
+
+        windows = []
+        for bucket in buckets:
+            window_start = datetime.fromtimestamp(bucket["key"] / 1000, UTC)
+            hits = hits_by_window.get(str(bucket["key"]), [])
+            windows.append(
+                {
+                    "start": window_start,
+                    "end": window_start + timedelta(minutes=window_minutes),
+                    "doc_count": bucket.get("doc_count", 0),
+                    "events": self._parse_dshield_hits(hits, indices, projection),
+                }
+            )
+        return windows
+
+    async def tail_dshield_events(
+        self,
+        checkpoint: dict[str, Any] | None = None,
+        since_hours: int = 24,
+        page_size: int = 1000,
+        max_events: int = 10000,
+        indices: list[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+        """Read the events indexed after a checkpoint, oldest first.
+
+        Pages are sorted by ``@timestamp`` and continue from the last
+        timestamp seen. Timestamps are not unique, so the checkpoint also
+        holds the IDs of the events at its timestamp; they are excluded with
+        an ``ids`` query instead of relying on a sort tiebreaker (``_id`` is
+        not sortable by default and ``_shard_doc`` needs a point-in-time,
+        which does not outlive the gaps between calls). Events indexed late,
+        with a timestamp before the checkpoint, are not returned.
+
+        Args:
+            checkpoint: Checkpoint returned by the previous call, or None to
+                start ``since_hours`` ago
+            since_hours: How far back to start without a checkpoint
+            page_size: Events per search request
+            max_events: Maximum events returned by one call; the returned
+                checkpoint resumes after the last of them
+            indices: Specific indices to query (default: DShield indices
+                overlapping the range)
+
+        Returns:
+            Tuple of events in timestamp order and the checkpoint to resume
+            from (``{"timestamp": epoch_millis, "ids": [...]}``; the input
+            checkpoint when no event is newer)
+
+        Raises:
+            RuntimeError: If the circuit breaker is open or a request fails
+
+        """
+        circuit_breaker_result = self._check_circuit_breaker("tail_dshield_events")
+        if isinstance(circuit_breaker_result, dict):
+            raise RuntimeError("Elasticsearch circuit breaker is open")
+
+        if not self.client:
+            await self.connect()
+
+        now_ms = int(datetime.now(UTC).timestamp() * 1000)
+        if checkpoint:
+            boundary_ms = int(checkpoint["timestamp"])
+            boundary_ids = list(checkpoint.get("ids", []))
+        else:
+            boundary_ms = now_ms - since_hours * 3600000
+            boundary_ids = []
+        if indices is None:
+            age_hours = (now_ms - boundary_ms) // 3600000 + 1
+            indices = await self._get_indices_for_time_range(max(1, age_hours))
+
+        events: list[dict[str, Any]] = []
+        while len(events) < max_events:
+            query: dict[str, Any] = {
+                "bool": {
+                    "filter": [
+                        {"range": {"@timestamp": {"gte": boundary_ms, "format": "epoch_millis"}}}
+                    ]
+                }
+            }
+            if boundary_ids:
+                query["bool"]["must_not"] = [{"ids": {"values": list(boundary_ids)}}]
+            body = {
+                "query": query,
+                "size": min(page_size, max_events - len(events)),
+                "track_total_hits": False,
+                # numeric_type keeps sort values in milliseconds for date_nanos fields too
+                "sort": [{"@timestamp": {"order": "asc", "numeric_type": "date"}}],
+            }
+            try:
+                response = await self._coalesced_search(index=",".join(indices), body=body)
+            except Exception as e:
+                logger.error("Event tail query failed", boundary=boundary_ms, error=str(e))
+                self._record_circuit_breaker_failure(e)
+                raise RuntimeError(f"Event tail query failed: {e!s}") from e
+
+            documents = response.get("hits", {}).get("hits", [])
+            for document in documents:
+                timestamp_ms = int(document["sort"][0])
+                if timestamp_ms != boundary_ms:
+                    boundary_ms = timestamp_ms
+                    boundary_ids = []
+                boundary_ids.append(document["_id"])
+            events.extend(self._parse_dshield_hits(documents, indices))
+            if len(documents) < body["size"]:
+                break
+
+        self._record_circuit_breaker_success()
+        logger.debug("Tailed DShield events", events=len(events), checkpoint=boundary_ms)
+        if not events and not checkpoint:
+            return events, None
+        return events, {"timestamp": boundary_ms, "ids": boundary_ids}
+
     async def query_dshield_attacks(
         self,
         time_range_hours: int = 24,
@@ -1540,11 +2944,9 @@ class ElasticsearchClient:
                 timeout=f"{self.timeout}s",
             )
 
-            attacks = []
-            for hit in response["hits"]["hits"]:
-                attack = self._parse_dshield_event(hit, ["dshield-attacks-*", "dshield-*"])
-                if attack:
-                    attacks.append(attack)
+            attacks = self._parse_dshield_hits(
+                response["hits"]["hits"], ["dshield-attacks-*", "dshield-*"]
+            )
 
             total_count = response["hits"]["total"]["value"]
 
@@ -1558,50 +2960,187 @@ class ElasticsearchClient:
 
             return attacks, total_count
 
-        except RequestError as e:
-            logger.error("Elasticsearch attack query error", error=str(e))
-            if self.error_handler:
-                return [], 0
-            raise
-        except Exception as e:
-            logger.error("Unexpected error during attack query", error=str(e))
-            if self.error_handler:
-                return [], 0
-            raise
+        except RequestError as e:
+            logger.error("Elasticsearch attack query error", error=str(e))
+            if self.error_handler:
+                return [], 0
+            raise
+        except Exception as e:
+            logger.error("Unexpected error during attack query", error=str(e))
+            if self.error_handler:
+                return [], 0
+            raise
+
+    async def query_dshield_reputation(
+        self,
+        ip_addresses: list[str] | None = None,
+        size: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """Query DShield reputation data for IP addresses.
+
+        Retrieves reputation and threat intelligence data for specific
+        IP addresses or all IPs in the DShield reputation database.
+
+        Args:
+            ip_addresses: List of IP addresses to query (default: all IPs)
+            size: Maximum number of results to return (default: 1000)
+
+        Returns:
+            List of reputation data dictionaries
+
+        Raises:
+            ConnectionError: If not connected to Elasticsearch
+            RequestError: If the query fails
+
+        """
+        filters = {}
+        if ip_addresses:
+            filters["source.ip"] = ip_addresses
+
+        events, _, _ = await self.query_dshield_events(
+            time_range_hours=24,
+            indices=["dshield-reputation-*", "dshield-*"],
+            filters=filters,
+            page_size=size,
+        )
+        return events
+
+    async def iter_composite_buckets(
+        self,
+        fields: str | list[str],
+        time_range_hours: int = 24,
+        indices: list[str] | None = None,
+        filters: dict[str, Any] | None = None,
+        page_size: int = 1000,
+        sub_aggregations: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over every bucket of a field breakdown with exact counts.
+
+        Pages through a ``composite`` aggregation with ``after_key``, so every
+        distinct value (source IP, port, ASN...) is visited once with its
+        exact document count, whatever the cardinality. Only one page of
+        buckets is held at a time.
+
+        Args:
+            fields: Field, or fields combined into one bucket key
+            time_range_hours: Time range in hours to query (default: 24)
+            indices: Specific indices to query (default: all DShield indices)
+            filters: Query filters to apply
+            page_size: Buckets per request (default: 1000)
+            sub_aggregations: Metric aggregations computed for every bucket
+
+        Yields:
+            Buckets with ``key`` (the field value, or a dict for several
+            fields), ``doc_count`` and one entry per sub-aggregation
+
+        Raises:
+            ValueError: If no field is given
+            RuntimeError: If a page request fails
+
+        """
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        if not field_list:
+            raise ValueError("At least one field is required")
+
+        if not self.client:
+            await self.connect()
+
+        if indices is None:
+            indices = await self._get_indices_for_time_range(time_range_hours)
+
+        query = self._build_events_query(time_range_hours, filters)
+        after_key = None
+        while True:
+            composite: dict[str, Any] = {
+                "size": page_size,
+                "sources": [{field: {"terms": {"field": field}}} for field in field_list],
+            }
+            if after_key is not None:
+                composite["after"] = after_key
+            aggregation: dict[str, Any] = {"composite": composite}
+            if sub_aggregations:
+                aggregation["aggs"] = sub_aggregations
+            body = {
+                "size": 0,
+                "track_total_hits": False,
+                "query": query,
+                "aggs": {"breakdown": aggregation},
+            }
+
+            try:
+                response = await self._coalesced_search(index=",".join(indices), body=body)
+            except Exception as e:
+                logger.error("Composite aggregation page failed", fields=field_list, error=str(e))
+                self._record_circuit_breaker_failure(e)
+                raise RuntimeError(f"Composite aggregation failed: {e!s}") from e
+            self._record_circuit_breaker_success()
+
+            result = response.get("aggregations", {}).get("breakdown", {})
+            buckets = result.get("buckets", [])
+            for bucket in buckets:
+                key = bucket["key"]
+                yield {
+                    "key": key[field_list[0]] if len(field_list) == 1 else key,
+                    "doc_count": bucket["doc_count"],
+                    **{name: bucket.get(name, {}) for name in sub_aggregations or {}},
+                }
+
+            after_key = result.get("after_key")
+            if after_key is None or len(buckets) < page_size:
+                return
 
-    async def query_dshield_reputation(
+    async def top_composite_buckets(
         self,
-        ip_addresses: list[str] | None = None,
-        size: int = 1000,
+        fields: str | list[str],
+        limit: int = 10,
+        time_range_hours: int = 24,
+        indices: list[str] | None = None,
+        filters: dict[str, Any] | None = None,
+        page_size: int = 1000,
+        sub_aggregations: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
-        """Query DShield reputation data for IP addresses.
+        """Rank the buckets of a field breakdown by exact document count.
 
-        Retrieves reputation and threat intelligence data for specific
-        IP addresses or all IPs in the DShield reputation database.
+        Streams :meth:`iter_composite_buckets` through a heap of ``limit``
+        buckets, so ranking millions of distinct values needs neither a huge
+        ``terms`` size nor memory beyond one page and the heap. Ties keep the
+        bucket with the lowest key.
 
         Args:
-            ip_addresses: List of IP addresses to query (default: all IPs)
-            size: Maximum number of results to return (default: 1000)
+            fields: Field, or fields combined into one bucket key
+            limit: Number of buckets to return
+            time_range_hours: Time range in hours to query (default: 24)
+            indices: Specific indices to query (default: all DShield indices)
+            filters: Query filters to apply
+            page_size: Buckets per request (default: 1000)
+            sub_aggregations: Metric aggregations computed for every bucket
 
         Returns:
-            List of reputation data dictionaries
-
-        Raises:
-            ConnectionError: If not connected to Elasticsearch
-            RequestError: If the query fails
+            Up to ``limit`` buckets, highest ``doc_count`` first
 
         """
-        filters = {}
-        if ip_addresses:
-            filters["source.ip"] = ip_addresses
+        if limit <= 0:
+            return []
 
-        events, _, _ = await self.query_dshield_events(
-            time_range_hours=24,
-            indices=["dshield-reputation-*", "dshield-*"],
+        heap: list[tuple[int, int, dict[str, Any]]] = []
+        position = 0
+        async for bucket in self.iter_composite_buckets(
+            fields,
+            time_range_hours=time_range_hours,
+            indices=indices,
             filters=filters,
-            page_size=size,
-        )
-        return events
+            page_size=page_size,
+            sub_aggregations=sub_aggregations,
+        ):
+            # Negated position: among equal counts the earliest key ranks higher
+            entry = (bucket["doc_count"], -position, bucket)
+            position += 1
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        return [bucket for _, _, bucket in sorted(heap, key=lambda e: e[:2], reverse=True)]
 
     async def query_dshield_top_attackers(
         self,
@@ -1610,28 +3149,80 @@ class ElasticsearchClient:
     ) -> list[dict[str, Any]]:
         """Query DShield top attackers data.
 
-        Retrieves the most active attacker IP addresses based on
-        attack frequency and severity within the specified time period.
+        Ranks every source IP seen in the time period by its exact number of
+        events with a plain :meth:`top_composite_buckets` pass, then computes
+        first/last seen and distinct destination ports for the ``limit``
+        winners only, in one ``terms`` request restricted to their IPs.
 
         Args:
             hours: Time range in hours to analyze (default: 24)
             limit: Maximum number of attackers to return (default: 100)
 
         Returns:
-            List of top attacker data dictionaries
+            List of attacker summaries (IP address, event count, first and
+            last seen, distinct destination ports), most active first
 
         Raises:
-            ConnectionError: If not connected to Elasticsearch
-            RequestError: If the query fails
+            RuntimeError: If an aggregation query fails
 
         """
-        events, _, _ = await self.query_dshield_events(
-            time_range_hours=hours,
-            indices=["dshield-top-*", "dshield-summary-*"],
-            filters={"event.type": "top_attacker"},
-            page_size=limit,
+        if not self.client:
+            await self.connect()
+        indices = await self._get_indices_for_time_range(hours)
+
+        buckets = await self.top_composite_buckets(
+            "source.ip", limit=limit, time_range_hours=hours, indices=indices
         )
-        return events
+        if not buckets:
+            return []
+
+        winners = [bucket["key"] for bucket in buckets]
+        body = {
+            "size": 0,
+            "track_total_hits": False,
+            "query": self._build_events_query(hours, None),
+            "aggs": {
+                "attackers": {
+                    "terms": {"field": "source.ip", "include": winners, "size": len(winners)},
+                    "aggs": ATTACKER_SUB_AGGREGATIONS,
+                }
+            },
+        }
+        try:
+            response = await self._coalesced_search(index=",".join(indices), body=body)
+        except Exception as e:
+            logger.error("Top attacker metrics query failed", attackers=len(winners), error=str(e))
+            self._record_circuit_breaker_failure(e)
+            raise RuntimeError(f"Top attacker metrics query failed: {e!s}") from e
+        self._record_circuit_breaker_success()
+
+        metrics = {
+            bucket["key"]: bucket
+            for bucket in response.get("aggregations", {}).get("attackers", {}).get("buckets", [])
+        }
+        return [
+            self._attacker_summary({**metrics.get(bucket["key"], {}), **bucket})
+            for bucket in buckets
+        ]
+
+    @staticmethod
+    def _attacker_summary(bucket: dict[str, Any]) -> dict[str, Any]:
+        """Convert a source IP bucket with attacker sub-aggregations to a summary.
+
+        Args:
+            bucket: Bucket with ``ATTACKER_SUB_AGGREGATIONS`` results
+
+        Returns:
+            Attacker summary dictionary
+
+        """
+        return {
+            "ip_address": bucket["key"],
+            "event_count": bucket["doc_count"],
+            "first_seen": bucket.get("first_seen", {}).get("value_as_string"),
+            "last_seen": bucket.get("last_seen", {}).get("value_as_string"),
+            "unique_ports": bucket.get("unique_ports", {}).get("value", 0),
+        }
 
     async def query_dshield_geographic_data(
         self,
@@ -1731,11 +3322,7 @@ class ElasticsearchClient:
 
         # Use DShield indices if available, otherwise fallback
         if indices is None:
-            available_indices = await self.get_available_indices()
-            if available_indices:
-                indices = available_indices
-            else:
-                indices = self.fallback_indices
+            indices = await self._get_indices_for_time_range(time_range_hours)
 
         # Calculate time range
         end_time = datetime.now(UTC)
@@ -1749,18 +3336,14 @@ class ElasticsearchClient:
         )
 
         try:
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=indices,
                 body=query,
                 size=self.max_results,
                 timeout=f"{self.timeout}s",
             )
 
-            events = []
-            for hit in response["hits"]["hits"]:
-                event = self._parse_dshield_event(hit, indices)
-                if event:
-                    events.append(event)
+            events = self._parse_dshield_hits(response["hits"]["hits"], indices)
 
             logger.info(
                 "IP events query completed",
@@ -1783,9 +3366,10 @@ class ElasticsearchClient:
     ) -> dict[str, Any]:
         """Get comprehensive DShield statistics and summary.
 
-        Retrieves aggregated statistics from multiple DShield data sources,
-        including event counts, top attackers, geographic distribution,
-        and other summary metrics.
+        All figures come from a single ``size: 0`` search whose aggregations
+        compute the top attackers, geographic and port distributions and an
+        hourly histogram, with ``track_total_hits`` for an exact event count.
+        No event documents are fetched.
 
         Args:
             time_range_hours: Time range in hours for statistics (default: 24)
@@ -1793,8 +3377,11 @@ class ElasticsearchClient:
         Returns:
             Dictionary containing comprehensive statistics including:
                 - total_events: Total number of events
+                - unique_attackers: Approximate number of distinct source IPs
                 - top_attackers: List of most active attackers
                 - geographic_distribution: Attack distribution by country
+                - port_distribution: Attack distribution by destination port
+                - hourly_distribution: Event counts per hour
                 - time_range_hours: Time range used for analysis
                 - timestamp: When the statistics were generated
                 - indices_queried: List of indices that were actually queried
@@ -1812,8 +3399,11 @@ class ElasticsearchClient:
                 logger.warning("No DShield indices available for statistics query")
                 return {
                     "total_events": 0,
+                    "unique_attackers": 0,
                     "top_attackers": [],
                     "geographic_distribution": {},
+                    "port_distribution": {},
+                    "hourly_distribution": [],
                     "time_range_hours": time_range_hours,
                     "timestamp": datetime.now(UTC).isoformat(),
                     "indices_queried": [],
@@ -1825,38 +3415,36 @@ class ElasticsearchClient:
                     },
                 }
 
+            available_indices = self._prune_indices(available_indices, time_range_hours)
+
             logger.info(
                 "Querying DShield statistics",
                 available_indices=available_indices,
                 time_range_hours=time_range_hours,
             )
 
-            # Query events using available indices
-            summary_events, total_count, _ = await self.query_dshield_events(
-                time_range_hours=time_range_hours,
-                indices=available_indices,
-                page_size=100,
+            # One round trip: totals and every distribution as aggregations
+            response = await self.execute_aggregation_query(
+                index=available_indices,
+                query=self._build_events_query(time_range_hours, None),
+                aggregation_query=self._build_statistics_aggregations(time_range_hours),
             )
+            response = getattr(response, "body", response)
+            if "error" in response and "aggregations" not in response:
+                raise RuntimeError(f"Statistics aggregation failed: {response['error']}")
 
-            # Query top attackers
-            top_attackers = await self.query_dshield_top_attackers(time_range_hours)
-
-            # Query geographic data
-            geo_data = await self.query_dshield_geographic_data()
-
-            # Compile statistics
+            total_count = response.get("hits", {}).get("total", {}).get("value", 0)
             stats = {
-                "total_events": total_count if total_count > 0 else len(summary_events),
-                "top_attackers": top_attackers[:10] if top_attackers else [],
-                "geographic_distribution": self._compile_geo_stats(geo_data) if geo_data else {},
+                "total_events": total_count,
+                **self._parse_statistics_aggregations(response.get("aggregations", {})),
                 "time_range_hours": time_range_hours,
                 "timestamp": datetime.now(UTC).isoformat(),
                 "indices_queried": available_indices,
                 "diagnostic_info": {
                     "status": "success",
                     "indices_found": len(available_indices),
-                    "events_retrieved": len(summary_events),
                     "total_count": total_count,
+                    "took_ms": response.get("took"),
                 },
             }
 
@@ -1876,8 +3464,11 @@ class ElasticsearchClient:
             # Return diagnostic information instead of empty dict
             return {
                 "total_events": 0,
+                "unique_attackers": 0,
                 "top_attackers": [],
                 "geographic_distribution": {},
+                "port_distribution": {},
+                "hourly_distribution": [],
                 "time_range_hours": time_range_hours,
                 "timestamp": datetime.now(UTC).isoformat(),
                 "indices_queried": [],
@@ -2021,8 +3612,68 @@ class ElasticsearchClient:
 
         return query
 
+    def _get_field_plan_cache(self, index: str | None = None) -> FieldPlanCache:
+        """Get the extraction plan cache for the current field mappings.
+
+        Hits from an index whose mapping the field resolver knows use the
+        candidate lists pruned to the mapped fields; other hits use the full
+        candidate lists. The cache is rebuilt whenever
+        ``dshield_field_mappings`` has been replaced since the plans were
+        compiled.
+
+        Args:
+            index: Index of the hit, if known
+
+        Returns:
+            FieldPlanCache bound to the current field mappings
+
+        """
+        resolver = self._compiled_field_resolver() if index is not None else None
+        if resolver is not None and resolver.covers(index):
+            cache = self._resolved_plan_cache
+            if cache is None or cache.field_mappings is not resolver.extraction_mappings:
+                cache = FieldPlanCache(resolver.extraction_mappings)
+                self._resolved_plan_cache = cache
+            return cache
+
+        cache = self._field_plan_cache
+        if cache is None or cache.field_mappings is not self.dshield_field_mappings:
+            cache = FieldPlanCache(self.dshield_field_mappings)
+            self._field_plan_cache = cache
+        return cache
+
+    def _parse_dshield_hits(
+        self,
+        hits: list[dict[str, Any]],
+        indices: list[str],
+        projection: str = "full",
+        batch: EventBatch | None = None,
+    ) -> list[dict[str, Any]]:
+        """Parse a page of Elasticsearch hits, dropping hits that fail to parse.
+
+        Args:
+            hits: Raw Elasticsearch hit documents
+            indices: List of indices the hits came from (for context)
+            projection: Event projection mode ('full' or 'lean')
+            batch: Optional EventBatch the parsed events are also appended
+                to, for columnar summaries over many pages
+
+        Returns:
+            List of standardized DShield event dictionaries
+
+        """
+        parse = self._parse_dshield_event
+        events = []
+        for hit in hits:
+            event = parse(hit, indices, projection)
+            if event:
+                events.append(event)
+        if batch is not None:
+            batch.extend(events)
+        return events
+
     def _parse_dshield_event(
-        self, hit: dict[str, Any], indices: list[str]
+        self, hit: dict[str, Any], indices: list[str], projection: str = "full"
     ) -> dict[str, Any] | None:
         """Parse Elasticsearch hit into standardized DShield event.
 
@@ -2030,9 +3681,14 @@ class ElasticsearchClient:
         DShield event format with proper field mapping and
         data normalization.
 
+        The ``full`` projection embeds the whole ``_source`` as ``raw_data``
+        and the queried ``indices``; the ``lean`` projection keeps only the
+        normalized fields and the hit's own ``index``.
+
         Args:
             hit: Raw Elasticsearch hit document
             indices: List of indices the hit came from (for context)
+            projection: Event projection mode ('full' or 'lean')
 
         Returns:
             Standardized DShield event dictionary or None if parsing fails
@@ -2044,15 +3700,26 @@ class ElasticsearchClient:
         """
         try:
             source = hit["_source"]
-            self.log_unmapped_fields(source)
 
             # Defensive: ensure source is a dict
             if not isinstance(source, dict):
                 logger.error("Elasticsearch hit _source is not a dict", hit=hit)
                 return None
 
+            if self.use_compiled_field_plans:
+                plan = self._get_field_plan_cache(hit.get("_index")).plan_for(source)
+
+                def extract(field_type: str, default: Any = None) -> Any:
+                    return plan.get(source, field_type, default)
+
+            else:
+                self.log_unmapped_fields(source)
+
+                def extract(field_type: str, default: Any = None) -> Any:
+                    return self._extract_field_mapped(source, field_type, default)
+
             # Extract timestamp using DShield field mappings
-            timestamp = self._extract_field_mapped(source, "timestamp")
+            timestamp = extract("timestamp")
             if isinstance(timestamp, str):
                 try:
                     timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
@@ -2065,25 +3732,25 @@ class ElasticsearchClient:
                 timestamp = datetime.now(UTC)
 
             # Extract IP addresses using DShield field mappings
-            source_ip = self._extract_field_mapped(source, "source_ip")
-            destination_ip = self._extract_field_mapped(source, "destination_ip")
+            source_ip = extract("source_ip")
+            destination_ip = extract("destination_ip")
 
             # Extract ports using DShield field mappings
-            source_port = self._extract_field_mapped(source, "source_port")
-            destination_port = self._extract_field_mapped(source, "destination_port")
+            source_port = extract("source_port")
+            destination_port = extract("destination_port")
 
             # Extract event information using DShield field mappings
-            event_type = self._extract_field_mapped(source, "event_type", "unknown")
-            event_category = self._extract_field_mapped(source, "category", "other")
-            severity = self._extract_field_mapped(source, "severity", "medium")
+            event_type = extract("event_type", "unknown")
+            event_category = extract("category", "other")
+            severity = extract("severity", "medium")
 
             # Extract HTTP fields for description derivation
-            http_method = self._extract_field_mapped(source, "http_method")
-            http_status = self._extract_field_mapped(source, "http_status")
-            user_agent = self._extract_field_mapped(source, "user_agent")
+            http_method = extract("http_method")
+            http_status = extract("http_status")
+            user_agent = extract("user_agent")
 
             # Extract description using DShield field mappings with better fallback
-            description = self._extract_field_mapped(source, "description")
+            description = extract("description")
 
             # Derive description from HTTP fields if not directly available
             if not description:
@@ -2098,11 +3765,11 @@ class ElasticsearchClient:
                     f"{destination_ip or 'unknown'}"
 
             # Extract protocol using DShield field mappings
-            protocol = self._extract_field_mapped(source, "protocol")
+            protocol = extract("protocol")
 
             # Derive protocol from HTTP fields if not directly available
             if not protocol:
-                http_version = self._extract_field_mapped(source, "http_version")
+                http_version = extract("http_version")
                 if http_version:
                     protocol = "http"
                 elif source_port == 443 or destination_port == 443:
@@ -2113,15 +3780,15 @@ class ElasticsearchClient:
                     protocol = "unknown"
 
             # Extract DShield-specific fields
-            country = self._extract_field_mapped(source, "country")
-            asn = self._extract_field_mapped(source, "asn")
-            organization = self._extract_field_mapped(source, "organization")
-            reputation_score = self._extract_field_mapped(source, "reputation_score")
-            attack_count = self._extract_field_mapped(source, "attack_count")
-            first_seen = self._extract_field_mapped(source, "first_seen")
-            last_seen = self._extract_field_mapped(source, "last_seen")
-            tags = self._extract_field_mapped(source, "tags", [])
-            attack_types = self._extract_field_mapped(source, "attack_types", [])
+            country = extract("country")
+            asn = extract("asn")
+            organization = extract("organization")
+            reputation_score = extract("reputation_score")
+            attack_count = extract("attack_count")
+            first_seen = extract("first_seen")
+            last_seen = extract("last_seen")
+            tags = extract("tags", [])
+            attack_types = extract("attack_types", [])
 
             # Ensure tags and attack_types are lists
             if not isinstance(tags, list):
@@ -2160,9 +3827,12 @@ class ElasticsearchClient:
                 "last_seen": last_seen,
                 "tags": tags,
                 "attack_types": attack_types,
-                "raw_data": source,
-                "indices": indices,
             }
+            if projection == "lean":
+                event["index"] = hit.get("_index")
+            else:
+                event["raw_data"] = source
+                event["indices"] = indices
 
             return event
         except TypeError as e:
@@ -2172,6 +3842,91 @@ class ElasticsearchClient:
             logger.warning("Failed to parse DShield event", hit_id=hit.get("_id"), error=str(e))
             return None
 
+    def _projection_source_fields(self) -> list[str]:
+        """Build the ``_source`` filter for lean event projection.
+
+        Includes every candidate field of the DShield field mappings, both as
+        given and under any parent object, so that the one-level nested lookup
+        done by the parser still finds its values.
+
+        Returns:
+            Sorted list of ``_source`` include patterns
+
+        """
+        candidates = {
+            candidate
+            for candidate_list in self.dshield_field_mappings.values()
+            for candidate in candidate_list
+        }
+        return sorted(candidates | {f"*.{candidate}" for candidate in candidates})
+
+    def _measure_projection(self, requested: bool) -> bool:
+        """Decide whether to measure the serialized size of a page.
+
+        Sampled measurements only feed the size estimator; they are reported
+        to the caller only when requested.
+
+        Args:
+            requested: Whether the caller asked for performance metrics
+
+        Returns:
+            True if requested or on one page in ``PROJECTION_METRICS_INTERVAL``
+
+        """
+        measure = requested or self._projection_pages % PROJECTION_METRICS_INTERVAL == 0
+        self._projection_pages += 1
+        return measure
+
+    def _projection_metrics(
+        self,
+        documents: list[dict[str, Any]],
+        events: list[dict[str, Any]],
+        indices: list[str],
+        projection: str,
+    ) -> dict[str, Any]:
+        """Measure serialized bytes per event for a page of results.
+
+        Reports the size of the returned events and what they would have
+        weighed with the full projection (``raw_data`` plus ``indices``); for
+        lean pages this is a lower bound since ``_source`` was already
+        filtered by Elasticsearch. Only the first ``PROJECTION_METRICS_SAMPLE``
+        events are serialized.
+
+        Args:
+            documents: Raw hits of the page
+            events: Parsed events of the page
+            indices: Indices the page was queried on
+            projection: Event projection mode the events were built with
+
+        Returns:
+            Dictionary with the projection mode and bytes per event
+
+        """
+        sample = events[:PROJECTION_METRICS_SAMPLE]
+        if not sample:
+            return {"projection": projection, "bytes_per_event": 0, "full_bytes_per_event": 0}
+
+        dumps = json_codec.dumps_bytes
+        returned = sum(len(dumps(event)) for event in sample)
+        if projection == "full":
+            full = returned
+        else:
+            sources = {hit.get("_id"): hit.get("_source", {}) for hit in documents}
+            indices_bytes = len(dumps(indices))
+            full = returned
+            for event in sample:
+                # Swap the lean "index" entry for the raw_data/indices pair
+                full += len(dumps(sources.get(event["id"], {})))
+                full += indices_bytes - len(dumps(event.get("index")))
+                full += len(',"raw_data":,"indices":') - len(',"index":')
+
+        return {
+            "projection": projection,
+            "bytes_per_event": returned // len(sample),
+            "full_bytes_per_event": full // len(sample),
+            "sampled_events": len(sample),
+        }
+
     def _extract_field_mapped(
         self, source: dict[str, Any], field_type: str, default: Any = None
     ) -> Any:
@@ -2249,6 +4004,73 @@ class ElasticsearchClient:
         if unmapped:
             logger.info("Unmapped fields detected in document", unmapped_fields=unmapped)
 
+    def _build_statistics_aggregations(
+        self, time_range_hours: int, top_attackers: int = 10
+    ) -> dict[str, Any]:
+        """Build the search body parts used by get_dshield_statistics.
+
+        Args:
+            time_range_hours: Time range in hours covered by the histogram
+            top_attackers: Number of top source IPs to return
+
+        Returns:
+            ``size``, ``track_total_hits`` and the aggregation definitions
+
+        """
+        return {
+            "size": 0,
+            "track_total_hits": True,
+            "aggs": {
+                "unique_attackers": {"cardinality": {"field": "source.ip"}},
+                "top_attackers": {
+                    "terms": {"field": "source.ip", "size": top_attackers},
+                    "aggs": ATTACKER_SUB_AGGREGATIONS,
+                },
+                "geographic_distribution": {
+                    "terms": {"field": "source.geo.country_name", "size": 50},
+                },
+                "port_distribution": {"terms": {"field": "destination.port", "size": 20}},
+                "hourly_distribution": {
+                    "date_histogram": {
+                        "field": "@timestamp",
+                        "fixed_interval": "1h",
+                        "min_doc_count": 0,
+                        "extended_bounds": {"min": f"now-{time_range_hours}h", "max": "now"},
+                    },
+                },
+            },
+        }
+
+    def _parse_statistics_aggregations(self, aggregations: dict[str, Any]) -> dict[str, Any]:
+        """Convert the statistics aggregations into the statistics fields.
+
+        Args:
+            aggregations: ``aggregations`` section of the statistics response
+
+        Returns:
+            Unique attackers, top attackers and the distributions
+
+        """
+
+        def buckets(name: str) -> list[dict[str, Any]]:
+            return aggregations.get(name, {}).get("buckets", [])
+
+        top_attackers = [self._attacker_summary(b) for b in buckets("top_attackers")]
+        return {
+            "unique_attackers": aggregations.get("unique_attackers", {}).get("value", 0),
+            "top_attackers": top_attackers,
+            "geographic_distribution": {
+                b["key"]: b["doc_count"] for b in buckets("geographic_distribution")
+            },
+            "port_distribution": {
+                str(b["key"]): b["doc_count"] for b in buckets("port_distribution")
+            },
+            "hourly_distribution": [
+                {"timestamp": b.get("key_as_string", b["key"]), "count": b["doc_count"]}
+                for b in buckets("hourly_distribution")
+            ],
+        }
+
     def _compile_geo_stats(self, geo_data: list[dict[str, Any]]) -> dict[str, int]:
         """Compile geographic statistics from geo data.
 
@@ -2461,7 +4283,9 @@ class ElasticsearchClient:
         This handles the mismatch between display fields (source_ip) and
         query fields (source.ip) as described in GitHub issue #17.
         Converts user-friendly field names to the proper Elasticsearch
-        Common Schema (ECS) field names for querying.
+        Common Schema (ECS) field names for querying. Once index mappings
+        are loaded, names resolve to the fields the indices actually map,
+        and text fields to their ``keyword`` sub-field.
 
         Args:
             filters: Dictionary containing user-friendly field names and values
@@ -2476,88 +4300,29 @@ class ElasticsearchClient:
         if not filters:
             return filters
 
-        field_mappings = {
-            # IP address fields
-            "source_ip": "source.ip",
-            "src_ip": "source.ip",
-            "sourceip": "source.ip",
-            "destination_ip": "destination.ip",
-            "dest_ip": "destination.ip",
-            "destinationip": "destination.ip",
-            "target_ip": "destination.ip",
-            # Port fields
-            "source_port": "source.port",
-            "src_port": "source.port",
-            "destination_port": "destination.port",
-            "dest_port": "destination.port",
-            "target_port": "destination.port",
-            # Event fields
-            "event_type": "event.type",
-            "eventtype": "event.type",
-            "event_category": "event.category",
-            "eventcategory": "event.category",
-            "event_kind": "event.kind",
-            "eventkind": "event.kind",
-            "event_outcome": "event.outcome",
-            "eventoutcome": "event.outcome",
-            # Network fields
-            "protocol": "network.protocol",
-            "network_protocol": "network.protocol",
-            "network_type": "network.type",
-            "networktype": "network.type",
-            "network_direction": "network.direction",
-            "networkdirection": "network.direction",
-            # HTTP fields
-            "http_method": "http.request.method",
-            "httpmethod": "http.request.method",
-            "http_status": "http.response.status_code",
-            "httpstatus": "http.response.status_code",
-            "http_version": "http.version",
-            "httpversion": "http.version",
-            # URL fields
-            "url": "url.original",
-            "url_original": "url.original",
-            "url_path": "url.path",
-            "urlpath": "url.path",
-            "url_query": "url.query",
-            "urlquery": "url.query",
-            # User agent fields
-            "user_agent": "user_agent.original",
-            "useragent": "user_agent.original",
-            "ua": "user_agent.original",
-            # Geographic fields
-            "source_country": "source.geo.country_name",
-            "sourcecountry": "source.geo.country_name",
-            "dest_country": "destination.geo.country_name",
-            "destcountry": "destination.geo.country_name",
-            "country": "source.geo.country_name",  # Default to source
-            # Timestamp fields
-            "timestamp": "@timestamp",
-            "time": "@timestamp",
-            "date": "@timestamp",
-            # Severity and description (common user expectations)
-            "severity": "event.severity",
-            "description": "event.description",
-            "message": "log.message",
-            "log_message": "log.message",
-        }
-
+        resolver = self._compiled_field_resolver()
         mapped_filters = {}
         unmapped_fields = []
 
         for key, value in filters.items():
-            mapped_key = field_mappings.get(key, key)
+            if resolver is not None:
+                mapped_key = resolver.resolve(key)
+                known = resolver.is_mapped(key)
+            else:
+                mapped_key = QUERY_FIELD_ALIASES.get(key, key)
+                known = key in QUERY_FIELD_ALIASES or "." in key
             if mapped_key != key:
                 logger.info(f"Field mapping: '{key}' -> '{mapped_key}'")
             mapped_filters[mapped_key] = value
 
             # Track unmapped fields for potential suggestions
-            if key not in field_mappings and "." not in key:
+            if not known:
                 unmapped_fields.append(key)
 
         # Log suggestions for unmapped fields
         if unmapped_fields:
-            logger.info(f"Unmapped fields detected: {unmapped_fields}")
+            suggestions = {field: self._get_field_suggestions(field) for field in unmapped_fields}
+            logger.info(f"Unmapped fields detected: {unmapped_fields}", suggestions=suggestions)
             logger.info(
                 "Consider using ECS dot notation (e.g., 'source.ip' instead of 'source_ip')"
             )
@@ -2569,7 +4334,8 @@ class ElasticsearchClient:
 
         Provides alternative field names when a user-friendly field name
         is not found in the mapping. This helps users understand the
-        correct ECS field names to use.
+        correct ECS field names to use. Fields of the loaded index mappings
+        come first.
 
         Args:
             field_name: The field name that needs alternatives
@@ -2578,7 +4344,8 @@ class ElasticsearchClient:
             List of suggested field name alternatives
 
         """
-        suggestions = []
+        resolver = self._compiled_field_resolver()
+        suggestions = resolver.suggestions(field_name) if resolver is not None else []
 
         # Common patterns
         if field_name.endswith("_ip"):
@@ -2614,69 +4381,7 @@ class ElasticsearchClient:
                 ]
             )
 
-        return suggestions
-
-    def _generate_session_key(self, event: dict[str, Any], session_fields: list[str]) -> str | None:
-        """Generate a session key from event data using specified session fields.
-
-        Creates a unique session identifier by combining values from
-        specified session fields. This is used for grouping related
-        events together in session-based streaming.
-
-        Args:
-            event: The event data dictionary
-            session_fields: List of fields to use for session grouping
-
-        Returns:
-            Session key string or None if no session fields are available
-
-        """
-        session_values = []
-
-        for field in session_fields:
-            value = event.get(field)
-            if value:
-                # Convert to string and clean up
-                if isinstance(value, list | dict):
-                    value = str(value)
-                session_values.append(f"{field}:{value}")
-
-        if session_values:
-            return "|".join(session_values)
-        return None
-
-    def _calculate_session_duration(
-        self, first_timestamp: str | None, last_timestamp: str | None
-    ) -> float | None:
-        """Calculate session duration in minutes.
-
-        Computes the duration between the first and last events in a session.
-        This is used for session analysis and reporting.
-
-        Args:
-            first_timestamp: First event timestamp in ISO format
-            last_timestamp: Last event timestamp in ISO format
-
-        Returns:
-            Duration in minutes or None if timestamps are invalid
-
-        Raises:
-            ValueError: If timestamp format is invalid
-
-        """
-        if not first_timestamp or not last_timestamp:
-            return None
-
-        try:
-            # Parse timestamps (assuming ISO format)
-            first_dt = datetime.fromisoformat(first_timestamp.replace("Z", "+00:00"))
-            last_dt = datetime.fromisoformat(last_timestamp.replace("Z", "+00:00"))
-
-            # Calculate duration in minutes
-            duration = (last_dt - first_dt).total_seconds() / 60
-            return round(duration, 2)
-        except (ValueError, TypeError):
-            return None
+        return list(dict.fromkeys(suggestions))
 
     async def stream_dshield_events_with_session_context(
         self,
@@ -2690,11 +4395,15 @@ class ElasticsearchClient:
         include_session_summary: bool = True,
         stream_id: str | None = None,
     ) -> tuple[list[dict[str, Any]], int, str | None, dict[str, Any]]:
-        """Stream DShield events with smart session-based chunking.
+        """Stream DShield events grouped into sessions.
 
-        Groups events by session context (e.g., source IP, user session, connection ID)
-        and ensures related events stay together in the same chunk. This is useful
-        for event correlation and analysis.
+        Elasticsearch sorts events by the session fields, then by
+        ``@timestamp``, so the events of a session arrive contiguously and
+        exactly ``chunk_size`` events are fetched per chunk. Events of one
+        key form a new session whenever they are more than
+        ``max_session_gap_minutes`` apart. A session still open at the end of
+        a chunk is carried in ``next_stream_id`` and continued by the next
+        chunk under the same ``session_id``; no event is skipped.
 
         Args:
             time_range_hours: Time range in hours to query (default: 24)
@@ -2707,11 +4416,12 @@ class ElasticsearchClient:
             max_session_gap_minutes: Maximum time gap within a session before starting
                 new session (default: 30)
             include_session_summary: Include session metadata in response (default: True)
-            stream_id: Resume streaming from specific point
+            stream_id: Stream ID returned by the previous chunk
 
         Returns:
             Tuple containing:
-                - List of event dictionaries for the current chunk
+                - List of event dictionaries for the current chunk, each with
+                  its ``session_id``
                 - Total count of available events
                 - Next stream ID for continuing the stream (None if complete)
                 - Session context information
@@ -2719,7 +4429,7 @@ class ElasticsearchClient:
         Raises:
             ConnectionError: If not connected to Elasticsearch
             RequestError: If the streaming query fails
-            ValueError: If parameters are invalid
+            ValueError: If stream_id was created with different session fields
 
         """
         if not self.client:
@@ -2728,7 +4438,7 @@ class ElasticsearchClient:
         # Initialize performance tracking
         performance_metrics = {
             "query_time_ms": 0,
-            "optimization_applied": ["session_chunking"],
+            "optimization_applied": ["server_side_session_sort"],
             "indices_scanned": 0,
             "total_documents_examined": 0,
             "query_complexity": "session_aware",
@@ -2742,11 +4452,7 @@ class ElasticsearchClient:
         try:
             # Determine indices to query
             if indices is None:
-                available_indices = await self.get_available_indices()
-                if available_indices:
-                    indices = available_indices
-                else:
-                    indices = self.fallback_indices
+                indices = await self._get_indices_for_time_range(time_range_hours)
             elif not indices:
                 indices = self.fallback_indices
 
@@ -2756,68 +4462,33 @@ class ElasticsearchClient:
             if session_fields is None:
                 session_fields = ["source.ip", "destination.ip", "user.name", "session.id"]
 
-            # Build query with time range
-            query = {
-                "bool": {
-                    "must": [
-                        {
-                            "range": {
-                                "@timestamp": {
-                                    "gte": f"now-{time_range_hours}h",
-                                    "lte": "now",
-                                },
-                            },
-                        },
-                    ],
-                },
-            }
-
-            # Add filters if provided
-            if filters:
-                mapped_filters = self._map_query_fields(filters)
-                for key, value in mapped_filters.items():
-                    if key == "@timestamp":
-                        query["bool"]["must"].append({"range": {"@timestamp": value}})
-                    elif isinstance(value, dict):
-                        for sub_key, sub_value in value.items():
-                            if sub_key == "eq":
-                                query["bool"]["must"].append({"term": {key: sub_value}})
-                            elif sub_key == "in":
-                                query["bool"]["must"].append({"terms": {key: sub_value}})
-                            elif sub_key == "gte":
-                                query["bool"]["must"].append({"range": {key: {"gte": sub_value}}})
-                            elif sub_key == "lte":
-                                query["bool"]["must"].append({"range": {key: {"lte": sub_value}}})
-                    else:
-                        query["bool"]["must"].append({"term": {key: value}})
+            state = decode_session_cursor(stream_id) if stream_id else None
+            if stream_id and state is None:
+                logger.warning(f"Invalid stream_id format: {stream_id}. Starting from beginning.")
+            if state is not None and state.get("session_fields") != session_fields:
+                raise ValueError("stream_id was created with different session_fields")
 
-            # Build search body with session-aware sorting
+            size = min(chunk_size, 1000)
             search_body = {
-                "query": query,
-                "size": min(chunk_size * 2, 2000),  # Get more events to group by session
+                "query": self._build_events_query(time_range_hours, filters),
+                "size": size,
                 "sort": [
-                    {"@timestamp": {"order": "desc"}},
-                    {"_id": {"order": "desc"}},
+                    *(
+                        {field: {"order": "asc", "missing": "_last", "unmapped_type": "keyword"}}
+                        for field in session_fields
+                    ),
+                    {"@timestamp": {"order": "asc"}},
+                    {"_id": {"order": "asc"}},
                 ],
             }
-
-            # Add field selection if specified
             if fields:
                 search_body["_source"] = fields
-
-            # Add search_after for cursor-based pagination
-            if stream_id:
-                try:
-                    timestamp_val, id_val = stream_id.split("|")
-                    search_body["search_after"] = [timestamp_val, id_val]
-                except (ValueError, AttributeError):
-                    logger.warning(
-                        f"Invalid stream_id format: {stream_id}. Starting from beginning."
-                    )
+            if state is not None:
+                search_body["search_after"] = state["search_after"]
 
             # Execute search with timing
             query_start = datetime.now()
-            response = await self.client.search(
+            response = await self._coalesced_search(
                 index=",".join(indices),
                 body=search_body,
             )
@@ -2836,122 +4507,73 @@ class ElasticsearchClient:
             hits = response.get("hits", {})
             total_count = hits.get("total", {}).get("value", 0)
             documents = hits.get("hits", [])
+            performance_metrics["total_documents_examined"] = len(documents)
 
-            # Track documents examined
-            performance_metrics["total_documents_examined"] = total_count
+            open_session = (
+                Session.from_state(state["open_session"])
+                if state is not None and state.get("open_session")
+                else None
+            )
+            sessionizer = Sessionizer(max_session_gap_minutes, open_session)
+            key_count = len(session_fields)
 
-            # Parse events and group by session
             events = []
-            session_groups: dict[str, list[dict[str, Any]]] = {}
-            session_context = {
-                "session_fields": session_fields,
-                "max_session_gap_minutes": max_session_gap_minutes,
-                "sessions_in_chunk": 0,
-                "session_summaries": [],
-            }
-
             for doc in documents:
                 event = self._parse_dshield_event(doc, indices)
-                if event:
-                    # Generate session key
-                    session_key = self._generate_session_key(event, session_fields)
-
-                    if session_key:
-                        if session_key not in session_groups:
-                            session_groups[session_key] = {
-                                "events": [],
-                                "first_timestamp": None,
-                                "last_timestamp": None,
-                                "session_metadata": {},
-                            }
-
-                        session_groups[session_key]["events"].append(event)
-
-                        # Track session timestamps
-                        timestamp = event.get("@timestamp")
-                        if timestamp:
-                            if not session_groups[session_key]["first_timestamp"]:
-                                session_groups[session_key]["first_timestamp"] = timestamp
-                            session_groups[session_key]["last_timestamp"] = timestamp
-
-                        # Extract session metadata
-                        for field in session_fields:
-                            if field in event:
-                                session_groups[session_key]["session_metadata"][field] = event[
-                                    field
-                                ]
-                    else:
-                        # Events without session context go to a default group
-                        if "no_session" not in session_groups:
-                            session_groups["no_session"] = {
-                                "events": [],
-                                "first_timestamp": None,
-                                "last_timestamp": None,
-                                "session_metadata": {"type": "no_session"},
-                            }
-                        session_groups["no_session"]["events"].append(event)
-
-            # Sort sessions by timestamp and create smart chunks
-            sorted_sessions = sorted(
-                session_groups.items(),
-                key=lambda x: x[1]["last_timestamp"] or "1970-01-01",
-                reverse=True,
-            )
-
-            # Build final event list with session-aware chunking
-            current_chunk_size = 0
-            sessions_in_chunk = 0
-
-            for session_key, session_data in sorted_sessions:
-                session_events = session_data["events"]
-
-                # Check if adding this session would exceed chunk size
-                if current_chunk_size + len(session_events) > chunk_size and current_chunk_size > 0:
-                    # Start new chunk
-                    break
+                if not event:
+                    continue
+                sort_values = doc.get("sort") or [None] * (key_count + 1)
+                key_values = sort_values[:key_count]
+                metadata = {
+                    name: value
+                    for name, value in zip(session_fields, key_values, strict=False)
+                    if value is not None
+                } or {"type": NO_SESSION_KEY}
+                session = sessionizer.add(
+                    session_key(session_fields, key_values), sort_values[key_count], metadata
+                )
+                event["session_id"] = session.session_id
+                events.append(event)
 
-                # Add session events to current chunk
-                events.extend(session_events)
-                current_chunk_size += len(session_events)
-                sessions_in_chunk += 1
-
-                # Add session summary if requested
-                if include_session_summary:
-                    session_summary = {
-                        "session_key": session_key,
-                        "event_count": len(session_events),
-                        "first_timestamp": session_data["first_timestamp"],
-                        "last_timestamp": session_data["last_timestamp"],
-                        "duration_minutes": self._calculate_session_duration(
-                            session_data["first_timestamp"],
-                            session_data["last_timestamp"],
+            # A short chunk is the end of the stream
+            stream_complete = len(documents) < size
+            next_stream_id = None
+            if not stream_complete:
+                next_stream_id = encode_session_cursor(
+                    {
+                        "search_after": documents[-1].get("sort", []),
+                        "session_fields": session_fields,
+                        "open_session": (
+                            sessionizer.current.to_state() if sessionizer.current else None
                         ),
-                        "metadata": session_data["session_metadata"],
                     }
-                    session_context["session_summaries"].append(session_summary)
+                )
 
-            session_context["sessions_in_chunk"] = sessions_in_chunk
-            performance_metrics["sessions_processed"] = len(session_groups)
+            session_context = {
+                "session_fields": session_fields,
+                "max_session_gap_minutes": max_session_gap_minutes,
+                "sessions_in_chunk": len(sessionizer.sessions),
+                "session_summaries": (
+                    sessionizer.summaries(stream_complete) if include_session_summary else []
+                ),
+                "open_session_id": (
+                    sessionizer.current.session_id
+                    if sessionizer.current and not stream_complete
+                    else None
+                ),
+            }
+            performance_metrics["sessions_processed"] = len(sessionizer.sessions)
             performance_metrics["session_chunks_created"] = 1
 
-            # Generate next stream_id for cursor-based pagination
-            next_stream_id = None
-            if documents:
-                last_hit = documents[-1]
-                sort_values = last_hit.get("sort", [])
-                if len(sort_values) >= 2:
-                    next_stream_id = f"{sort_values[0]}|{sort_values[1]}"
-
             # Add performance metrics to session context
             session_context["performance_metrics"] = performance_metrics
 
             logger.info(
-                f"Streamed {len(events)} events in {sessions_in_chunk} sessions from "
+                f"Streamed {len(events)} events in {len(sessionizer.sessions)} sessions from "
                 f"{len(indices)} indices",
                 total_count=total_count,
                 chunk_size=chunk_size,
                 stream_id=stream_id,
-                sessions_processed=len(session_groups),
                 query_time_ms=performance_metrics["query_time_ms"],
             )
 
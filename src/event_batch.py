@@ -0,0 +1,458 @@
+"""Columnar event batches for DShield analytics.
+
+Summaries over parsed DShield events used to walk the full list of event
+dictionaries once per statistic, with ``isinstance`` checks on every value.
+:class:`EventBatch` stores the same events column by column instead: string
+like fields are dictionary-encoded into integer code arrays and numeric
+fields are kept as float arrays. Every event is converted exactly once, when
+it is appended, and every statistic afterwards is a vectorised NumPy
+operation over a column (``bincount`` for group-bys, masks for filters).
+
+Example:
+    >>> from src.event_batch import EventBatch
+    >>> batch = EventBatch.from_events(events)
+    >>> batch.country.most_common(10)
+    [('US', 120), ('CN', 87), ...]
+
+"""
+
+import math
+from array import array
+from collections.abc import Hashable, Iterable
+from datetime import datetime
+from itertools import islice
+from typing import Any
+
+import numpy as np
+
+
+def _hashable(value: Any) -> Hashable:
+    """Return a hashable form of an event value.
+
+    Lists and dicts are converted to their string representation, matching
+    how DataProcessor has always counted unhashable values.
+
+    Args:
+        value: Raw event value
+
+    Returns:
+        The value itself, or its string representation if unhashable
+
+    """
+    return str(value) if isinstance(value, list | dict) else value
+
+
+def _hour_bucket(timestamp: Any) -> str | None:
+    """Return the hourly timeline bucket of an event timestamp.
+
+    Calendar ISO-8601 strings are validated by parsing and then bucketed by
+    slicing, which avoids a ``strftime`` per event.
+
+    Args:
+        timestamp: ISO-8601 string or datetime
+
+    Returns:
+        Bucket label formatted as ``YYYY-MM-DD HH:00``, or None if the
+        timestamp is missing or cannot be parsed
+
+    """
+    if not timestamp:
+        return None
+    try:
+        if isinstance(timestamp, str):
+            parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+            if (
+                len(timestamp) >= 13
+                and timestamp[4] == "-"
+                and timestamp[7] == "-"
+                and timestamp[10] in "T "
+            ):
+                return f"{timestamp[:10]} {timestamp[11:13]}:00"
+            timestamp = parsed
+        return timestamp.strftime("%Y-%m-%d %H:00")
+    except Exception:
+        return None
+
+
+def _to_float(value: Any) -> float:
+    """Convert a numeric event value to float, using NaN for missing values.
+
+    Args:
+        value: Raw event value
+
+    Returns:
+        Float value, or NaN if the value is None or not numeric
+
+    """
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _text(value: Any) -> Any:
+    """Return a hashable form of a free-text field (lists joined by spaces).
+
+    Args:
+        value: Description or event type value
+
+    Returns:
+        The value itself, or a joined/stringified form if unhashable
+
+    """
+    if isinstance(value, list):
+        return " ".join(map(str, value))
+    return str(value) if isinstance(value, dict) else value
+
+
+# Key under which a column without keep_empty files all falsy values
+_EMPTY = object()
+
+
+class DictionaryColumn:
+    """Dictionary-encoded column of hashable values.
+
+    Each distinct value is stored once in :attr:`values`; rows hold the
+    integer code of their value, or -1 when the row has no value. Codes are
+    assigned in order of first appearance, so value counts come out in the
+    same order as a ``Counter`` fed the rows one by one.
+    """
+
+    MISSING = -1
+
+    def __init__(self, keep_empty: bool = False) -> None:
+        """Initialize an empty column.
+
+        Args:
+            keep_empty: Store falsy values (None, "", 0) as regular values
+                instead of treating them as missing
+
+        """
+        self.keep_empty = keep_empty
+        self.values: list[Hashable] = []
+        # Falsy values all map to MISSING through the _EMPTY key
+        self._codes_by_value: dict[Hashable, int] = {} if keep_empty else {_EMPTY: self.MISSING}
+        self._codes = array("q")
+
+    def __len__(self) -> int:
+        """Return the number of rows in the column."""
+        return len(self._codes)
+
+    def append(self, value: Any) -> None:
+        """Append one row.
+
+        Args:
+            value: Raw event value; falsy values are missing unless
+                ``keep_empty`` was set
+
+        """
+        self.extend((value,))
+
+    def extend(self, values: Iterable[Any]) -> None:
+        """Append several rows.
+
+        New values are assigned codes in order of first appearance. Lists
+        and dicts are stored by their string representation.
+
+        Args:
+            values: Raw event values; falsy values are missing unless
+                ``keep_empty`` was set
+
+        """
+        if not isinstance(values, list | tuple):
+            values = list(values)
+        if not self.keep_empty:
+            values = [value if value else _EMPTY for value in values]
+
+        index = self._codes_by_value
+        offset = 0 if self.keep_empty else 1
+        try:
+            distinct = dict.fromkeys(values)
+        except TypeError:
+            values = [_hashable(value) for value in values]
+            distinct = dict.fromkeys(values)
+        for value in distinct:
+            if value not in index:
+                index[value] = len(index) - offset
+        codes = map(index.__getitem__, values)
+
+        self.values.extend(islice(index, len(self.values) + offset, None))
+        self._codes.extend(codes)
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Return the row codes as a NumPy array (a copy)."""
+        return np.frombuffer(self._codes, dtype=np.int64).copy()
+
+    def code_of(self, value: Any) -> int:
+        """Return the code of a value, or MISSING if it never occurred.
+
+        Args:
+            value: Value to look up
+
+        Returns:
+            Integer code of the value
+
+        """
+        return self._codes_by_value.get(_hashable(value), self.MISSING)
+
+    def mask(self, *values: Any) -> np.ndarray:
+        """Return a boolean row mask selecting rows equal to any of ``values``.
+
+        Args:
+            *values: Values to select
+
+        Returns:
+            Boolean NumPy array with one entry per row
+
+        """
+        wanted = [code for code in map(self.code_of, values) if code != self.MISSING]
+        return np.isin(self.codes, wanted)
+
+    def counts(self, mask: np.ndarray | None = None) -> np.ndarray:
+        """Count rows per distinct value.
+
+        Args:
+            mask: Optional boolean row mask restricting the rows counted
+
+        Returns:
+            Array of counts indexed by value code
+
+        """
+        codes = self.codes
+        if mask is not None:
+            codes = codes[mask]
+        codes = codes[codes != self.MISSING]
+        return np.bincount(codes, minlength=len(self.values))
+
+    def value_counts(self, mask: np.ndarray | None = None) -> dict[Hashable, int]:
+        """Count rows per value.
+
+        Args:
+            mask: Optional boolean row mask restricting the rows counted
+
+        Returns:
+            Dictionary of value to count, in first-appearance order, without
+            values that have no rows
+
+        """
+        counts = self.counts(mask)
+        return {
+            self.values[code]: int(counts[code]) for code in np.flatnonzero(counts)
+        }
+
+    def most_common(
+        self, n: int, mask: np.ndarray | None = None
+    ) -> list[tuple[Hashable, int]]:
+        """Return the ``n`` most frequent values.
+
+        Ties are broken by first appearance, like ``Counter.most_common``.
+
+        Args:
+            n: Number of values to return
+            mask: Optional boolean row mask restricting the rows counted
+
+        Returns:
+            List of (value, count) tuples in descending count order
+
+        """
+        counts = self.counts(mask)
+        order = np.argsort(-counts, kind="stable")[:n]
+        return [(self.values[code], int(counts[code])) for code in order if counts[code]]
+
+    def nunique(self, mask: np.ndarray | None = None) -> int:
+        """Count the distinct values present.
+
+        Args:
+            mask: Optional boolean row mask restricting the rows considered
+
+        Returns:
+            Number of distinct values
+
+        """
+        return int(np.count_nonzero(self.counts(mask)))
+
+    def unique(self, mask: np.ndarray | None = None) -> list[Hashable]:
+        """Return the distinct values present, in first-appearance order.
+
+        Args:
+            mask: Optional boolean row mask restricting the rows considered
+
+        Returns:
+            List of distinct values
+
+        """
+        return [self.values[code] for code in np.flatnonzero(self.counts(mask))]
+
+
+class NumericColumn:
+    """Float column with NaN for missing values."""
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self._values = array("d")
+
+    def __len__(self) -> int:
+        """Return the number of rows in the column."""
+        return len(self._values)
+
+    def append(self, value: Any) -> None:
+        """Append one row.
+
+        Args:
+            value: Raw event value; None and non-numeric values become NaN
+
+        """
+        self._values.append(_to_float(value))
+
+    def extend(self, values: Iterable[Any]) -> None:
+        """Append several rows.
+
+        Args:
+            values: Raw event values; None and non-numeric values become NaN
+
+        """
+        values = values if isinstance(values, list) else list(values)
+        try:
+            converted = np.array(values, dtype=np.float64)
+            if converted.ndim != 1:
+                raise ValueError("nested values")
+        except (TypeError, ValueError):
+            converted = np.fromiter(map(_to_float, values), dtype=np.float64, count=len(values))
+        self._values.frombytes(converted.tobytes())
+
+    @property
+    def values(self) -> np.ndarray:
+        """Return the column as a NumPy float array (a copy)."""
+        return np.frombuffer(self._values, dtype=np.float64).copy()
+
+
+class EventBatch:
+    """Columnar container for parsed DShield events.
+
+    Columns are filled by :meth:`extend` (or :meth:`append`) and then queried
+    with vectorised operations. The event dictionaries themselves are not
+    kept.
+
+    Attributes:
+        source_ip: Source IPs (as strings)
+        destination_ip: Destination IPs (as strings)
+        country: Source country
+        destination_port: Destination port
+        protocol: Network protocol
+        asn: Autonomous system number
+        organization: Source organization
+        event_type: Event type
+        severity: Severity (``"medium"`` when the key is absent)
+        category: Category (``"other"`` when the key is absent)
+        hour: Hourly timeline bucket of the event timestamp
+        pattern_text: (description, event_type) pairs used for attack pattern
+            detection; list values are joined with spaces
+        reputation_score: Reputation score (NaN when missing)
+        attack_count: Attack count (NaN when missing)
+        indices: Names of the indices the events came from
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty batch."""
+        self.source_ip = DictionaryColumn()
+        self.destination_ip = DictionaryColumn()
+        self.country = DictionaryColumn()
+        self.destination_port = DictionaryColumn()
+        self.protocol = DictionaryColumn()
+        self.asn = DictionaryColumn()
+        self.organization = DictionaryColumn()
+        self.event_type = DictionaryColumn()
+        self.severity = DictionaryColumn(keep_empty=True)
+        self.category = DictionaryColumn(keep_empty=True)
+        self.hour = DictionaryColumn()
+        self.pattern_text = DictionaryColumn(keep_empty=True)
+        self.reputation_score = NumericColumn()
+        self.attack_count = NumericColumn()
+        self.indices: set[str] = set()
+
+    @classmethod
+    def from_events(cls, events: Iterable[dict[str, Any]]) -> "EventBatch":
+        """Build a batch from event dictionaries.
+
+        Args:
+            events: Parsed DShield events
+
+        Returns:
+            New EventBatch holding the events
+
+        """
+        batch = cls()
+        batch.extend(events)
+        return batch
+
+    def __len__(self) -> int:
+        """Return the number of events in the batch."""
+        return len(self.severity)
+
+    def extend(self, events: Iterable[dict[str, Any]]) -> None:
+        """Append several events, filling each column in one pass over them.
+
+        Args:
+            events: Parsed DShield events
+
+        """
+        events = events if isinstance(events, list) else list(events)
+        if not events:
+            return
+
+        def column(key: str, default: Any = None) -> list[Any]:
+            return [event.get(key, default) for event in events]
+
+        self.source_ip.extend([str(ip) if ip else None for ip in column("source_ip")])
+        self.destination_ip.extend(
+            [str(ip) if ip else None for ip in column("destination_ip")]
+        )
+        self.country.extend(column("country"))
+        self.destination_port.extend(column("destination_port"))
+        self.protocol.extend(column("protocol"))
+        self.asn.extend(column("asn"))
+        self.organization.extend(column("organization"))
+        event_types = column("event_type", "")
+        self.event_type.extend(event_types)
+        self.severity.extend(column("severity", "medium"))
+        self.category.extend(column("category", "other"))
+        timestamps = column("timestamp")
+        try:
+            buckets = {timestamp: _hour_bucket(timestamp) for timestamp in set(timestamps)}
+            self.hour.extend(map(buckets.__getitem__, timestamps))
+        except TypeError:
+            self.hour.extend([_hour_bucket(timestamp) for timestamp in timestamps])
+        pairs = list(zip(column("description", ""), event_types, strict=True))
+        try:
+            self.pattern_text.extend(pairs)
+        except TypeError:
+            self.pattern_text.extend([(_text(text), _text(kind)) for text, kind in pairs])
+        self.reputation_score.extend(column("reputation_score"))
+        self.attack_count.extend(column("attack_count"))
+
+        # Events of one page usually share the same indices list object
+        seen: set[int] = set()
+        for event in events:
+            indices = event.get("indices")
+            if indices is None:
+                if event.get("index"):
+                    self.indices.add(str(event["index"]))
+            elif id(indices) not in seen:
+                seen.add(id(indices))
+                if isinstance(indices, list):
+                    self.indices.update(map(str, indices))
+                else:
+                    self.indices.add(str(indices))
+
+    def append(self, event: dict[str, Any]) -> None:
+        """Append one event, encoding each field into its column.
+
+        Args:
+            event: Parsed DShield event dictionary
+
+        """
+        self.extend([event])
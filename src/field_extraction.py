@@ -0,0 +1,225 @@
+"""Compiled field-extraction plans for DShield event parsing.
+
+The Elasticsearch client maps logical DShield fields (``source_ip``,
+``event_type``...) onto whichever physical field a document actually carries.
+Resolving that mapping from scratch for every field of every hit means
+walking the full candidate list, re-splitting dotted names and scanning every
+nested dict. Documents from the same index almost always share the same
+structure, so this module compiles the resolution once per document *shape*
+and reuses it for every later hit with that shape.
+
+A shape is the document's top-level key set together with the key set of
+every directly nested dict. Given a shape, each candidate lookup from the
+field mappings can be decided up front: lookups that cannot possibly match
+are dropped and the survivors are stored as pre-split key paths. Extraction
+then only touches keys that are known to exist.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+KeyPath = tuple[str, ...]
+DocumentShape = tuple[tuple[str, tuple[str, ...] | None], ...]
+
+
+def document_shape(source: dict[str, Any]) -> DocumentShape:
+    """Compute the structural shape of a document.
+
+    Args:
+        source: Elasticsearch ``_source`` dictionary
+
+    Returns:
+        Hashable tuple describing the top-level keys and, for nested dicts,
+        their own key sets (in document order)
+
+    """
+    return tuple(
+        (key, tuple(value) if isinstance(value, dict) else None) for key, value in source.items()
+    )
+
+
+def _resolve(source: dict[str, Any], paths: tuple[KeyPath, ...]) -> Any:
+    """Return the first non-None value reachable through ``paths``.
+
+    Args:
+        source: Document to read from
+        paths: Candidate key paths in priority order
+
+    Returns:
+        The first non-None value found, or None
+
+    """
+    for path in paths:
+        value: Any = source
+        for part in path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(part)
+            if value is None:
+                break
+        if value is not None:
+            return value
+    return None
+
+
+class FieldExtractionPlan:
+    """Pre-resolved accessors for every logical field of one document shape."""
+
+    def __init__(
+        self, shape: DocumentShape, field_mappings: dict[str, list[str]]
+    ) -> None:
+        """Compile accessors for a document shape.
+
+        The candidate order mirrors ``ElasticsearchClient._extract_field_mapped``
+        exactly: for each candidate, a literal key match and then a dotted
+        path walk; after all candidates, a one-level-deep scan of nested dicts.
+
+        Args:
+            shape: Shape of the documents this plan will be applied to
+            field_mappings: Logical field name to candidate field list mapping
+
+        """
+        self.shape = shape
+        nested_keys = {key: set(children) for key, children in shape if children is not None}
+        top_level = {key for key, _ in shape}
+
+        self.accessors: dict[str, tuple[KeyPath, ...]] = {}
+        for field_type, candidates in field_mappings.items():
+            paths: list[KeyPath] = []
+            for candidate in candidates:
+                if candidate in top_level:
+                    paths.append((candidate,))
+                if "." in candidate:
+                    parts = tuple(candidate.split("."))
+                    if self._path_possible(parts, top_level, nested_keys):
+                        paths.append(parts)
+            for key, children in nested_keys.items():
+                for candidate in candidates:
+                    if candidate in children:
+                        paths.append((key, candidate))
+            self.accessors[field_type] = tuple(paths)
+
+    @staticmethod
+    def _path_possible(
+        parts: KeyPath, top_level: set[str], nested_keys: dict[str, set[str]]
+    ) -> bool:
+        """Check whether a dotted path can match a document of this shape.
+
+        Only the first two levels are known from the shape; deeper levels are
+        checked at extraction time.
+
+        Args:
+            parts: Pre-split dotted field name
+            top_level: Top-level keys of the shape
+            nested_keys: Key sets of the nested dicts of the shape
+
+        Returns:
+            True if the path may resolve to a value
+
+        """
+        if parts[0] not in top_level:
+            return False
+        if parts[0] not in nested_keys:
+            return False
+        return parts[1] in nested_keys[parts[0]]
+
+    def get(self, source: dict[str, Any], field_type: str, default: Any = None) -> Any:
+        """Extract a logical field from a document of this plan's shape.
+
+        Args:
+            source: Document with the same shape the plan was compiled for
+            field_type: Logical DShield field type to extract
+            default: Value returned when no candidate field holds a value
+
+        Returns:
+            The extracted value if found, otherwise ``default``
+
+        """
+        paths = self.accessors.get(field_type)
+        if not paths:
+            return default
+        value = _resolve(source, paths)
+        return default if value is None else value
+
+
+class FieldPlanCache:
+    """Cache of compiled extraction plans keyed by document shape.
+
+    The cache is bound to one field-mapping table; callers should build a new
+    cache when the mapping changes. It is bounded so that a stream of
+    heterogeneous documents cannot grow it without limit.
+    """
+
+    def __init__(self, field_mappings: dict[str, list[str]], max_shapes: int = 256) -> None:
+        """Initialize the plan cache.
+
+        Args:
+            field_mappings: Logical field name to candidate field list mapping
+            max_shapes: Maximum number of distinct shapes kept before the cache
+                is reset
+
+        """
+        self.field_mappings = field_mappings
+        self.max_shapes = max_shapes
+        self._plans: dict[DocumentShape, FieldExtractionPlan] = {}
+        self._mapped_fields: set[str] = set()
+        for candidates in field_mappings.values():
+            self._mapped_fields.update(candidates)
+        self.hits = 0
+        self.misses = 0
+
+    def plan_for(self, source: dict[str, Any]) -> FieldExtractionPlan:
+        """Return the compiled plan for a document, compiling it on first sight.
+
+        Unmapped top-level fields are logged once per new shape rather than once
+        per document.
+
+        Args:
+            source: Elasticsearch ``_source`` dictionary
+
+        Returns:
+            Extraction plan for the document's shape
+
+        """
+        shape = document_shape(source)
+        plan = self._plans.get(shape)
+        if plan is not None:
+            self.hits += 1
+            return plan
+
+        self.misses += 1
+        if len(self._plans) >= self.max_shapes:
+            self._plans.clear()
+        plan = FieldExtractionPlan(shape, self.field_mappings)
+        self._plans[shape] = plan
+
+        unmapped = self.unmapped_fields(key for key, _ in shape)
+        if unmapped:
+            logger.info("Unmapped fields detected in document", unmapped_fields=unmapped)
+        return plan
+
+    def unmapped_fields(self, keys: Iterable[str]) -> list[str]:
+        """Return the keys that are not a candidate of any logical field.
+
+        Args:
+            keys: Top-level document keys
+
+        Returns:
+            List of unmapped keys in input order
+
+        """
+        return [key for key in keys if key not in self._mapped_fields]
+
+    def get_stats(self) -> dict[str, int]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with the number of cached shapes, hits and misses
+
+        """
+        return {"shapes": len(self._plans), "hits": self.hits, "misses": self.misses}
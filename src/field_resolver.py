@@ -0,0 +1,258 @@
+"""Mapping-aware resolution of logical DShield fields to physical fields.
+
+The client knows each logical field (``source_ip``, ``event_type``...) only
+as a list of candidate names, and user filters only as friendly aliases, so
+queries and the parser both guess which names a cluster really uses.
+:class:`FieldResolver` reads the actual index mappings instead, once per
+index, and compiles two tables from them:
+
+* a query table from every alias, logical name and candidate to the physical
+  field to query. Text fields resolve to their ``keyword`` sub-field so that
+  ``term`` filters match exactly instead of probing an analyzed field;
+* extraction mappings for the parser, in which every logical field only
+  keeps the candidates that exist in the mapped indices.
+
+Lookups in both tables are plain dictionary reads. Indices whose mapping may
+not list every ``_source`` field (``dynamic: false``, runtime mappings or
+disabled objects) disable candidate pruning, since their documents can carry
+fields the mapping does not show.
+"""
+
+import difflib
+from collections.abc import Iterable
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_TEXT_TYPES = frozenset({"text", "match_only_text"})
+_OBJECT_TYPES = frozenset({"object", "nested"})
+
+
+class IndexFields:
+    """Fields of one index, flattened from its mapping."""
+
+    def __init__(self, mapping: dict[str, Any]) -> None:
+        """Flatten an index mapping.
+
+        Args:
+            mapping: ``mappings`` section of a ``get_mapping`` response entry
+
+        """
+        self.fields: dict[str, str] = {}
+        self.objects: set[str] = set()
+        self.keyword_subfields: dict[str, str] = {}
+        self.complete = mapping.get("dynamic", True) in (True, "true", "strict")
+        self._flatten(mapping.get("properties", {}), "")
+        runtime = mapping.get("runtime", {})
+        if runtime:
+            self.complete = False
+            for name, spec in runtime.items():
+                self.fields[name] = spec.get("type", "keyword")
+
+    def _flatten(self, properties: dict[str, Any], prefix: str) -> None:
+        """Record the leaf fields, objects and multi-fields below a prefix."""
+        for name, spec in properties.items():
+            path = f"{prefix}{name}"
+            if not isinstance(spec, dict):
+                continue
+            if "properties" in spec or spec.get("type") in _OBJECT_TYPES:
+                self.objects.add(path)
+                if spec.get("enabled") is False or spec.get("dynamic") in (False, "false"):
+                    self.complete = False
+                self._flatten(spec.get("properties", {}), f"{path}.")
+                continue
+            if spec.get("enabled") is False:
+                self.objects.add(path)
+                self.complete = False
+                continue
+            field_type = spec.get("type", "object")
+            self.fields[path] = field_type
+            for sub_name, sub_spec in spec.get("fields", {}).items():
+                sub_type = sub_spec.get("type") if isinstance(sub_spec, dict) else None
+                self.fields[f"{path}.{sub_name}"] = sub_type
+                if field_type in _TEXT_TYPES and sub_type == "keyword":
+                    self.keyword_subfields.setdefault(path, f"{path}.{sub_name}")
+
+
+class FieldResolver:
+    """Logical-to-physical field tables compiled from index mappings."""
+
+    def __init__(self) -> None:
+        """Initialize without any index mapping."""
+        self._indices: dict[str, IndexFields] = {}
+        self._query_table: dict[str, str] = {}
+        self.extraction_mappings: dict[str, list[str]] | None = None
+        self.compiled_for: dict[str, list[str]] | None = None
+        self._mapped_paths: list[str] = []
+        self.compilations = 0
+
+    @property
+    def indices(self) -> list[str]:
+        """Names of the indices whose mapping is known."""
+        return list(self._indices)
+
+    @property
+    def ready(self) -> bool:
+        """Whether tables have been compiled from at least one mapping."""
+        return self.compiled_for is not None and bool(self._indices)
+
+    def covers(self, index: str | None) -> bool:
+        """Check whether the mapping of an index is known.
+
+        Args:
+            index: Index name (e.g. the ``_index`` of a hit)
+
+        Returns:
+            True if the index was part of the compiled tables
+
+        """
+        return index in self._indices
+
+    def update(self, mapping_response: dict[str, Any]) -> int:
+        """Add or replace index mappings from a ``get_mapping`` response.
+
+        Compiled tables are dropped; call :meth:`compile` afterwards.
+
+        Args:
+            mapping_response: ``{index: {"mappings": {...}}}`` dictionary
+
+        Returns:
+            Number of indices read from the response
+
+        """
+        if not isinstance(mapping_response, dict):
+            return 0
+        read = 0
+        for index, entry in mapping_response.items():
+            mapping = entry.get("mappings", {}) if isinstance(entry, dict) else {}
+            self._indices[index] = IndexFields(mapping)
+            read += 1
+        if read:
+            self.compiled_for = None
+        return read
+
+    def forget(self, indices: Iterable[str]) -> int:
+        """Drop the mappings of indices that no longer exist.
+
+        Args:
+            indices: Index names to drop
+
+        Returns:
+            Number of mappings dropped
+
+        """
+        dropped = 0
+        for index in indices:
+            if self._indices.pop(index, None) is not None:
+                dropped += 1
+        if dropped:
+            self.compiled_for = None
+        return dropped
+
+    def compile(self, field_mappings: dict[str, list[str]], aliases: dict[str, str]) -> None:
+        """Compile the query table and extraction mappings.
+
+        Args:
+            field_mappings: Logical field name to candidate field list mapping
+            aliases: User-friendly query field names to ECS field names
+
+        """
+        index_count: dict[str, int] = {}
+        keyword_subfields: dict[str, str] = {}
+        present: set[str] = set()
+        complete = True
+        for index_fields in self._indices.values():
+            for path in index_fields.fields:
+                index_count[path] = index_count.get(path, 0) + 1
+            keyword_subfields.update(index_fields.keyword_subfields)
+            present.update(index_fields.fields)
+            present.update(index_fields.objects)
+            complete = complete and index_fields.complete
+
+        def physical(path: str) -> str:
+            return keyword_subfields.get(path, path)
+
+        # Best mapped candidate of every logical field: the one found in the
+        # most indices, earlier candidates first on ties
+        best: dict[str, str] = {}
+        for field_type, candidates in field_mappings.items():
+            counts = [(index_count.get(c, 0), -i, c) for i, c in enumerate(candidates)]
+            count, _, candidate = max(counts, default=(0, 0, ""))
+            if count:
+                best[field_type] = physical(candidate)
+
+        table: dict[str, str] = {path: physical(path) for path in index_count}
+        for field_type, candidates in field_mappings.items():
+            if field_type not in best:
+                continue
+            for name in (field_type, *candidates):
+                table.setdefault(name, best[field_type])
+        for alias, target in aliases.items():
+            # A mapped field is queried as named, even if it is also an alias
+            if alias not in index_count:
+                table[alias] = table.get(target, table.get(alias, target))
+
+        # Candidates can also match one level below any top-level object
+        nested = {path.split(".", 1)[1] for path in present if "." in path}
+        if complete:
+            extraction = {
+                field_type: [c for c in candidates if c in present or c in nested]
+                for field_type, candidates in field_mappings.items()
+            }
+        else:
+            extraction = field_mappings
+
+        self._query_table = table
+        self._mapped_paths = sorted(index_count)
+        self.extraction_mappings = extraction
+        self.compiled_for = field_mappings
+        self.compilations += 1
+        logger.debug(
+            "Compiled field resolver",
+            indices=len(self._indices),
+            mapped_fields=len(index_count),
+            pruned=extraction is not field_mappings,
+        )
+
+    def resolve(self, name: str) -> str:
+        """Return the physical field to query for a field name.
+
+        Args:
+            name: Alias, logical field name, candidate or physical field
+
+        Returns:
+            Mapped physical field, or ``name`` if nothing better is known
+
+        """
+        return self._query_table.get(name, name)
+
+    def is_mapped(self, name: str) -> bool:
+        """Check whether a field name exists in any known mapping."""
+        return name in self._query_table
+
+    def suggestions(self, name: str, limit: int = 5) -> list[str]:
+        """Suggest mapped fields for a field name that is not mapped.
+
+        Args:
+            name: Field name to find alternatives for
+            limit: Maximum number of suggestions
+
+        Returns:
+            Mapped field names, closest first
+
+        """
+        leaf = name.replace("_", ".").rsplit(".", 1)[-1]
+        same_leaf = [path for path in self._mapped_paths if path.rsplit(".", 1)[-1] == leaf]
+        close = difflib.get_close_matches(name.replace("_", "."), self._mapped_paths, n=limit)
+        return list(dict.fromkeys(close + same_leaf))[:limit]
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the number of indices, mapped fields and compilations."""
+        return {
+            "indices": len(self._indices),
+            "mapped_fields": len(self._mapped_paths),
+            "compilations": self.compilations,
+            "ready": self.ready,
+        }
@@ -0,0 +1,176 @@
+"""Catalog of DShield indices and the time range each one covers.
+
+Index discovery (``cat.indices``) used to run before every query, and every
+query then searched all DShield indices even when its time range only
+touches one of them. :class:`IndexCatalog` keeps the discovered index names
+together with the ``@timestamp`` range each index holds, so queries can skip
+discovery until the catalog goes stale and target only the indices that
+overlap their time range.
+
+An index's range comes from two sources:
+
+* its name, for daily (``dshield-2024.01.15``) or monthly
+  (``zeek-2024.01``) indices;
+* the min/max ``@timestamp`` found by an aggregation over all indices.
+
+Both are combined, so events indexed late into a daily index are still
+covered. Indices whose range is unknown are never pruned.
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_DAILY_NAME = re.compile(r"(?<!\d)(\d{4})[.\-_](\d{2})[.\-_](\d{2})(?!\d)")
+_MONTHLY_NAME = re.compile(r"(?<!\d)(\d{4})[.\-_](\d{2})(?![\d.\-_]*\d)")
+
+
+def index_name_time_range(name: str) -> tuple[datetime, datetime] | None:
+    """Derive the time range an index covers from a date in its name.
+
+    Data stream backing indices (``.ds-*``) are skipped: the date in their
+    name is the rollover date, not the date of the data.
+
+    Args:
+        name: Index name
+
+    Returns:
+        (start, end) of the day or month in the name, or None
+
+    """
+    if name.startswith(".ds-"):
+        return None
+    try:
+        match = _DAILY_NAME.search(name)
+        if match:
+            year, month, day = map(int, match.groups())
+            start = datetime(year, month, day, tzinfo=UTC)
+            return start, start + timedelta(days=1)
+        match = _MONTHLY_NAME.search(name)
+        if match:
+            year, month = map(int, match.groups())
+            start = datetime(year, month, 1, tzinfo=UTC)
+            end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=UTC)
+            return start, end
+    except ValueError:
+        # Digits that are not a valid date (e.g. version numbers)
+        pass
+    return None
+
+
+@dataclass
+class IndexTimeRange:
+    """Time range covered by one index (None bounds are unknown)."""
+
+    name: str
+    min_timestamp: datetime | None = None
+    max_timestamp: datetime | None = None
+
+
+class IndexCatalog:
+    """Discovered DShield indices with their time ranges."""
+
+    def __init__(self, refresh_interval_seconds: float = 300.0) -> None:
+        """Initialize an empty catalog.
+
+        Args:
+            refresh_interval_seconds: Age after which the catalog is stale
+
+        """
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.indices: dict[str, IndexTimeRange] = {}
+        self.refreshed_at: datetime | None = None
+        self._refreshed_monotonic: float | None = None
+
+    def is_stale(self) -> bool:
+        """Return True if the catalog was never filled or is too old."""
+        return (
+            self._refreshed_monotonic is None
+            or time.monotonic() - self._refreshed_monotonic >= self.refresh_interval_seconds
+        )
+
+    def update(
+        self,
+        names: list[str],
+        timestamp_bounds: dict[str, tuple[datetime | None, datetime | None]] | None = None,
+    ) -> None:
+        """Replace the catalog contents.
+
+        Args:
+            names: Discovered index names
+            timestamp_bounds: Min/max ``@timestamp`` per index, where known
+
+        """
+        timestamp_bounds = timestamp_bounds or {}
+        indices = {}
+        for name in names:
+            bounds = [index_name_time_range(name), timestamp_bounds.get(name)]
+            starts = [b[0] for b in bounds if b is not None and b[0] is not None]
+            ends = [b[1] for b in bounds if b is not None and b[1] is not None]
+            indices[name] = IndexTimeRange(
+                name=name,
+                min_timestamp=min(starts) if starts else None,
+                max_timestamp=max(ends) if ends else None,
+            )
+
+        self.indices = indices
+        self.refreshed_at = datetime.now(UTC)
+        self._refreshed_monotonic = time.monotonic()
+
+    def _overlaps(self, entry: IndexTimeRange, start: datetime, end: datetime) -> bool:
+        """Check whether an index may hold events between start and end.
+
+        An index whose newest event is recent relative to the last refresh may
+        have received newer events since, so its upper bound is left open.
+
+        Args:
+            entry: Index time range
+            start: Query range start
+            end: Query range end
+
+        Returns:
+            True unless the index certainly holds no event in the range
+
+        """
+        if entry.min_timestamp is not None and entry.min_timestamp > end:
+            return False
+        if entry.max_timestamp is None or self.refreshed_at is None:
+            return True
+        still_written = entry.max_timestamp >= self.refreshed_at - timedelta(
+            seconds=self.refresh_interval_seconds
+        )
+        return still_written or entry.max_timestamp >= start
+
+    def prune(self, indices: list[str], start: datetime, end: datetime) -> list[str]:
+        """Keep the indices that may hold events in a time range.
+
+        Indices missing from the catalog are kept.
+
+        Args:
+            indices: Candidate index names
+            start: Range start (timezone-aware)
+            end: Range end (timezone-aware)
+
+        Returns:
+            Candidate indices overlapping the range, in their original order
+
+        """
+        kept = []
+        for name in indices:
+            entry = self.indices.get(name)
+            if entry is None or self._overlaps(entry, start, end):
+                kept.append(name)
+        if len(kept) < len(indices):
+            logger.debug(
+                "Pruned indices by time range",
+                candidates=len(indices),
+                kept=len(kept),
+                start=start.isoformat(),
+                end=end.isoformat(),
+            )
+        return kept
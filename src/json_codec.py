@@ -0,0 +1,138 @@
+"""JSON encoding and decoding for tool output, transports and Elasticsearch.
+
+Events are serialized several times per request: by the Elasticsearch
+client, by the tool formatters and again by the TCP transports for every
+frame. This module is the single place that does it, using ``orjson``, a
+required dependency of the project. The standard library is only a fallback
+for environments where ``orjson`` cannot be installed. Both paths produce
+the same JSON: values ``orjson`` does not handle natively (datetimes,
+dataclasses, arbitrary objects) go through ``str`` as with ``default=str``.
+
+Tool output is indented by default for readability; compact output (no
+indentation, no spaces after separators) can be enabled with
+:func:`set_compact_output`, which cuts payload bytes for machine clients.
+"""
+
+import json
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+    HAS_ORJSON = False
+
+if HAS_ORJSON:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+JSONDecodeError = json.JSONDecodeError
+
+_compact_output = False
+
+
+def set_compact_output(compact: bool) -> None:
+    """Select compact or indented output for :func:`dumps_text`.
+
+    Args:
+        compact: True for compact JSON, False for 2-space indentation
+
+    """
+    global _compact_output
+    _compact_output = bool(compact)
+
+
+def is_compact_output() -> bool:
+    """Return True if :func:`dumps_text` produces compact JSON."""
+    return _compact_output
+
+
+def _default(value: Any) -> Any:
+    """Convert values orjson cannot serialize, matching ``default=str``."""
+    if isinstance(value, float):
+        # float subclasses (e.g. numpy.float64) stay numbers, as with json
+        return float(value)
+    return str(value)
+
+
+def dumps_bytes(value: Any, indent: bool = False) -> bytes:
+    """Serialize a value to UTF-8 JSON bytes.
+
+    Args:
+        value: Value to serialize
+        indent: Indent with 2 spaces instead of producing compact output
+
+    Returns:
+        UTF-8 encoded JSON
+
+    Raises:
+        TypeError: If the value cannot be serialized
+
+    """
+    if HAS_ORJSON:
+        try:
+            options = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+            return orjson.dumps(value, default=_default, option=options)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, circular data...: defer to the stdlib
+            pass
+    if indent:
+        return json.dumps(value, indent=2, default=str, ensure_ascii=False).encode("utf-8")
+    return json.dumps(value, separators=(",", ":"), default=str, ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def dumps(value: Any, indent: bool = False) -> str:
+    """Serialize a value to a JSON string.
+
+    Args:
+        value: Value to serialize
+        indent: Indent with 2 spaces instead of producing compact output
+
+    Returns:
+        JSON text
+
+    """
+    return dumps_bytes(value, indent=indent).decode("utf-8")
+
+
+def dumps_text(value: Any) -> str:
+    """Serialize a value for tool output, honouring the compact output setting.
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        JSON text, indented unless compact output is enabled
+
+    """
+    return dumps(value, indent=not _compact_output)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """Parse JSON from bytes or text.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed value
+
+    Raises:
+        JSONDecodeError: If the document is not valid JSON
+
+    """
+    if HAS_ORJSON:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+    if isinstance(data, bytes | bytearray | memoryview):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
@@ -81,6 +81,19 @@ class QueryDShieldEventsTool(BaseTool):
                         "type": "string",
                         "description": "Cursor token for cursor-based pagination (better for large datasets)",
                     },
+                    "use_pit": {
+                        "type": "boolean",
+                        "description": "Page through a point-in-time snapshot with an "
+                        "opaque cursor (constant cost per page, no max_result_window limit; "
+                        "default: false)",
+                    },
+                    "projection": {
+                        "type": "string",
+                        "enum": ["lean", "full"],
+                        "description": "Event shape: 'lean' returns normalized fields and "
+                        "the hit's index only; 'full' also embeds raw_data and the queried "
+                        "indices (default: lean)",
+                    },
                     "optimization": {
                         "type": "string",
                         "enum": ["auto", "none"],
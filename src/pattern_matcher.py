@@ -0,0 +1,179 @@
+"""Multi-keyword attack pattern matching with an Aho-Corasick automaton.
+
+DataProcessor classifies events into attack patterns by looking for any of a
+pattern's keywords in the event description or type. Testing every keyword
+separately makes the cost of classifying an event grow with the number of
+keywords. :class:`AttackPatternMatcher` compiles all keywords of all patterns
+into one Aho-Corasick automaton (converted to a deterministic transition
+table), so an event is classified in a single scan of its text whatever the
+number of keywords.
+
+Matched patterns are tracked as a bit mask with one bit per pattern and
+reported in the order the patterns were defined.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+# Separates description and event type so that no keyword matches across them
+_FIELD_SEPARATOR = "\x00"
+
+
+class AttackPatternMatcher:
+    """Precompiled matcher for a ``{pattern: [keywords]}`` table.
+
+    Keywords are matched case-sensitively; callers lower-case the text, as
+    the keyword tables are lower-case.
+    """
+
+    def __init__(self, patterns: dict[str, list[str]], max_cached_texts: int = 10000) -> None:
+        """Compile the automaton.
+
+        Args:
+            patterns: Pattern name to keyword list mapping
+            max_cached_texts: Maximum number of distinct texts whose result
+                is cached by :meth:`classify` (0 disables the cache)
+
+        """
+        self.patterns = patterns
+        self.pattern_names = list(patterns)
+        self.max_cached_texts = max_cached_texts
+        self._cache: dict[str, tuple[str, ...]] = {}
+        self._names_by_mask: dict[int, tuple[str, ...]] = {0: ()}
+
+        # Trie of all keywords; each node records the patterns ending there
+        goto: list[dict[str, int]] = [{}]
+        output: list[int] = [0]
+        for bit, keywords in enumerate(patterns.values()):
+            for keyword in keywords:
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        output.append(0)
+                    state = next_state
+                output[state] |= 1 << bit
+
+        # Failure links (breadth first), folding outputs along them
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] |= output[fail[next_state]]
+
+        # Deterministic transitions: follow failure links once, at build time
+        alphabet = {char for edges in goto for char in edges}
+        delta: list[dict[str, int]] = [{} for _ in goto]
+        for state in self._breadth_first(goto):
+            for char in alphabet:
+                if char in goto[state]:
+                    target = goto[state][char]
+                elif state:
+                    target = delta[fail[state]].get(char, 0)
+                else:
+                    target = 0
+                if target:
+                    delta[state][char] = target
+
+        self._delta = delta
+        self._output = output
+        self.state_count = len(goto)
+
+    @staticmethod
+    def _breadth_first(goto: list[dict[str, int]]) -> Iterable[int]:
+        """Yield trie states in breadth-first order (parents before children).
+
+        Args:
+            goto: Trie transitions
+
+        Yields:
+            State numbers
+
+        """
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            yield state
+            queue.extend(goto[state].values())
+
+    def _scan(self, text: str) -> int:
+        """Scan a text once and return the bit mask of matched patterns.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Bit mask with one bit per matched pattern
+
+        """
+        delta = self._delta
+        output = self._output
+        state = 0
+        mask = output[0]
+        for char in text:
+            state = delta[state].get(char, 0)
+            mask |= output[state]
+        return mask
+
+    def _names(self, mask: int) -> tuple[str, ...]:
+        """Convert a bit mask to pattern names in definition order.
+
+        Args:
+            mask: Bit mask of matched patterns
+
+        Returns:
+            Tuple of matched pattern names
+
+        """
+        names = self._names_by_mask.get(mask)
+        if names is None:
+            names = tuple(
+                name for bit, name in enumerate(self.pattern_names) if mask >> bit & 1
+            )
+            self._names_by_mask[mask] = names
+        return names
+
+    def classify(self, description: str, event_type: str = "") -> tuple[str, ...]:
+        """Return the patterns with a keyword in the description or the event type.
+
+        Args:
+            description: Lower-cased event description
+            event_type: Lower-cased event type
+
+        Returns:
+            Tuple of matched pattern names in definition order
+
+        """
+        text = f"{description}{_FIELD_SEPARATOR}{event_type}"
+        names = self._cache.get(text)
+        if names is None:
+            names = self._names(self._scan(text))
+            if self.max_cached_texts:
+                if len(self._cache) >= self.max_cached_texts:
+                    self._cache.clear()
+                self._cache[text] = names
+        return names
+
+    def classify_many(
+        self, texts: Iterable[tuple[str, str]]
+    ) -> list[tuple[str, ...]]:
+        """Classify a page of events.
+
+        Args:
+            texts: (description, event_type) pairs, lower-cased
+
+        Returns:
+            Matched pattern names for each pair, in input order
+
+        """
+        classify = self.classify
+        return [classify(description, event_type) for description, event_type in texts]
@@ -0,0 +1,298 @@
+"""Result cache for normalized Elasticsearch queries.
+
+Analysts and agents repeatedly ask for the same views ("last 24h, source IP
+X"). Those requests differ only in details that do not change the result:
+filter order, user-friendly versus ECS field names, or the exact second at
+which ``now-24h`` or the absolute bounds derived from it were evaluated.
+:func:`normalize_filters`, :func:`time_bucket` and :func:`snap_time_bounds`
+remove those differences, :func:`canonical_query_key` turns the normalized
+request into a stable key, and :class:`QueryResultCache` keeps recent
+results under those keys. :func:`drop_absolute_time_bounds` removes such
+bounds altogether where only the shape of a query matters.
+
+Results are stored serialized, which gives every entry a byte size for the
+LRU bound and hands each caller its own copy, so cached results cannot be
+modified through a previous caller's reference.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+import structlog
+
+from . import json_codec
+
+logger = structlog.get_logger(__name__)
+
+# Bound keys of Elasticsearch range clauses
+_RANGE_BOUNDS = ("gt", "gte", "lt", "lte", "from", "to")
+
+
+def normalize_filters(filters: Any) -> Any:
+    """Normalize query filters so equivalent filters compare equal.
+
+    Dictionary order is irrelevant once the key is serialized with sorted
+    keys; lists of scalars are sorted because in filters they are value sets
+    (``terms``, ``in``). Lists anywhere else in a query (sort clauses,
+    ``search_after``) are ordered and must not go through this function.
+
+    Args:
+        filters: Filters, already mapped to Elasticsearch field names
+
+    Returns:
+        Filters with value lists sorted
+
+    """
+    if isinstance(filters, dict):
+        return {str(key): normalize_filters(value) for key, value in filters.items()}
+    if isinstance(filters, list | tuple | set):
+        items = [normalize_filters(item) for item in filters]
+        if all(isinstance(item, str | int | float | bool) for item in items):
+            return sorted(items, key=lambda item: (type(item).__name__, item))
+        return items
+    return filters
+
+
+def canonical_query_key(namespace: str, components: dict[str, Any]) -> str:
+    """Build a stable cache key for a normalized query.
+
+    Args:
+        namespace: Kind of query (keeps e.g. event pages and aggregations apart)
+        components: Everything that determines the result
+
+    Returns:
+        Namespaced hex digest identifying the query
+
+    """
+    payload = json.dumps(components, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def time_bucket(bucket_seconds: int, now: float | None = None) -> int:
+    """Return the time bucket relative time ranges are snapped to.
+
+    Requests for ``now-24h`` made within the same bucket share one cache
+    entry; cached results are at most one bucket (and one TTL) old.
+
+    Args:
+        bucket_seconds: Bucket width in seconds
+        now: Current UNIX time (defaults to ``time.time()``)
+
+    Returns:
+        Index of the bucket containing ``now``
+
+    """
+    return int((time.time() if now is None else now) // max(1, bucket_seconds))
+
+
+def has_relative_range(query: Any) -> bool:
+    """Return whether a ``range`` clause of a query uses date math on ``now``.
+
+    Args:
+        query: Query or search body
+
+    Returns:
+        True if a range bound starts with ``now`` (e.g. ``now-24h``)
+
+    """
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if key == "range" and isinstance(value, dict):
+                for bounds in value.values():
+                    if isinstance(bounds, dict) and any(
+                        _is_date_math(bounds.get(bound)) for bound in _RANGE_BOUNDS
+                    ):
+                        return True
+            if has_relative_range(value):
+                return True
+    elif isinstance(query, list | tuple):
+        return any(has_relative_range(item) for item in query)
+    return False
+
+
+def snap_time_bounds(query: Any, bucket_seconds: int, field: str = "@timestamp") -> Any:
+    """Replace absolute time bounds on a field with the time bucket holding them.
+
+    Callers that turn "last 24 hours" into absolute ISO 8601 bounds produce a
+    different query every microsecond. Snapping the bounds down to
+    ``bucket_seconds`` makes such queries within one bucket share a key, as
+    :func:`time_bucket` does for ``now``-relative ranges. Bounds are found
+    as ``{field: {"gte": ...}}`` (filters and ``range`` clauses) and as
+    flattened ``"field.gte"`` filter keys; date math and values that are not
+    timestamps are kept.
+
+    Args:
+        query: Filters or search body; not modified
+        bucket_seconds: Bucket width in seconds
+        field: Time field whose bounds are snapped
+
+    Returns:
+        Copy of the query with snapped bounds
+
+    """
+    if isinstance(query, dict):
+        flattened = {f"{field}.{bound}" for bound in _RANGE_BOUNDS}
+        snapped = {}
+        for key, value in query.items():
+            if key == field and isinstance(value, dict):
+                snapped[key] = {
+                    bound: _snap_bound(item, bucket_seconds) if bound in _RANGE_BOUNDS else item
+                    for bound, item in value.items()
+                }
+            elif str(key) in flattened:
+                snapped[key] = _snap_bound(value, bucket_seconds)
+            else:
+                snapped[key] = snap_time_bounds(value, bucket_seconds, field)
+        return snapped
+    if isinstance(query, list | tuple):
+        return [snap_time_bounds(item, bucket_seconds, field) for item in query]
+    return query
+
+
+def drop_absolute_time_bounds(filters: Any, field: str = "@timestamp") -> Any:
+    """Remove absolute time bounds on a field from top-level filters.
+
+    Size statistics are kept per query shape; a shape should not change
+    because the absolute bounds of "the last 24 hours" moved on. Date math
+    bounds (``now-24h``) do not move and are kept.
+
+    Args:
+        filters: Filters, already mapped to Elasticsearch field names
+        field: Time field whose bounds are removed
+
+    Returns:
+        Copy of the filters without absolute bounds on the field
+
+    """
+    if not isinstance(filters, dict):
+        return filters
+    flattened = {f"{field}.{bound}" for bound in _RANGE_BOUNDS}
+    kept = {}
+    for key, value in filters.items():
+        if key == field and isinstance(value, dict):
+            value = {
+                bound: item
+                for bound, item in value.items()
+                if bound not in _RANGE_BOUNDS or _is_date_math(item)
+            }
+            if not value:
+                continue
+        elif key in flattened and not _is_date_math(value):
+            continue
+        kept[key] = value
+    return kept
+
+
+def _is_date_math(value: Any) -> bool:
+    """Return whether a range bound is date math relative to ``now``."""
+    return isinstance(value, str) and value.strip().startswith("now")
+
+
+def _snap_bound(value: Any, bucket_seconds: int) -> Any:
+    """Return the time bucket of an absolute timestamp bound, or the bound itself."""
+    if isinstance(value, str) and not _is_date_math(value):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        return f"bucket:{time_bucket(bucket_seconds, value.timestamp())}"
+    return value
+
+
+class QueryResultCache:
+    """LRU cache of serialized query results with a TTL and a byte budget."""
+
+    def __init__(self, name: str, max_bytes: int, ttl_seconds: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            name: Name used in logs and statistics
+            max_bytes: Maximum total size of cached results
+            ttl_seconds: Time a result stays valid after being stored
+
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        """Return a copy of the cached result for a key.
+
+        Args:
+            key: Key from :func:`canonical_query_key`
+
+        Returns:
+            The cached result, or None if absent or expired
+
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return json_codec.loads(entry[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result, evicting least recently used entries as needed.
+
+        Results larger than the whole cache are not stored.
+
+        Args:
+            key: Key from :func:`canonical_query_key`
+            value: JSON-serializable result
+
+        """
+        payload = json_codec.dumps_bytes(value)
+        if key in self._entries:
+            self._remove(key)
+        if len(payload) > self.max_bytes:
+            logger.debug("Result too large to cache", cache=self.name, size_bytes=len(payload))
+            return
+
+        while self._entries and self.current_bytes + len(payload) > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        self._entries[key] = (payload, time.monotonic() + self.ttl_seconds)
+        self.current_bytes += len(payload)
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and release its bytes."""
+        payload, _ = self._entries.pop(key)
+        self.current_bytes -= len(payload)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and size information."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
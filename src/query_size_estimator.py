@@ -0,0 +1,233 @@
+"""Result size estimation for smart query optimization from rolling statistics.
+
+``query_dshield_events`` decides whether to reduce fields or the page size,
+or to fall back to an aggregation, from an estimate of the result size. That
+estimate used to cost a ``count`` request per step and assumed fixed sizes
+(1 KB per field, 5 KB per document). :class:`QuerySizeEstimator` instead
+learns from what queries actually return and from index ``_stats``, and
+answers without contacting Elasticsearch:
+
+* bytes per document, per index and per requested field set, as
+  exponentially weighted moving averages of observed pages;
+* total hits per query shape (indices, time range and filters), which
+  bounds how many documents a page can hold;
+* average stored bytes per document from index ``_stats``, used as a prior
+  until an index has been queried.
+
+Each observation is compared with the prediction made for it, and the
+prediction error is kept as a metric.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Sizes assumed before anything is known about an index
+DEFAULT_DOC_BYTES = 5 * 1024
+DEFAULT_FIELD_BYTES = 1024
+
+_ALL_FIELDS = "*"
+
+
+@dataclass
+class SizeEstimate:
+    """Predicted size of one page of results."""
+
+    bytes_per_doc: float
+    expected_docs: int
+    source: str
+
+    @property
+    def total_bytes(self) -> float:
+        """Predicted size of the page in bytes."""
+        return self.bytes_per_doc * self.expected_docs
+
+    @property
+    def total_mb(self) -> float:
+        """Predicted size of the page in megabytes."""
+        return self.total_bytes / (1024 * 1024)
+
+
+class QuerySizeEstimator:
+    """Rolling statistics on result sizes, per index, field set and query shape."""
+
+    def __init__(self, smoothing: float = 0.2, max_entries: int = 1024) -> None:
+        """Initialize empty statistics.
+
+        Args:
+            smoothing: Weight of a new observation in the moving averages
+            max_entries: Maximum number of field sets and query shapes tracked
+
+        """
+        self.smoothing = smoothing
+        self.max_entries = max_entries
+        self._index_doc_bytes: dict[str, float] = {}
+        self._stored_doc_bytes: dict[str, float] = {}
+        self._field_set_doc_bytes: dict[tuple[str, str], float] = {}
+        self._shape_hits: dict[str, float] = {}
+        self.observations = 0
+        self.last_error: float | None = None
+        self.mean_abs_error: float | None = None
+
+    @staticmethod
+    def _field_set_key(fields: list[str] | None) -> str:
+        """Return the key of a requested field set (``*`` for all fields)."""
+        return ",".join(sorted(set(fields))) if fields else _ALL_FIELDS
+
+    def _update(self, table: dict, key: Any, value: float) -> None:
+        """Fold a value into a moving average, bounding the table size."""
+        previous = table.get(key)
+        if previous is None:
+            if len(table) >= self.max_entries:
+                table.pop(next(iter(table)))
+            table[key] = float(value)
+        else:
+            table[key] = previous + self.smoothing * (value - previous)
+
+    def seed_from_index_stats(self, stats: dict[str, Any]) -> int:
+        """Record average stored bytes per document from an ``_stats`` response.
+
+        Args:
+            stats: Response of ``indices.stats`` with the docs and store metrics
+
+        Returns:
+            Number of indices with usable statistics
+
+        """
+        seeded = 0
+        indices = stats.get("indices") if isinstance(stats, dict) else None
+        if not isinstance(indices, dict):
+            return 0
+        for name, index_stats in indices.items():
+            primaries = index_stats.get("primaries", {}) if isinstance(index_stats, dict) else {}
+            count = primaries.get("docs", {}).get("count") or 0
+            size = primaries.get("store", {}).get("size_in_bytes") or 0
+            if count > 0 and size > 0:
+                self._stored_doc_bytes[name] = size / count
+                seeded += 1
+        return seeded
+
+    def _bytes_per_doc(self, indices: list[str], fields: list[str] | None) -> tuple[float, str]:
+        """Predict bytes per document from the most specific statistics known.
+
+        Args:
+            indices: Queried indices
+            fields: Requested fields, None for all fields
+
+        Returns:
+            (bytes per document, name of the statistic used)
+
+        """
+        index_key = ",".join(sorted(indices))
+        field_key = self._field_set_key(fields)
+        observed = self._field_set_doc_bytes.get((index_key, field_key))
+        if observed is not None:
+            return observed, "field_set"
+
+        per_index = [self._index_doc_bytes[i] for i in indices if i in self._index_doc_bytes]
+        source = "index"
+        if not per_index:
+            per_index = [self._stored_doc_bytes[i] for i in indices if i in self._stored_doc_bytes]
+            source = "index_stats"
+        if per_index:
+            doc_bytes = sum(per_index) / len(per_index)
+        else:
+            doc_bytes, source = float(DEFAULT_DOC_BYTES), "default"
+
+        if fields:
+            # A field subset is never larger than the whole document
+            doc_bytes = min(doc_bytes, len(fields) * DEFAULT_FIELD_BYTES)
+        return doc_bytes, source
+
+    def estimate(
+        self,
+        indices: list[str],
+        fields: list[str] | None,
+        page_size: int,
+        shape_key: str | None = None,
+    ) -> SizeEstimate:
+        """Predict the size of a page of results.
+
+        Args:
+            indices: Queried indices
+            fields: Requested fields, None for all fields
+            page_size: Requested page size
+            shape_key: Key of the query shape, used to bound the page by the
+                total hits seen for the same query
+
+        Returns:
+            Predicted size of the page
+
+        """
+        bytes_per_doc, source = self._bytes_per_doc(indices, fields)
+        expected_docs = page_size
+        if shape_key is not None and shape_key in self._shape_hits:
+            expected_docs = min(page_size, round(self._shape_hits[shape_key]))
+        return SizeEstimate(
+            bytes_per_doc=bytes_per_doc, expected_docs=expected_docs, source=source
+        )
+
+    def observe(
+        self,
+        indices: list[str],
+        fields: list[str] | None,
+        returned_docs: int,
+        bytes_per_doc: float,
+        total_hits: int | None = None,
+        shape_key: str | None = None,
+        predicted: SizeEstimate | None = None,
+    ) -> None:
+        """Fold the size of a returned page into the statistics.
+
+        Args:
+            indices: Queried indices
+            fields: Requested fields, None for all fields
+            returned_docs: Number of documents in the page
+            bytes_per_doc: Measured average serialized bytes per document, 0 if
+                the page was not measured
+            total_hits: Total hits reported for the query
+            shape_key: Key of the query shape
+            predicted: Estimate made for this page, to record the prediction error
+
+        """
+        if predicted is not None and bytes_per_doc > 0:
+            actual_bytes = bytes_per_doc * returned_docs
+            error = abs(predicted.total_bytes - actual_bytes) / max(actual_bytes, 1.0)
+            self.last_error = error
+            if self.mean_abs_error is None:
+                self.mean_abs_error = error
+            else:
+                self.mean_abs_error += self.smoothing * (error - self.mean_abs_error)
+        self.observations += 1
+
+        if shape_key is not None and total_hits is not None:
+            self._update(self._shape_hits, shape_key, total_hits)
+
+        if returned_docs <= 0 or bytes_per_doc <= 0:
+            return
+        index_key = ",".join(sorted(indices))
+        self._update(
+            self._field_set_doc_bytes, (index_key, self._field_set_key(fields)), bytes_per_doc
+        )
+        if not fields:
+            for index in indices:
+                self._update(self._index_doc_bytes, index, bytes_per_doc)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the prediction error metric and the size of the statistics."""
+        return {
+            "observations": self.observations,
+            "last_relative_error": (
+                round(self.last_error, 4) if self.last_error is not None else None
+            ),
+            "mean_relative_error": (
+                round(self.mean_abs_error, 4) if self.mean_abs_error is not None else None
+            ),
+            "indices_observed": len(self._index_doc_bytes),
+            "indices_with_stats": len(self._stored_doc_bytes),
+            "field_sets": len(self._field_set_doc_bytes),
+            "query_shapes": len(self._shape_hits),
+        }
@@ -0,0 +1,73 @@
+"""Single-flight coalescing of identical concurrent Elasticsearch requests.
+
+Parallel tool calls and several TCP clients frequently issue the same search
+at the same moment (e.g. dashboards opened at the start of a shift). The
+result cache only helps once the first request has completed; until then
+every caller would send its own copy of the request. :class:`RequestCoalescer`
+lets the first caller of a key send the request and makes every caller that
+arrives while it is in flight wait for the same response. Nothing is kept
+after the request completes, so coalescing never serves stale data.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class RequestCoalescer:
+    """Shares one in-flight request between concurrent callers of the same key.
+
+    Responses are shared, not copied: callers must treat them as read-only.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no request in flight."""
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.requests = 0
+        self.coalesced_waiters = 0
+
+    async def run(self, key: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a request, or wait for the identical one already in flight.
+
+        The request runs in its own task, so cancelling one caller does not
+        cancel it for the others. Errors are raised to every caller.
+
+        Args:
+            key: Canonical key of the request
+            request: Factory starting the request, called only by the first caller
+
+        Returns:
+            The response of the shared request
+
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced_waiters += 1
+            logger.debug("Coalesced identical in-flight request", key=key)
+            return await asyncio.shield(future)
+
+        self.requests += 1
+        future = asyncio.ensure_future(request())
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        """Forget a completed request and mark its error as retrieved."""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Every caller may have been cancelled; avoid "exception never retrieved"
+            future.exception()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the number of requests sent and of callers that shared one."""
+        return {
+            "requests": self.requests,
+            "coalesced_waiters": self.coalesced_waiters,
+            "in_flight": len(self._in_flight),
+        }
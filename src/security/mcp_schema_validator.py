@@ -301,6 +301,13 @@ TOOL_PARAMETER_SCHEMAS = {
                 "type": "string",
                 "maxLength": MAX_STRING_LENGTH,
             },
+            "use_pit": {
+                "type": "boolean",
+            },
+            "projection": {
+                "type": "string",
+                "enum": ["lean", "full"],
+            },
             "optimization": {
                 "type": "string",
                 "enum": ["auto", "none"],
@@ -0,0 +1,228 @@
+"""Gap-based sessionization of event streams sorted by session key.
+
+``stream_dshield_events_with_session_context`` asks Elasticsearch to sort
+events by the session fields and then by ``@timestamp``, so all events of a
+session key arrive contiguously and in time order. :class:`Sessionizer`
+then needs a single pass: a new session starts when the key changes or when
+the time since the previous event of the key exceeds the maximum gap.
+
+Only the session open at the end of a chunk can continue into the next one.
+Its state travels in the stream cursor (see :func:`encode_session_cursor`),
+so the next chunk continues the same session instead of starting over.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Key of events that have none of the session fields
+NO_SESSION_KEY = "no_session"
+
+_CURSOR_PREFIX = "session."
+
+
+def session_key(session_fields: list[str], values: list[Any]) -> str:
+    """Build the session key for the session field values of an event.
+
+    Args:
+        session_fields: Fields sessions are grouped by
+        values: Values of those fields (None when missing)
+
+    Returns:
+        ``field:value`` pairs joined by ``|``, or ``NO_SESSION_KEY``
+
+    """
+    parts = [
+        f"{name}:{value}"
+        for name, value in zip(session_fields, values, strict=False)
+        if value is not None and value != ""
+    ]
+    return "|".join(parts) if parts else NO_SESSION_KEY
+
+
+def _iso(timestamp_ms: int | None) -> str | None:
+    """Convert epoch milliseconds to an ISO 8601 timestamp."""
+    if timestamp_ms is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ms / 1000, UTC).isoformat()
+
+
+@dataclass
+class Session:
+    """A session being built from the stream."""
+
+    key: str
+    ordinal: int
+    first_timestamp_ms: int | None
+    last_timestamp_ms: int | None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    event_count: int = 0
+    chunk_event_count: int = 0
+    continued: bool = False
+
+    @property
+    def session_id(self) -> str:
+        """Identifier of the session (the n-th session of its key)."""
+        return f"{self.key}#{self.ordinal}"
+
+    def to_state(self) -> dict[str, Any]:
+        """Serialize the session for the stream cursor."""
+        return {
+            "key": self.key,
+            "ordinal": self.ordinal,
+            "first": self.first_timestamp_ms,
+            "last": self.last_timestamp_ms,
+            "metadata": self.metadata,
+            "count": self.event_count,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "Session":
+        """Restore a session carried over from the previous chunk."""
+        return cls(
+            key=state["key"],
+            ordinal=state["ordinal"],
+            first_timestamp_ms=state["first"],
+            last_timestamp_ms=state["last"],
+            metadata=state.get("metadata", {}),
+            event_count=state["count"],
+            continued=True,
+        )
+
+    def summary(self, complete: bool) -> dict[str, Any]:
+        """Describe the session for the session context of a chunk.
+
+        Args:
+            complete: Whether the session can receive no further events
+
+        Returns:
+            Session summary dictionary
+
+        """
+        duration = None
+        if self.first_timestamp_ms is not None and self.last_timestamp_ms is not None:
+            duration = round((self.last_timestamp_ms - self.first_timestamp_ms) / 60000, 2)
+        return {
+            "session_id": self.session_id,
+            "session_key": self.key,
+            "event_count": self.event_count,
+            "chunk_event_count": self.chunk_event_count,
+            "first_timestamp": _iso(self.first_timestamp_ms),
+            "last_timestamp": _iso(self.last_timestamp_ms),
+            "duration_minutes": duration,
+            "metadata": self.metadata,
+            "continued_from_previous_chunk": self.continued,
+            "complete": complete,
+        }
+
+
+class Sessionizer:
+    """Splits a key- and time-ordered event stream into sessions."""
+
+    def __init__(self, max_gap_minutes: float, open_session: Session | None = None) -> None:
+        """Initialize the sessionizer for one chunk.
+
+        Args:
+            max_gap_minutes: Largest gap between two events of one session
+            open_session: Session left open by the previous chunk
+
+        """
+        self.max_gap_ms = max_gap_minutes * 60000
+        self.current = open_session
+        self.sessions: list[Session] = [open_session] if open_session else []
+
+    def add(self, key: str, timestamp_ms: int | None, metadata: dict[str, Any]) -> Session:
+        """Assign the next event of the stream to a session.
+
+        Args:
+            key: Session key of the event
+            timestamp_ms: Event time in epoch milliseconds (None if unknown)
+            metadata: Session field values of the event
+
+        Returns:
+            The session the event belongs to
+
+        """
+        current = self.current
+        same_key = current is not None and current.key == key
+        within_gap = (
+            timestamp_ms is None
+            or current is None
+            or current.last_timestamp_ms is None
+            or timestamp_ms - current.last_timestamp_ms <= self.max_gap_ms
+        )
+        if current is None or not (same_key and within_gap):
+            current = Session(
+                key=key,
+                ordinal=current.ordinal + 1 if same_key and current else 0,
+                first_timestamp_ms=timestamp_ms,
+                last_timestamp_ms=timestamp_ms,
+                metadata=metadata,
+            )
+            self.current = current
+            self.sessions.append(current)
+
+        current.event_count += 1
+        current.chunk_event_count += 1
+        if timestamp_ms is not None:
+            if current.first_timestamp_ms is None:
+                current.first_timestamp_ms = timestamp_ms
+            current.last_timestamp_ms = timestamp_ms
+        return current
+
+    def summaries(self, stream_complete: bool) -> list[dict[str, Any]]:
+        """Summarize the sessions that received events in this chunk.
+
+        Args:
+            stream_complete: Whether this chunk ends the stream
+
+        Returns:
+            One summary per session, in stream order
+
+        """
+        return [
+            session.summary(complete=stream_complete or session is not self.current)
+            for session in self.sessions
+        ]
+
+
+def encode_session_cursor(state: dict[str, Any]) -> str:
+    """Encode session stream state as an opaque ``stream_id``.
+
+    Args:
+        state: ``search_after`` values, session fields and open session
+
+    Returns:
+        URL-safe cursor token
+
+    """
+    payload = json.dumps(state, separators=(",", ":"), default=str).encode()
+    return _CURSOR_PREFIX + base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_session_cursor(stream_id: str) -> dict[str, Any] | None:
+    """Decode a ``stream_id`` produced by :func:`encode_session_cursor`.
+
+    Args:
+        stream_id: Cursor token supplied by the caller
+
+    Returns:
+        Stream state, or None if the token is not a valid session cursor
+
+    """
+    if not isinstance(stream_id, str) or not stream_id.startswith(_CURSOR_PREFIX):
+        return None
+    encoded = stream_id[len(_CURSOR_PREFIX) :]
+    try:
+        state = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(state, dict) or "search_after" not in state:
+        return None
+    return state
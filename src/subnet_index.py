@@ -0,0 +1,188 @@
+"""Integer-keyed IPv4/IPv6 subnet grouping for network correlation.
+
+Network correlation groups the IP addresses of a campaign by subnet and
+then searches each subnet that holds several of them. Working on strings
+meant building an ``ipaddress`` network object per address and, later,
+searching every member address individually. :class:`SubnetIndex` keeps
+each address as an integer in a sorted array per IP version instead:
+
+* the subnet of an address is its integer shifted right by the host bits,
+  so grouping is one pass over the sorted array;
+* the members of any prefix form a contiguous slice found by bisection;
+* a subnet is identified by its canonical CIDR (``203.0.113.0/24``,
+  ``2001:db8::/64``), which Elasticsearch ``ip`` fields accept directly in
+  ``term`` and ``terms`` queries.
+"""
+
+import ipaddress
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_BITS = {4: 32, 6: 128}
+_NETWORK_CLASSES = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+
+
+def parse_ip(value: str) -> tuple[int, int] | None:
+    """Parse an IP address into its version and integer value.
+
+    Args:
+        value: IPv4 or IPv6 address
+
+    Returns:
+        (version, integer), or None if the value is not an IP address
+
+    """
+    try:
+        address = ipaddress.ip_address(value)
+    except (TypeError, ValueError):
+        return None
+    return address.version, int(address)
+
+
+def network_cidr(version: int, value: int, prefix: int) -> str:
+    """Format the network of a given prefix length containing an address.
+
+    Args:
+        version: IP version (4 or 6)
+        value: Integer value of an address in the network
+        prefix: Prefix length
+
+    Returns:
+        Canonical CIDR notation of the network
+
+    """
+    shift = _BITS[version] - prefix
+    return str(_NETWORK_CLASSES[version]((value >> shift << shift, prefix)))
+
+
+def subnet_of(ip: str, prefix: int) -> str | None:
+    """Return the CIDR of the subnet of a given prefix length containing an IP.
+
+    Args:
+        ip: IPv4 or IPv6 address
+        prefix: Prefix length
+
+    Returns:
+        Canonical CIDR, or None if ``ip`` is not an address or the prefix is
+        longer than its address family allows
+
+    """
+    parsed = parse_ip(ip)
+    if parsed is None or prefix > _BITS[parsed[0]]:
+        return None
+    return network_cidr(parsed[0], parsed[1], prefix)
+
+
+class SubnetIndex:
+    """Sorted integer arrays of IPv4 and IPv6 addresses grouped by prefix."""
+
+    def __init__(self, ipv4_prefix: int = 24, ipv6_prefix: int = 64) -> None:
+        """Initialize an empty index.
+
+        Args:
+            ipv4_prefix: Prefix length of IPv4 subnets
+            ipv6_prefix: Prefix length of IPv6 subnets
+
+        Raises:
+            ValueError: If a prefix length is out of range
+
+        """
+        if not 0 <= ipv4_prefix <= 32 or not 0 <= ipv6_prefix <= 128:
+            raise ValueError("Subnet prefix length out of range")
+        self.prefixes = {4: ipv4_prefix, 6: ipv6_prefix}
+        self._addresses: dict[int, dict[int, str]] = {4: {}, 6: {}}
+        self._sorted: dict[int, list[int]] | None = None
+
+    def add(self, ip: str) -> bool:
+        """Add an IP address.
+
+        Args:
+            ip: IPv4 or IPv6 address
+
+        Returns:
+            False if ``ip`` is not an IP address
+
+        """
+        parsed = parse_ip(ip)
+        if parsed is None:
+            logger.debug("Skipping value that is not an IP address", value=ip)
+            return False
+        version, value = parsed
+        self._addresses[version].setdefault(value, ip)
+        self._sorted = None
+        return True
+
+    def add_all(self, ips: Iterable[str]) -> int:
+        """Add IP addresses, skipping values that are not addresses.
+
+        Args:
+            ips: IPv4 or IPv6 addresses
+
+        Returns:
+            Number of values added
+
+        """
+        return sum(self.add(ip) for ip in ips)
+
+    def __len__(self) -> int:
+        """Return the number of distinct addresses."""
+        return sum(len(addresses) for addresses in self._addresses.values())
+
+    def _sorted_values(self) -> dict[int, list[int]]:
+        """Return the address integers of each version in ascending order."""
+        if self._sorted is None:
+            self._sorted = {
+                version: sorted(addresses) for version, addresses in self._addresses.items()
+            }
+        return self._sorted
+
+    def groups(self, min_members: int = 1) -> dict[str, list[str]]:
+        """Group the addresses by subnet.
+
+        Args:
+            min_members: Smallest number of addresses a subnet must hold
+
+        Returns:
+            Subnet CIDR to member addresses, both in ascending address order,
+            IPv4 before IPv6
+
+        """
+        groups: dict[str, list[str]] = {}
+        for version, values in self._sorted_values().items():
+            shift = _BITS[version] - self.prefixes[version]
+            addresses = self._addresses[version]
+            start = 0
+            while start < len(values):
+                key = values[start] >> shift
+                end = start + 1
+                while end < len(values) and values[end] >> shift == key:
+                    end += 1
+                if end - start >= min_members:
+                    cidr = network_cidr(version, values[start], self.prefixes[version])
+                    groups[cidr] = [addresses[value] for value in values[start:end]]
+                start = end
+        return groups
+
+    def members(self, cidr: str) -> list[str]:
+        """List the indexed addresses inside a network.
+
+        Args:
+            cidr: Network in CIDR notation, of any prefix length
+
+        Returns:
+            Member addresses in ascending order
+
+        Raises:
+            ValueError: If ``cidr`` is not a valid network
+
+        """
+        network = ipaddress.ip_network(cidr, strict=False)
+        values = self._sorted_values()[network.version]
+        low = bisect_left(values, int(network.network_address))
+        high = bisect_right(values, int(network.broadcast_address))
+        addresses = self._addresses[network.version]
+        return [addresses[value] for value in values[low:high]]
@@ -0,0 +1,343 @@
+"""Fused, mergeable accumulators for DShield event summaries.
+
+A summary is a set of named statistics. Each statistic is an
+:class:`Accumulator` that is updated incrementally, one chunk of events at a
+time, and that can be merged with another accumulator of the same kind. A
+:class:`SummaryEngine` holds the registered accumulators and feeds every
+chunk to all of them, so each chunk is encoded into an
+:class:`~src.event_batch.EventBatch` exactly once no matter how many
+statistics are computed.
+
+Because accumulator state is keyed by values rather than by batch-local
+dictionary codes, engines built over different chunks can be merged. This
+allows summaries to be computed per chunk in worker processes and combined
+afterwards (see :func:`summarize`).
+
+Example:
+    >>> engine = SummaryEngine({"total": RowCount(), "countries": ValueCounts("country")})
+    >>> engine.update(events)
+    >>> engine.results()
+    {'total': 2, 'countries': {'US': 1, 'CN': 1}}
+
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Executor
+from itertools import repeat
+from typing import Any, Generic, Self, TypeVar
+
+import numpy as np
+
+from .event_batch import DictionaryColumn, EventBatch
+
+R = TypeVar("R")
+
+
+class Accumulator(ABC, Generic[R]):  # noqa: UP046 - type parameter syntax needs 3.12
+    """Base class for incremental, mergeable statistics with results of type ``R``."""
+
+    @abstractmethod
+    def update(self, batch: EventBatch) -> None:
+        """Fold one chunk of events into the statistic.
+
+        Args:
+            batch: Chunk of events
+
+        """
+
+    @abstractmethod
+    def merge(self, other: Self) -> None:
+        """Fold another accumulator of the same kind into this one.
+
+        Args:
+            other: Accumulator computed over a different chunk of events
+
+        """
+
+    @abstractmethod
+    def result(self) -> R:
+        """Return the statistic over every chunk seen so far."""
+
+
+class RowCount(Accumulator[int]):
+    """Number of events."""
+
+    def __init__(self) -> None:
+        """Initialize the count."""
+        self.count = 0
+
+    def update(self, batch: EventBatch) -> None:
+        """Add the number of events in the chunk."""
+        self.count += len(batch)
+
+    def merge(self, other: Self) -> None:
+        """Add the other accumulator's count."""
+        self.count += other.count
+
+    def result(self) -> int:
+        """Return the number of events."""
+        return self.count
+
+
+class CounterAccumulator(Accumulator[R]):
+    """Base class for statistics kept as a ``Counter``.
+
+    Keys appear in the order they were first seen, across merges as well,
+    so results match a ``Counter`` fed the events one by one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.counts: Counter[Hashable] = Counter()
+
+    def merge(self, other: Self) -> None:
+        """Add the other accumulator's counts."""
+        self.counts.update(other.counts)
+
+
+class ColumnCounts(CounterAccumulator[R]):
+    """Base class for statistics over the value counts of a column."""
+
+    def __init__(self, column: str) -> None:
+        """Initialize the accumulator.
+
+        Args:
+            column: Name of an EventBatch dictionary column
+
+        """
+        super().__init__()
+        self.column = column
+
+    def update(self, batch: EventBatch) -> None:
+        """Add the chunk's value counts."""
+        column: DictionaryColumn = getattr(batch, self.column)
+        self.counts.update(column.value_counts())
+
+
+class ValueCounts(ColumnCounts[dict[Hashable, int]]):
+    """Number of events per value of a column."""
+
+    def result(self) -> dict[Hashable, int]:
+        """Return the counts as a plain dictionary."""
+        return dict(self.counts)
+
+
+class TopValues(ColumnCounts[list[tuple[Hashable, int]]]):
+    """Most frequent values of a column."""
+
+    def __init__(self, column: str, n: int = 10) -> None:
+        """Initialize the accumulator.
+
+        Args:
+            column: Name of an EventBatch dictionary column
+            n: Number of values to report
+
+        """
+        super().__init__(column)
+        self.n = n
+
+    def result(self) -> list[tuple[Hashable, int]]:
+        """Return the ``n`` most frequent (value, count) pairs."""
+        return self.counts.most_common(self.n)
+
+
+class DistinctCount(ColumnCounts[int]):
+    """Number of distinct values of a column."""
+
+    def result(self) -> int:
+        """Return the number of distinct values."""
+        return len(self.counts)
+
+
+class MatchCount(Accumulator[int]):
+    """Number of events whose column value is one of a set of values."""
+
+    def __init__(self, column: str, values: tuple[Hashable, ...]) -> None:
+        """Initialize the accumulator.
+
+        Args:
+            column: Name of an EventBatch dictionary column
+            values: Values that count as a match
+
+        """
+        self.column = column
+        self.values = values
+        self.count = 0
+
+    def update(self, batch: EventBatch) -> None:
+        """Add the chunk's matching rows."""
+        column: DictionaryColumn = getattr(batch, self.column)
+        self.count += int(np.count_nonzero(column.mask(*self.values)))
+
+    def merge(self, other: Self) -> None:
+        """Add the other accumulator's count."""
+        self.count += other.count
+
+    def result(self) -> int:
+        """Return the number of matching events."""
+        return self.count
+
+
+class BatchCounts(CounterAccumulator[dict[Hashable, int]]):
+    """Counts produced by a function of each chunk.
+
+    Used for statistics that need more than one column, such as attack
+    pattern detection or reputation bands.
+    """
+
+    def __init__(self, count: Callable[[EventBatch], dict[Hashable, int]]) -> None:
+        """Initialize the accumulator.
+
+        Args:
+            count: Function returning the counts of one chunk; it must be
+                picklable (e.g. a bound method) for process-based summaries
+
+        """
+        super().__init__()
+        self.count = count
+
+    def update(self, batch: EventBatch) -> None:
+        """Add the counts of the chunk."""
+        self.counts.update(self.count(batch))
+
+    def result(self) -> dict[Hashable, int]:
+        """Return the counts as a plain dictionary."""
+        return dict(self.counts)
+
+
+class IndexNames(Accumulator[list[str]]):
+    """Names of the indices the events came from."""
+
+    def __init__(self) -> None:
+        """Initialize the set of names."""
+        self.names: set[str] = set()
+
+    def update(self, batch: EventBatch) -> None:
+        """Add the chunk's index names."""
+        self.names.update(batch.indices)
+
+    def merge(self, other: Self) -> None:
+        """Add the other accumulator's index names."""
+        self.names.update(other.names)
+
+    def result(self) -> list[str]:
+        """Return the index names."""
+        return list(self.names)
+
+
+class SummaryEngine:
+    """Named accumulators updated together in one pass over the events."""
+
+    def __init__(self, accumulators: dict[str, Accumulator[Any]] | None = None) -> None:
+        """Initialize the engine.
+
+        Args:
+            accumulators: Initial statistics by name
+
+        """
+        self.accumulators: dict[str, Accumulator[Any]] = dict(accumulators or {})
+
+    def register(self, name: str, accumulator: Accumulator[Any]) -> None:
+        """Register a statistic.
+
+        Args:
+            name: Name of the statistic in :meth:`results`
+            accumulator: Accumulator computing it
+
+        Raises:
+            ValueError: If a statistic with this name is already registered
+
+        """
+        if name in self.accumulators:
+            raise ValueError(f"Statistic '{name}' is already registered")
+        self.accumulators[name] = accumulator
+
+    def update(self, events: list[dict[str, Any]] | EventBatch) -> None:
+        """Fold a chunk of events into every registered statistic.
+
+        Args:
+            events: Chunk of parsed events, or an EventBatch holding them
+
+        """
+        batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+        for accumulator in self.accumulators.values():
+            accumulator.update(batch)
+
+    def merge(self, other: "SummaryEngine") -> None:
+        """Fold an engine computed over other chunks into this one.
+
+        Args:
+            other: Engine with the same registered statistics
+
+        Raises:
+            ValueError: If the engines do not register the same statistics
+
+        """
+        if self.accumulators.keys() != other.accumulators.keys():
+            raise ValueError("Cannot merge summary engines with different statistics")
+        for name, accumulator in self.accumulators.items():
+            accumulator.merge(other.accumulators[name])
+
+    def results(self) -> dict[str, Any]:
+        """Return every statistic by name."""
+        return {name: accumulator.result() for name, accumulator in self.accumulators.items()}
+
+
+def _summarize_chunk(
+    factory: Callable[[], SummaryEngine], events: list[dict[str, Any]]
+) -> SummaryEngine:
+    """Build an engine over one chunk (module level so process pools can pickle it).
+
+    Args:
+        factory: Function creating an empty engine
+        events: Chunk of parsed events
+
+    Returns:
+        Engine updated with the chunk
+
+    """
+    engine = factory()
+    engine.update(events)
+    return engine
+
+
+def summarize(
+    events: list[dict[str, Any]],
+    factory: Callable[[], SummaryEngine],
+    chunk_size: int = 100_000,
+    executor: Executor | None = None,
+) -> SummaryEngine:
+    """Compute a summary over events in chunks, optionally in parallel.
+
+    Args:
+        events: Parsed events
+        factory: Function creating an empty engine with the statistics to
+            compute
+        chunk_size: Number of events per chunk
+        executor: Optional executor running one chunk per task; the partial
+            engines are merged in chunk order
+
+    Returns:
+        Engine holding the statistics over all events
+
+    Raises:
+        ValueError: If chunk_size is less than 1
+
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    chunks: Iterable[list[dict[str, Any]]] = (
+        events[start : start + chunk_size] for start in range(0, len(events), chunk_size)
+    )
+    engine = factory()
+    if executor is None:
+        for chunk in chunks:
+            engine.update(chunk)
+        return engine
+
+    for partial in executor.map(_summarize_chunk, repeat(factory), chunks):
+        engine.merge(partial)
+    return engine
@@ -6,11 +6,11 @@ support, authentication, security, and integration with the existing MCP server.
 """
 
 import asyncio
-import json
 from typing import Any
 
 import structlog
 
+from . import json_codec
 from .connection_manager import ConnectionManager
 from .mcp_error_handler import ErrorHandlingConfig, MCPErrorHandler
 from .tcp_auth import TCPAuthenticator
@@ -308,7 +308,7 @@ class MCPServerAdapter:
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, indent=2),
+                            "text": json_codec.dumps_text(result),
                         },
                     ],
                 },
@@ -677,7 +677,7 @@ class EnhancedTCPServer:
 
                 # Parse JSON message
                 try:
-                    message = json.loads(message_data.decode("utf-8"))
+                    message = json_codec.loads(message_data)
                     connection.update_activity()
 
                     # Validate message with security manager
@@ -698,7 +698,7 @@ class EnhancedTCPServer:
 
                 except SecurityViolation as e:
                     await self._send_error_response(connection, e.violation_type, str(e))
-                except json.JSONDecodeError as e:
+                except json_codec.JSONDecodeError as e:
                     await self._send_error_response(
                         connection, "INVALID_JSON", f"Invalid JSON: {e}"
                     )
@@ -726,7 +726,7 @@ class EnhancedTCPServer:
 
         """
         try:
-            message_data = json.dumps(response).encode("utf-8")
+            message_data = json_codec.dumps_bytes(response)
             message_length = len(message_data)
 
             # Send message length
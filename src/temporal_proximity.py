@@ -0,0 +1,95 @@
+"""Sliding-window neighbour counts over event timestamps.
+
+Campaign confidence scoring rewards events that have other events close to
+them in time. Counting those neighbours by comparing every event with every
+other one is quadratic; with the timestamps sorted, the neighbours of an
+event are a contiguous run whose bounds two ``searchsorted`` calls find, so
+all counts together cost O(n log n) for any window length.
+"""
+
+from collections.abc import Hashable, Sequence
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_microseconds(timestamps: Sequence[datetime]) -> np.ndarray:
+    """Convert datetimes to exact integer microseconds since the epoch.
+
+    Naive timestamps are counted from a naive epoch, so differences between
+    them match plain datetime subtraction.
+
+    Args:
+        timestamps: Event timestamps
+
+    Returns:
+        int64 array of microseconds since the epoch
+
+    """
+    return np.fromiter(
+        ((ts - (_EPOCH if ts.tzinfo is None else _EPOCH_UTC)) // _MICROSECOND for ts in timestamps),
+        dtype=np.int64,
+        count=len(timestamps),
+    )
+
+
+def _window_counts(sorted_times: np.ndarray, times: np.ndarray, window: int) -> np.ndarray:
+    """Count the sorted times within ``window`` of each time, bounds included."""
+    upper = np.searchsorted(sorted_times, times + window, side="right")
+    lower = np.searchsorted(sorted_times, times - window, side="left")
+    return upper - lower
+
+
+def neighbour_counts(
+    times: np.ndarray,
+    window: int,
+    keys: Sequence[Hashable] | None = None,
+) -> np.ndarray:
+    """Count, for every event, the other events at most ``window`` away.
+
+    Times and window are integers in the same unit, so the window bounds
+    are exact.
+
+    Args:
+        times: Event times, e.g. epoch microseconds (any order)
+        window: Largest time difference counted as a neighbour
+        keys: Optional identity of each event; events sharing the key of an
+            event (including itself) are not counted as its neighbours.
+            Without keys only the event itself is excluded.
+
+    Returns:
+        int64 array of neighbour counts, in input order
+
+    Raises:
+        ValueError: If ``keys`` does not have one entry per event
+
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if times.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    counts = _window_counts(np.sort(times), times, window)
+    if keys is None:
+        return counts - 1
+    if len(keys) != times.size:
+        raise ValueError("keys must have one entry per event")
+
+    # Same-key events within the window are excluded as well. Keys are
+    # usually unique (only the event itself), so only shared keys need work.
+    groups: dict[Hashable, list[int]] = {}
+    for position, key in enumerate(keys):
+        groups.setdefault(key, []).append(position)
+    counts -= 1
+    for positions in groups.values():
+        if len(positions) > 1:
+            members = np.asarray(positions)
+            group_times = times[members]
+            same_key = _window_counts(np.sort(group_times), group_times, window)
+            counts[members] -= same_key - 1
+    return counts
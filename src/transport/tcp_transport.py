@@ -6,12 +6,12 @@ network-based MCP protocol communication with authentication and rate limiting.
 """
 
 import asyncio
-import json
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
 
+from .. import json_codec
 from .base_transport import BaseTransport, TransportError
 
 logger = structlog.get_logger(__name__)
@@ -323,7 +323,7 @@ class TCPTransport(BaseTransport):
 
                 # Parse JSON message
                 try:
-                    message = json.loads(message_data.decode("utf-8"))
+                    message = json_codec.loads(message_data)
                     connection.update_activity()
 
                     # Check rate limiting
@@ -334,7 +334,7 @@ class TCPTransport(BaseTransport):
                     # Process message (placeholder - will be implemented with MCP protocol)
                     await self._process_mcp_message(connection, message)
 
-                except json.JSONDecodeError as e:
+                except json_codec.JSONDecodeError as e:
                     await self._send_error_response(connection, -32700, f"Invalid JSON: {e}")
                 except Exception as e:
                     await self._send_error_response(connection, -32603, f"Internal error: {e}")
@@ -384,7 +384,7 @@ class TCPTransport(BaseTransport):
 
         """
         try:
-            message_data = json.dumps(response).encode("utf-8")
+            message_data = json_codec.dumps_bytes(response)
             message_length = len(message_data)
 
             # Send message length
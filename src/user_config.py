@@ -123,6 +123,11 @@ class PerformanceSettings:
         enable_sqlite_cache: Whether to enable SQLite persistent caching
         sqlite_cache_ttl_hours: SQLite cache time-to-live in hours
         sqlite_cache_db_name: SQLite database filename
+        query_cache_max_mb: Maximum size of cached Elasticsearch query results
+        query_cache_time_bucket_seconds: Granularity relative time ranges are
+            snapped to in query cache keys
+        compact_json_output: Whether tool output and responses use compact
+            (non-indented) JSON
 
     """
 
@@ -135,6 +140,9 @@ class PerformanceSettings:
     enable_sqlite_cache: bool = True
     sqlite_cache_ttl_hours: int = 24
     sqlite_cache_db_name: str = "enrichment_cache.sqlite3"
+    query_cache_max_mb: int = 64
+    query_cache_time_bucket_seconds: int = 60
+    compact_json_output: bool = False
 
 
 @dataclass
@@ -207,6 +215,19 @@ class CampaignSettings:
         enable_ip_correlation: Whether to enable IP correlation
         max_expansion_depth: Maximum expansion depth
         expansion_timeout_seconds: Expansion timeout in seconds
+        subnet_prefix_v4: IPv4 prefix length used to group source IPs into subnets
+        subnet_prefix_v6: IPv6 prefix length used to group source IPs into subnets
+        time_proximity_window_seconds: Window in seconds for temporal proximity scoring
+        temporal_max_windows: Number of densest time windows used for temporal correlation
+        temporal_events_per_window: Events fetched from each temporal correlation window
+        indicator_batch_size: Indicators per batched stage query
+        searches_per_msearch: Searches sent in one multi-search request
+        events_per_indicator: Events fetched per indicator in batched queries
+        max_concurrent_queries: Elasticsearch queries run at once by the analyzer
+        max_queries_per_campaign: Query budget for correlating one campaign
+        max_documents_per_campaign: Document budget for correlating one campaign
+        campaign_deadline_seconds: Time budget in seconds for correlating one campaign
+        campaign_store_db_name: SQLite filename of the persistent campaign store
 
     """
 
@@ -220,6 +241,19 @@ class CampaignSettings:
     enable_ip_correlation: bool = True
     max_expansion_depth: int = 3
     expansion_timeout_seconds: int = 300
+    subnet_prefix_v4: int = 24
+    subnet_prefix_v6: int = 64
+    time_proximity_window_seconds: float = 3600.0
+    temporal_max_windows: int = 50
+    temporal_events_per_window: int = 100
+    indicator_batch_size: int = 100
+    searches_per_msearch: int = 10
+    events_per_indicator: int = 100
+    max_concurrent_queries: int = 4
+    max_queries_per_campaign: int = 500
+    max_documents_per_campaign: int = 100000
+    campaign_deadline_seconds: float = 120.0
+    campaign_store_db_name: str = "campaigns.sqlite3"
 
 
 @dataclass
@@ -602,6 +636,21 @@ class UserConfigManager:
         self.performance_settings.sqlite_cache_db_name = os.getenv(
             "SQLITE_CACHE_DB_NAME", self.performance_settings.sqlite_cache_db_name
         )
+        self.performance_settings.query_cache_max_mb = int(
+            os.getenv("QUERY_CACHE_MAX_MB", self.performance_settings.query_cache_max_mb)
+        )
+        self.performance_settings.query_cache_time_bucket_seconds = int(
+            os.getenv(
+                "QUERY_CACHE_TIME_BUCKET_SECONDS",
+                self.performance_settings.query_cache_time_bucket_seconds,
+            )
+        )
+        self.performance_settings.compact_json_output = (
+            os.getenv(
+                "COMPACT_JSON_OUTPUT", str(self.performance_settings.compact_json_output)
+            ).lower()
+            == "true"
+        )
 
         # Security Settings
         self.security_settings.rate_limit_requests_per_minute = int(
@@ -711,6 +760,52 @@ class UserConfigManager:
         self.campaign_settings.expansion_timeout_seconds = int(
             os.getenv("EXPANSION_TIMEOUT_SECONDS", self.campaign_settings.expansion_timeout_seconds)
         )
+        self.campaign_settings.subnet_prefix_v4 = int(
+            os.getenv("SUBNET_PREFIX_V4", self.campaign_settings.subnet_prefix_v4)
+        )
+        self.campaign_settings.subnet_prefix_v6 = int(
+            os.getenv("SUBNET_PREFIX_V6", self.campaign_settings.subnet_prefix_v6)
+        )
+        self.campaign_settings.time_proximity_window_seconds = float(
+            os.getenv(
+                "TIME_PROXIMITY_WINDOW_SECONDS",
+                self.campaign_settings.time_proximity_window_seconds,
+            )
+        )
+        self.campaign_settings.temporal_max_windows = int(
+            os.getenv("TEMPORAL_MAX_WINDOWS", self.campaign_settings.temporal_max_windows)
+        )
+        self.campaign_settings.temporal_events_per_window = int(
+            os.getenv(
+                "TEMPORAL_EVENTS_PER_WINDOW", self.campaign_settings.temporal_events_per_window
+            )
+        )
+        self.campaign_settings.indicator_batch_size = int(
+            os.getenv("INDICATOR_BATCH_SIZE", self.campaign_settings.indicator_batch_size)
+        )
+        self.campaign_settings.searches_per_msearch = int(
+            os.getenv("SEARCHES_PER_MSEARCH", self.campaign_settings.searches_per_msearch)
+        )
+        self.campaign_settings.events_per_indicator = int(
+            os.getenv("EVENTS_PER_INDICATOR", self.campaign_settings.events_per_indicator)
+        )
+        self.campaign_settings.max_concurrent_queries = int(
+            os.getenv("MAX_CONCURRENT_QUERIES", self.campaign_settings.max_concurrent_queries)
+        )
+        self.campaign_settings.max_queries_per_campaign = int(
+            os.getenv("MAX_QUERIES_PER_CAMPAIGN", self.campaign_settings.max_queries_per_campaign)
+        )
+        self.campaign_settings.max_documents_per_campaign = int(
+            os.getenv(
+                "MAX_DOCUMENTS_PER_CAMPAIGN", self.campaign_settings.max_documents_per_campaign
+            )
+        )
+        self.campaign_settings.campaign_deadline_seconds = float(
+            os.getenv("CAMPAIGN_DEADLINE_SECONDS", self.campaign_settings.campaign_deadline_seconds)
+        )
+        self.campaign_settings.campaign_store_db_name = os.getenv(
+            "CAMPAIGN_STORE_DB_NAME", self.campaign_settings.campaign_store_db_name
+        )
 
     def _apply_user_config(self, user_config: dict[str, Any]) -> None:
         """Apply user configuration file settings.
@@ -813,6 +908,16 @@ class UserConfigManager:
             self.performance_settings.sqlite_cache_db_name = performance_config.get(
                 "sqlite_cache_db_name", self.performance_settings.sqlite_cache_db_name
             )
+            self.performance_settings.query_cache_max_mb = performance_config.get(
+                "query_cache_max_mb", self.performance_settings.query_cache_max_mb
+            )
+            self.performance_settings.query_cache_time_bucket_seconds = performance_config.get(
+                "query_cache_time_bucket_seconds",
+                self.performance_settings.query_cache_time_bucket_seconds,
+            )
+            self.performance_settings.compact_json_output = performance_config.get(
+                "compact_json_output", self.performance_settings.compact_json_output
+            )
 
         # Security Settings
         if "security" in user_config:
@@ -897,6 +1002,46 @@ class UserConfigManager:
             self.campaign_settings.expansion_timeout_seconds = campaign_config.get(
                 "expansion_timeout_seconds", self.campaign_settings.expansion_timeout_seconds
             )
+            self.campaign_settings.subnet_prefix_v4 = campaign_config.get(
+                "subnet_prefix_v4", self.campaign_settings.subnet_prefix_v4
+            )
+            self.campaign_settings.subnet_prefix_v6 = campaign_config.get(
+                "subnet_prefix_v6", self.campaign_settings.subnet_prefix_v6
+            )
+            self.campaign_settings.time_proximity_window_seconds = campaign_config.get(
+                "time_proximity_window_seconds",
+                self.campaign_settings.time_proximity_window_seconds,
+            )
+            self.campaign_settings.temporal_max_windows = campaign_config.get(
+                "temporal_max_windows", self.campaign_settings.temporal_max_windows
+            )
+            self.campaign_settings.temporal_events_per_window = campaign_config.get(
+                "temporal_events_per_window", self.campaign_settings.temporal_events_per_window
+            )
+            self.campaign_settings.indicator_batch_size = campaign_config.get(
+                "indicator_batch_size", self.campaign_settings.indicator_batch_size
+            )
+            self.campaign_settings.searches_per_msearch = campaign_config.get(
+                "searches_per_msearch", self.campaign_settings.searches_per_msearch
+            )
+            self.campaign_settings.events_per_indicator = campaign_config.get(
+                "events_per_indicator", self.campaign_settings.events_per_indicator
+            )
+            self.campaign_settings.max_concurrent_queries = campaign_config.get(
+                "max_concurrent_queries", self.campaign_settings.max_concurrent_queries
+            )
+            self.campaign_settings.max_queries_per_campaign = campaign_config.get(
+                "max_queries_per_campaign", self.campaign_settings.max_queries_per_campaign
+            )
+            self.campaign_settings.max_documents_per_campaign = campaign_config.get(
+                "max_documents_per_campaign", self.campaign_settings.max_documents_per_campaign
+            )
+            self.campaign_settings.campaign_deadline_seconds = campaign_config.get(
+                "campaign_deadline_seconds", self.campaign_settings.campaign_deadline_seconds
+            )
+            self.campaign_settings.campaign_store_db_name = campaign_config.get(
+                "campaign_store_db_name", self.campaign_settings.campaign_store_db_name
+            )
 
         # TCP Transport Settings
         if "tcp_transport" in user_config:
@@ -1011,6 +1156,10 @@ class UserConfigManager:
             errors.append("max_cache_size must be positive")
         if self.performance_settings.connection_pool_size <= 0:
             errors.append("connection_pool_size must be positive")
+        if self.performance_settings.query_cache_max_mb <= 0:
+            errors.append("query_cache_max_mb must be positive")
+        if self.performance_settings.query_cache_time_bucket_seconds <= 0:
+            errors.append("query_cache_time_bucket_seconds must be positive")
 
         # Security Settings Validation
         if self.security_settings.rate_limit_requests_per_minute <= 0:
@@ -1038,6 +1187,30 @@ class UserConfigManager:
             errors.append("max_expansion_depth must be positive")
         if self.campaign_settings.expansion_timeout_seconds <= 0:
             errors.append("expansion_timeout_seconds must be positive")
+        if not 1 <= self.campaign_settings.subnet_prefix_v4 <= 32:
+            errors.append("subnet_prefix_v4 must be between 1 and 32")
+        if not 1 <= self.campaign_settings.subnet_prefix_v6 <= 128:
+            errors.append("subnet_prefix_v6 must be between 1 and 128")
+        if self.campaign_settings.time_proximity_window_seconds <= 0:
+            errors.append("time_proximity_window_seconds must be positive")
+        if self.campaign_settings.temporal_max_windows <= 0:
+            errors.append("temporal_max_windows must be positive")
+        if self.campaign_settings.temporal_events_per_window <= 0:
+            errors.append("temporal_events_per_window must be positive")
+        if self.campaign_settings.indicator_batch_size <= 0:
+            errors.append("indicator_batch_size must be positive")
+        if self.campaign_settings.searches_per_msearch <= 0:
+            errors.append("searches_per_msearch must be positive")
+        if self.campaign_settings.events_per_indicator <= 0:
+            errors.append("events_per_indicator must be positive")
+        if self.campaign_settings.max_concurrent_queries <= 0:
+            errors.append("max_concurrent_queries must be positive")
+        if self.campaign_settings.max_queries_per_campaign <= 0:
+            errors.append("max_queries_per_campaign must be positive")
+        if self.campaign_settings.max_documents_per_campaign <= 0:
+            errors.append("max_documents_per_campaign must be positive")
+        if self.campaign_settings.campaign_deadline_seconds <= 0:
+            errors.append("campaign_deadline_seconds must be positive")
 
         # TCP Transport Settings Validation
         if self.tcp_transport_settings.port <= 0 or self.tcp_transport_settings.port > 65535:
@@ -1198,6 +1371,11 @@ class UserConfigManager:
                 "enable_sqlite_cache": self.performance_settings.enable_sqlite_cache,
                 "sqlite_cache_ttl_hours": self.performance_settings.sqlite_cache_ttl_hours,
                 "sqlite_cache_db_name": self.performance_settings.sqlite_cache_db_name,
+                "query_cache_max_mb": self.performance_settings.query_cache_max_mb,
+                "query_cache_time_bucket_seconds": (
+                    self.performance_settings.query_cache_time_bucket_seconds
+                ),
+                "compact_json_output": self.performance_settings.compact_json_output,
             },
             "security": {
                 "rate_limit_requests_per_minute": (
@@ -1234,6 +1412,21 @@ class UserConfigManager:
                 "enable_ip_correlation": self.campaign_settings.enable_ip_correlation,
                 "max_expansion_depth": self.campaign_settings.max_expansion_depth,
                 "expansion_timeout_seconds": self.campaign_settings.expansion_timeout_seconds,
+                "subnet_prefix_v4": self.campaign_settings.subnet_prefix_v4,
+                "subnet_prefix_v6": self.campaign_settings.subnet_prefix_v6,
+                "time_proximity_window_seconds": (
+                    self.campaign_settings.time_proximity_window_seconds
+                ),
+                "temporal_max_windows": self.campaign_settings.temporal_max_windows,
+                "temporal_events_per_window": self.campaign_settings.temporal_events_per_window,
+                "indicator_batch_size": self.campaign_settings.indicator_batch_size,
+                "searches_per_msearch": self.campaign_settings.searches_per_msearch,
+                "events_per_indicator": self.campaign_settings.events_per_indicator,
+                "max_concurrent_queries": self.campaign_settings.max_concurrent_queries,
+                "max_queries_per_campaign": self.campaign_settings.max_queries_per_campaign,
+                "max_documents_per_campaign": self.campaign_settings.max_documents_per_campaign,
+                "campaign_deadline_seconds": self.campaign_settings.campaign_deadline_seconds,
+                "campaign_store_db_name": self.campaign_settings.campaign_store_db_name,
             },
         }
 
@@ -1299,6 +1492,11 @@ class UserConfigManager:
             "ENABLE_SQLITE_CACHE": str(self.performance_settings.enable_sqlite_cache),
             "SQLITE_CACHE_TTL_HOURS": str(self.performance_settings.sqlite_cache_ttl_hours),
             "SQLITE_CACHE_DB_NAME": self.performance_settings.sqlite_cache_db_name,
+            "QUERY_CACHE_MAX_MB": str(self.performance_settings.query_cache_max_mb),
+            "QUERY_CACHE_TIME_BUCKET_SECONDS": str(
+                self.performance_settings.query_cache_time_bucket_seconds
+            ),
+            "COMPACT_JSON_OUTPUT": str(self.performance_settings.compact_json_output),
             # Security Settings
             "RATE_LIMIT_REQUESTS_PER_MINUTE": str(
                 self.security_settings.rate_limit_requests_per_minute
@@ -1332,6 +1530,21 @@ class UserConfigManager:
             "ENABLE_IP_CORRELATION": str(self.campaign_settings.enable_ip_correlation),
             "MAX_EXPANSION_DEPTH": str(self.campaign_settings.max_expansion_depth),
             "EXPANSION_TIMEOUT_SECONDS": str(self.campaign_settings.expansion_timeout_seconds),
+            "SUBNET_PREFIX_V4": str(self.campaign_settings.subnet_prefix_v4),
+            "SUBNET_PREFIX_V6": str(self.campaign_settings.subnet_prefix_v6),
+            "TIME_PROXIMITY_WINDOW_SECONDS": str(
+                self.campaign_settings.time_proximity_window_seconds
+            ),
+            "TEMPORAL_MAX_WINDOWS": str(self.campaign_settings.temporal_max_windows),
+            "TEMPORAL_EVENTS_PER_WINDOW": str(self.campaign_settings.temporal_events_per_window),
+            "INDICATOR_BATCH_SIZE": str(self.campaign_settings.indicator_batch_size),
+            "SEARCHES_PER_MSEARCH": str(self.campaign_settings.searches_per_msearch),
+            "EVENTS_PER_INDICATOR": str(self.campaign_settings.events_per_indicator),
+            "MAX_CONCURRENT_QUERIES": str(self.campaign_settings.max_concurrent_queries),
+            "MAX_QUERIES_PER_CAMPAIGN": str(self.campaign_settings.max_queries_per_campaign),
+            "MAX_DOCUMENTS_PER_CAMPAIGN": str(self.campaign_settings.max_documents_per_campaign),
+            "CAMPAIGN_DEADLINE_SECONDS": str(self.campaign_settings.campaign_deadline_seconds),
+            "CAMPAIGN_STORE_DB_NAME": self.campaign_settings.campaign_store_db_name,
         }
 
     def get_database_directory(self) -> str:
@@ -1357,6 +1570,16 @@ class UserConfigManager:
         db_dir = self.get_database_directory()
         return os.path.join(db_dir, self.performance_settings.sqlite_cache_db_name)
 
+    def get_campaign_database_path(self) -> str:
+        """Get the full path to the campaign store database file.
+
+        Returns:
+            str: Full path to the campaign store database file
+
+        """
+        db_dir = self.get_database_directory()
+        return os.path.join(db_dir, self.campaign_settings.campaign_store_db_name)
+
 
 # Global instance for easy access
 _user_config_manager: UserConfigManager | None = None
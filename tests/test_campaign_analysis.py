@@ -4,14 +4,32 @@ Tests for campaign analysis functionality including data models, correlation met
 timeline building, scoring, and MCP tools integration.
 """
 
+import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 import pytest_asyncio
 
-from src.campaign_analyzer import Campaign, CampaignAnalyzer, CampaignEvent, CorrelationMethod
+from src.campaign_analyzer import (
+    Campaign,
+    CampaignAnalyzer,
+    CampaignEvent,
+    CorrelationMethod,
+    QueryBudget,
+)
 from src.campaign_mcp_tools import CampaignMCPTools
+from src.user_config import CampaignSettings
+
+
+def campaign_settings_config() -> Mock:
+    """User config mock answering campaign settings with their defaults."""
+    defaults = CampaignSettings()
+    user_config = Mock()
+    user_config.get_setting.side_effect = lambda section, key: (
+        getattr(defaults, key) if section == "campaign" else Mock()
+    )
+    return user_config
 
 
 class TestCampaignAnalysis:
@@ -561,3 +579,321 @@ class TestCampaignAnalysis:
         assert "advanced" in full_campaign.metadata["tags"]
         assert "persistent" in full_campaign.metadata["tags"]
         assert full_campaign.metadata["threat_level"] == "high"
+
+
+class TestBatchedIndicatorQueries:
+    """Test batched multi-search correlation in stages 1, 5 and 6."""
+
+    @pytest.fixture
+    def analyzer(self):
+        """CampaignAnalyzer over a mocked ES client with a recording msearch."""
+        es_client = Mock()
+        es_client.searches = []
+
+        async def msearch(queries, time_range_hours=24, size=100, **kwargs):
+            es_client.searches.append(queries)
+            results = []
+            for query in queries:
+                events = []
+                for clause in query["bool"]["should"]:
+                    if "terms" in clause:
+                        for ip in next(iter(clause["terms"].values())):
+                            events.append({"id": f"ev-{ip}", "source_ip": ip})
+                    else:
+                        name = clause["bool"]["_name"]
+                        events.append({"id": f"ev-{name}", "matched_queries": [name]})
+                results.append(events)
+            return results
+
+        es_client.msearch_dshield_events = AsyncMock(side_effect=msearch)
+        with patch(
+            "src.campaign_analyzer.get_user_config", return_value=campaign_settings_config()
+        ):
+            yield CampaignAnalyzer(es_client)
+
+    @pytest.mark.asyncio
+    async def test_stage1_batches_iocs_into_one_request(self, analyzer):
+        """All seed IOCs go out in one msearch request, split by IOC kind."""
+        seed_events = [
+            {"source.ip": "1.1.1.1", "destination.ip": "2.2.2.2"},
+            {"source.ip": "3.3.3.3", "user_agent.original": "evil*bot"},
+        ]
+
+        events = await analyzer._stage1_direct_ioc_matches(seed_events, 24)
+
+        assert analyzer.es_client.msearch_dshield_events.await_count == 1
+        queries = analyzer.es_client.searches[0]
+        assert len(queries) == 2
+        ip_query, ioc_query = queries
+        assert ip_query["bool"]["should"][0] == {
+            "terms": {"source.ip": ["1.1.1.1", "2.2.2.2", "3.3.3.3"]}
+        }
+        wildcard = ioc_query["bool"]["should"][0]["bool"]["should"][1]
+        assert wildcard == {"wildcard": {"user_agent.original": "*evil\\*bot*"}}
+
+        attributed = {e["id"]: e["matched_indicators"] for e in events}
+        assert attributed["ev-1.1.1.1"] == ["1.1.1.1"]
+        assert attributed["ev-evil*bot"] == ["evil*bot"]
+        assert len(events) == 4
+
+    @pytest.mark.asyncio
+    async def test_requests_are_split_and_bounded(self, analyzer):
+        """Large indicator sets are split into batches with bounded concurrency."""
+        analyzer.indicator_batch_size = 10
+        analyzer.searches_per_msearch = 2
+        analyzer.max_concurrent_queries = 2
+        in_flight = 0
+        peak = 0
+        inner = analyzer.es_client.msearch_dshield_events.side_effect
+
+        async def slow_msearch(queries, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await inner(queries, **kwargs)
+
+        analyzer.es_client.msearch_dshield_events.side_effect = slow_msearch
+        ips = [f"10.0.{i // 250}.{i % 250}" for i in range(55)]
+
+        matches = await analyzer._query_events_by_indicators(ips, 24, ip_fields=("source.ip",))
+
+        # 55 IPs -> 6 searches -> 3 msearch requests, at most 2 at a time
+        assert analyzer.es_client.msearch_dshield_events.await_count == 3
+        assert peak == 2
+        assert all(len(events) == 1 for events in matches.values())
+        assert set(matches) == set(ips)
+
+    @pytest.mark.asyncio
+    async def test_noisy_indicator_does_not_starve_batch(self, analyzer):
+        """Each indicator of a batch gets its own events_per_indicator budget."""
+        analyzer.events_per_indicator = 5
+        matching = {"1.1.1.1": 1000, "2.2.2.2": 3, "3.3.3.3": 1}
+
+        async def msearch(queries, size=100, groups=None, **kwargs):
+            # Per-bucket top hits, as Elasticsearch returns them for grouped searches
+            return [
+                [
+                    {"id": f"ev-{name}-{n}", "matched_queries": [name]}
+                    for name in search_groups
+                    for n in range(min(matching[name], size))
+                ]
+                for search_groups in groups
+            ]
+
+        analyzer.es_client.msearch_dshield_events.side_effect = msearch
+
+        matches = await analyzer._query_events_by_indicators(list(matching), 24)
+
+        kwargs = analyzer.es_client.msearch_dshield_events.await_args.kwargs
+        assert kwargs["size"] == 5
+        (groups,) = kwargs["groups"]
+        assert groups["2.2.2.2"]["bool"]["should"][0] == {"term": {"source.ip": "2.2.2.2"}}
+        assert {ip: len(events) for ip, events in matches.items()} == {
+            "1.1.1.1": 5,
+            "2.2.2.2": 3,
+            "3.3.3.3": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_fail_stage(self, analyzer):
+        """A failing msearch request is logged and contributes no events."""
+        analyzer.es_client.msearch_dshield_events.side_effect = RuntimeError("boom")
+        events = [{"_id": "seed", "source.ip": "1.1.1.1"}]
+
+        result = await analyzer._stage5_ip_correlation(events, 24)
+
+        assert result == events
+
+    @pytest.mark.asyncio
+    async def test_stage6_queries_subnets_as_cidrs(self, analyzer):
+        """Subnets with several IPs are searched once each, by CIDR."""
+        searched = []
+
+        async def msearch(queries, **kwargs):
+            for query in queries:
+                searched.extend(query["bool"]["should"][0]["terms"]["source.ip"])
+            return [[{"id": "ev-new", "source_ip": "203.0.113.77"}] for _ in queries]
+
+        analyzer.es_client.msearch_dshield_events.side_effect = msearch
+        events = [
+            {"_id": "a", "source.ip": "203.0.113.5"},
+            {"_id": "b", "source.ip": "203.0.113.9"},
+            {"_id": "c", "source.ip": "198.51.100.1"},
+            {"_id": "d", "source.ip": "2001:db8::1"},
+            {"_id": "e", "source.ip": "2001:db8::ffff"},
+        ]
+
+        result = await analyzer._stage6_network_correlation(events, 24)
+
+        assert sorted(searched) == ["2001:db8::/64", "203.0.113.0/24"]
+        new_event = next(e for e in result if e.get("id") == "ev-new")
+        assert new_event["matched_indicators"] == ["203.0.113.0/24"]
+
+
+class TestCorrelationQueryPlanning:
+    """Test concurrent stage queries under a per-campaign budget."""
+
+    @pytest.fixture
+    def analyzer(self):
+        """CampaignAnalyzer whose ES client answers every query after a short delay."""
+        es_client = Mock()
+        state = {"in_flight": 0, "peak": 0, "seed_events": []}
+
+        async def query_dshield_events(**kwargs):
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            start = kwargs["filters"]["@timestamp"]["gte"]
+            return [{"id": f"window-{start}", "@timestamp": start}], 1, {}
+
+        async def msearch(queries, **kwargs):
+            # Stage 1 finds the seed events again
+            return [state["seed_events"] for _ in queries]
+
+        async def query_events_by_time_windows(start, end, window_minutes, **kwargs):
+            # One window per hour of the range, the densest first
+            hours = int((end - start).total_seconds() // 3600)
+            return [
+                {
+                    "start": start + timedelta(hours=h),
+                    "end": start + timedelta(hours=h, minutes=window_minutes),
+                    "doc_count": hours - h,
+                    "events": [{"id": f"window-{h}", "@timestamp": start.isoformat()}],
+                }
+                for h in range(hours)
+            ]
+
+        es_client.query_dshield_events = AsyncMock(side_effect=query_dshield_events)
+        es_client.msearch_dshield_events = AsyncMock(side_effect=msearch)
+        es_client.query_events_by_time_windows = AsyncMock(
+            side_effect=query_events_by_time_windows
+        )
+        es_client.state = state
+        with patch(
+            "src.campaign_analyzer.get_user_config", return_value=campaign_settings_config()
+        ):
+            analyzer = CampaignAnalyzer(es_client)
+        analyzer.max_campaign_events = 10000
+        analyzer.correlation_window_minutes = 30
+        analyzer.enable_performance_logging = False
+        return analyzer
+
+    @staticmethod
+    def seed_events(analyzer, hours: int = 4):
+        """Seed events spread over a few hours, also returned by stage 1."""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        events = [
+            {
+                "_id": f"seed-{h}",
+                "@timestamp": (base + timedelta(hours=h)).isoformat(),
+                "source.ip": "1.1.1.1",
+            }
+            for h in range(hours)
+        ]
+        analyzer.es_client.state["seed_events"] = events
+        return events
+
+    def test_budget_limits(self):
+        """The budget refuses queries past its query, document and time limits."""
+        budget = QueryBudget(max_queries=3, max_documents=10, deadline_seconds=60)
+        assert budget.acquire(2)
+        assert not budget.acquire(2)
+        assert budget.exhausted_reason == "max_queries"
+
+        budget = QueryBudget(max_queries=10, max_documents=10, deadline_seconds=60)
+        budget.documents_used = 10
+        assert not budget.acquire()
+        assert budget.exhausted_reason == "max_documents"
+
+        budget = QueryBudget(max_queries=10, max_documents=10, deadline_seconds=0)
+        assert not budget.acquire()
+        assert budget.exhausted_reason == "deadline"
+
+    @pytest.mark.asyncio
+    async def test_stage_queries_run_concurrently(self, analyzer):
+        """Independent stage queries overlap up to max_concurrent_queries."""
+        analyzer.max_concurrent_queries = 3
+        queries = [
+            lambda i=i: analyzer.es_client.query_dshield_events(
+                filters={"@timestamp": {"gte": str(i)}}
+            )
+            for i in range(6)
+        ]
+
+        await analyzer._run_event_queries(queries, None)
+
+        assert analyzer.es_client.state["peak"] == 3
+        assert analyzer.es_client.query_dshield_events.await_count == 6
+
+    @pytest.mark.asyncio
+    async def test_temporal_windows_in_one_query_with_timings(self, analyzer):
+        """All temporal windows come from one windows query; timings reach the metadata."""
+        campaign = await analyzer.correlate_events(
+            self.seed_events(analyzer),
+            [CorrelationMethod.TEMPORAL_CORRELATION],
+            min_confidence=0.0,
+        )
+
+        windows_query = analyzer.es_client.query_events_by_time_windows
+        windows_query.assert_awaited_once()
+        start, end, window_minutes = windows_query.await_args.args
+        assert window_minutes == 30
+        assert start == datetime(2024, 1, 1, 12, 0, 0)
+        assert end == datetime(2024, 1, 1, 15, 30, 0)
+        assert windows_query.await_args.kwargs["max_windows"] == analyzer.temporal_max_windows
+        analyzer.es_client.query_dshield_events.assert_not_awaited()
+        assert campaign.total_events == 4 + 3
+        timings = campaign.metadata["stage_timings"]
+        assert set(timings) == {
+            "direct_ioc_matches",
+            "temporal_correlation",
+            "confidence_scoring",
+        }
+        budget = campaign.metadata["query_budget"]
+        # One msearch search for the seed IP, then the histogram and window events requests
+        assert budget["queries_used"] == 3
+        assert budget["exhausted_reason"] is None
+        assert campaign.metadata["short_circuited_at"] is None
+
+    @pytest.mark.asyncio
+    async def test_short_circuit_at_max_campaign_events(self, analyzer):
+        """Expansion stops once max_campaign_events events have been found."""
+        analyzer.max_campaign_events = 1
+
+        campaign = await analyzer.correlate_events(
+            self.seed_events(analyzer),
+            [CorrelationMethod.TEMPORAL_CORRELATION, CorrelationMethod.IP_CORRELATION],
+            min_confidence=0.0,
+        )
+
+        analyzer.es_client.query_events_by_time_windows.assert_not_awaited()
+        assert campaign.metadata["short_circuited_at"] == "temporal_correlation"
+        assert campaign.total_events == 1
+
+    @pytest.mark.asyncio
+    async def test_query_budget_caps_queries(self, analyzer):
+        """Queries beyond max_queries_per_campaign are not sent."""
+        analyzer.max_queries_per_campaign = 1
+
+        campaign = await analyzer.correlate_events(
+            self.seed_events(analyzer, hours=6),
+            [CorrelationMethod.TEMPORAL_CORRELATION],
+            min_confidence=0.0,
+        )
+
+        analyzer.es_client.query_events_by_time_windows.assert_not_awaited()
+        assert campaign.metadata["query_budget"]["exhausted_reason"] == "max_queries"
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_slow_queries(self, analyzer):
+        """Queries still running at the deadline are abandoned."""
+        budget = QueryBudget(max_queries=10, max_documents=100, deadline_seconds=0.05)
+
+        async def never_returns():
+            await asyncio.sleep(10)
+
+        assert await analyzer._run_query(never_returns, budget) is None
+        assert budget.exhausted_reason == "deadline"
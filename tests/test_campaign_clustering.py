@@ -0,0 +1,253 @@
+"""Tests for online campaign clustering."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.campaign_analyzer import Campaign
+from src.campaign_clustering import OnlineCampaignClusterer
+from src.campaign_mcp_tools import CampaignMCPTools
+from src.campaign_store import CampaignStore
+from src.elasticsearch_client import ElasticsearchClient
+
+NOW = datetime.now(UTC)
+
+
+def make_event(number: int, source_ip: str, minutes_ago: float = 5, **raw) -> dict:
+    """Build a parsed event with optional raw source fields."""
+    return {
+        "id": f"evt-{number}",
+        "timestamp": (NOW - timedelta(minutes=minutes_ago)).isoformat(),
+        "source_ip": source_ip,
+        "event_type": "connection",
+        "raw_data": raw,
+    }
+
+
+def cluster_sizes(clusterer: OnlineCampaignClusterer) -> list[int]:
+    """Event counts of all clusters, largest first."""
+    campaigns = clusterer.active_campaigns(NOW - timedelta(days=1), min_events=1)
+    return sorted((c["event_count"] for c in campaigns), reverse=True)
+
+
+class TestOnlineCampaignClusterer:
+    """Union-find clustering over shared features."""
+
+    def test_events_sharing_features_are_clustered(self):
+        """IPs, subnets and payloads chain events into one cluster."""
+        clusterer = OnlineCampaignClusterer()
+        clusterer.add_events(
+            [
+                make_event(1, "203.0.113.5"),
+                make_event(2, "203.0.113.5"),
+                # Same /24 as the first IP
+                make_event(3, "203.0.113.77"),
+                # Different subnet, same payload as the next event
+                make_event(4, "198.51.100.1", **{"url.original": "/shell?cmd=id"}),
+                make_event(5, "192.0.2.9", url={"original": "/shell?cmd=id"}),
+                make_event(6, "2001:db8::1"),
+            ]
+        )
+        assert cluster_sizes(clusterer) == [3, 2, 1]
+
+    def test_threshold_selects_linking_features(self):
+        """A threshold of 1.0 only links events from the same IP."""
+        clusterer = OnlineCampaignClusterer(correlation_threshold=1.0)
+        clusterer.add_events([make_event(1, "203.0.113.5"), make_event(2, "203.0.113.6")])
+        assert cluster_sizes(clusterer) == [1, 1]
+
+    def test_widely_shared_values_stop_linking(self):
+        """A user agent seen from too many sources no longer joins clusters."""
+        clusterer = OnlineCampaignClusterer(correlation_threshold=0.6, max_key_sources=2)
+        agent = {"user_agent": {"original": "Mozilla/5.0"}}
+        clusterer.add_events([make_event(i, f"10.{i}.0.1", **agent) for i in range(4)])
+        assert cluster_sizes(clusterer) == [2, 1, 1]
+        assert clusterer.get_stats()["overused_features"] == 1
+
+    def test_cluster_id_is_kept_when_clusters_merge(self):
+        """The merged cluster keeps the ID of the older one."""
+        clusterer = OnlineCampaignClusterer(correlation_threshold=1.0)
+        clusterer.add_event(make_event(1, "203.0.113.5"))
+        (first,) = clusterer.active_campaigns(NOW - timedelta(days=1), min_events=1)
+        clusterer.add_event(make_event(2, "203.0.113.5"))
+        (merged,) = clusterer.active_campaigns(NOW - timedelta(days=1), min_events=1)
+        assert merged["campaign_id"] == first["campaign_id"]
+        assert merged["alert_data"]["sample_event_ids"] == ["evt-1", "evt-2"]
+
+    def test_prune_and_active_window(self):
+        """Idle clusters are not reported and can be dropped."""
+        clusterer = OnlineCampaignClusterer()
+        clusterer.add_events(
+            [make_event(1, "203.0.113.5", minutes_ago=600), make_event(2, "198.51.100.1")]
+        )
+        assert len(clusterer.active_campaigns(NOW - timedelta(hours=1), min_events=1)) == 1
+        assert clusterer.prune(NOW - timedelta(hours=1)) == 1
+        assert len(clusterer) == 1
+        clusterer.add_event(make_event(3, "203.0.113.5"))
+        assert cluster_sizes(clusterer) == [1, 1]
+
+    def test_state_round_trip(self):
+        """A restored clusterer keeps clusters, checkpoint and features."""
+        clusterer = OnlineCampaignClusterer(correlation_threshold=0.6)
+        clusterer.add_events([make_event(1, "203.0.113.5"), make_event(2, "198.51.100.1")])
+        clusterer.checkpoint = {"timestamp": 1, "ids": ["evt-2"]}
+
+        restored = OnlineCampaignClusterer.from_state(clusterer.to_state())
+        assert restored.checkpoint == clusterer.checkpoint
+        assert restored.kinds == clusterer.kinds
+        restored.add_event(make_event(3, "198.51.100.1"))
+        assert cluster_sizes(restored) == [2, 1]
+
+
+class TestEventTail:
+    """ElasticsearchClient.tail_dshield_events paging and checkpoints."""
+
+    @pytest.fixture
+    def client(self):
+        """Client with a mocked search."""
+        config = {"elasticsearch": {"url": "http://localhost:9200"}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @staticmethod
+    def page(*hits: tuple[str, int]) -> dict:
+        """Search response with hits given as (id, epoch millis)."""
+        return {
+            "hits": {
+                "hits": [
+                    {"_id": hit_id, "_index": "cowrie-1", "sort": [ms], "_source": {}}
+                    for hit_id, ms in hits
+                ]
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_pages_continue_after_boundary_ids(self, client):
+        """Pages resume at the last timestamp, excluding its known IDs."""
+        client.client.search.side_effect = [
+            self.page(("a", 100), ("b", 200)),
+            self.page(("c", 200)),
+        ]
+        events, checkpoint = await client.tail_dshield_events(
+            checkpoint={"timestamp": 50, "ids": ["z"]}, page_size=2, indices=["cowrie-*"]
+        )
+        assert [e["id"] for e in events] == ["a", "b", "c"]
+        assert checkpoint == {"timestamp": 200, "ids": ["b", "c"]}
+
+        first, second = (call.kwargs["body"] for call in client.client.search.call_args_list)
+        assert first["query"]["bool"]["must_not"] == [{"ids": {"values": ["z"]}}]
+        assert second["query"]["bool"]["filter"][0]["range"]["@timestamp"]["gte"] == 200
+        assert second["query"]["bool"]["must_not"] == [{"ids": {"values": ["b"]}}]
+
+    @pytest.mark.asyncio
+    async def test_no_new_events_keeps_checkpoint(self, client):
+        """An empty tail returns the checkpoint it was given."""
+        client.client.search.return_value = self.page()
+        checkpoint = {"timestamp": 50, "ids": ["z"]}
+        events, returned = await client.tail_dshield_events(checkpoint, indices=["cowrie-*"])
+        assert events == [] and returned == checkpoint
+
+    @pytest.mark.asyncio
+    async def test_failure_raises(self, client):
+        """Search errors surface as RuntimeError."""
+        client.client.search.side_effect = Exception("boom")
+        with pytest.raises(RuntimeError):
+            await client.tail_dshield_events(indices=["cowrie-*"])
+
+
+class TestDetectOngoingCampaigns:
+    """detect_ongoing_campaigns over the event tail."""
+
+    @pytest.fixture
+    def store(self):
+        """In-memory campaign store."""
+        return CampaignStore()
+
+    def make_tools(self, store: CampaignStore, tail: AsyncMock) -> CampaignMCPTools:
+        """Campaign tools whose client tails the given batches."""
+        es_client = Mock()
+        es_client.tail_dshield_events = tail
+        with (
+            patch("src.campaign_mcp_tools.get_user_config"),
+            patch("src.campaign_analyzer.get_user_config"),
+        ):
+            tools = CampaignMCPTools(es_client, campaign_store=store)
+        tools.campaign_analyzer.subnet_prefix_v4 = 24
+        tools.campaign_analyzer.subnet_prefix_v6 = 64
+        return tools
+
+    @pytest.mark.asyncio
+    async def test_each_call_processes_events_since_checkpoint(self, store):
+        """Later calls resume from the checkpoint and grow the same clusters."""
+        first = [make_event(i, "203.0.113.5") for i in range(3)]
+        second = [make_event(i, "203.0.113.9") for i in range(3, 5)]
+        tail = AsyncMock(
+            side_effect=[
+                (first, {"timestamp": 1, "ids": ["evt-2"]}),
+                (second, {"timestamp": 2, "ids": ["evt-4"]}),
+            ]
+        )
+        tools = self.make_tools(store, tail)
+
+        result = await tools.detect_ongoing_campaigns(min_event_threshold=4)
+        assert result["success"] and result["ongoing_campaigns"] == []
+        result = await tools.detect_ongoing_campaigns(min_event_threshold=4)
+        (campaign,) = result["ongoing_campaigns"]
+        assert campaign["event_count"] == 5
+        assert result["new_events_analyzed"] == 2
+        assert tail.await_args_list[1].kwargs["checkpoint"] == {"timestamp": 1, "ids": ["evt-2"]}
+
+        # A new instance resumes from the checkpoint saved in the store
+        later = AsyncMock(return_value=([], {"timestamp": 2, "ids": ["evt-4"]}))
+        restored = self.make_tools(store, later)
+        result = await restored.detect_ongoing_campaigns(min_event_threshold=4)
+        assert result["ongoing_campaigns"][0]["event_count"] == 5
+        assert later.await_args.kwargs["checkpoint"] == {"timestamp": 2, "ids": ["evt-4"]}
+
+    @pytest.mark.asyncio
+    async def test_tailed_events_extend_stored_campaigns(self, store):
+        """New events of a stored campaign's IPs are merged into it and re-indexed."""
+        store.save_campaign(
+            Campaign(
+                campaign_id="stored",
+                confidence_score=0.8,
+                start_time=NOW - timedelta(hours=2),
+                end_time=NOW - timedelta(hours=1),
+                related_indicators=["203.0.113.5"],
+                total_events=10,
+            )
+        )
+        events = [make_event(1, "203.0.113.5"), make_event(2, "198.51.100.7")]
+        tail = AsyncMock(return_value=(events, {"timestamp": 1, "ids": ["evt-2"]}))
+        tools = self.make_tools(store, tail)
+        index = tools._get_similarity_index()
+
+        with patch.object(index, "add_campaign", wraps=index.add_campaign) as reindex:
+            result = await tools.detect_ongoing_campaigns()
+        assert result["extended_campaigns"] == {"stored": 1}
+        campaign = store.get_campaign("stored")
+        assert campaign["total_events"] == 11
+        assert datetime.fromisoformat(campaign["end_time"]) > NOW - timedelta(minutes=6)
+        assert [e.event_id for e in store.get_events("stored")] == ["evt-1"]
+        (call,) = reindex.call_args_list
+        assert call.args[0]["campaign_id"] == "stored"
+
+        # Events already merged are not counted again
+        result = await tools.detect_ongoing_campaigns()
+        assert result["extended_campaigns"] == {}
+
+    @pytest.mark.asyncio
+    async def test_threshold_change_restarts_clustering(self, store):
+        """A different correlation threshold starts a new clusterer."""
+        tail = AsyncMock(return_value=([make_event(1, "203.0.113.5")], {"timestamp": 1}))
+        tools = self.make_tools(store, tail)
+        await tools.detect_ongoing_campaigns(correlation_threshold=0.8)
+        await tools.detect_ongoing_campaigns(correlation_threshold=1.0)
+        assert tail.await_args.kwargs["checkpoint"] is None
+        assert tools.campaign_clusterer.correlation_threshold == 1.0
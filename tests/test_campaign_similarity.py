@@ -0,0 +1,142 @@
+"""Tests for MinHash/LSH campaign similarity."""
+
+from datetime import UTC, datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.campaign_analyzer import Campaign
+from src.campaign_mcp_tools import CampaignMCPTools
+from src.campaign_similarity import (
+    CampaignSimilarityIndex,
+    MinHasher,
+    estimate_similarity,
+    estimate_similarity_matrix,
+)
+from src.campaign_store import CampaignStore
+
+
+def ips(start: int, stop: int) -> list[str]:
+    """IP indicators 10.0.x.y for a range of numbers."""
+    return [f"10.0.{n // 256}.{n % 256}" for n in range(start, stop)]
+
+
+def make_campaign(campaign_id: str, indicators: list[str], ttps: list[str]) -> Campaign:
+    """Build a campaign from its indicators and techniques."""
+    now = datetime.now(UTC)
+    return Campaign(
+        campaign_id=campaign_id,
+        confidence_score=0.8,
+        start_time=now,
+        end_time=now,
+        related_indicators=indicators,
+        ttp_techniques=ttps,
+        total_events=len(indicators),
+    )
+
+
+class TestMinHash:
+    """Signature estimates of Jaccard similarity."""
+
+    def test_estimate_tracks_jaccard_similarity(self):
+        """Estimates are close to the true similarity."""
+        hasher = MinHasher()
+        base = hasher.signature(ips(0, 200))
+        # 150 shared of 250 distinct tokens: Jaccard 0.6
+        overlapping = hasher.signature(ips(50, 250))
+        assert estimate_similarity(base, overlapping) == pytest.approx(0.6, abs=0.12)
+        assert estimate_similarity(base, hasher.signature(ips(0, 200))) == 1.0
+        assert estimate_similarity(base, hasher.signature(ips(1000, 1200))) < 0.1
+
+    def test_empty_sets_are_similar_to_nothing(self):
+        """An empty token set has no signature and similarity 0."""
+        hasher = MinHasher()
+        assert hasher.signature([]) is None
+        assert estimate_similarity(None, hasher.signature(["a"])) == 0.0
+
+    def test_similarity_matrix(self):
+        """The matrix is symmetric with ones on the diagonal."""
+        hasher = MinHasher()
+        signatures = [hasher.signature(["a", "b"]), hasher.signature(["a", "b"]), None]
+        assert estimate_similarity_matrix(signatures) == [
+            [1.0, 1.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+
+
+class TestCampaignSimilarityIndex:
+    """LSH candidate search."""
+
+    @pytest.fixture
+    def index(self):
+        """Index of a campaign, a near duplicate and an unrelated campaign."""
+        index = CampaignSimilarityIndex()
+        index.add("original", [f"ind:{ip}" for ip in ips(0, 100)] + ["ttp:T1110"])
+        index.add("near", [f"ind:{ip}" for ip in ips(5, 100)] + ["ttp:T1110"])
+        index.add("other", [f"ind:{ip}" for ip in ips(500, 600)] + ["ttp:T1046"])
+        return index
+
+    def test_similar_campaigns_are_found(self, index):
+        """Near duplicates are returned, unrelated campaigns are not."""
+        ((campaign_id, similarity),) = index.similar_to("original")
+        assert campaign_id == "near"
+        assert similarity > 0.8
+        assert index.similar_to("missing") == []
+
+    def test_remove_and_replace(self, index):
+        """Removed campaigns leave the buckets; re-adding replaces."""
+        assert index.remove("near") is True
+        assert index.similar_to("original") == []
+        assert index.add("near", ["ttp:T1046"]) is True
+        assert len(index) == 3
+        assert index.add("empty", []) is False
+        assert "empty" not in index
+
+    def test_bands_must_divide_signature(self):
+        """The signature must split evenly into bands."""
+        with pytest.raises(ValueError):
+            CampaignSimilarityIndex(num_perm=100, bands=32)
+
+
+class TestCampaignToolsSimilarity:
+    """Similarity in campaign comparison and search."""
+
+    @pytest.fixture
+    def tools(self):
+        """Campaign tools over a store with related and unrelated campaigns."""
+        store = CampaignStore()
+        store.save_campaign(make_campaign("original", ips(0, 100), ["T1110"]))
+        store.save_campaign(make_campaign("near", ips(5, 100), ["T1110"]))
+        store.save_campaign(make_campaign("other", ips(500, 600), ["T1046"]))
+        with (
+            patch("src.campaign_mcp_tools.get_user_config"),
+            patch("src.campaign_analyzer.get_user_config"),
+        ):
+            return CampaignMCPTools(Mock(), campaign_store=store)
+
+    @pytest.mark.asyncio
+    async def test_search_similar_to_campaign(self, tools):
+        """similar_to ranks related campaigns and still applies filters."""
+        result = await tools.search_campaigns({"similar_to": "original"})
+        (match,) = result["matching_campaigns"]
+        assert match["campaign_id"] == "near"
+        assert match["similarity"] > 0.8
+
+        result = await tools.search_campaigns({"similar_to": "original", "min_confidence": 0.9})
+        assert result["matching_campaigns"] == []
+
+    @pytest.mark.asyncio
+    async def test_compare_campaigns_matrix_and_related(self, tools):
+        """The matrix covers every compared campaign; related ones are listed."""
+        result = await tools.compare_campaigns(["original", "other"])
+        matrix = result["similarity_matrix"]
+        assert len(matrix) == 2 and matrix[0][0] == 1.0
+        assert matrix[0][1] < 0.1
+        assert [r["campaign_id"] for r in result["related_campaigns"]["original"]] == ["near"]
+
+    def test_index_follows_new_campaigns(self, tools):
+        """Campaigns analysed after the index is built are indexed too."""
+        index = tools._get_similarity_index()
+        tools._store_campaign(make_campaign("copy", ips(0, 100), ["T1110"]))
+        assert index.similar_to("original", limit=1)[0] == ("copy", 1.0)
@@ -0,0 +1,200 @@
+"""Tests for the persistent campaign store."""
+
+import sqlite3
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.campaign_analyzer import Campaign, CampaignEvent
+from src.campaign_mcp_tools import CampaignMCPTools
+from src.campaign_store import CampaignStore
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def make_event(number: int, source_ip: str, **kwargs) -> CampaignEvent:
+    """Build a campaign event ``number`` minutes after START."""
+    return CampaignEvent(
+        event_id=f"evt-{number}",
+        timestamp=START + timedelta(minutes=number),
+        source_ip=source_ip,
+        destination_ip="10.0.0.1",
+        **kwargs,
+    )
+
+
+def make_campaign(campaign_id: str, confidence: float, events: list[CampaignEvent]) -> Campaign:
+    """Build a campaign summarising its events."""
+    return Campaign(
+        campaign_id=campaign_id,
+        confidence_score=confidence,
+        start_time=min(e.timestamp for e in events),
+        end_time=max(e.timestamp for e in events),
+        related_indicators=sorted({e.source_ip for e in events}),
+        ttp_techniques=sorted({e.ttp_technique for e in events if e.ttp_technique}),
+        total_events=len(events),
+        unique_ips=len({e.source_ip for e in events}),
+        unique_targets=1,
+        events=events,
+    )
+
+
+@pytest.fixture
+def store():
+    """Store holding a brute-force and a scanning campaign."""
+    store = CampaignStore()
+    store.save_campaign(
+        make_campaign(
+            "bruteforce",
+            0.9,
+            [make_event(i, "203.0.113.5", ttp_technique="T1110") for i in range(3)],
+        )
+    )
+    store.save_campaign(
+        make_campaign(
+            "scanning",
+            0.6,
+            [
+                make_event(600, "198.51.100.7", ttp_technique="T1046"),
+                make_event(601, "198.51.100.8", url="http://c2.example.com/x"),
+            ],
+        )
+    )
+    yield store
+    store.close()
+
+
+class TestCampaignStore:
+    """Storage, incremental updates and indexed search."""
+
+    def test_campaign_and_events_round_trip(self, store):
+        """Summaries and events come back as saved, events oldest first."""
+        summary = store.get_campaign("bruteforce")
+        assert summary["confidence_score"] == 0.9
+        assert summary["start_time"] == START.isoformat()
+        events = store.get_events("bruteforce")
+        assert [e.event_id for e in events] == ["evt-0", "evt-1", "evt-2"]
+        assert events[0].timestamp == START
+        assert events[0].ttp_technique == "T1110"
+        assert store.get_campaign("missing") is None
+        assert store.get_events("missing") == []
+
+    def test_search_by_indicator_ttp_time_and_score(self, store):
+        """Each criterion narrows the results; results are sorted by score."""
+
+        def ids(**criteria):
+            return [c["campaign_id"] for c in store.search(**criteria)]
+
+        assert ids() == ["bruteforce", "scanning"]
+        assert ids(indicators=["198.51.100.8"]) == ["scanning"]
+        # Domains of event URLs are indexed as indicators
+        assert ids(indicators=["c2.example.com"]) == ["scanning"]
+        assert ids(ttps=["T1110", "T1046"]) == ["bruteforce", "scanning"]
+        assert ids(start_time=START + timedelta(hours=1)) == ["scanning"]
+        assert ids(end_time=START + timedelta(hours=1)) == ["bruteforce"]
+        assert ids(min_confidence=0.8) == ["bruteforce"]
+        assert ids(indicators=["203.0.113.5"], ttps=["T1046"]) == []
+        assert ids(limit=1) == ["bruteforce"]
+
+    @pytest.mark.skipif(
+        not hasattr(sqlite3.Connection, "setlimit"), reason="Connection.setlimit needs 3.11"
+    )
+    def test_search_accepts_lists_beyond_sqlite_variable_limit(self, store):
+        """Long indicator and campaign ID lists are not bound one variable each."""
+        store._conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 100)
+        many = [f"10.0.{n // 256}.{n % 256}" for n in range(1000)]
+        found = store.search(indicators=[*many, "203.0.113.5"], campaign_ids=[*many, "bruteforce"])
+        assert [c["campaign_id"] for c in found] == ["bruteforce"]
+
+    def test_add_events_merges_new_events_only(self, store):
+        """Known events are skipped; summary and indexes follow new events."""
+        new = [
+            make_event(2, "203.0.113.5"),
+            make_event(30, "203.0.113.9", ttp_technique="T1078"),
+        ]
+        assert store.add_events("bruteforce", new) == 1
+        assert store.add_events("bruteforce", new) == 0
+
+        summary = store.get_campaign("bruteforce")
+        assert summary["total_events"] == 4
+        assert summary["unique_ips"] == 2
+        assert summary["end_time"] == (START + timedelta(minutes=30)).isoformat()
+        assert "203.0.113.9" in summary["related_indicators"]
+        assert summary["ttp_techniques"] == ["T1110", "T1078"]
+        assert [c["campaign_id"] for c in store.search(ttps=["T1078"])] == ["bruteforce"]
+
+        with pytest.raises(KeyError):
+            store.add_events("missing", new)
+
+    def test_save_replaces_and_delete_removes_index_entries(self, store):
+        """Saving a campaign again replaces its events and index entries."""
+        store.save_campaign(make_campaign("scanning", 0.7, [make_event(700, "192.0.2.1")]))
+        assert store.search(indicators=["198.51.100.7"]) == []
+        assert [e.event_id for e in store.get_events("scanning")] == ["evt-700"]
+
+        assert store.delete_campaign("scanning") is True
+        assert store.delete_campaign("scanning") is False
+        stats = store.get_stats()
+        assert stats["campaigns"] == 1
+        assert stats["indicators"] == 2
+
+    def test_campaigns_persist_in_database_file(self, tmp_path):
+        """A file-backed store is readable after reopening."""
+        path = str(tmp_path / "campaigns.sqlite3")
+        store = CampaignStore(path)
+        store.save_campaign(make_campaign("c1", 0.5, [make_event(0, "192.0.2.1")]))
+        store.close()
+
+        reopened = CampaignStore(path)
+        assert reopened.get_campaign("c1")["total_events"] == 1
+        reopened.close()
+
+
+class TestCampaignToolsStore:
+    """Campaign tools backed by the campaign store."""
+
+    @pytest.fixture
+    def tools(self, store):
+        """Campaign tools using the populated in-memory store."""
+        with (
+            patch("src.campaign_mcp_tools.get_user_config"),
+            patch("src.campaign_analyzer.get_user_config"),
+        ):
+            return CampaignMCPTools(Mock(), campaign_store=store)
+
+    @pytest.mark.asyncio
+    async def test_search_campaigns_reads_store(self, tools):
+        """search_campaigns filters stored campaigns by its criteria."""
+        # The fixture campaigns are from 2024, outside the default time range
+        result = await tools.search_campaigns({"indicators": "203.0.113.5"})
+        assert result["success"] and result["matching_campaigns"] == []
+
+        result = await tools.search_campaigns(
+            {"indicators": ["203.0.113.5"], "min_confidence": 0.5}, time_range_hours=10**6
+        )
+        assert [c["campaign_id"] for c in result["matching_campaigns"]] == ["bruteforce"]
+        assert result["matching_campaigns"][0]["summary"] == "Campaign with 3 events"
+
+    @pytest.mark.asyncio
+    async def test_campaign_details_and_timeline_use_stored_campaign(self, tools):
+        """Details and timelines no longer report stored campaigns as missing."""
+        result = await tools.get_campaign_details(
+            "bruteforce", include_relationships=False, include_threat_intel=False
+        )
+        assert result["success"]
+        assert result["campaign_details"]["basic_info"]["total_events"] == 3
+
+        timeline = await tools.get_campaign_timeline("bruteforce")
+        assert timeline["success"]
+        assert timeline["timeline"]["total_events"] == 3
+
+    def test_store_falls_back_to_memory(self):
+        """An unusable database path leaves an in-memory store."""
+        with (
+            patch("src.campaign_mcp_tools.get_user_config") as get_user_config,
+            patch("src.campaign_analyzer.get_user_config"),
+        ):
+            get_user_config.return_value.get_campaign_database_path.side_effect = ValueError
+            tools = CampaignMCPTools(Mock())
+        assert tools.campaign_store.db_path == ":memory:"
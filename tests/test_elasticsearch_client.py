@@ -1,5 +1,6 @@
 """Unit tests for Elasticsearch client."""
 
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -545,6 +546,58 @@ class TestElasticsearchClient:
         assert 'time_range_hours' in stats
         assert 'timestamp' in stats
 
+    @pytest.mark.asyncio
+    async def test_get_dshield_statistics_single_aggregation_request(self):
+        """Statistics come from one size:0 search with all aggregations."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        client.get_available_indices = AsyncMock(return_value=["dshield-events"])
+        client.client.search.return_value = {
+            "took": 12,
+            "hits": {"total": {"value": 1500, "relation": "eq"}, "hits": []},
+            "aggregations": {
+                "unique_attackers": {"value": 2},
+                "top_attackers": {
+                    "buckets": [
+                        {
+                            "key": "203.0.113.7",
+                            "doc_count": 900,
+                            "first_seen": {"value_as_string": "2024-01-01T00:00:00.000Z"},
+                            "last_seen": {"value_as_string": "2024-01-01T12:00:00.000Z"},
+                            "unique_ports": {"value": 3},
+                        }
+                    ]
+                },
+                "geographic_distribution": {"buckets": [{"key": "US", "doc_count": 1000}]},
+                "port_distribution": {"buckets": [{"key": 22, "doc_count": 700}]},
+                "hourly_distribution": {
+                    "buckets": [
+                        {"key": 0, "key_as_string": "2024-01-01T00:00:00.000Z", "doc_count": 5}
+                    ]
+                },
+            },
+        }
+
+        stats = await client.get_dshield_statistics(time_range_hours=12)
+
+        client.client.search.assert_awaited_once()
+        body = client.client.search.await_args.kwargs["body"]
+        assert body["size"] == 0
+        assert body["track_total_hits"] is True
+        assert stats["total_events"] == 1500
+        assert stats["unique_attackers"] == 2
+        assert stats["top_attackers"][0]["ip_address"] == "203.0.113.7"
+        assert stats["top_attackers"][0]["event_count"] == 900
+        assert stats["geographic_distribution"] == {"US": 1000}
+        assert stats["port_distribution"] == {"22": 700}
+        assert stats["hourly_distribution"][0]["count"] == 5
+        assert stats["diagnostic_info"]["status"] == "success"
+
 
 class TestElasticsearchClientFieldMapping:
     """Test field mapping functionality."""
@@ -840,3 +893,282 @@ class TestElasticsearchClientErrorHandling:
         # Should return error response instead of raising exception
         assert "error" in result
         assert result["error"]["error"]["code"] == error_handler.EXTERNAL_SERVICE_ERROR
+
+
+class TestMultiSearch:
+    """Test batched DShield event searches through _msearch."""
+
+    @pytest.fixture
+    def client(self):
+        """ElasticsearchClient with a mocked transport."""
+        with patch('src.elasticsearch_client.get_config', return_value=TEST_CONFIG):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @pytest.mark.asyncio
+    async def test_msearch_builds_one_request(self, client):
+        """Every query becomes one filtered search in a single msearch call."""
+        client.client.msearch.return_value = {
+            "responses": [
+                {
+                    "hits": {
+                        "hits": [
+                            {
+                                "_id": "a",
+                                "_source": {"source.ip": "1.1.1.1"},
+                                "matched_queries": ["1.1.1.1"],
+                            }
+                        ]
+                    }
+                },
+                {"error": {"type": "query_shard_exception"}},
+            ]
+        }
+        queries = [{"terms": {"source.ip": ["1.1.1.1"]}}, {"term": {"x": 1}}]
+
+        results = await client.msearch_dshield_events(
+            queries, time_range_hours=6, indices=["idx"], size=50, projection="lean"
+        )
+
+        client.client.msearch.assert_awaited_once()
+        kwargs = client.client.msearch.await_args.kwargs
+        assert kwargs["index"] == "idx"
+        searches = kwargs["searches"]
+        assert len(searches) == 4
+        body = searches[1]
+        assert body["size"] == 50
+        assert body["query"]["bool"]["filter"] == [queries[0]]
+        assert body["query"]["bool"]["must"][0]["range"]["@timestamp"]["gte"] == "now-6h"
+        assert "_source" in body
+
+        assert len(results) == 2
+        assert results[0][0]["id"] == "a"
+        assert results[0][0]["matched_queries"] == ["1.1.1.1"]
+        assert results[1] == []
+
+    @pytest.mark.asyncio
+    async def test_msearch_groups_bound_hits_per_clause(self, client):
+        """Grouped searches return top hits per named clause, merged by document."""
+
+        def bucket(*ids):
+            hits = [{"_id": i, "_index": "idx", "_source": {"source.ip": "1.1.1.1"}} for i in ids]
+            return {"doc_count": len(ids), "events": {"hits": {"hits": hits}}}
+
+        client.client.msearch.return_value = {
+            "responses": [
+                {
+                    "hits": {"hits": []},
+                    "aggregations": {
+                        "groups": {"buckets": {"busy": bucket("a", "b"), "quiet": bucket("b")}}
+                    },
+                }
+            ]
+        }
+        groups = [{"busy": {"term": {"x": 1}}, "quiet": {"term": {"x": 2}}}]
+
+        (events,) = await client.msearch_dshield_events(
+            [{"terms": {"x": [1, 2]}}], indices=["idx"], size=2, groups=groups
+        )
+
+        body = client.client.msearch.await_args.kwargs["searches"][1]
+        assert body["size"] == 0
+        aggregation = body["aggs"]["groups"]
+        assert aggregation["filters"]["filters"] == groups[0]
+        top_hits = aggregation["aggs"]["events"]["top_hits"]
+        assert top_hits == {"size": 2, "sort": [{"@timestamp": {"order": "desc"}}]}
+        assert {e["id"]: e["matched_queries"] for e in events} == {
+            "a": ["busy"],
+            "b": ["busy", "quiet"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_msearch_without_queries_skips_request(self, client):
+        """No queries means no round trip."""
+        assert await client.msearch_dshield_events([]) == []
+        client.client.msearch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_msearch_failure_is_raised(self, client):
+        """A failed msearch request propagates to the caller."""
+        client.client.msearch.side_effect = RuntimeError("down")
+        with pytest.raises(RuntimeError):
+            await client.msearch_dshield_events([{"match_all": {}}], indices=["idx"])
+
+    @pytest.mark.asyncio
+    async def test_time_windows_rank_then_fetch_densest(self, client):
+        """A count-only histogram ranks windows; top_hits run for the kept ones only."""
+        start = datetime(2024, 1, 1, 0, 7, tzinfo=UTC)
+        densest = int(start.timestamp() * 1000) + 600000
+        client.client.search.side_effect = [
+            {"aggregations": {"windows": {"buckets": [{"key": densest, "doc_count": 9}]}}},
+            {
+                "aggregations": {
+                    "windows": {
+                        "buckets": {
+                            str(densest): {
+                                "doc_count": 9,
+                                "events": {"hits": {"hits": [{"_id": "a", "_source": {}}]}},
+                            }
+                        }
+                    }
+                }
+            },
+        ]
+
+        windows = await client.query_events_by_time_windows(
+            start, start + timedelta(hours=2), 5, max_windows=10, indices=["idx"]
+        )
+
+        histogram, events = (c.kwargs["body"] for c in client.client.search.await_args_list)
+        aggs = histogram["aggs"]["windows"]
+        assert aggs["date_histogram"]["fixed_interval"] == "5m"
+        # 00:07 is 120 s past a 5 minute boundary
+        assert aggs["date_histogram"]["offset"] == "120000ms"
+        assert aggs["aggs"] == {
+            "densest": {"bucket_sort": {"sort": [{"_count": {"order": "desc"}}], "size": 10}}
+        }
+        filters = events["aggs"]["windows"]["filters"]["filters"]
+        assert filters == {
+            str(densest): {
+                "range": {
+                    "@timestamp": {
+                        "gte": densest,
+                        "lt": densest + 300000,
+                        "format": "epoch_millis",
+                    }
+                }
+            }
+        }
+        assert "top_hits" in events["aggs"]["windows"]["aggs"]["events"]
+        assert windows[0]["doc_count"] == 9
+        assert windows[0]["start"] == start + timedelta(minutes=10)
+        assert windows[0]["end"] == start + timedelta(minutes=15)
+        assert windows[0]["events"][0]["id"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_time_windows_skip_fetch_without_events(self, client):
+        """No events request is sent when the range has no events."""
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        client.client.search.return_value = {"aggregations": {"windows": {"buckets": []}}}
+
+        windows = await client.query_events_by_time_windows(
+            start, start + timedelta(hours=1), 5, indices=["idx"]
+        )
+
+        assert windows == []
+        client.client.search.assert_awaited_once()
+
+
+class TestCompositeAggregations:
+    """Exhaustive composite-aggregation breakdowns."""
+
+    @pytest.fixture
+    def client(self):
+        """ElasticsearchClient with a mocked transport."""
+        with patch('src.elasticsearch_client.get_config', return_value=TEST_CONFIG):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @staticmethod
+    def _pages(counts, page_size):
+        """Build a search side effect paging through {ip: count} buckets."""
+        keys = sorted(counts)
+
+        async def search(index, body):
+            composite = body["aggs"]["breakdown"]["composite"]
+            start = keys.index(composite["after"]["source.ip"]) + 1 if "after" in composite else 0
+            page = keys[start : start + page_size]
+            result = {
+                "buckets": [{"key": {"source.ip": k}, "doc_count": counts[k]} for k in page]
+            }
+            if page:
+                result["after_key"] = {"source.ip": page[-1]}
+            return {"aggregations": {"breakdown": result}}
+
+        return search
+
+    @pytest.mark.asyncio
+    async def test_iterates_every_bucket_across_pages(self, client):
+        """All buckets are yielded once, following after_key between pages."""
+        counts = {f"10.0.0.{i}": i for i in range(1, 8)}
+        client.client.search.side_effect = self._pages(counts, page_size=3)
+
+        buckets = [
+            bucket
+            async for bucket in client.iter_composite_buckets(
+                "source.ip", indices=["dshield-events"], page_size=3
+            )
+        ]
+
+        assert {b["key"]: b["doc_count"] for b in buckets} == counts
+        assert client.client.search.await_count == 3
+        body = client.client.search.await_args_list[0].kwargs["body"]
+        assert body["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_top_k_ranks_exact_counts(self, client):
+        """The heap keeps the largest buckets in descending order."""
+        counts = {f"10.0.0.{i}": (i * 37) % 11 for i in range(1, 30)}
+        client.client.search.side_effect = self._pages(counts, page_size=4)
+
+        top = await client.top_composite_buckets(
+            "source.ip", limit=5, indices=["dshield-events"], page_size=4
+        )
+
+        expected = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:5]
+        assert [b["doc_count"] for b in top] == [count for _, count in expected]
+
+    @pytest.mark.asyncio
+    async def test_top_attackers_use_composite_ranking(self, client):
+        """Attackers are ranked without metrics, then metrics are fetched for the winners."""
+        client.get_available_indices = AsyncMock(return_value=["dshield-events"])
+        counts = {"203.0.113.9": 42, "198.51.100.1": 7, "192.0.2.1": 1}
+        ranking = self._pages(counts, page_size=10)
+
+        async def search(index, body):
+            if "breakdown" in body["aggs"]:
+                assert "aggs" not in body["aggs"]["breakdown"]
+                return await ranking(index, body)
+            terms = body["aggs"]["attackers"]["terms"]
+            assert terms["include"] == ["203.0.113.9", "198.51.100.1"]
+            return {
+                "aggregations": {
+                    "attackers": {
+                        "buckets": [
+                            {
+                                "key": ip,
+                                "doc_count": counts[ip],
+                                "first_seen": {"value_as_string": "2024-01-01T00:00:00.000Z"},
+                                "last_seen": {"value_as_string": "2024-01-01T01:00:00.000Z"},
+                                "unique_ports": {"value": 4},
+                            }
+                            for ip in terms["include"]
+                        ]
+                    }
+                }
+            }
+
+        client.client.search.side_effect = search
+
+        attackers = await client.query_dshield_top_attackers(hours=1, limit=2)
+
+        assert client.client.search.await_count == 2
+        assert attackers[0] == {
+            "ip_address": "203.0.113.9",
+            "event_count": 42,
+            "first_seen": "2024-01-01T00:00:00.000Z",
+            "last_seen": "2024-01-01T01:00:00.000Z",
+            "unique_ports": 4,
+        }
+        assert [a["ip_address"] for a in attackers] == ["203.0.113.9", "198.51.100.1"]
+
+    @pytest.mark.asyncio
+    async def test_page_failure_raises(self, client):
+        """A failed page request surfaces as RuntimeError."""
+        client.client.search.side_effect = TransportError("connection refused")
+
+        with pytest.raises(RuntimeError):
+            async for _ in client.iter_composite_buckets("source.ip", indices=["i"]):
+                pass
@@ -0,0 +1,124 @@
+"""Tests for columnar event batches."""
+
+from collections import Counter
+
+import numpy as np
+
+from src.data_processor import DataProcessor
+from src.event_batch import DictionaryColumn, EventBatch
+
+EVENTS = [
+    {
+        "timestamp": "2024-01-01T12:30:00Z",
+        "source_ip": "1.1.1.1",
+        "destination_ip": "10.0.0.1",
+        "destination_port": 22,
+        "country": "US",
+        "event_type": "attack",
+        "severity": "high",
+        "description": "Failed login for root",
+        "reputation_score": 90,
+        "indices": ["idx-a"],
+    },
+    {
+        "timestamp": "2024-01-01T12:45:00Z",
+        "source_ip": "2.2.2.2",
+        "destination_port": 22,
+        "country": "CN",
+        "event_type": "block",
+        "severity": "low",
+        "description": "Port scan with nmap",
+        "reputation_score": None,
+        "index": "idx-b",
+    },
+    {
+        "timestamp": "not a timestamp",
+        "source_ip": "1.1.1.1",
+        "destination_port": 443,
+        "country": ["US", "CN"],
+        "event_type": "attack",
+        "description": "failed login",
+        "reputation_score": 40,
+    },
+]
+
+
+class TestDictionaryColumn:
+    """Test dictionary encoding."""
+
+    def test_codes_follow_first_appearance(self):
+        """Distinct values get codes in first-appearance order; falsy values are missing."""
+        column = DictionaryColumn()
+        column.extend(["b", None, "a", "b", "", 0])
+        assert column.values == ["b", "a"]
+        assert column.codes.tolist() == [0, -1, 1, 0, -1, -1]
+        assert column.value_counts() == {"b": 2, "a": 1}
+
+    def test_keep_empty_and_unhashable_values(self):
+        """keep_empty stores falsy values; lists are stored by their string form."""
+        column = DictionaryColumn(keep_empty=True)
+        column.extend([None, ["x"], None])
+        column.append(["x"])
+        assert column.value_counts() == {None: 2, "['x']": 2}
+
+    def test_most_common_matches_counter(self):
+        """Top-N ordering, including ties, matches Counter.most_common."""
+        values = ["c", "a", "b", "a", "c", "d"]
+        column = DictionaryColumn()
+        column.extend(values)
+        assert column.most_common(3) == Counter(values).most_common(3)
+
+    def test_masks(self):
+        """Masks select rows by value and restrict counts."""
+        column = DictionaryColumn()
+        column.extend(["x", "y", "x", "z"])
+        mask = column.mask("x", "missing")
+        assert mask.tolist() == [True, False, True, False]
+        assert column.nunique(~mask) == 2
+
+
+class TestEventBatch:
+    """Test event encoding and summaries."""
+
+    def test_columns(self):
+        """Events are encoded column by column."""
+        batch = EventBatch.from_events(EVENTS)
+
+        assert len(batch) == 3
+        assert batch.source_ip.value_counts() == {"1.1.1.1": 2, "2.2.2.2": 1}
+        assert batch.severity.value_counts() == {"high": 1, "low": 1, "medium": 1}
+        assert batch.hour.value_counts() == {"2024-01-01 12:00": 2}
+        assert batch.country.value_counts() == {"US": 1, "CN": 1, "['US', 'CN']": 1}
+        assert np.isnan(batch.reputation_score.values[1])
+        assert batch.indices == {"idx-a", "idx-b"}
+
+    def test_append_and_extend_agree(self):
+        """Appending one event at a time gives the same columns as extend."""
+        appended = EventBatch()
+        for event in EVENTS:
+            appended.append(event)
+        extended = EventBatch.from_events(EVENTS)
+        assert appended.country.codes.tolist() == extended.country.codes.tolist()
+        assert appended.pattern_text.values == extended.pattern_text.values
+
+    def test_summaries_accept_batches(self):
+        """Summaries over a list and over the equivalent batch agree."""
+        processor = DataProcessor()
+        batch = EventBatch.from_events(EVENTS)
+
+        from_list = processor.generate_security_summary(EVENTS)
+        from_batch = processor.generate_security_summary(batch)
+        from_list.pop("timestamp")
+        from_batch.pop("timestamp")
+        assert from_list == from_batch
+
+        assert from_batch["dshield_attacks"] == 2
+        assert from_batch["high_risk_events"] == 1
+        assert from_batch["attack_patterns"] == {"brute_force": 2, "port_scan": 1}
+        assert from_batch["reputation_distribution"] == {"high": 1, "low": 1}
+
+        stats = processor.generate_dshield_summary(batch)
+        assert stats.total_attacks == 2
+        assert stats.unique_attackers == 1
+        assert stats.average_reputation_score == 65.0
+        assert stats.top_ports == [{"port": 22, "count": 2}, {"port": 443, "count": 1}]
@@ -0,0 +1,120 @@
+"""Tests for compiled field-extraction plans."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.field_extraction import FieldPlanCache, document_shape
+
+MAPPINGS = {
+    "source_ip": ["source.ip", "src_ip"],
+    "country": ["source.geo.country_name", "country"],
+    "event_type": ["event.type", "type"],
+}
+
+
+@pytest.fixture
+def client():
+    """ElasticsearchClient built without real configuration."""
+    config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+    with (
+        patch("src.elasticsearch_client.get_config", return_value=config),
+        patch("src.elasticsearch_client.get_user_config"),
+    ):
+        yield ElasticsearchClient()
+
+
+class TestFieldPlanCache:
+    """Test plan compilation and caching."""
+
+    def test_shape_includes_nested_keys(self):
+        """Shape records nested dict keys but not scalar values."""
+        shape = document_shape({"a": 1, "source": {"ip": "1.2.3.4"}})
+        assert shape == (("a", None), ("source", ("ip",)))
+
+    def test_literal_dotted_and_nested_lookups(self):
+        """Literal dotted keys, nested paths and one-level scans all resolve."""
+        cache = FieldPlanCache(MAPPINGS)
+
+        flat = {"source.ip": "1.1.1.1", "type": "scan"}
+        nested = {"source": {"ip": "2.2.2.2", "geo": {"country_name": "US"}}}
+        wrapped = {"cowrie": {"src_ip": "3.3.3.3"}}
+
+        assert cache.plan_for(flat).get(flat, "source_ip") == "1.1.1.1"
+        assert cache.plan_for(flat).get(flat, "event_type") == "scan"
+        assert cache.plan_for(nested).get(nested, "source_ip") == "2.2.2.2"
+        assert cache.plan_for(nested).get(nested, "country") == "US"
+        assert cache.plan_for(wrapped).get(wrapped, "source_ip") == "3.3.3.3"
+
+    def test_none_values_fall_through_to_next_candidate(self):
+        """A present-but-None candidate does not shadow later candidates."""
+        cache = FieldPlanCache(MAPPINGS)
+        source = {"source.ip": None, "src_ip": "4.4.4.4"}
+        assert cache.plan_for(source).get(source, "source_ip") == "4.4.4.4"
+
+    def test_default_returned_when_missing(self):
+        """Missing fields return the caller's default."""
+        cache = FieldPlanCache(MAPPINGS)
+        source = {"other": 1}
+        assert cache.plan_for(source).get(source, "event_type", "unknown") == "unknown"
+        assert cache.plan_for(source).get(source, "not_a_field", "x") == "x"
+
+    def test_plans_reused_per_shape(self):
+        """Documents with the same shape share one compiled plan."""
+        cache = FieldPlanCache(MAPPINGS)
+        first = cache.plan_for({"src_ip": "1.1.1.1"})
+        second = cache.plan_for({"src_ip": "2.2.2.2"})
+        assert first is second
+        assert cache.get_stats() == {"shapes": 1, "hits": 1, "misses": 1}
+
+    def test_cache_is_bounded(self):
+        """The cache resets instead of growing past max_shapes."""
+        cache = FieldPlanCache(MAPPINGS, max_shapes=2)
+        for i in range(5):
+            cache.plan_for({f"k{i}": i})
+        assert cache.get_stats()["shapes"] <= 2
+
+
+class TestParserUsesPlans:
+    """Test ElasticsearchClient integration."""
+
+    def test_compiled_and_per_call_parsing_agree(self, client):
+        """Compiled plans produce the same event as per-call resolution."""
+        hit = {
+            "_id": "1",
+            "_source": {
+                "@timestamp": "2024-01-01T00:00:00Z",
+                "source": {"ip": "1.2.3.4", "port": 5555, "geo": {"country_name": "CN"}},
+                "destination.port": 443,
+                "event": {"type": "connection", "category": "network"},
+                "message": "hello",
+                "tags": "single",
+            },
+        }
+        compiled = client._parse_dshield_event(hit, ["idx"])
+        client.use_compiled_field_plans = False
+        per_call = client._parse_dshield_event(hit, ["idx"])
+
+        assert compiled == per_call
+        assert compiled["source_ip"] == "1.2.3.4"
+        assert compiled["country"] == "CN"
+        assert compiled["protocol"] == "https"
+        assert compiled["tags"] == ["single"]
+
+    def test_plan_cache_follows_mapping_replacement(self, client):
+        """Replacing dshield_field_mappings invalidates compiled plans."""
+        hit = {"_id": "1", "_source": {"custom_ip": "9.9.9.9"}}
+        assert client._parse_dshield_event(hit, [])["source_ip"] is None
+
+        client.dshield_field_mappings = {
+            **client.dshield_field_mappings,
+            "source_ip": ["custom_ip"],
+        }
+        assert client._parse_dshield_event(hit, [])["source_ip"] == "9.9.9.9"
+
+    def test_parse_hits_drops_unparseable(self, client):
+        """_parse_dshield_hits skips hits whose _source is not a dict."""
+        hits = [{"_id": "1", "_source": {"src_ip": "1.1.1.1"}}, {"_id": "2", "_source": None}]
+        events = client._parse_dshield_hits(hits, ["idx"])
+        assert [e["id"] for e in events] == ["1"]
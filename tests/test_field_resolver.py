@@ -0,0 +1,173 @@
+"""Tests for mapping-aware field resolution."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.elasticsearch_client import QUERY_FIELD_ALIASES, ElasticsearchClient
+from src.field_resolver import FieldResolver
+
+FIELD_MAPPINGS = {
+    "source_ip": ["source.ip", "src_ip", "related.ip"],
+    "destination_port": ["destination.port", "dst_port"],
+    "description": ["event.description", "message"],
+    "country": ["source.geo.country_name", "country"],
+}
+
+COWRIE_MAPPING = {
+    "cowrie-2024.01.01": {
+        "mappings": {
+            "properties": {
+                "@timestamp": {"type": "date"},
+                "source": {
+                    "properties": {
+                        "ip": {"type": "ip"},
+                        "geo": {"properties": {"country_name": {"type": "keyword"}}},
+                    }
+                },
+                "destination": {"properties": {"port": {"type": "long"}}},
+                "message": {
+                    "type": "text",
+                    "fields": {"keyword": {"type": "keyword", "ignore_above": 256}},
+                },
+            }
+        }
+    }
+}
+
+ZEEK_MAPPING = {
+    "zeek-2024.01.01": {
+        "mappings": {
+            "properties": {
+                "@timestamp": {"type": "date"},
+                "src_ip": {"type": "ip"},
+                "dst_port": {"type": "long"},
+            }
+        }
+    }
+}
+
+
+def compiled(*mappings: dict) -> FieldResolver:
+    """Build a resolver compiled from index mapping responses."""
+    resolver = FieldResolver()
+    for mapping in mappings:
+        resolver.update(mapping)
+    resolver.compile(FIELD_MAPPINGS, QUERY_FIELD_ALIASES)
+    return resolver
+
+
+class TestFieldResolver:
+    """Query table and extraction mappings compiled from mappings."""
+
+    def test_aliases_and_logical_names_resolve_to_mapped_fields(self):
+        """Aliases, logical names and candidates resolve to what is mapped."""
+        resolver = compiled(ZEEK_MAPPING)
+        assert resolver.resolve("source_ip") == "src_ip"
+        assert resolver.resolve("source.ip") == "src_ip"
+        assert resolver.resolve("dest_port") == "dst_port"
+        assert resolver.resolve("@timestamp") == "@timestamp"
+        assert resolver.resolve("unknown_field") == "unknown_field"
+
+    def test_text_fields_resolve_to_keyword_subfield(self):
+        """Term filters on text fields go to the keyword sub-field."""
+        resolver = compiled(COWRIE_MAPPING)
+        assert resolver.resolve("message") == "message.keyword"
+        assert resolver.resolve("description") == "message.keyword"
+        assert resolver.resolve("source_ip") == "source.ip"
+
+    def test_candidate_mapped_in_most_indices_wins(self):
+        """The candidate found in more indices is preferred."""
+        other = {"cowrie-2024.01.02": COWRIE_MAPPING["cowrie-2024.01.01"]}
+        resolver = compiled(COWRIE_MAPPING, ZEEK_MAPPING, other)
+        assert resolver.resolve("source_ip") == "source.ip"
+        # Explicitly mapped names are never rerouted
+        assert resolver.resolve("src_ip") == "src_ip"
+
+    def test_extraction_mappings_are_pruned(self):
+        """Only candidates present in the mappings are kept for parsing."""
+        resolver = compiled(COWRIE_MAPPING, ZEEK_MAPPING)
+        assert resolver.extraction_mappings["source_ip"] == ["source.ip", "src_ip"]
+        assert resolver.extraction_mappings["country"] == ["source.geo.country_name"]
+
+    def test_incomplete_mappings_disable_pruning(self):
+        """dynamic: false indices keep every candidate."""
+        loose = {"misc-1": {"mappings": {"dynamic": False, "properties": {}}}}
+        resolver = compiled(COWRIE_MAPPING, loose)
+        assert resolver.extraction_mappings is FIELD_MAPPINGS
+
+    def test_forget_drops_index_and_invalidates_tables(self):
+        """Removed indices no longer contribute after recompiling."""
+        resolver = compiled(COWRIE_MAPPING, ZEEK_MAPPING)
+        assert resolver.forget(["zeek-2024.01.01"]) == 1
+        assert resolver.compiled_for is None
+        resolver.compile(FIELD_MAPPINGS, QUERY_FIELD_ALIASES)
+        assert resolver.resolve("src_ip") == "source.ip"
+        assert resolver.resolve("dst_port") == "destination.port"
+
+    def test_suggestions_prefer_mapped_fields(self):
+        """Suggestions come from the mapped field names."""
+        resolver = compiled(COWRIE_MAPPING)
+        assert "destination.port" in resolver.suggestions("destination_prt")
+
+
+class TestClientFieldResolution:
+    """ElasticsearchClient use of the field resolver."""
+
+    @pytest.fixture
+    def client(self):
+        """Client whose catalog holds a cowrie and a zeek index."""
+        config = {
+            "elasticsearch": {
+                "url": "http://localhost:9200",
+                "index_patterns": {"cowrie": ["cowrie-*"], "zeek": ["zeek-*"]},
+            }
+        }
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        client.client.indices.get_mapping.return_value = {**COWRIE_MAPPING, **ZEEK_MAPPING}
+        return client
+
+    def test_without_mappings_aliases_apply(self, client):
+        """Before mappings are loaded, the static aliases are used."""
+        assert client._map_query_fields({"message": "x"}) == {"log.message": "x"}
+
+    @pytest.mark.asyncio
+    async def test_mappings_loaded_once_per_index(self, client):
+        """Known indices are not requested again; new ones are."""
+        names = ["cowrie-2024.01.01", "zeek-2024.01.01"]
+        assert await client.refresh_field_resolver(names) == 2
+        assert await client.refresh_field_resolver(names) == 0
+        client.client.indices.get_mapping.assert_called_once_with(index=",".join(names))
+
+        mapped = client._map_query_fields({"message": "x", "source_ip": "1.2.3.4"})
+        assert mapped == {"message.keyword": "x", "source.ip": "1.2.3.4"}
+
+    @pytest.mark.asyncio
+    async def test_parser_uses_pruned_plans_for_known_indices(self, client):
+        """Hits from mapped indices parse with the resolved candidate lists."""
+        await client.refresh_field_resolver(["cowrie-2024.01.01", "zeek-2024.01.01"])
+        hit = {
+            "_id": "1",
+            "_index": "zeek-2024.01.01",
+            "_source": {"@timestamp": "2024-01-01T00:00:00Z", "src_ip": "1.2.3.4"},
+        }
+        event = client._parse_dshield_event(hit, ["zeek-*"])
+        assert event["source_ip"] == "1.2.3.4"
+        assert client._resolved_plan_cache.get_stats()["misses"] == 1
+
+        # Hits from indices without a known mapping keep the full candidate lists
+        event = client._parse_dshield_event({**hit, "_index": "zeek-2024.01.02"}, ["zeek-*"])
+        assert event["source_ip"] == "1.2.3.4"
+        assert client._field_plan_cache.get_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mapping_failure_keeps_static_aliases(self, client):
+        """A failed mapping request leaves query mapping unchanged."""
+        client.client.indices.get_mapping.side_effect = Exception("boom")
+        assert await client.refresh_field_resolver(["cowrie-2024.01.01"]) == 0
+        assert client._map_query_fields({"source_ip": "1.2.3.4"}) == {"source.ip": "1.2.3.4"}
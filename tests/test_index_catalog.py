@@ -0,0 +1,160 @@
+"""Tests for the index catalog and time-range index pruning."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.index_catalog import IndexCatalog, index_name_time_range
+
+
+def day(offset: int = 0) -> datetime:
+    """Midnight UTC, offset days from today."""
+    today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(days=offset)
+
+
+@pytest.fixture
+def client():
+    """ElasticsearchClient with ninety daily indices up to today."""
+    config = {
+        "elasticsearch": {
+            "url": "http://localhost:9200",
+            "index_patterns": {"dshield": ["dshield-*"]},
+        }
+    }
+    with (
+        patch("src.elasticsearch_client.get_config", return_value=config),
+        patch("src.elasticsearch_client.get_user_config"),
+    ):
+        client = ElasticsearchClient()
+    client.client = AsyncMock()
+    names = [f"dshield-{day(-i):%Y.%m.%d}" for i in range(90)]
+    client.client.cat.indices.return_value = [{"index": name} for name in names]
+    client.client.search.return_value = {"aggregations": {"indices": {"buckets": []}}}
+    return client
+
+
+class TestIndexNames:
+    """Test time ranges derived from index names."""
+
+    def test_daily_and_monthly_names(self):
+        """Daily and monthly dates are recognised."""
+        start, end = index_name_time_range("cowrie-2024.01.15")
+        assert start == datetime(2024, 1, 15, tzinfo=UTC)
+        assert end == datetime(2024, 1, 16, tzinfo=UTC)
+
+        start, end = index_name_time_range("zeek-2024_12")
+        assert (start, end) == (datetime(2024, 12, 1, tzinfo=UTC), datetime(2025, 1, 1, tzinfo=UTC))
+
+    def test_undated_names(self):
+        """Undated, invalid and data stream backing names have no range."""
+        assert index_name_time_range("dshield-events") is None
+        assert index_name_time_range("dshield-2024.13.45") is None
+        assert index_name_time_range(".ds-logs-2024.01.15-000001") is None
+
+
+class TestIndexCatalog:
+    """Test catalog pruning."""
+
+    def test_prune_by_name_and_bounds(self):
+        """Indices outside the range are dropped, late events extend a range."""
+        catalog = IndexCatalog()
+        catalog.update(
+            ["d-2024.01.01", "d-2024.01.02", "d-2024.01.03", "undated"],
+            {"d-2024.01.01": (None, datetime(2024, 1, 2, 6, tzinfo=UTC))},
+        )
+
+        start = datetime(2024, 1, 2, 3, tzinfo=UTC)
+        kept = catalog.prune(list(catalog.indices), start, start + timedelta(hours=1))
+
+        assert kept == ["d-2024.01.01", "d-2024.01.02", "undated"]
+
+    def test_recently_written_index_stays_open(self):
+        """An index written close to the refresh may have newer events."""
+        catalog = IndexCatalog(refresh_interval_seconds=300)
+        recent = datetime.now(UTC) - timedelta(seconds=30)
+        catalog.update(["live"], {"live": (recent - timedelta(days=1), recent)})
+
+        start = datetime.now(UTC) + timedelta(minutes=1)
+        assert catalog.prune(["live", "unknown"], start, start + timedelta(hours=1)) == [
+            "live",
+            "unknown",
+        ]
+
+    def test_staleness(self):
+        """The catalog is stale until filled and after its interval."""
+        catalog = IndexCatalog(refresh_interval_seconds=0)
+        assert catalog.is_stale()
+        catalog.update(["a"])
+        assert catalog.is_stale()
+        catalog.refresh_interval_seconds = 60
+        assert not catalog.is_stale()
+
+
+class TestClientIndexSelection:
+    """Test index discovery and pruning in ElasticsearchClient."""
+
+    @pytest.mark.asyncio
+    async def test_discovery_is_cached(self, client):
+        """cat.indices runs once while the catalog is fresh."""
+        first = await client.get_available_indices()
+        second = await client.get_available_indices()
+
+        assert first == second
+        assert len(first) == 90
+        client.client.cat.indices.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_catalog_refreshes_in_background(self, client):
+        """A stale catalog answers immediately and refreshes in the background."""
+        await client.get_available_indices()
+        client.index_catalog.refresh_interval_seconds = 0
+
+        indices = await client.get_available_indices()
+        assert len(indices) == 90
+        await asyncio.sleep(0)
+        await client._catalog_refresh_task
+
+        assert client.client.cat.indices.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_one_hour_query_targets_recent_indices(self, client):
+        """A 1h query searches only the indices overlapping the last hour."""
+        client.client.search.return_value = {
+            "hits": {"total": {"value": 0}, "hits": []},
+            "aggregations": {"indices": {"buckets": []}},
+        }
+
+        await client.query_dshield_events(time_range_hours=1, optimization="none")
+
+        searched = client.client.search.await_args.kwargs["index"].split(",")
+        now = datetime.now(UTC)
+        expected = {f"dshield-{now:%Y.%m.%d}", f"dshield-{now - timedelta(hours=1):%Y.%m.%d}"}
+        assert set(searched) == expected
+
+    @pytest.mark.asyncio
+    async def test_timestamp_bounds_parsed(self, client):
+        """Min/max aggregation values become index time ranges."""
+        client.client.cat.indices.return_value = [{"index": "dshield-events"}]
+        client.client.search.return_value = {
+            "aggregations": {
+                "indices": {
+                    "buckets": [
+                        {
+                            "key": "dshield-events",
+                            "min_timestamp": {"value": 1704067200000},
+                            "max_timestamp": {"value": 1704153600000},
+                        }
+                    ]
+                }
+            }
+        }
+
+        await client.refresh_index_catalog()
+
+        entry = client.index_catalog.indices["dshield-events"]
+        assert entry.min_timestamp == datetime(2024, 1, 1, tzinfo=UTC)
+        assert entry.max_timestamp == datetime(2024, 1, 2, tzinfo=UTC)
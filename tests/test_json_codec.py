@@ -0,0 +1,80 @@
+"""Tests for the pluggable JSON codec."""
+
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, ClassVar
+
+import pytest
+
+from src import json_codec
+
+
+@pytest.fixture(autouse=True)
+def reset_compact_output():
+    """Restore indented tool output after each test."""
+    yield
+    json_codec.set_compact_output(False)
+
+
+@dataclass
+class Sample:
+    """Dataclass serialized through the ``default=str`` fallback."""
+
+    name: str
+
+
+class TestJSONCodec:
+    """Encoding and decoding with and without orjson."""
+
+    VALUE: ClassVar[dict[Any, Any]] = {
+        "timestamp": datetime(2024, 1, 1, 12, 30, tzinfo=UTC),
+        "ports": [22, 80],
+        "score": 1.5,
+        "country": "Côte d'Ivoire",
+        "nested": {"sample": Sample("a"), "missing": None},
+        1: "non-string key",
+    }
+
+    def test_compact_matches_stdlib(self):
+        """Compact output is the stdlib output with compact separators."""
+        expected = json.dumps(self.VALUE, separators=(",", ":"), default=str, ensure_ascii=False)
+        assert json_codec.dumps(self.VALUE) == expected
+
+    def test_indent_matches_stdlib(self):
+        """Indented output round-trips to the same value as the stdlib."""
+        expected = json.dumps(self.VALUE, indent=2, default=str)
+        encoded = json_codec.dumps(self.VALUE, indent=True)
+        assert "\n  " in encoded
+        assert json.loads(encoded) == json.loads(expected)
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Without orjson the standard library produces the same document."""
+        expected = json_codec.dumps_bytes(self.VALUE)
+        monkeypatch.setattr(json_codec, "HAS_ORJSON", False)
+        assert json_codec.dumps_bytes(self.VALUE) == expected
+        assert json_codec.loads(expected) == json.loads(expected)
+
+    def test_large_integer_falls_back(self):
+        """Integers beyond 64 bits are encoded by the standard library."""
+        assert json_codec.dumps({"n": 2**70}) == f'{{"n":{2**70}}}'
+
+    def test_dumps_text_honours_compact_output(self):
+        """Tool output is indented unless compact output is enabled."""
+        assert "\n" in json_codec.dumps_text({"a": 1})
+        json_codec.set_compact_output(True)
+        assert json_codec.is_compact_output()
+        assert json_codec.dumps_text({"a": 1}) == '{"a":1}'
+
+    def test_loads_bytes_and_text(self):
+        """Bytes, memoryviews and text all decode."""
+        assert json_codec.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+        assert json_codec.loads(memoryview(b'{"a": 1}')) == {"a": 1}
+        assert json_codec.loads('{"a": "é"}') == {"a": "é"}
+
+    def test_loads_invalid_raises_json_decode_error(self):
+        """Invalid input raises the stdlib-compatible decode error."""
+        with pytest.raises(json_codec.JSONDecodeError):
+            json_codec.loads(b"{not json")
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads("")
@@ -1,6 +1,6 @@
 """Tests for pagination functionality in DShield MCP service."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -146,3 +146,210 @@ class TestPagination:
             "end_index",
         }
         assert set(pagination_info.keys()) == expected_keys
+
+
+class TestPointInTimePagination:
+    """Tests for point-in-time + search_after pagination."""
+
+    @pytest.fixture
+    def pit_client(self):
+        """Real ElasticsearchClient with a mocked transport."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.cursor_timeout_seconds = 300
+        client.client = AsyncMock()
+        client.client.open_point_in_time.return_value = {"id": "pit-1"}
+        return client
+
+    @staticmethod
+    def _response(ids, total=3, pit_id="pit-1"):
+        hits = [
+            {"_id": i, "_source": {"@timestamp": "2024-01-01T00:00:00Z"}, "sort": [1000, n]}
+            for n, i in enumerate(ids)
+        ]
+        return {"pit_id": pit_id, "hits": {"total": {"value": total}, "hits": hits}}
+
+    @pytest.mark.asyncio
+    async def test_first_page_opens_pit_and_returns_opaque_cursor(self, pit_client):
+        """First page opens a PIT, sorts with a _shard_doc tiebreaker and tracks totals."""
+        pit_client.client.search.return_value = self._response(["a", "b"], pit_id="pit-2")
+
+        events, total, info = await pit_client.query_dshield_events(
+            indices=["idx"], page_size=2, use_pit=True
+        )
+
+        pit_client.client.open_point_in_time.assert_awaited_once_with(
+            index="idx", keep_alive="300s"
+        )
+        body = pit_client.client.search.call_args.kwargs["body"]
+        assert "index" not in pit_client.client.search.call_args.kwargs
+        assert body["pit"]["id"] == "pit-1"
+        assert body["sort"][1] == {"_shard_doc": {"order": "desc"}}
+        assert body["track_total_hits"] is True
+        assert "search_after" not in body and "from_" not in body
+        assert [e["id"] for e in events] == ["a", "b"]
+        assert total == 3
+        assert info["pagination_method"] == "pit"
+        assert info["has_next"] is True
+
+        state = ElasticsearchClient._decode_pit_cursor(info["next_page_token"])
+        assert state["pit_id"] == "pit-2"
+        assert state["search_after"] == [1000, 1]
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_and_last_page_closes_pit(self, pit_client):
+        """A PIT cursor resumes after the stored sort values; a short page closes the PIT."""
+        cursor = ElasticsearchClient._encode_pit_cursor(
+            {
+                "pit_id": "pit-2",
+                "search_after": [1000, 1],
+                "page": 1,
+                "total": 3,
+                "sort_by": "@timestamp",
+                "sort_order": "desc",
+                "page_size": 2,
+            }
+        )
+        pit_client.client.search.return_value = self._response(["c"], pit_id="pit-2")
+
+        _, total, info = await pit_client.query_dshield_events(cursor=cursor)
+
+        pit_client.client.open_point_in_time.assert_not_awaited()
+        body = pit_client.client.search.call_args.kwargs["body"]
+        assert body["search_after"] == [1000, 1]
+        assert body["track_total_hits"] is False
+        assert body["size"] == 2
+        assert total == 3
+        assert info["page_number"] == 2
+        assert info["has_next"] is False
+        assert "next_page_token" not in info
+        pit_client.client.close_point_in_time.assert_awaited_once_with(id="pit-2")
+
+    @pytest.mark.asyncio
+    async def test_cursor_pins_time_bounds_and_filters(self, pit_client):
+        """Later pages rerun the first page's query even when only the cursor is passed."""
+        pit_client.client.search.return_value = self._response(["a", "b"])
+        _, _, info = await pit_client.query_dshield_events(
+            time_range_hours=6,
+            indices=["idx"],
+            filters={"source_ip": "1.2.3.4"},
+            page_size=2,
+            use_pit=True,
+        )
+        first_query = pit_client.client.search.call_args.kwargs["body"]["query"]
+        bounds = first_query["bool"]["must"][0]["range"]["@timestamp"]
+        assert not bounds["gte"].startswith("now")
+        assert len(first_query["bool"]["must"]) == 2
+
+        pit_client.client.search.return_value = self._response(["c", "d"])
+        _, _, info = await pit_client.query_dshield_events(cursor=info["next_page_token"])
+        assert pit_client.client.search.call_args.kwargs["body"]["query"] == first_query
+
+        await pit_client.query_dshield_events(cursor=info["next_page_token"])
+        assert pit_client.client.search.call_args.kwargs["body"]["query"] == first_query
+
+    def test_non_pit_cursor_is_ignored(self):
+        """Legacy timestamp cursors are not mistaken for PIT cursors."""
+        assert ElasticsearchClient._decode_pit_cursor("2024-01-01T00:00:00Z") is None
+        assert ElasticsearchClient._decode_pit_cursor("pit.@@not-base64@@") is None
+
+
+class TestLeanProjection:
+    """Tests for the lean event projection."""
+
+    @pytest.fixture
+    def lean_client(self):
+        """Real ElasticsearchClient with a mocked transport."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        client.client.search.return_value = {
+            "hits": {
+                "total": {"value": 1},
+                "hits": [
+                    {
+                        "_id": "a",
+                        "_index": "cowrie-2024.01.01",
+                        "_source": {
+                            "@timestamp": "2024-01-01T00:00:00Z",
+                            "source.ip": "1.2.3.4",
+                            "payload": "x" * 500,
+                        },
+                    }
+                ],
+            }
+        }
+        return client
+
+    @pytest.mark.asyncio
+    async def test_lean_events_drop_raw_data_and_push_down_source(self, lean_client):
+        """Lean events carry the hit index only and _source is filtered server-side."""
+        events, _, info = await lean_client.query_dshield_events(
+            indices=["cowrie-*", "zeek-*"], optimization="none", projection="lean"
+        )
+
+        event = events[0]
+        assert "raw_data" not in event and "indices" not in event
+        assert event["index"] == "cowrie-2024.01.01"
+        assert event["source_ip"] == "1.2.3.4"
+
+        source_filter = lean_client.client.search.call_args.kwargs["body"]["_source"]
+        assert "source.ip" in source_filter and "*.src_ip" in source_filter
+
+        metrics = info["performance_metrics"]
+        assert metrics["projection"] == "lean"
+        assert metrics["bytes_per_event"] < metrics["full_bytes_per_event"]
+
+    @pytest.mark.asyncio
+    async def test_full_projection_is_default(self, lean_client):
+        """The default projection keeps raw_data, indices and the unfiltered _source."""
+        events, _, info = await lean_client.query_dshield_events(
+            indices=["cowrie-*"], optimization="none"
+        )
+
+        assert events[0]["raw_data"]["payload"] == "x" * 500
+        assert events[0]["indices"] == ["cowrie-*"]
+        assert "_source" not in lean_client.client.search.call_args.kwargs["body"]
+        metrics = info["performance_metrics"]
+        assert metrics["bytes_per_event"] == metrics["full_bytes_per_event"]
+
+    @pytest.mark.asyncio
+    async def test_metrics_follow_setting_and_sampling_feeds_estimator(self, lean_client):
+        """Metrics are reported per the setting; unreported pages are still sampled."""
+        _, _, info = await lean_client.query_dshield_events(
+            indices=["cowrie-*"], optimization="none"
+        )
+        assert info["performance_metrics"]["bytes_per_event"] > 0
+
+        lean_client.include_performance_metrics = False
+        lean_client._projection_pages = 0
+        with (
+            patch("src.elasticsearch_client.PROJECTION_METRICS_INTERVAL", 3),
+            patch.object(lean_client, "_record_query_size") as record,
+        ):
+            for _ in range(4):
+                _, _, info = await lean_client.query_dshield_events(
+                    indices=["cowrie-*"], optimization="none"
+                )
+                assert "performance_metrics" not in info
+            # The measured bytes per event reach the estimator on sampled pages only
+            observed = [call.args[3] > 0 for call in record.call_args_list]
+            _, _, info = await lean_client.query_dshield_events(
+                indices=["cowrie-*"], optimization="none", include_performance_metrics=True
+            )
+        assert observed == [True, False, False, True]
+        assert info["performance_metrics"]["bytes_per_event"] > 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_projection(self, lean_client):
+        """Unknown projection modes are rejected."""
+        with pytest.raises(ValueError):
+            await lean_client.query_dshield_events(projection="tiny")
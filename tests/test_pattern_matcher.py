@@ -0,0 +1,88 @@
+"""Tests for the Aho-Corasick attack pattern matcher."""
+
+import random
+
+from src.data_processor import DataProcessor
+from src.pattern_matcher import AttackPatternMatcher
+
+PATTERNS = {
+    "brute_force": ["failed login", "brute force"],
+    "port_scan": ["nmap", "port scan"],
+    "overlap": ["he", "she", "hers"],
+}
+
+
+def _naive(patterns, description, event_type):
+    return tuple(
+        name
+        for name, keywords in patterns.items()
+        if any(keyword in description or keyword in event_type for keyword in keywords)
+    )
+
+
+class TestAttackPatternMatcher:
+    """Test automaton construction and matching."""
+
+    def test_matches_in_definition_order(self):
+        """Patterns are reported once each, in definition order."""
+        matcher = AttackPatternMatcher(PATTERNS)
+        assert matcher.classify("nmap run after failed login", "") == ("brute_force", "port_scan")
+        assert matcher.classify("quiet traffic", "connection") == ()
+
+    def test_overlapping_keywords_use_failure_links(self):
+        """Keywords that are suffixes of other keywords are found."""
+        matcher = AttackPatternMatcher(PATTERNS)
+        assert matcher.classify("ushers", "") == ("overlap",)
+
+    def test_no_match_across_fields(self):
+        """A keyword split between description and event type does not match."""
+        matcher = AttackPatternMatcher(PATTERNS)
+        assert matcher.classify("port", " scan") == ()
+        assert matcher.classify("", "port scan") == ("port_scan",)
+
+    def test_agrees_with_substring_search(self):
+        """Random texts classify exactly like per-keyword substring tests."""
+        patterns = DataProcessor().dshield_attack_patterns
+        matcher = AttackPatternMatcher(patterns)
+        keywords = [keyword for group in patterns.values() for keyword in group]
+        rng = random.Random(7)
+        for _ in range(2000):
+            words = rng.choices([*keywords, "x", "scan", "sql"], k=rng.randint(0, 4))
+            description = rng.choice(["", " "]).join(words)
+            event_type = rng.choice(["", "attack", "ssh brute force"])
+            assert matcher.classify(description, event_type) == _naive(
+                patterns, description, event_type
+            )
+
+    def test_classify_many(self):
+        """The batch API classifies a page in input order."""
+        matcher = AttackPatternMatcher(PATTERNS, max_cached_texts=0)
+        assert matcher.classify_many([("nmap", ""), ("", ""), ("she", "brute force")]) == [
+            ("port_scan",),
+            (),
+            ("brute_force", "overlap"),
+        ]
+
+
+class TestDataProcessorPatterns:
+    """Test DataProcessor integration."""
+
+    def test_process_events_and_page_classification(self):
+        """Per-event results and page classification use the compiled matcher."""
+        processor = DataProcessor()
+        events = [
+            {"description": "Failed login for root", "event_type": "ssh"},
+            {"description": ["Port", "Scan"], "event_type": "recon"},
+        ]
+
+        processed = processor.process_security_events(events)
+        assert processed[0]["attack_patterns"] == {"brute_force": 1}
+        assert processed[1]["attack_patterns"] == {"port_scan": 1}
+        assert processor.classify_attack_patterns(events) == [("brute_force",), ("port_scan",)]
+        assert processor._detect_attack_patterns(events) == {"brute_force": 1, "port_scan": 1}
+
+    def test_matcher_follows_pattern_table(self):
+        """Replacing dshield_attack_patterns recompiles the matcher."""
+        processor = DataProcessor()
+        processor.dshield_attack_patterns = {"custom": ["zzz"]}
+        assert processor.classify_attack_patterns([{"description": "zzz"}]) == [("custom",)]
@@ -0,0 +1,227 @@
+"""Tests for the normalized query result cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.query_cache import (
+    QueryResultCache,
+    canonical_query_key,
+    has_relative_range,
+    normalize_filters,
+    snap_time_bounds,
+    time_bucket,
+)
+
+CACHE_SETTINGS = {
+    ("performance", "enable_caching"): True,
+    ("performance", "cache_ttl_seconds"): 300,
+    ("performance", "query_cache_max_mb"): 1,
+    ("performance", "query_cache_time_bucket_seconds"): 60,
+}
+
+
+@pytest.fixture
+def client():
+    """ElasticsearchClient with caching enabled and a mocked transport."""
+    config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+    user_config = Mock()
+    user_config.get_setting.side_effect = lambda section, key: CACHE_SETTINGS.get((section, key))
+    with (
+        patch("src.elasticsearch_client.get_config", return_value=config),
+        patch("src.elasticsearch_client.get_user_config", return_value=user_config),
+    ):
+        client = ElasticsearchClient()
+    client.client = AsyncMock()
+    client.client.search.return_value = {
+        "hits": {
+            "total": {"value": 1},
+            "hits": [{"_id": "1", "_source": {"source.ip": "1.2.3.4"}}],
+        },
+        "aggregations": {"ips": {"buckets": [{"key": "1.2.3.4", "doc_count": 1}]}},
+    }
+    return client
+
+
+class TestQueryResultCache:
+    """Test the cache data structure."""
+
+    def test_hits_misses_and_copies(self):
+        """Results round-trip as copies and lookups are counted."""
+        cache = QueryResultCache("test", max_bytes=1024, ttl_seconds=60)
+        assert cache.get("k") is None
+        cache.put("k", {"events": [1, 2]})
+
+        first = cache.get("k")
+        first["events"].append(3)
+
+        assert cache.get("k") == {"events": [1, 2]}
+        assert cache.get_stats()["hits"] == 2
+        assert cache.get_stats()["misses"] == 1
+
+    def test_lru_eviction_by_bytes(self):
+        """Least recently used entries are evicted to stay within max_bytes."""
+        cache = QueryResultCache("test", max_bytes=30, ttl_seconds=60)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 10)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 10
+        assert cache.current_bytes <= 30
+        assert cache.get_stats()["evictions"] == 1
+
+        cache.put("huge", "h" * 100)
+        assert cache.get("huge") is None
+
+    def test_ttl_expiry(self):
+        """Expired entries are dropped on lookup."""
+        cache = QueryResultCache("test", max_bytes=1024, ttl_seconds=0)
+        cache.put("k", 1)
+        assert cache.get("k") is None
+        assert cache.current_bytes == 0
+
+    def test_key_normalization(self):
+        """Filter order and value order do not change the key."""
+        first = canonical_query_key(
+            "events", {"filters": normalize_filters({"a": 1, "b": ["y", "x"]})}
+        )
+        second = canonical_query_key(
+            "events", {"filters": normalize_filters({"b": ["x", "y"], "a": 1})}
+        )
+        assert first == second
+        aggregations = canonical_query_key("aggregations", {"filters": {"a": 1}})
+        assert aggregations != canonical_query_key("events", {"filters": {"a": 1}})
+        assert time_bucket(60, now=119) == time_bucket(60, now=60) != time_bucket(60, now=120)
+
+    def test_absolute_time_bounds_snap_to_bucket(self):
+        """Bounds within one bucket compare equal; date math and other fields are kept."""
+        first = {
+            "@timestamp": {"gte": "2024-01-01T00:00:01.123456", "lte": "2024-01-02T00:00:01"},
+            "source.ip": "2024-01-01T00:00:01",
+        }
+        second = {
+            "@timestamp": {"gte": "2024-01-01T00:00:59", "lte": "2024-01-02T00:00:30.5"},
+            "source.ip": "2024-01-01T00:00:01",
+        }
+        assert snap_time_bounds(first, 60) == snap_time_bounds(second, 60)
+        assert snap_time_bounds(first, 1) != snap_time_bounds(second, 1)
+        assert snap_time_bounds(first, 60)["source.ip"] == "2024-01-01T00:00:01"
+
+        flattened = {"@timestamp.gte": "2024-01-01T00:00:01Z"}
+        assert snap_time_bounds(flattened, 60) == snap_time_bounds(
+            {"@timestamp.gte": "2024-01-01T00:00:30Z"}, 60
+        )
+        relative = {"range": {"@timestamp": {"gte": "now-24h", "lte": "now"}}}
+        assert snap_time_bounds(relative, 60) == relative
+
+    def test_relative_ranges_are_detected_in_range_clauses(self):
+        """Only range bounds starting with now count as relative."""
+        assert has_relative_range({"bool": {"filter": [{"range": {"ts": {"gte": "now-1h"}}}]}})
+        assert not has_relative_range({"term": {"event.outcome": "unknown"}})
+        assert not has_relative_range({"range": {"@timestamp": {"gte": "2024-01-01"}}})
+
+
+class TestClientCaching:
+    """Test caching in ElasticsearchClient."""
+
+    @pytest.mark.asyncio
+    async def test_equivalent_event_queries_share_entry(self, client):
+        """Field aliases and filter order resolve to the same cached page."""
+        first = await client.query_dshield_events(
+            indices=["idx"],
+            filters={"source_ip": "1.2.3.4", "event_type": "scan"},
+            optimization="none",
+        )
+        second = await client.query_dshield_events(
+            indices=["idx"],
+            filters={"event.type": "scan", "source.ip": "1.2.3.4"},
+            optimization="none",
+        )
+
+        assert client.client.search.await_count == 1
+        assert second[0] == first[0]
+        assert second[1] == 1
+        stats = client.get_query_cache_stats()["events"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_time_bucket_change_misses(self, client):
+        """A new time bucket yields a new cache entry."""
+        with patch("src.elasticsearch_client.time_bucket", side_effect=[1, 2]):
+            await client.query_dshield_events(indices=["idx"], optimization="none")
+            await client.query_dshield_events(indices=["idx"], optimization="none")
+        assert client.client.search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_aggregations_cached_separately(self, client):
+        """Aggregation responses go to their own cache."""
+        query = {"range": {"@timestamp": {"gte": "now-24h"}}}
+        aggs = {"size": 0, "aggs": {"ips": {"terms": {"field": "source.ip"}}}}
+
+        await client.execute_aggregation_query(["idx"], query, aggs)
+        cached = await client.execute_aggregation_query(["idx"], query, aggs)
+
+        assert client.client.search.await_count == 1
+        assert cached["aggregations"]["ips"]["buckets"][0]["key"] == "1.2.3.4"
+        stats = client.get_query_cache_stats()
+        assert stats["aggregations"]["hits"] == 1
+        assert stats["events"]["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_absolute_aggregation_bounds_share_entry(self, client):
+        """Absolute bounds computed from the current time share an entry within a bucket."""
+        client.query_cache_time_bucket_seconds = 3600
+        aggs = {"size": 0, "aggs": {"ips": {"terms": {"field": "source.ip"}}}}
+        for now in ("2024-01-01T10:00:00.000001", "2024-01-01T10:00:00.004321"):
+            query = {"range": {"@timestamp": {"gte": "2024-01-01T09:00:00", "lte": now}}}
+            await client.execute_aggregation_query(["idx"], query, aggs)
+
+        assert client.client.search.await_count == 1
+        assert client.get_query_cache_stats()["aggregations"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_mcp_event_queries_hit_cache(self, client):
+        """Two tool calls a few ms apart send one search despite their absolute bounds."""
+        import mcp_server
+
+        server = mcp_server.DShieldMCPServer.__new__(mcp_server.DShieldMCPServer)
+        server.elastic_client = client
+        server.user_config = None
+        # A wide bucket keeps the two calls from straddling a bucket boundary
+        client.query_cache_time_bucket_seconds = 3600
+
+        # The handler adds its @timestamp bounds to the filters it is given
+        await server._query_dshield_events({"filters": {"source_ip": "1.2.3.4"}})
+        await asyncio.sleep(0.005)
+        result = await server._query_dshield_events({"filters": {"source_ip": "1.2.3.4"}})
+
+        assert "Events:" in result[0]["text"]
+        assert client.client.search.await_count == 1
+        assert client.get_query_cache_stats()["events"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, client):
+        """Failed queries are retried rather than served from cache."""
+        client.client.search.side_effect = [RuntimeError("down"), client.client.search.return_value]
+        with pytest.raises(RuntimeError):
+            await client.query_dshield_events(indices=["idx"], optimization="none")
+        events, _, _ = await client.query_dshield_events(indices=["idx"], optimization="none")
+        assert len(events) == 1
+
+    def test_caching_disabled(self):
+        """enable_caching=False leaves both caches off."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        settings = {**CACHE_SETTINGS, ("performance", "enable_caching"): False}
+        user_config = Mock()
+        user_config.get_setting.side_effect = lambda section, key: settings.get((section, key))
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config", return_value=user_config),
+        ):
+            client = ElasticsearchClient()
+        assert client.events_cache is None
+        assert client.get_query_cache_stats()["enabled"] is False
@@ -346,9 +346,6 @@ class TestSmartQueryOptimization:
     @pytest.mark.asyncio
     async def test_estimate_query_size_method(self, mock_es_client):
         """Test the _estimate_query_size method."""
-        # Mock count response
-        mock_es_client.client.count.return_value = {"count": 1000}
-
         # Use the real method instead of mock
         from src.elasticsearch_client import ElasticsearchClient
 
@@ -368,21 +365,25 @@ class TestSmartQueryOptimization:
         assert isinstance(estimated_size, float)
         assert estimated_size > 0
 
-        # Verify count was called
-        mock_es_client.client.count.assert_called_once()
+        # Estimated from rolling statistics, without a count round trip
+        mock_es_client.client.count.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_fallback_strategy_aggregate(self, mock_es_client):
         """Test aggregation fallback strategy implementation."""
-        # Mock aggregation response
-        mock_response = {
-            "aggregations": {
-                "top_sources": {"buckets": [{"key": "192.168.1.1", "doc_count": 100}]},
-                "top_destinations": {"buckets": [{"key": "80", "doc_count": 50}]},
-                "event_types": {"buckets": [{"key": "attack", "doc_count": 200}]},
+        # Mock composite aggregation responses, one page per breakdown field
+        buckets = {"source.ip": ("192.168.1.1", 100), "destination.port": (80, 50)}
+
+        async def composite_page(index, body):
+            (field,) = body["aggs"]["breakdown"]["composite"]["sources"][0]
+            key, doc_count = buckets[field]
+            return {
+                "aggregations": {
+                    "breakdown": {"buckets": [{"key": {field: key}, "doc_count": doc_count}]}
+                }
             }
-        }
-        mock_es_client.client.search.return_value = mock_response
+
+        mock_es_client.client.search.side_effect = composite_page
 
         # Use the real method instead of mock
         from src.elasticsearch_client import ElasticsearchClient
@@ -402,6 +403,8 @@ class TestSmartQueryOptimization:
         )
 
         assert len(events) > 0
+        assert events[0]["source_ip"] == "192.168.1.1"
+        assert events[1]["destination_port"] == 80
         assert pagination_info["fallback_strategy"] == "aggregate"
         assert "aggregation fallback" in pagination_info["note"]
 
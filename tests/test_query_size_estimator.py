@@ -0,0 +1,131 @@
+"""Tests for the statistics-driven query size estimator."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.query_size_estimator import DEFAULT_DOC_BYTES, DEFAULT_FIELD_BYTES, QuerySizeEstimator
+
+
+class TestQuerySizeEstimator:
+    """Unit tests for QuerySizeEstimator."""
+
+    def test_defaults_without_statistics(self):
+        """Unknown indices fall back to the default document and field sizes."""
+        estimator = QuerySizeEstimator()
+
+        full = estimator.estimate(["dshield-a"], None, 100)
+        subset = estimator.estimate(["dshield-a"], ["@timestamp", "source.ip"], 100)
+
+        assert full.source == "default"
+        assert full.total_bytes == 100 * DEFAULT_DOC_BYTES
+        assert subset.bytes_per_doc == 2 * DEFAULT_FIELD_BYTES
+
+    def test_index_stats_prior(self):
+        """Stored bytes per document from _stats are used until pages are observed."""
+        estimator = QuerySizeEstimator()
+        seeded = estimator.seed_from_index_stats(
+            {
+                "indices": {
+                    "dshield-a": {
+                        "primaries": {"docs": {"count": 1000}, "store": {"size_in_bytes": 800000}}
+                    },
+                    "empty": {"primaries": {"docs": {"count": 0}, "store": {"size_in_bytes": 0}}},
+                }
+            }
+        )
+
+        estimate = estimator.estimate(["dshield-a"], None, 10)
+
+        assert seeded == 1
+        assert estimate.source == "index_stats"
+        assert estimate.bytes_per_doc == 800
+
+    def test_observations_refine_estimate(self):
+        """Observed pages replace the prior and converge on the measured size."""
+        estimator = QuerySizeEstimator(smoothing=0.5)
+        for _ in range(10):
+            estimator.observe(["dshield-a"], None, returned_docs=50, bytes_per_doc=2000)
+
+        by_field_set = estimator.estimate(["dshield-a"], None, 50)
+        by_index = estimator.estimate(["dshield-a", "dshield-b"], None, 50)
+
+        assert by_field_set.source == "field_set"
+        assert by_field_set.bytes_per_doc == pytest.approx(2000)
+        assert by_index.source == "index"
+        assert by_index.bytes_per_doc == pytest.approx(2000)
+
+    def test_total_hits_bound_expected_documents(self):
+        """A query shape known to match few documents predicts a short page."""
+        estimator = QuerySizeEstimator()
+        estimator.observe(["i"], None, 3, 1000, total_hits=3, shape_key="shape")
+
+        assert estimator.estimate(["i"], None, 100, shape_key="shape").expected_docs == 3
+        assert estimator.estimate(["i"], None, 100, shape_key="other").expected_docs == 100
+
+    def test_prediction_error_metric(self):
+        """The relative error between prediction and measurement is tracked."""
+        estimator = QuerySizeEstimator()
+        predicted = estimator.estimate(["i"], None, 10)
+
+        estimator.observe(["i"], None, 10, DEFAULT_DOC_BYTES / 2, predicted=predicted)
+        stats = estimator.get_stats()
+
+        assert stats["observations"] == 1
+        assert stats["last_relative_error"] == pytest.approx(1.0)
+        assert stats["mean_relative_error"] == pytest.approx(1.0)
+
+
+class TestClientSizeEstimation:
+    """Integration of the estimator with ElasticsearchClient."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a client with a mocked Elasticsearch connection."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @pytest.mark.asyncio
+    async def test_auto_optimization_learns_without_count(self, client):
+        """Auto optimization never counts and learns sizes from responses."""
+        client.client.search.return_value = {
+            "hits": {
+                "total": {"value": 2},
+                "hits": [
+                    {"_id": str(i), "_index": "dshield-a", "_source": {"source.ip": "10.0.0.1"}}
+                    for i in range(2)
+                ],
+            }
+        }
+
+        await client.query_dshield_events(indices=["dshield-a"], page_size=100)
+        await client.query_dshield_events(
+            indices=["dshield-a"], page_size=100, include_performance_metrics=True
+        )
+
+        client.client.count.assert_not_called()
+        stats = client.get_query_size_estimator_stats()
+        assert stats["observations"] == 2
+        assert stats["query_shapes"] == 1
+        # The second prediction uses the measured size and hit count
+        assert stats["last_relative_error"] == pytest.approx(0.0)
+
+    def test_shape_ignores_absolute_time_bounds(self, client):
+        """Absolute bounds of a moving window do not change the query shape."""
+
+        def shape(now: str, **filters) -> str:
+            bounds = {"@timestamp": {"gte": "2024-01-01T00:00:00", "lte": now}}
+            return client._query_shape_key(24, ["dshield-a"], {**bounds, **filters})
+
+        first = shape("2024-01-02T00:00:00.000001", source_ip="1.2.3.4")
+        assert first == shape("2024-01-02T01:30:00", source_ip="1.2.3.4")
+        assert first != shape("2024-01-02T00:00:00", source_ip="5.6.7.8")
+        relative = client._query_shape_key(24, ["dshield-a"], {"@timestamp": {"gte": "now-1h"}})
+        assert relative != client._query_shape_key(24, ["dshield-a"], None)
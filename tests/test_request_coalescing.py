@@ -0,0 +1,136 @@
+"""Tests for single-flight coalescing of concurrent Elasticsearch requests."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.request_coalescing import RequestCoalescer
+
+
+class TestRequestCoalescer:
+    """Unit tests for RequestCoalescer."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_request(self):
+        """Callers arriving while a request is in flight get its response."""
+        coalescer = RequestCoalescer()
+        calls = 0
+        release = asyncio.Event()
+
+        async def request():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"hits": 1}
+
+        tasks = [asyncio.create_task(coalescer.run("k", request)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert results == [{"hits": 1}] * 5
+        assert coalescer.get_stats() == {"requests": 1, "coalesced_waiters": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_completed_requests_are_not_reused(self):
+        """Sequential callers each send their own request (no staleness)."""
+        coalescer = RequestCoalescer()
+        request = AsyncMock(side_effect=[1, 2])
+
+        assert await coalescer.run("k", request) == 1
+        assert await coalescer.run("k", request) == 2
+        assert coalescer.coalesced_waiters == 0
+
+    @pytest.mark.asyncio
+    async def test_error_raised_to_every_caller(self):
+        """A failed shared request fails all of its callers."""
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def request():
+            await release.wait()
+            raise ConnectionError("cluster unavailable")
+
+        tasks = [asyncio.create_task(coalescer.run("k", request)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Cancelling the first caller leaves the request running for waiters."""
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def request():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(coalescer.run("k", request))
+        second = asyncio.create_task(coalescer.run("k", request))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+
+class TestClientRequestCoalescing:
+    """Coalescing of ElasticsearchClient searches."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a client with a mocked Elasticsearch connection."""
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch("src.elasticsearch_client.get_config", return_value=config),
+            patch("src.elasticsearch_client.get_user_config"),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @pytest.mark.asyncio
+    async def test_identical_event_queries_send_one_search(self, client):
+        """Concurrent identical query_dshield_events calls share one search."""
+
+        async def slow_search(**kwargs):
+            await asyncio.sleep(0.01)
+            return {
+                "hits": {
+                    "total": {"value": 1},
+                    "hits": [{"_id": "1", "_index": "dshield-a", "_source": {}}],
+                }
+            }
+
+        client.client.search.side_effect = slow_search
+
+        results = await asyncio.gather(
+            *(
+                client.query_dshield_events(indices=["dshield-a"], optimization="none")
+                for _ in range(4)
+            )
+        )
+
+        assert client.client.search.await_count == 1
+        assert all(total == 1 for _, total, _ in results)
+        assert client.get_request_coalescing_stats()["coalesced_waiters"] == 3
+
+    @pytest.mark.asyncio
+    async def test_different_queries_are_not_coalesced(self, client):
+        """Searches with different bodies are sent separately."""
+        client.client.search.return_value = {"hits": {"total": {"value": 0}, "hits": []}}
+
+        await asyncio.gather(
+            client.query_dshield_events(indices=["dshield-a"], page=1, optimization="none"),
+            client.query_dshield_events(indices=["dshield-a"], page=2, optimization="none"),
+        )
+
+        assert client.client.search.await_count == 2
@@ -0,0 +1,142 @@
+"""Tests for gap-based sessionization of session-context event streams."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.elasticsearch_client import ElasticsearchClient
+from src.sessionization import (
+    NO_SESSION_KEY,
+    Session,
+    Sessionizer,
+    decode_session_cursor,
+    encode_session_cursor,
+    session_key,
+)
+
+MINUTE_MS = 60000
+
+
+class TestSessionizer:
+    """Unit tests for Sessionizer and the session cursor."""
+
+    def test_session_key_skips_missing_values(self):
+        """Missing fields are left out; no fields at all gives NO_SESSION_KEY."""
+        fields = ["source.ip", "user.name"]
+
+        assert session_key(fields, ["10.0.0.1", None]) == "source.ip:10.0.0.1"
+        assert session_key(fields, [None, None]) == NO_SESSION_KEY
+
+    def test_gap_splits_sessions_of_one_key(self):
+        """Events further apart than the gap start a new session of the key."""
+        sessionizer = Sessionizer(max_gap_minutes=30)
+
+        ids = [
+            sessionizer.add("a", minute * MINUTE_MS, {}).session_id
+            for minute in (0, 10, 35, 100)
+        ]
+        ids.append(sessionizer.add("b", 101 * MINUTE_MS, {}).session_id)
+
+        assert ids == ["a#0", "a#0", "a#0", "a#1", "b#0"]
+        summaries = sessionizer.summaries(stream_complete=False)
+        assert [s["event_count"] for s in summaries] == [3, 1, 1]
+        assert [s["complete"] for s in summaries] == [True, True, False]
+        assert summaries[0]["duration_minutes"] == 35
+
+    def test_open_session_continues_across_chunks(self):
+        """A session restored from the cursor keeps its id and counts."""
+        first = Sessionizer(max_gap_minutes=30)
+        first.add("a", 0, {"source.ip": "10.0.0.1"})
+        first.add("a", 5 * MINUTE_MS, {"source.ip": "10.0.0.1"})
+        cursor = encode_session_cursor(
+            {"search_after": [1], "session_fields": [], "open_session": first.current.to_state()}
+        )
+
+        state = decode_session_cursor(cursor)
+        second = Sessionizer(30, Session.from_state(state["open_session"]))
+        session = second.add("a", 10 * MINUTE_MS, {"source.ip": "10.0.0.1"})
+        summary = second.summaries(stream_complete=True)[0]
+
+        assert session.session_id == "a#0"
+        assert summary["event_count"] == 3
+        assert summary["chunk_event_count"] == 1
+        assert summary["continued_from_previous_chunk"] is True
+        assert summary["complete"] is True
+
+    def test_invalid_cursor_is_rejected(self):
+        """Tokens that are not session cursors decode to None."""
+        assert decode_session_cursor("1704067200000|abc") is None
+        assert decode_session_cursor("session.!!!") is None
+
+
+class TestSessionContextStreaming:
+    """stream_dshield_events_with_session_context over several chunks."""
+
+    @pytest.fixture
+    def client(self):
+        """ElasticsearchClient with a mocked search returning sorted hits."""
+        client = ElasticsearchClient.__new__(ElasticsearchClient)
+        client.client = AsyncMock()
+        client._map_query_fields = lambda filters: filters
+        client._parse_dshield_event = lambda hit, indices: {"id": hit["_id"]}
+        return client
+
+    @staticmethod
+    def _hits(rows):
+        """Build hits sorted by (source.ip, @timestamp, _id)."""
+        return [
+            {"_id": f"e{n}", "_source": {}, "sort": [ip, minute * MINUTE_MS, f"e{n}"]}
+            for n, (ip, minute) in enumerate(rows)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sessions_span_chunks_without_skipping(self, client):
+        """Every event is streamed once and open sessions carry over."""
+        hits = self._hits([("1.1.1.1", 0), ("1.1.1.1", 5), ("1.1.1.1", 50), ("2.2.2.2", 1)])
+
+        async def search(index, body):
+            start = 0
+            if "search_after" in body:
+                start = next(i for i, h in enumerate(hits) if h["sort"] == body["search_after"])
+                start += 1
+            page = hits[start : start + body["size"]]
+            return {"hits": {"total": {"value": len(hits)}, "hits": page}}
+
+        client.client.search.side_effect = search
+
+        streamed = []
+        stream_id = None
+        while True:
+            events, _, stream_id, _ = await client.stream_dshield_events_with_session_context(
+                indices=["dshield-events"],
+                session_fields=["source.ip"],
+                chunk_size=2,
+                max_session_gap_minutes=30,
+                stream_id=stream_id,
+            )
+            streamed.extend(events)
+            if stream_id is None:
+                break
+
+        assert [e["id"] for e in streamed] == ["e0", "e1", "e2", "e3"]
+        assert [e["session_id"] for e in streamed] == [
+            "source.ip:1.1.1.1#0",
+            "source.ip:1.1.1.1#0",
+            "source.ip:1.1.1.1#1",
+            "source.ip:2.2.2.2#0",
+        ]
+        body = client.client.search.await_args_list[0].kwargs["body"]
+        assert body["size"] == 2
+        assert list(body["sort"][0]) == ["source.ip"]
+
+    @pytest.mark.asyncio
+    async def test_stream_id_bound_to_session_fields(self, client):
+        """A stream cannot be resumed with different session fields."""
+        stream_id = encode_session_cursor(
+            {"search_after": [1], "session_fields": ["source.ip"], "open_session": None}
+        )
+
+        with pytest.raises(ValueError):
+            await client.stream_dshield_events_with_session_context(
+                indices=["dshield-events"], session_fields=["user.name"], stream_id=stream_id
+            )
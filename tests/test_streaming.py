@@ -4,6 +4,7 @@ Tests for event streaming functionality including basic streaming, cursor-based
 field selection, filtering, and smart chunking with session context.
 """
 
+import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
@@ -593,3 +594,192 @@ class TestSmartChunking:
         assert next_stream_id is None, "Stream ID should be None"
         assert session_context["sessions_in_chunk"] == 0, "Should have 0 sessions"
         assert len(session_context["session_summaries"]) == 0, "Should have 0 session summaries"
+
+
+class TestEventIterator:
+    """Test the iter_dshield_events async generator."""
+
+    @pytest.fixture
+    def es_client(self):
+        """Create a real ElasticsearchClient with a mocked transport."""
+        from src.elasticsearch_client import ElasticsearchClient
+
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch('src.elasticsearch_client.get_config', return_value=config),
+            patch('src.elasticsearch_client.get_user_config'),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        return client
+
+    @staticmethod
+    def _pages(*pages):
+        """Build stream_dshield_events side effects from lists of event ids."""
+        results = []
+        for index, ids in enumerate(pages):
+            next_id = f"cursor-{index}" if ids else None
+            results.append(([{"id": i} for i in ids], 100, next_id))
+        return results
+
+    @pytest.mark.asyncio
+    async def test_iterates_across_pages(self, es_client):
+        """Events from every page are yielded in order and the cursor is threaded."""
+        es_client.stream_dshield_events = AsyncMock(
+            side_effect=self._pages(["a", "b"], ["c"], [])
+        )
+
+        ids = [event["id"] async for event in es_client.iter_dshield_events(indices=["idx"])]
+
+        assert ids == ["a", "b", "c"]
+        stream_ids = [c.kwargs["stream_id"] for c in es_client.stream_dshield_events.call_args_list]
+        assert stream_ids == [None, "cursor-0", "cursor-1"]
+
+    @pytest.mark.asyncio
+    async def test_max_events_stops_fetching(self, es_client):
+        """Breaking out early cancels the prefetch task."""
+        es_client.stream_dshield_events = AsyncMock(
+            side_effect=self._pages(["a", "b"], ["c", "d"], ["e"], [])
+        )
+
+        ids = [
+            event["id"]
+            async for event in es_client.iter_dshield_events(indices=["idx"], max_events=3)
+        ]
+
+        assert ids == ["a", "b", "c"]
+        assert es_client.stream_dshield_events.call_count <= 4
+
+    @pytest.mark.asyncio
+    async def test_prefetch_is_bounded(self, es_client):
+        """The fetcher never runs more than prefetch_pages ahead of the consumer."""
+        es_client.stream_dshield_events = AsyncMock(
+            side_effect=self._pages(*[[str(i)] for i in range(10)], [])
+        )
+
+        iterator = es_client.iter_dshield_events(indices=["idx"], prefetch_pages=2)
+        first = await iterator.__anext__()
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        # One page consumed, two buffered, one blocked on the full buffer
+        assert first == {"id": "0"}
+        assert es_client.stream_dshield_events.call_count <= 4
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_page_error_is_raised(self, es_client):
+        """Structured error responses from a page surface as RuntimeError."""
+        es_client.stream_dshield_events = AsyncMock(
+            side_effect=[([{"id": "a"}], 10, "c0"), ([], 0, {"error": "boom"})]
+        )
+
+        seen = []
+        with pytest.raises(RuntimeError, match="boom"):
+            async for event in es_client.iter_dshield_events(indices=["idx"]):
+                seen.append(event["id"])
+        assert seen == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_prefetch(self, es_client):
+        """prefetch_pages must be positive."""
+        with pytest.raises(ValueError):
+            async for _ in es_client.iter_dshield_events(prefetch_pages=0):
+                pass
+
+
+class TestSlicedExport:
+    """Test the iter_dshield_events_sliced bulk export."""
+
+    @pytest.fixture
+    def es_client(self):
+        """Create a real ElasticsearchClient with a mocked transport."""
+        from src.elasticsearch_client import ElasticsearchClient
+
+        config = {"elasticsearch": {"url": "http://localhost:9200", "index_patterns": {}}}
+        with (
+            patch('src.elasticsearch_client.get_config', return_value=config),
+            patch('src.elasticsearch_client.get_user_config'),
+        ):
+            client = ElasticsearchClient()
+        client.client = AsyncMock()
+        client.cursor_timeout_seconds = 60
+        client.client.open_point_in_time = AsyncMock(
+            return_value={"id": "pit-1", "_shards": {"total": 3}}
+        )
+        client.client.close_point_in_time = AsyncMock()
+        return client
+
+    @staticmethod
+    def _slice_search(pages_per_slice, chunk_size):
+        """Build a search side effect serving ``pages_per_slice`` full pages per slice."""
+        served = {}
+
+        async def search(body):
+            slice_id = body.get("slice", {}).get("id", 0)
+            page = served.get(slice_id, 0)
+            served[slice_id] = page + 1
+            size = chunk_size if page < pages_per_slice else 0
+            hits = [
+                {
+                    "_id": f"{slice_id}-{page}-{n}",
+                    "_source": {"source.ip": "1.2.3.4"},
+                    "sort": [page * chunk_size + n],
+                }
+                for n in range(size)
+            ]
+            return {"hits": {"hits": hits}}
+
+        return search
+
+    @pytest.mark.asyncio
+    async def test_slices_capped_by_shards_and_merged(self, es_client):
+        """All slices are read over one PIT and merged into one stream."""
+        es_client.client.search = AsyncMock(side_effect=self._slice_search(2, 5))
+        metrics = {}
+
+        ids = [
+            event["id"]
+            async for event in es_client.iter_dshield_events_sliced(
+                indices=["idx"], chunk_size=5, max_slices=8, metrics=metrics
+            )
+        ]
+
+        assert len(ids) == len(set(ids)) == 3 * 2 * 5
+        assert metrics["slice_count"] == 3
+        assert metrics["total_documents"] == 30
+        assert [s["documents"] for s in metrics["slices"]] == [10, 10, 10]
+        assert all("documents_per_second" in s for s in metrics["slices"])
+
+        bodies = [c.kwargs["body"] for c in es_client.client.search.call_args_list]
+        assert {b["slice"]["max"] for b in bodies} == {3}
+        assert all(b["pit"]["id"] == "pit-1" for b in bodies)
+        assert any(b.get("search_after") == [4] for b in bodies)
+        es_client.client.open_point_in_time.assert_awaited_once_with(index="idx", keep_alive="60s")
+        es_client.client.close_point_in_time.assert_awaited_once_with(id="pit-1")
+
+    @pytest.mark.asyncio
+    async def test_single_slice_omits_slice_clause(self, es_client):
+        """max_slices=1 falls back to a plain PIT scan."""
+        es_client.client.search = AsyncMock(side_effect=self._slice_search(1, 2))
+
+        events = [
+            e
+            async for e in es_client.iter_dshield_events_sliced(
+                indices=["idx"], chunk_size=2, max_slices=1
+            )
+        ]
+
+        assert len(events) == 2
+        assert all("slice" not in c.kwargs["body"] for c in es_client.client.search.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_slice_error_closes_pit(self, es_client):
+        """A failing slice is raised to the consumer and the PIT is released."""
+        es_client.client.search = AsyncMock(side_effect=Exception("boom"))
+
+        with pytest.raises(Exception, match="boom"):
+            async for _ in es_client.iter_dshield_events_sliced(indices=["idx"], max_slices=2):
+                pass
+
+        es_client.client.close_point_in_time.assert_awaited_once_with(id="pit-1")
@@ -0,0 +1,60 @@
+"""Tests for integer-keyed subnet grouping."""
+
+import pytest
+
+from src.subnet_index import SubnetIndex, subnet_of
+
+
+class TestSubnetIndex:
+    """Grouping and lookups over sorted integer addresses."""
+
+    def test_groups_ipv4_and_ipv6_by_prefix(self):
+        """Addresses are grouped per prefix, in address order."""
+        index = SubnetIndex(ipv4_prefix=24, ipv6_prefix=64)
+        added = index.add_all(
+            ["10.0.1.20", "10.0.1.3", "10.0.2.1", "2001:db8::1", "2001:db8:0:1::1", "bogus"]
+        )
+
+        assert added == 5
+        assert index.groups() == {
+            "10.0.1.0/24": ["10.0.1.3", "10.0.1.20"],
+            "10.0.2.0/24": ["10.0.2.1"],
+            "2001:db8::/64": ["2001:db8::1"],
+            "2001:db8:0:1::/64": ["2001:db8:0:1::1"],
+        }
+        assert index.groups(min_members=2) == {"10.0.1.0/24": ["10.0.1.3", "10.0.1.20"]}
+
+    def test_coarser_prefix_merges_subnets(self):
+        """A /16 index merges the /24 subnets below it."""
+        index = SubnetIndex(ipv4_prefix=16)
+        index.add_all(["10.0.1.3", "10.0.2.1", "10.1.0.1"])
+        assert index.groups() == {
+            "10.0.0.0/16": ["10.0.1.3", "10.0.2.1"],
+            "10.1.0.0/16": ["10.1.0.1"],
+        }
+
+    def test_duplicates_are_kept_once(self):
+        """Equal addresses count once."""
+        index = SubnetIndex()
+        index.add_all(["10.0.0.1", "10.0.0.1"])
+        assert len(index) == 1
+
+    def test_members_of_any_prefix(self):
+        """Members of a network are found by bisection."""
+        index = SubnetIndex()
+        index.add_all(["10.0.0.1", "10.0.0.200", "10.0.1.1", "2001:db8::5"])
+        assert index.members("10.0.0.128/25") == ["10.0.0.200"]
+        assert index.members("10.0.0.0/16") == ["10.0.0.1", "10.0.0.200", "10.0.1.1"]
+        assert index.members("2001:db8::/32") == ["2001:db8::5"]
+
+    def test_subnet_of(self):
+        """The subnet of an address is returned in canonical CIDR form."""
+        assert subnet_of("192.0.2.77", 24) == "192.0.2.0/24"
+        assert subnet_of("2001:db8::abcd", 64) == "2001:db8::/64"
+        assert subnet_of("192.0.2.77", 64) is None
+        assert subnet_of("not-an-ip", 24) is None
+
+    def test_invalid_prefix(self):
+        """Prefix lengths outside the address family are rejected."""
+        with pytest.raises(ValueError):
+            SubnetIndex(ipv4_prefix=33)
@@ -0,0 +1,126 @@
+"""Tests for the fused summary engine."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.data_processor import DataProcessor
+from src.summary_engine import (
+    DistinctCount,
+    RowCount,
+    SummaryEngine,
+    TopValues,
+    ValueCounts,
+    summarize,
+)
+
+EVENTS = [
+    {
+        "timestamp": f"2024-01-01T{i % 3:02d}:00:00Z",
+        "source_ip": f"1.1.1.{i % 4}",
+        "destination_port": [22, 80][i % 2],
+        "country": ["US", "CN", "RU"][i % 3],
+        "event_type": ["attack", "block"][i % 2],
+        "severity": ["high", "low", "critical", "medium"][i % 4],
+        "description": ["failed login", "nmap sweep", "plain"][i % 3],
+        "reputation_score": (i * 17) % 100,
+        "indices": [f"idx-{i % 2}"],
+    }
+    for i in range(50)
+]
+
+
+def _engine():
+    return SummaryEngine(
+        {
+            "total": RowCount(),
+            "countries": ValueCounts("country"),
+            "ips": DistinctCount("source_ip"),
+            "top_ips": TopValues("source_ip", 2),
+        }
+    )
+
+
+class TestSummaryEngine:
+    """Test accumulator registration, updates and merges."""
+
+    def test_single_update(self):
+        """One update computes every registered statistic."""
+        engine = _engine()
+        engine.update(EVENTS[:4])
+        assert engine.results() == {
+            "total": 4,
+            "countries": {"US": 2, "CN": 1, "RU": 1},
+            "ips": 4,
+            "top_ips": [("1.1.1.0", 1), ("1.1.1.1", 1)],
+        }
+
+    def test_merged_chunks_equal_single_pass(self):
+        """Merging per-chunk engines gives the same results as one pass."""
+        whole = _engine()
+        whole.update(EVENTS)
+
+        merged = _engine()
+        for start in range(0, len(EVENTS), 7):
+            part = _engine()
+            part.update(EVENTS[start : start + 7])
+            merged.merge(part)
+
+        assert merged.results() == whole.results()
+
+    def test_register_and_merge_validation(self):
+        """Duplicate names and mismatched engines are rejected."""
+        engine = _engine()
+        with pytest.raises(ValueError):
+            engine.register("total", RowCount())
+        with pytest.raises(ValueError):
+            engine.merge(SummaryEngine({"total": RowCount()}))
+
+    def test_summarize_with_executor(self):
+        """summarize merges chunk engines produced by an executor."""
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            parallel = summarize(EVENTS, _engine, chunk_size=8, executor=executor)
+        sequential = summarize(EVENTS, _engine, chunk_size=50)
+        assert parallel.results() == sequential.results()
+
+        with pytest.raises(ValueError):
+            summarize(EVENTS, _engine, chunk_size=0)
+
+
+class TestSecuritySummary:
+    """Test DataProcessor on top of the engine."""
+
+    def test_chunked_summary_matches_unchunked(self):
+        """Chunk size and parallelism do not change the security summary."""
+        processor = DataProcessor()
+        whole = processor.generate_security_summary(EVENTS)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            chunked = processor.generate_security_summary(EVENTS, chunk_size=9, executor=executor)
+
+        whole.pop("timestamp")
+        chunked.pop("timestamp")
+        assert chunked == whole
+        assert whole["total_events"] == 50
+        assert whole["dshield_attacks"] == 25
+        assert whole["attack_patterns"] == {"brute_force": 17, "port_scan": 17}
+
+    def test_summary_from_merged_engines(self):
+        """Engines from create_security_summary_engine can be merged and rendered."""
+        processor = DataProcessor()
+        first = processor.create_security_summary_engine()
+        first.update(EVENTS[:20])
+        second = processor.create_security_summary_engine()
+        second.update(EVENTS[20:])
+        first.merge(second)
+
+        summary = processor.generate_security_summary(first)
+        assert summary["total_events"] == 50
+        assert summary["unique_source_ips"] == 4
+        assert sorted(summary["indices_queried"]) == ["idx-0", "idx-1"]
+
+    def test_empty_engine(self):
+        """An engine that saw no events renders the empty summary."""
+        processor = DataProcessor()
+        summary = processor.generate_security_summary(processor.create_security_summary_engine())
+        assert summary["total_events"] == 0
+        assert summary["events_by_severity"] == {}
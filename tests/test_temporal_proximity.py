@@ -0,0 +1,73 @@
+"""Tests for sliding-window temporal proximity counts."""
+
+import random
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.campaign_analyzer import CampaignAnalyzer, CampaignEvent
+from src.temporal_proximity import neighbour_counts, to_epoch_microseconds
+
+
+def pairwise_counts(times, window, keys):
+    """Reference quadratic neighbour count."""
+    return [
+        sum(1 for j, other in enumerate(times) if keys[j] != keys[i] and abs(t - other) <= window)
+        for i, t in enumerate(times)
+    ]
+
+
+class TestNeighbourCounts:
+    """Window counts over sorted timestamps."""
+
+    def test_matches_pairwise_reference(self):
+        """Counts equal the quadratic reference for random inputs and windows."""
+        rng = random.Random(7)
+        for window in (0, 1, 50, 10_000):
+            times = [rng.randint(0, 5_000) for _ in range(300)]
+            keys = [rng.choice(["a", "b", ""]) if i % 3 == 0 else i for i in range(300)]
+            expected = pairwise_counts(times, window, keys)
+            assert neighbour_counts(np.array(times), window, keys).tolist() == expected
+
+    def test_window_bounds_are_inclusive(self):
+        """Events exactly one window apart are neighbours."""
+        assert neighbour_counts(np.array([0, 10, 21]), 10).tolist() == [1, 1, 0]
+
+    def test_empty_and_mismatched_keys(self):
+        """Empty input gives no counts; keys must match the events."""
+        assert neighbour_counts(np.array([]), 10).size == 0
+        with pytest.raises(ValueError):
+            neighbour_counts(np.array([1, 2]), 10, keys=["a"])
+
+    def test_epoch_microseconds_are_exact(self):
+        """Naive and aware timestamps convert to exact microseconds."""
+        naive = datetime(2024, 1, 1, 0, 0, 0, 1)
+        aware = datetime(2024, 1, 1, tzinfo=UTC)
+        assert to_epoch_microseconds([naive, aware]).tolist() == [
+            1_704_067_200_000_001,
+            1_704_067_200_000_000,
+        ]
+
+
+class TestCampaignProximityScores:
+    """CampaignAnalyzer scores computed with the window counts."""
+
+    def test_batch_scores_match_per_event_scores(self):
+        """The O(n log n) scores equal the per-event pairwise scores."""
+        with patch("src.campaign_analyzer.get_user_config"):
+            analyzer = CampaignAnalyzer(Mock())
+        analyzer.time_proximity_window_seconds = 3600.0
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        rng = random.Random(3)
+        events = [
+            CampaignEvent(
+                event_id=str(i) if i % 5 else "",
+                timestamp=start + timedelta(seconds=rng.randint(0, 6 * 3600)),
+            )
+            for i in range(200)
+        ]
+
+        expected = [analyzer._calculate_time_proximity_score(e, events) for e in events]
+        assert analyzer._calculate_time_proximity_scores(events) == expected